@@ -84,31 +84,63 @@ class Config(JsonConfig):
         EnumSerializer(LLMServiceEnum),
     )
 
+    # 各服务的 *_RequestsPerMinute / *_TokensPerMinute 为该服务的每分钟请求数 / token 数上限
+    # （0 表示不限制，从响应头学习）
     openai_model = ConfigItem("LLM", "OpenAI_Model", "gpt-4o-mini")
     openai_api_key = ConfigItem("LLM", "OpenAI_API_Key", "")
     openai_api_base = ConfigItem("LLM", "OpenAI_API_Base", "https://api.openai.com/v1")
+    openai_requests_per_minute = RangeConfigItem(
+        "LLM", "OpenAI_RequestsPerMinute", 0, RangeValidator(0, 100000)
+    )
+    openai_tokens_per_minute = RangeConfigItem(
+        "LLM", "OpenAI_TokensPerMinute", 0, RangeValidator(0, 100000000)
+    )
 
     silicon_cloud_model = ConfigItem("LLM", "SiliconCloud_Model", "gpt-4o-mini")
     silicon_cloud_api_key = ConfigItem("LLM", "SiliconCloud_API_Key", "")
     silicon_cloud_api_base = ConfigItem(
         "LLM", "SiliconCloud_API_Base", "https://api.siliconflow.cn/v1"
     )
+    silicon_cloud_requests_per_minute = RangeConfigItem(
+        "LLM", "SiliconCloud_RequestsPerMinute", 0, RangeValidator(0, 100000)
+    )
+    silicon_cloud_tokens_per_minute = RangeConfigItem(
+        "LLM", "SiliconCloud_TokensPerMinute", 0, RangeValidator(0, 100000000)
+    )
 
     deepseek_model = ConfigItem("LLM", "DeepSeek_Model", "deepseek-chat")
     deepseek_api_key = ConfigItem("LLM", "DeepSeek_API_Key", "")
     deepseek_api_base = ConfigItem(
         "LLM", "DeepSeek_API_Base", "https://api.deepseek.com/v1"
     )
+    deepseek_requests_per_minute = RangeConfigItem(
+        "LLM", "DeepSeek_RequestsPerMinute", 0, RangeValidator(0, 100000)
+    )
+    deepseek_tokens_per_minute = RangeConfigItem(
+        "LLM", "DeepSeek_TokensPerMinute", 0, RangeValidator(0, 100000000)
+    )
 
     ollama_model = ConfigItem("LLM", "Ollama_Model", "llama2")
     ollama_api_key = ConfigItem("LLM", "Ollama_API_Key", "ollama")
     ollama_api_base = ConfigItem("LLM", "Ollama_API_Base", "http://localhost:11434/v1")
+    ollama_requests_per_minute = RangeConfigItem(
+        "LLM", "Ollama_RequestsPerMinute", 0, RangeValidator(0, 100000)
+    )
+    ollama_tokens_per_minute = RangeConfigItem(
+        "LLM", "Ollama_TokensPerMinute", 0, RangeValidator(0, 100000000)
+    )
 
     lm_studio_model = ConfigItem("LLM", "LmStudio_Model", "qwen2.5:7b")
     lm_studio_api_key = ConfigItem("LLM", "LmStudio_API_Key", "lmstudio")
     lm_studio_api_base = ConfigItem(
         "LLM", "LmStudio_API_Base", "http://localhost:1234/v1"
     )
+    lm_studio_requests_per_minute = RangeConfigItem(
+        "LLM", "LmStudio_RequestsPerMinute", 0, RangeValidator(0, 100000)
+    )
+    lm_studio_tokens_per_minute = RangeConfigItem(
+        "LLM", "LmStudio_TokensPerMinute", 0, RangeValidator(0, 100000000)
+    )
 
     gemini_model = ConfigItem("LLM", "Gemini_Model", "gemini-pro")
     gemini_api_key = ConfigItem("LLM", "Gemini_API_Key", "")
@@ -117,12 +149,34 @@ class Config(JsonConfig):
         "Gemini_API_Base",
         "https://generativelanguage.googleapis.com/v1beta/openai/",
     )
+    gemini_requests_per_minute = RangeConfigItem(
+        "LLM", "Gemini_RequestsPerMinute", 0, RangeValidator(0, 100000)
+    )
+    gemini_tokens_per_minute = RangeConfigItem(
+        "LLM", "Gemini_TokensPerMinute", 0, RangeValidator(0, 100000000)
+    )
 
     chatglm_model = ConfigItem("LLM", "ChatGLM_Model", "glm-4")
     chatglm_api_key = ConfigItem("LLM", "ChatGLM_API_Key", "")
     chatglm_api_base = ConfigItem(
         "LLM", "ChatGLM_API_Base", "https://open.bigmodel.cn/api/paas/v4"
     )
+    chatglm_requests_per_minute = RangeConfigItem(
+        "LLM", "ChatGLM_RequestsPerMinute", 0, RangeValidator(0, 100000)
+    )
+    chatglm_tokens_per_minute = RangeConfigItem(
+        "LLM", "ChatGLM_TokensPerMinute", 0, RangeValidator(0, 100000000)
+    )
+
+    # 同一 API 地址与模型的并发请求上限（所有任务共享）
+    llm_max_concurrency = RangeConfigItem(
+        "LLM", "MaxConcurrency", 32, RangeValidator(1, 256)
+    )
+    # 备用 LLM 服务（LLMServiceEnum 的值，如 ["DeepSeek", "SiliconCloud"]），
+    # 与当前服务一起按延迟与健康状况路由，出错时切换
+    llm_fallback_services = ConfigItem("LLM", "FallbackServices", [])
+    # 请求超过近期 p95 延迟仍未返回时，向备用服务发送对冲请求
+    llm_hedge_requests = ConfigItem("LLM", "HedgeRequests", True, BoolValidator())
 
     # ------------------- 翻译配置 -------------------
     translator_service = OptionsConfigItem(
@@ -161,6 +215,14 @@ class Config(JsonConfig):
         OptionsValidator(TranscribeLanguageEnum),
         EnumSerializer(TranscribeLanguageEnum),
     )
+    # 分块时把切分点移到附近的静音处（块之间不再重叠）
+    transcribe_chunk_snap_to_silence = ConfigItem(
+        "Transcribe", "ChunkSnapToSilence", True, BoolValidator()
+    )
+    # 由 ffmpeg 经管道输出 PCM，边解码边分块转录（不写临时 WAV）
+    transcribe_stream_decode = ConfigItem(
+        "Transcribe", "StreamDecode", True, BoolValidator()
+    )
 
     # ------------------- Whisper Cpp 配置 -------------------
     whisper_model = OptionsConfigItem(
@@ -170,6 +232,10 @@ class Config(JsonConfig):
         OptionsValidator(WhisperModelEnum),
         EnumSerializer(WhisperModelEnum),
     )
+    # 常驻 whisper-server：模型只加载一次，找不到可执行文件时回退为命令行
+    whisper_cpp_server_mode = ConfigItem(
+        "Whisper", "ServerMode", True, BoolValidator()
+    )
 
     # ------------------- Faster Whisper 配置 -------------------
     faster_whisper_program = ConfigItem(
@@ -212,12 +278,27 @@ class Config(JsonConfig):
     )
     # 提示词
     faster_whisper_prompt = ConfigItem("FasterWhisper", "Prompt", "")
+    # 进程内模型复用（Python 版）：已加载模型的内存预算（MB，0 为不限制）与启动时预加载
+    faster_whisper_model_memory_budget = RangeConfigItem(
+        "FasterWhisper", "ModelMemoryBudget", 8192, RangeValidator(0, 1048576)
+    )
+    faster_whisper_preload_model = ConfigItem(
+        "FasterWhisper", "PreloadModel", True, BoolValidator()
+    )
+    # 批量推理（Python 版）：VAD 语音片段成批送入模型，1 为逐段解码
+    faster_whisper_batch_size = RangeConfigItem(
+        "FasterWhisper", "BatchSize", 1, RangeValidator(1, 64)
+    )
 
     # ------------------- Whisper API 配置 -------------------
     whisper_api_base = ConfigItem("WhisperAPI", "WhisperApiBase", "")
     whisper_api_key = ConfigItem("WhisperAPI", "WhisperApiKey", "")
     whisper_api_model = OptionsConfigItem("WhisperAPI", "WhisperApiModel", "")
     whisper_api_prompt = ConfigItem("WhisperAPI", "WhisperApiPrompt", "")
+    # 接口并发上限：分块并发从 3 开始，延迟平稳时逐步提高，被限流（429/超时）时减半
+    whisper_api_max_concurrency = RangeConfigItem(
+        "WhisperAPI", "MaxConcurrency", 16, RangeValidator(1, 64)
+    )
 
     # ------------------- 字幕配置 -------------------
     need_optimize = ConfigItem("Subtitle", "NeedOptimize", False, BoolValidator())
@@ -270,12 +351,53 @@ class Config(JsonConfig):
 
     # ------------------- 缓存配置 -------------------
     cache_enabled = ConfigItem("Cache", "CacheEnabled", True, BoolValidator())
+    # LLM 响应缓存的磁盘预算（MB），超出后按最近最少使用淘汰
+    llm_cache_size_mb = RangeConfigItem(
+        "Cache", "LLMCacheSizeMB", 512, RangeValidator(16, 102400)
+    )
 
     # ------------------- RPC 配置 -------------------
     rpc_enabled = ConfigItem("RPC", "Enabled", False, BoolValidator())
     rpc_host = ConfigItem("RPC", "Host", "0.0.0.0")
     rpc_port = RangeConfigItem("RPC", "Port", 5000, RangeValidator(1024, 65535))
     rpc_master_url = ConfigItem("RPC", "MasterUrl", "")
+    # 任务队列与各阶段并发数
+    rpc_max_queue_size = RangeConfigItem(
+        "RPC", "MaxQueueSize", 32, RangeValidator(1, 1000)
+    )
+    rpc_transcribe_concurrency = RangeConfigItem(
+        "RPC", "TranscribeConcurrency", 1, RangeValidator(1, 16)
+    )
+    rpc_subtitle_concurrency = RangeConfigItem(
+        "RPC", "SubtitleConcurrency", 2, RangeValidator(1, 32)
+    )
+    # 流式字幕处理：转录未完成时即开始断句/优化/翻译已定稿的片段
+    rpc_streaming_subtitle = ConfigItem(
+        "RPC", "StreamingSubtitle", False, BoolValidator()
+    )
+    # 任务日志：持久化任务与阶段检查点，重启后断点续跑
+    rpc_task_journal = ConfigItem("RPC", "TaskJournal", True, BoolValidator())
+    # 进度回调：每秒最多向 Master 发送的进度批次数，是否合并为一条批量消息
+    rpc_progress_max_rate = RangeConfigItem(
+        "RPC", "ProgressMaxRate", 4, RangeValidator(1, 50)
+    )
+    rpc_progress_batch = ConfigItem("RPC", "ProgressBatch", False, BoolValidator())
+    # HTTP 服务：waitress（生产，多线程）或 werkzeug（开发服务器）
+    rpc_server_backend = ConfigItem(
+        "RPC", "ServerBackend", "waitress", OptionsValidator(["waitress", "werkzeug"])
+    )
+    rpc_server_threads = RangeConfigItem(
+        "RPC", "ServerThreads", 8, RangeValidator(1, 64)
+    )
+    # 收到退出信号后等待进行中 HTTP 请求完成的最长时间（秒）
+    rpc_drain_timeout = RangeConfigItem(
+        "RPC", "DrainTimeout", 30, RangeValidator(0, 600)
+    )
+    # 容量上报：向 Master 推送 WorkerCapacity 的间隔（秒），拉取模式下空闲时主动请求任务
+    rpc_capacity_interval = RangeConfigItem(
+        "RPC", "CapacityInterval", 10, RangeValidator(1, 300)
+    )
+    rpc_pull_mode = ConfigItem("RPC", "PullMode", False, BoolValidator())
 
 
 cfg = Config()
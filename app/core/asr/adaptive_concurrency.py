@@ -0,0 +1,189 @@
+"""在线 ASR 接口的自适应并发控制
+
+按接口（base_url 或服务名）维护一个 AIMD 并发上限，进程内所有任务共享：
+
+- 请求延迟（按块大小归一化）保持平稳时，上限加 1
+- 收到限流（HTTP 429）或超时时，上限减半，被限流的块退避后重试
+- 上限不超过接口的配置上限（自建服务可以很高，公共接口通常只能 2 个）
+
+上一个任务探测到的上限会被下一个任务沿用，不必每次都从头试探。
+"""
+
+import threading
+from typing import Dict, Optional
+
+from ..utils.cancel import current_cancel_token
+from ..utils.logger import setup_logger
+
+logger = setup_logger("adaptive_concurrency")
+
+# 延迟不超过基线的该倍数时视为平稳
+LATENCY_TOLERANCE = 1.25
+# 基线（最低延迟）向较慢样本漂移的速度，用于适应服务端的长期变化
+BASELINE_DRIFT = 0.05
+# 限流时上限的缩减比例
+BACKOFF_FACTOR = 0.5
+# 等待空闲槽位时检查取消的间隔（秒）
+WAIT_POLL_INTERVAL = 0.5
+
+# 视为限流的 HTTP 状态码
+THROTTLE_STATUS_CODES = (429, 503)
+# 被限流的块最多重试次数与首次退避时间（秒）
+MAX_THROTTLE_RETRIES = 3
+THROTTLE_RETRY_DELAY = 2.0
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    """判断异常是否为限流或超时（应降低并发后重试）"""
+    for exc in (error, error.__cause__, error.__context__):
+        if exc is None:
+            continue
+        if isinstance(exc, TimeoutError) or "Timeout" in type(exc).__name__:
+            return True
+        if "RateLimit" in type(exc).__name__:
+            return True
+        # openai 异常带 status_code，requests 的 HTTPError 带 response
+        status = getattr(exc, "status_code", None)
+        if status is None:
+            status = getattr(getattr(exc, "response", None), "status_code", None)
+        if status in THROTTLE_STATUS_CODES:
+            return True
+    return False
+
+
+def wait_before_retry(attempt: int):
+    """被限流的请求重试前退避等待（指数退避，可被任务取消打断）
+
+    Raises:
+        TaskCancelledError: 等待期间任务被取消
+    """
+    cancel_token = current_cancel_token()
+    cancel_token.wait(THROTTLE_RETRY_DELAY * (2**attempt))
+    cancel_token.raise_if_cancelled()
+
+
+class AdaptiveConcurrency:
+    """单个接口的 AIMD 并发上限"""
+
+    def __init__(self, endpoint: str, max_limit: int, initial_limit: int):
+        self.endpoint = endpoint
+        self.max_limit = max(1, max_limit)
+        self.limit = float(min(max(1, initial_limit), self.max_limit))
+        self.in_flight = 0
+        # 单位数据量的基线延迟（秒/字节），首个成功样本确定
+        self.baseline: Optional[float] = None
+
+        self._condition = threading.Condition()
+
+    def set_max_limit(self, max_limit: int):
+        """更新接口上限（配置变更时），当前上限随之收紧"""
+        with self._condition:
+            self.max_limit = max(1, max_limit)
+            self.limit = min(self.limit, self.max_limit)
+            self._condition.notify_all()
+
+    def acquire(self):
+        """等待空闲槽位
+
+        Raises:
+            TaskCancelledError: 等待期间任务被取消
+        """
+        cancel_token = current_cancel_token()
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                cancel_token.raise_if_cancelled()
+                self._condition.wait(timeout=WAIT_POLL_INTERVAL)
+            self.in_flight += 1
+
+    def release(self, latency_per_unit: Optional[float] = None, throttled: bool = False):
+        """
+        归还槽位并根据结果调整上限
+
+        Args:
+            latency_per_unit: 成功请求的延迟除以数据量，None 表示请求失败（不调整）
+            throttled: 请求被限流或超时
+        """
+        with self._condition:
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            if throttled:
+                self._decrease()
+            elif latency_per_unit is not None:
+                self._observe(latency_per_unit, saturated)
+            self._condition.notify_all()
+
+    def _observe(self, latency: float, saturated: bool):
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+            flat = True
+        else:
+            flat = latency <= self.baseline * LATENCY_TOLERANCE
+            self.baseline += (latency - self.baseline) * BASELINE_DRIFT
+
+        # 只有用满当前上限且延迟平稳时才说明还有余量
+        if flat and saturated and self.limit < self.max_limit:
+            self.limit = min(self.limit + 1, self.max_limit)
+            logger.info(f"[{self.endpoint}] 延迟平稳，并发上限提高到 {int(self.limit)}")
+
+    def _decrease(self):
+        new_limit = max(1.0, float(int(self.limit * BACKOFF_FACTOR)))
+        if new_limit < self.limit:
+            logger.warning(f"[{self.endpoint}] 请求被限流，并发上限降低到 {int(new_limit)}")
+        self.limit = new_limit
+
+
+class ConcurrencyRegistry:
+    """按接口共享的并发控制器（单例模式）"""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self._limiters: Dict[str, AdaptiveConcurrency] = {}
+        self._limiters_lock = threading.Lock()
+
+    def get(self, endpoint: str, max_limit: int, initial_limit: int) -> AdaptiveConcurrency:
+        """
+        获取接口的并发控制器（不存在时创建，已存在时沿用之前探测到的上限）
+
+        Args:
+            endpoint: 接口标识（base_url 或服务名）
+            max_limit: 接口并发上限
+            initial_limit: 首次使用时的初始并发数
+        """
+        with self._limiters_lock:
+            limiter = self._limiters.get(endpoint)
+            if limiter is None:
+                limiter = AdaptiveConcurrency(endpoint, max_limit, initial_limit)
+                self._limiters[endpoint] = limiter
+            elif limiter.max_limit != max_limit:
+                limiter.set_max_limit(max_limit)
+            return limiter
+
+    def limits(self) -> Dict[str, int]:
+        """各接口当前的并发上限"""
+        with self._limiters_lock:
+            return {
+                endpoint: int(limiter.limit)
+                for endpoint, limiter in self._limiters.items()
+            }
+
+    def clear(self):
+        with self._limiters_lock:
+            self._limiters.clear()
+
+
+# 全局单例实例
+concurrency_registry = ConcurrencyRegistry()
@@ -0,0 +1,181 @@
+"""音频数据源
+
+以内存映射方式打开音频文件，避免长音频在分块、转录过程中被多次完整读入内存：
+
+- PCM WAV 的时长直接从文件头计算，不需要解码
+- 哈希按块增量计算，不复制数据
+- PCM 分块为惰性视图，只在真正转录时读出对应范围
+"""
+
+import hashlib
+import mmap
+import os
+import threading
+import zlib
+from typing import Optional, Union
+
+from .pcm_wav import PCMWavInfo, parse_pcm_wav, wav_header
+
+MS_PER_SECOND = 1000
+# 增量哈希每次处理的字节数
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class AudioSource:
+    """音频数据源（文件路径以只读内存映射打开，bytes 直接引用）
+
+    映射在首次访问时建立，close() 后再次访问会重新映射。
+    """
+
+    def __init__(self, audio_input: Union[str, bytes]):
+        if isinstance(audio_input, bytes):
+            self.path: Optional[str] = None
+            self._data: Optional[bytes] = audio_input
+            self.size = len(audio_input)
+        elif isinstance(audio_input, str):
+            self.path = audio_input
+            self._data = None
+            self.size = os.path.getsize(audio_input)
+        else:
+            raise ValueError("audio_input must be provided as string or bytes")
+
+        self._mmap: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+        self._wav_info: Optional[PCMWavInfo] = None
+        self._wav_parsed = False
+        self._crc32_hex: Optional[str] = None
+
+    @property
+    def buffer(self) -> Union[bytes, mmap.mmap]:
+        """完整音频数据（文件为内存映射，不占用进程堆内存）"""
+        if self._data is not None:
+            return self._data
+        with self._lock:
+            if self._mmap is None:
+                if self.size == 0:
+                    return b""
+                with open(self.path, "rb") as f:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._mmap
+
+    @property
+    def wav_info(self) -> Optional[PCMWavInfo]:
+        """PCM WAV 格式信息，非 PCM WAV 为 None"""
+        if not self._wav_parsed:
+            self._wav_info = parse_pcm_wav(self.buffer)
+            self._wav_parsed = True
+        return self._wav_info
+
+    @property
+    def duration_ms(self) -> Optional[int]:
+        """由 WAV 头计算的时长（毫秒），非 PCM WAV 返回 None"""
+        info = self.wav_info
+        if info is None:
+            return None
+        frames = info.data_size // info.block_align
+        return frames * MS_PER_SECOND // info.sample_rate
+
+    def read(self) -> bytes:
+        """读出完整数据（需要 bytes 的场景，如上传在线接口）"""
+        if self._data is not None:
+            return self._data
+        return self.buffer[:]
+
+    def crc32_hex(self) -> str:
+        """CRC32（增量计算，结果缓存）"""
+        if self._crc32_hex is None:
+            value = 0
+            with memoryview(self.buffer) as view:
+                for pos in range(0, self.size, HASH_BLOCK_SIZE):
+                    value = zlib.crc32(view[pos : pos + HASH_BLOCK_SIZE], value)
+            self._crc32_hex = format(value & 0xFFFFFFFF, "08x")
+        return self._crc32_hex
+
+    def sha1_hex(
+        self, start: int = 0, end: Optional[int] = None, prefix: bytes = b""
+    ) -> str:
+        """对指定字节范围增量计算 SHA-1
+
+        Args:
+            start: 起始字节
+            end: 结束字节（不含），默认到末尾
+            prefix: 先于数据参与哈希的字节（如分块的 WAV 头）
+        """
+        return self._digest(hashlib.sha1(prefix), start, end)
+
+    def blake2b_hex(
+        self, start: int = 0, end: Optional[int] = None, prefix: bytes = b""
+    ) -> str:
+        """对指定字节范围增量计算 BLAKE2b（128 位），比 SHA-1 快，用于内容寻址缓存"""
+        return self._digest(hashlib.blake2b(prefix, digest_size=16), start, end)
+
+    def _digest(self, digest, start: int, end: Optional[int]) -> str:
+        end = self.size if end is None else end
+        with memoryview(self.buffer) as view:
+            for pos in range(start, end, HASH_BLOCK_SIZE):
+                digest.update(view[pos : min(pos + HASH_BLOCK_SIZE, end)])
+        return digest.hexdigest()
+
+    def pcm_chunk(self, start_ms: int, end_ms: int) -> "PCMChunk":
+        """
+        获取 PCM 分块视图（按帧对齐，不复制数据）
+
+        Args:
+            start_ms: 起始时间（毫秒）
+            end_ms: 结束时间（毫秒）
+        """
+        info = self.wav_info
+        if info is None:
+            raise ValueError("audio source is not a PCM WAV")
+
+        total_frames = info.data_size // info.block_align
+
+        def to_byte_offset(ms: int) -> int:
+            frame = min(ms * info.sample_rate // MS_PER_SECOND, total_frames)
+            return info.data_offset + frame * info.block_align
+
+        return PCMChunk(
+            self, to_byte_offset(start_ms), to_byte_offset(end_ms), start_ms, end_ms
+        )
+
+    def close(self):
+        """释放内存映射"""
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+
+    def __enter__(self) -> "AudioSource":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PCMChunk:
+    """PCM 分块视图：引用数据源中的一段采样，读取时加上独立的 WAV 头"""
+
+    def __init__(
+        self, source: AudioSource, start: int, end: int, offset_ms: int, end_ms: int
+    ):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.offset_ms = offset_ms
+        self.end_ms = end_ms
+
+    @property
+    def size(self) -> int:
+        """读出后的字节数（含 WAV 头）"""
+        return len(self._header()) + self.end - self.start
+
+    def read(self) -> bytes:
+        """读出为独立的 WAV 数据"""
+        return self._header() + self.source.buffer[self.start : self.end]
+
+    def sha1_hex(self) -> str:
+        """与 read() 结果的 SHA-1 相同，但不复制数据"""
+        return self.source.sha1_hex(self.start, self.end, prefix=self._header())
+
+    def _header(self) -> bytes:
+        return wav_header(self.source.wav_info, self.end - self.start)
@@ -2,7 +2,6 @@ import os
 import threading
 import time
 import uuid
-import zlib
 from io import BytesIO
 from typing import Callable, Optional, Union, cast
 
@@ -12,6 +11,7 @@ from app.core.utils.cache import get_asr_cache, is_cache_enabled
 from app.core.utils.logger import setup_logger
 
 from .asr_data import ASRData, ASRDataSeg
+from .audio_source import AudioSource
 
 logger = setup_logger("asr")
 
@@ -28,6 +28,8 @@ class BaseASR:
     """
 
     SUPPORTED_SOUND_FORMAT = ["flac", "m4a", "mp3", "wav"]
+    # 分块输入是否需要压缩音频（在线接口上传 MP3）；本地引擎直接使用 WAV PCM
+    NEEDS_COMPRESSED_AUDIO = True
     _lock = threading.Lock()
 
     RATE_LIMIT_MAX_CALLS = 100
@@ -48,17 +50,34 @@ class BaseASR:
             need_word_time_stamp: Whether to return word-level timestamps
         """
         self.audio_input = audio_input
-        self.file_binary = None
+        self.audio_source: Optional[AudioSource] = None
+        self._file_binary: Optional[bytes] = None
         self.use_cache = use_cache
+        # 上一次 run() 是否直接返回了缓存结果
+        self.cache_hit = False
         self._set_data()
         self._cache = get_asr_cache()
         self.audio_duration = self._get_audio_duration()
 
+    @property
+    def file_binary(self) -> Optional[bytes]:
+        """Raw audio bytes, read from the file on first access."""
+        if self._file_binary is None and self.audio_source is not None:
+            self._file_binary = self.audio_source.read()
+        return self._file_binary
+
+    @property
+    def crc32_hex(self) -> str:
+        """CRC32 of the audio data, computed on first access (cache key, uploads)."""
+        return self.audio_source.crc32_hex()
+
     def _set_data(self):
-        """Load audio data and compute CRC32 hash for cache key."""
-        if isinstance(self.audio_input, bytes):
-            self.file_binary = self.audio_input
-        elif isinstance(self.audio_input, str):
+        """Open audio source and validate the input.
+
+        File inputs are memory-mapped; the bytes are only read into memory
+        when an implementation accesses ``file_binary``.
+        """
+        if isinstance(self.audio_input, str):
             ext = self.audio_input.split(".")[-1].lower()
             assert (
                 ext in self.SUPPORTED_SOUND_FORMAT
@@ -66,19 +85,22 @@ class BaseASR:
             assert os.path.exists(
                 self.audio_input
             ), f"File not found: {self.audio_input}"
-            with open(self.audio_input, "rb") as f:
-                self.file_binary = f.read()
-        else:
+        elif not isinstance(self.audio_input, bytes):
             raise ValueError("audio_input must be provided as string or bytes")
-        crc32_value = zlib.crc32(self.file_binary) & 0xFFFFFFFF
-        self.crc32_hex = format(crc32_value, "08x")
+        self.audio_source = AudioSource(self.audio_input)
 
     def _get_audio_duration(self) -> float:
-        """Get audio duration in seconds using pydub."""
-        if not self.file_binary:
+        """Get audio duration in seconds (WAV header, falling back to pydub)."""
+        if not self.audio_source or not self.audio_source.size:
             return 0.01
+        duration_ms = self.audio_source.duration_ms
+        if duration_ms is not None:
+            return duration_ms / 1000
         try:
-            audio = AudioSegment.from_file(BytesIO(self.file_binary))
+            if isinstance(self.audio_input, str):
+                audio = AudioSegment.from_file(self.audio_input)
+            else:
+                audio = AudioSegment.from_file(BytesIO(self.audio_input))
             return audio.duration_seconds
         except Exception as e:
             logger.warning(f"Failed to get audio duration: {e}")
@@ -96,23 +118,30 @@ class BaseASR:
         Returns:
             ASRData: Recognition results with segments
         """
-        cache_key = f"{self.__class__.__name__}:{self._get_key()}"
+        # 不使用缓存时不计算 key（避免对整段音频计算 CRC32）
+        cache_key = None
 
         # Try cache first
         if self.use_cache and is_cache_enabled():
+            cache_key = f"{self.__class__.__name__}:{self._get_key()}"
             cached_result = cast(
                 Optional[dict], self._cache.get(cache_key, default=None)
             )
             if cached_result is not None:
                 logger.info("找到缓存，直接返回")
+                self.cache_hit = True
                 segments = self._make_segments(cached_result)
                 return ASRData(segments)
 
         # Run ASR
-        resp_data = self._run(callback, **kwargs)
+        try:
+            resp_data = self._run(callback, **kwargs)
+        finally:
+            self.audio_source.close()
 
         # Cache result
-        self._cache.set(cache_key, resp_data, expire=86400 * 2)
+        if cache_key is not None:
+            self._cache.set(cache_key, resp_data, expire=86400 * 2)
 
         segments = self._make_segments(resp_data)
         return ASRData(segments)
@@ -0,0 +1,158 @@
+"""分块边界规划
+
+在固定分块位置附近做一次轻量的能量分析（按帧计算 RMS），把切分点移到最近的静音处。
+切在静音处的块之间不需要重叠，只有找不到静音（连续讲话、背景音乐）时才退回
+固定位置 + 重叠，由 ChunkMerger 按文本对齐修复。
+
+只读取每个切分点前的搜索窗口，不扫描整段音频。
+"""
+
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .audio_source import AudioSource
+
+# 能量分析帧长（毫秒）
+FRAME_MS = 20
+# 切分点所在静音段的最短时长（毫秒）
+MIN_SILENCE_MS = 300
+# 在目标切分点之前搜索静音的范围（毫秒）
+DEFAULT_SEARCH_WINDOW_MS = 30 * 1000
+# 静音判定：低于窗口内底噪该分贝数以内，且不高于绝对上限
+SILENCE_MARGIN_DB = 10.0
+SILENCE_MAX_DBFS = -35.0
+
+
+class ChunkPlan(NamedTuple):
+    """分块计划"""
+
+    start_ms: int
+    end_ms: int
+    # 与上一块的重叠时长（首块及切在静音处的块为 0）
+    overlap_ms: int
+
+
+def plan_chunks(
+    source: AudioSource,
+    chunk_length_ms: int,
+    chunk_overlap_ms: int,
+    search_window_ms: int = DEFAULT_SEARCH_WINDOW_MS,
+) -> Optional[List[ChunkPlan]]:
+    """
+    规划分块边界
+
+    Args:
+        source: 音频数据源（16 位 PCM WAV）
+        chunk_length_ms: 最大分块长度（毫秒），切分点只会提前不会推后
+        chunk_overlap_ms: 找不到静音时使用的重叠时长（毫秒）
+        search_window_ms: 目标切分点之前的静音搜索范围（毫秒）
+
+    Returns:
+        分块计划列表，音频不是 16 位 PCM WAV 时返回 None
+    """
+    info = source.wav_info
+    if info is None or info.bits_per_sample != 16:
+        return None
+
+    total_ms = source.duration_ms
+
+    plans = []
+    start_ms = 0
+    overlap_ms = 0
+    while True:
+        target_ms = start_ms + chunk_length_ms
+        if target_ms >= total_ms:
+            plans.append(ChunkPlan(start_ms, total_ms, overlap_ms))
+            return plans
+
+        cut_ms, next_overlap_ms = next_boundary(
+            source, target_ms, chunk_length_ms, chunk_overlap_ms, search_window_ms
+        )
+        plans.append(ChunkPlan(start_ms, cut_ms, overlap_ms))
+        start_ms, overlap_ms = cut_ms - next_overlap_ms, next_overlap_ms
+
+
+def next_boundary(
+    source: AudioSource,
+    target_ms: int,
+    chunk_length_ms: int,
+    chunk_overlap_ms: int,
+    search_window_ms: int = DEFAULT_SEARCH_WINDOW_MS,
+) -> Tuple[int, int]:
+    """
+    确定目标切分点对应的实际切分点
+
+    Args:
+        source: 音频数据源（16 位 PCM WAV，至少包含到 target_ms 的数据）
+        target_ms: 目标切分点（毫秒）
+        chunk_length_ms: 最大分块长度（毫秒），搜索范围不超过其一半
+        chunk_overlap_ms: 找不到静音时使用的重叠时长（毫秒）
+        search_window_ms: 目标切分点之前的静音搜索范围（毫秒）
+
+    Returns:
+        (切分点, 下一块与本块的重叠时长)
+    """
+    search_window_ms = min(search_window_ms, chunk_length_ms // 2)
+    cut_ms = find_silence(source, target_ms - search_window_ms, target_ms)
+    if cut_ms is not None:
+        return cut_ms, 0
+    return target_ms, chunk_overlap_ms
+
+
+def find_silence(source: AudioSource, start_ms: int, end_ms: int) -> Optional[int]:
+    """
+    在 [start_ms, end_ms) 内查找离 end_ms 最近的静音点
+
+    Returns:
+        静音段内最靠近 end_ms 的切分位置（距静音段边缘至少 MIN_SILENCE_MS / 2），
+        没有足够长的静音时返回 None
+    """
+    energies = frame_energies(source, start_ms, end_ms)
+    if energies is None or not len(energies):
+        return None
+
+    floor_db = float(np.percentile(energies, 5))
+    threshold_db = min(floor_db + SILENCE_MARGIN_DB, SILENCE_MAX_DBFS)
+    silent = energies <= threshold_db
+
+    min_frames = MIN_SILENCE_MS // FRAME_MS
+    margin = min_frames // 2
+
+    # 从后往前扫描静音段 [run_start, run_end)，取第一段足够长的
+    run_end = len(silent)
+    for i in range(len(silent) - 1, -2, -1):
+        if i >= 0 and silent[i]:
+            continue
+        if run_end - (i + 1) >= min_frames:
+            if run_end == len(silent):
+                # 静音一直延续到 end_ms，直接切在 end_ms
+                cut_frame = run_end
+            else:
+                cut_frame = run_end - margin
+            return start_ms + cut_frame * FRAME_MS
+        run_end = i
+    return None
+
+
+def frame_energies(
+    source: AudioSource, start_ms: int, end_ms: int
+) -> Optional[np.ndarray]:
+    """计算 [start_ms, end_ms) 内每帧的能量（dBFS）"""
+    info = source.wav_info
+    chunk = source.pcm_chunk(start_ms, end_ms)
+    samples_per_frame = info.sample_rate * FRAME_MS // 1000
+    frame_bytes = samples_per_frame * info.block_align
+    frame_count = (chunk.end - chunk.start) // frame_bytes
+    if frame_count <= 0:
+        return None
+
+    samples = np.frombuffer(
+        source.buffer,
+        dtype="<i2",
+        count=frame_count * samples_per_frame * info.channels,
+        offset=chunk.start,
+    ).astype(np.float32)
+    frames = samples.reshape(frame_count, samples_per_frame * info.channels)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1.0) / 32768.0)
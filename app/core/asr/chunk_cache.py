@@ -0,0 +1,203 @@
+"""内容寻址的分块转录缓存
+
+整块音频的缓存 key 依赖分块位置（以及 MP3 重新编码的结果），换一个分块长度、
+或两个视频共用同一段片头片尾时几乎不会命中。这里把每个块在长静音处切成若干片段，
+以「解码后 PCM 数据的哈希 + 引擎参数」为 key 按片段缓存转录结果：
+
+- 切分点只取决于静音附近的音频内容（绝对能量阈值、固定 20ms 帧网格），
+  与块的起止位置无关，同一段音频在不同分块方式下得到相同的片段
+- 转录一个块时只把缓存未覆盖的连续片段送入引擎，其余片段直接复用
+- 哈希使用 BLAKE2b 对内存映射中的 PCM 范围增量计算，不复制数据
+"""
+
+import hashlib
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from diskcache import Cache
+
+from ..utils.logger import setup_logger
+from .asr_data import ASRData, ASRDataSeg
+from .audio_source import AudioSource
+from .boundary_planner import FRAME_MS, frame_energies
+
+logger = setup_logger("chunk_cache")
+
+# 片段切分点所在静音的能量上限（dBFS，绝对阈值，保证切分点与块位置无关）
+PIECE_SILENCE_DBFS = -40.0
+# 作为片段切分点的最短静音时长（毫秒），较短的停顿不切分，保留上下文
+PIECE_MIN_SILENCE_MS = 600
+# 缓存有效期（秒）
+CACHE_EXPIRE = 86400 * 30
+
+# 片段：(起始毫秒, 结束毫秒)，绝对时间
+Piece = Tuple[int, int]
+
+
+def split_pieces(source: AudioSource, start_ms: int, end_ms: int) -> List[Piece]:
+    """
+    在长静音的中点把 [start_ms, end_ms) 切成片段
+
+    帧网格对齐到音频开头（而不是 start_ms），接触范围边缘的静音不作为切分点，
+    因此同一段音频无论从哪里开始分块，内部的切分点都相同。
+    """
+    grid_start = -(-start_ms // FRAME_MS) * FRAME_MS
+    energies = frame_energies(source, grid_start, end_ms)
+    if energies is None or not len(energies):
+        return [(start_ms, end_ms)]
+
+    silent = energies <= PIECE_SILENCE_DBFS
+    min_frames = PIECE_MIN_SILENCE_MS // FRAME_MS
+
+    cuts = []
+    run_start = None
+    for i, is_silent in enumerate(np.append(silent, False)):
+        if is_silent:
+            if run_start is None:
+                run_start = i
+            continue
+        if run_start is not None:
+            touches_edge = run_start == 0 or i == len(silent)
+            if not touches_edge and i - run_start >= min_frames:
+                cuts.append(grid_start + (run_start + i) // 2 * FRAME_MS)
+            run_start = None
+
+    bounds = [start_ms] + cuts + [end_ms]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+class ChunkCache:
+    """按片段缓存转录结果
+
+    Args:
+        cache: 缓存存储
+        engine_key: 引擎及参数标识，参数不同的结果互不复用
+    """
+
+    def __init__(self, cache: Cache, engine_key: str):
+        self.cache = cache
+        self.engine_key = hashlib.sha1(engine_key.encode()).hexdigest()[:16]
+
+    def transcribe(
+        self,
+        source: AudioSource,
+        start_ms: int,
+        end_ms: int,
+        transcribe_range: Callable[[int, int], ASRData],
+    ) -> ASRData:
+        """
+        转录 [start_ms, end_ms)，已缓存的片段直接复用
+
+        Args:
+            source: 音频数据源（PCM WAV）
+            start_ms: 块起始时间（毫秒）
+            end_ms: 块结束时间（毫秒）
+            transcribe_range: 转录函数(start_ms, end_ms)，返回相对 start_ms 的结果
+
+        Returns:
+            相对 start_ms 的转录结果
+        """
+        pieces = split_pieces(source, start_ms, end_ms)
+        keys = [self._key(source, piece) for piece in pieces]
+        results: List[Optional[List[ASRDataSeg]]] = [self._get(key) for key in keys]
+
+        hits = sum(result is not None for result in results)
+        if hits:
+            logger.info(f"分块缓存命中 {hits}/{len(pieces)} 个片段")
+
+        for first, last in _missing_runs(results):
+            run_start, run_end = pieces[first][0], pieces[last][1]
+            asr_data = transcribe_range(run_start, run_end)
+            assigned, straddled = _assign_segments(
+                asr_data.segments, pieces[first : last + 1], run_start
+            )
+            for index, segments in assigned.items():
+                piece_index = first + index
+                results[piece_index] = segments
+                # 有片段跨越切分点时，两侧片段的结果都不完整，不缓存
+                if index not in straddled:
+                    self._put(keys[piece_index], segments)
+            if straddled:
+                logger.debug(f"{len(straddled)} 个片段有跨越切分点的字幕，不缓存")
+
+        merged = []
+        for (piece_start, _), segments in zip(pieces, results):
+            shift = piece_start - start_ms
+            for seg in segments:
+                merged.append(
+                    ASRDataSeg(
+                        text=seg.text,
+                        start_time=seg.start_time + shift,
+                        end_time=seg.end_time + shift,
+                    )
+                )
+        return ASRData(merged)
+
+    def _key(self, source: AudioSource, piece: Piece) -> str:
+        view = source.pcm_chunk(*piece)
+        info = source.wav_info
+        fmt = f"{info.sample_rate}:{info.channels}:{info.bits_per_sample}".encode()
+        return f"{self.engine_key}:{source.blake2b_hex(view.start, view.end, prefix=fmt)}"
+
+    def _get(self, key: str) -> Optional[List[ASRDataSeg]]:
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        return [ASRDataSeg(text, start, end) for start, end, text in cached]
+
+    def _put(self, key: str, segments: Sequence[ASRDataSeg]):
+        self.cache.set(
+            key,
+            [(seg.start_time, seg.end_time, seg.text) for seg in segments],
+            expire=CACHE_EXPIRE,
+        )
+
+
+def _missing_runs(results: Sequence[Optional[list]]) -> List[Tuple[int, int]]:
+    """未命中缓存的连续片段 [(首个下标, 末个下标), ...]"""
+    runs = []
+    first = None
+    for i, result in enumerate(list(results) + [[]]):
+        if result is None:
+            if first is None:
+                first = i
+        elif first is not None:
+            runs.append((first, i - 1))
+            first = None
+    return runs
+
+
+def _assign_segments(
+    segments: Sequence[ASRDataSeg], pieces: Sequence[Piece], run_start: int
+) -> Tuple[Dict[int, List[ASRDataSeg]], Set[int]]:
+    """按片段中点把转录结果分配到各片段，时间改为相对片段起点
+
+    Returns:
+        (片段下标 -> 字幕列表, 字幕超出自身边界的片段下标)；
+        跨越切分点的字幕所涉及的片段都在后者中，它们的结果不能单独复用
+    """
+    assigned: Dict[int, List[ASRDataSeg]] = {i: [] for i in range(len(pieces))}
+    straddled: Set[int] = set()
+    for seg in segments:
+        start = run_start + seg.start_time
+        end = run_start + seg.end_time
+        middle = (start + end) // 2
+        index = next(
+            (i for i, (_, stop) in enumerate(pieces) if middle < stop), len(pieces) - 1
+        )
+        piece_start, piece_end = pieces[index]
+        if start < piece_start or end > piece_end:
+            straddled.update(
+                i
+                for i, (other_start, other_end) in enumerate(pieces)
+                if i == index or (start < other_end and end > other_start)
+            )
+        shift = run_start - piece_start
+        assigned[index].append(
+            ASRDataSeg(
+                text=seg.text,
+                start_time=seg.start_time + shift,
+                end_time=seg.end_time + shift,
+            )
+        )
+    return assigned, straddled
@@ -6,16 +6,25 @@
 匹配策略：
 - 词级时间戳（字级）: 精确文本匹配
 - 句子级时间戳（非字级）: difflib 模糊匹配（相似度 > 0.7）
+
+对齐不逐个位置比较切片：先找出所有匹配的片段对（词级按文本哈希查找，
+句子级只比较时间相近的片段），再按对角线（对齐位置）累计匹配数，
+结果与逐位置滑动窗口相同，耗时与匹配对数量成正比。
 """
 
+import bisect
 import difflib
-from typing import List, Optional
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from ..utils.logger import setup_logger
 from .asr_data import ASRData, ASRDataSeg
 
 logger = setup_logger("chunk_merger")
 
+# 同一内容在相邻两块中的时间戳偏差上限（毫秒），超出的片段对不视为匹配
+MATCH_TIME_WINDOW_MS = 3000
+
 
 class ChunkMerger:
     """音频分块后的 ASR 结果合并器
@@ -24,21 +33,30 @@ class ChunkMerger:
     适用于长音频分块识别后的结果拼接。
     """
 
-    def __init__(self, min_match_count: int = 2, fuzzy_threshold: float = 0.7):
+    def __init__(
+        self,
+        min_match_count: int = 2,
+        fuzzy_threshold: float = 0.7,
+        time_window: Optional[int] = None,
+    ):
         """初始化合并器
 
         Args:
             min_match_count: 最小匹配数阈值，低于此值视为无效匹配
             fuzzy_threshold: 模糊匹配相似度阈值（仅用于句子级）
+            time_window: 匹配片段对的起始时间偏差上限（毫秒），None 不限制；
+                chunk 偏移准确时可设为 MATCH_TIME_WINDOW_MS，排除时间相距很远的重复文本
         """
         self.min_match_count = min_match_count
         self.fuzzy_threshold = fuzzy_threshold
+        self.time_window = time_window
 
     def merge_chunks(
         self,
         chunks: List[ASRData],
         chunk_offsets: Optional[List[int]] = None,
         overlap_duration: int = 10000,
+        boundary_overlaps: Optional[List[int]] = None,
     ) -> ASRData:
         """合并多个音频片段的 ASR 结果
 
@@ -46,6 +64,8 @@ class ChunkMerger:
             chunks: ASRData 对象列表（每个 chunk 的 segments 应从 0 开始）
             chunk_offsets: 每个 chunk 的绝对时间偏移（毫秒），None 则自动推断
             overlap_duration: 重叠时长（毫秒），默认 10 秒
+            boundary_overlaps: 各相邻 chunk 之间的重叠时长（毫秒，长度为 chunk 数 - 1），
+                None 则均为 overlap_duration；为 0 的边界直接拼接
 
         Returns:
             合并后的 ASRData 对象
@@ -92,7 +112,7 @@ class ChunkMerger:
             merged_segments = self._merge_two_sequences(
                 merged_segments,
                 adjusted_chunks[i],
-                overlap_duration,
+                boundary_overlaps[i - 1] if boundary_overlaps else overlap_duration,
             )
 
         logger.info(f"合并完成，总片段数: {len(merged_segments)}")
@@ -118,6 +138,9 @@ class ChunkMerger:
             return right
         if not right:
             return left
+        if overlap_duration <= 0:
+            # 切在静音处的 chunk 之间没有重叠
+            return left + right
 
         left_len = len(left)
 
@@ -192,13 +215,20 @@ class ChunkMerger:
         left_len = len(left)
         right_len = len(right)
 
+        # left[a] 与 right[b] 匹配时，两者处于对齐位置 i = left_len - a + b
+        diagonal_matches = Counter(
+            left_len - a + b for a, b in self._matching_pairs(left, right)
+        )
+
         best_score = 0.0
         best_result = None
 
         # 滑动窗口：尝试所有对齐位置
         for i in range(1, left_len + right_len + 1):
-            # epsilon: 偏好更长的匹配
-            epsilon = float(i) / 10000.0
+            matches = diagonal_matches.get(i, 0)
+            # 至少需要 min_match_count 个匹配
+            if matches < self.min_match_count:
+                continue
 
             # 计算当前对齐位置的重叠区域
             left_start = max(0, left_len - i)
@@ -207,45 +237,77 @@ class ChunkMerger:
             right_start = max(0, i - left_len)
             right_end = min(right_len, i)
 
-            # 提取重叠部分
-            left_slice = left[left_start:left_end]
-            right_slice = right[right_start:right_end]
-
-            if len(left_slice) != len(right_slice):
-                raise RuntimeError(
-                    f"对齐错误: left[{left_start}:{left_end}]={len(left_slice)} "
-                    f"vs right[{right_start}:{right_end}]={len(right_slice)}"
-                )
-
-            # 计算匹配数（词级用精确匹配，句子级用模糊匹配）
-            if self._is_word_level:
-                # 词级：精确匹配
-                matches = sum(
-                    1
-                    for left_seg, right_seg in zip(left_slice, right_slice)
-                    if left_seg.text == right_seg.text
-                )
-            else:
-                # 句子级：模糊匹配（difflib 相似度 > threshold）
-                matches = sum(
-                    1
-                    for left_seg, right_seg in zip(left_slice, right_slice)
-                    if difflib.SequenceMatcher(
-                        None, left_seg.text, right_seg.text
-                    ).ratio()
-                    > self.fuzzy_threshold
-                )
-
             # 归一化得分 + epsilon（偏好长匹配）
-            score = matches / float(i) + epsilon
+            score = matches / float(i) + float(i) / 10000.0
 
-            # 至少需要 min_match_count 个匹配
-            if matches >= self.min_match_count and score > best_score:
+            if score > best_score:
                 best_score = score
                 best_result = (left_start, left_end, right_start, right_end, matches)
 
         return best_result
 
+    def _matching_pairs(
+        self, left: List[ASRDataSeg], right: List[ASRDataSeg]
+    ) -> Iterator[Tuple[int, int]]:
+        """找出所有匹配的片段对 (left 索引, right 索引)
+
+        词级用文本哈希精确匹配，句子级用 difflib 模糊匹配；
+        设置了 time_window 时只考虑起始时间相近的片段对。
+        """
+        if self._is_word_level:
+            # 词级：按文本建索引，只比较文本相同的片段
+            right_by_text: Dict[str, List[int]] = defaultdict(list)
+            for b, seg in enumerate(right):
+                right_by_text[seg.text].append(b)
+            for a, seg in enumerate(left):
+                for b in right_by_text.get(seg.text, ()):
+                    if self._within_time_window(seg, right[b]):
+                        yield a, b
+            return
+
+        # 句子级：按起始时间排序，二分查找时间窗口内的候选
+        right_order = sorted(range(len(right)), key=lambda b: right[b].start_time)
+        right_starts = [right[b].start_time for b in right_order]
+        matchers: Dict[int, difflib.SequenceMatcher] = {}
+        for a, seg in enumerate(left):
+            if self.time_window is None:
+                candidates = right_order
+            else:
+                lo = bisect.bisect_left(right_starts, seg.start_time - self.time_window)
+                hi = bisect.bisect_right(right_starts, seg.start_time + self.time_window)
+                candidates = right_order[lo:hi]
+            for b in candidates:
+                if self._is_similar(seg.text, right[b].text, b, matchers):
+                    yield a, b
+
+    def _within_time_window(self, left_seg: ASRDataSeg, right_seg: ASRDataSeg) -> bool:
+        if self.time_window is None:
+            return True
+        return abs(left_seg.start_time - right_seg.start_time) <= self.time_window
+
+    def _is_similar(
+        self,
+        left_text: str,
+        right_text: str,
+        right_idx: int,
+        matchers: Dict[int, difflib.SequenceMatcher],
+    ) -> bool:
+        """difflib 相似度是否超过阈值（先用廉价的上界排除明显不同的文本）"""
+        if left_text == right_text:
+            return 1.0 > self.fuzzy_threshold
+
+        # SequenceMatcher 会缓存 seq2 的索引，同一个 right 片段复用
+        matcher = matchers.get(right_idx)
+        if matcher is None:
+            matcher = difflib.SequenceMatcher(None, b=right_text)
+            matchers[right_idx] = matcher
+        matcher.set_seq1(left_text)
+        return (
+            matcher.real_quick_ratio() > self.fuzzy_threshold
+            and matcher.quick_ratio() > self.fuzzy_threshold
+            and matcher.ratio() > self.fuzzy_threshold
+        )
+
     def _adjust_timestamps(
         self, segments: List[ASRDataSeg], offset: int
     ) -> List[ASRDataSeg]:
@@ -291,9 +353,10 @@ class ChunkMerger:
             threshold = segments[-1].end_time - duration
             for seg in reversed(segments):
                 if seg.start_time >= threshold:
-                    overlap.insert(0, seg)
+                    overlap.append(seg)
                 else:
                     break
+            overlap.reverse()
         else:
             # 从开头往后提取
             threshold = segments[0].start_time + duration
@@ -330,3 +393,169 @@ class ChunkMerger:
                 offsets.append(offsets[-1])
 
         return offsets
+
+
+class StreamingChunkMerger:
+    """增量式分块合并器
+
+    按 chunk 顺序逐个合并转录结果，并在每次合并后返回已经"定稿"的片段，
+    即之后的 chunk 无论如何对齐都不会再改变的前缀部分。
+    chunk 可以乱序到达，未轮到的 chunk 会被缓存。
+    各 chunk 时间戳类型一致时，全部加入后的结果与 ChunkMerger.merge_chunks 一致。
+
+    示例:
+        >>> merger = StreamingChunkMerger(chunk_offsets=[0, 590000], overlap_duration=10000)
+        >>> finalized = merger.add_chunk(1, chunk1)  # 乱序到达，返回 []
+        >>> finalized = merger.add_chunk(0, chunk0)  # 返回 chunk0 及 chunk1 的定稿片段
+        >>> finalized = merger.finish()  # 返回剩余片段
+
+    边解码边分块时 chunk 边界事先未知，可以不传 chunk_offsets，
+    每切出一块调用 append_offset() 追加，全部切分完成后调用 close_offsets()。
+    """
+
+    def __init__(
+        self,
+        chunk_offsets: Optional[List[int]] = None,
+        overlap_duration: int = 10000,
+        merger: Optional[ChunkMerger] = None,
+        boundary_overlaps: Optional[List[int]] = None,
+    ):
+        """初始化增量合并器
+
+        Args:
+            chunk_offsets: 每个 chunk 的绝对时间偏移（毫秒），None 表示通过 append_offset 逐个追加
+            overlap_duration: 重叠时长（毫秒）
+            merger: 实际执行两两合并的 ChunkMerger，None 则使用默认参数
+            boundary_overlaps: 各相邻 chunk 之间的重叠时长，同 ChunkMerger.merge_chunks
+        """
+        if chunk_offsets is not None and not chunk_offsets:
+            raise ValueError("chunk_offsets 不能为空")
+
+        self.chunk_offsets = list(chunk_offsets or [])
+        self.overlap_duration = overlap_duration
+        self.boundary_overlaps = boundary_overlaps
+        self._offsets_closed = chunk_offsets is not None
+        if not self._offsets_closed:
+            self.boundary_overlaps = []
+        self.merger = merger or ChunkMerger()
+        self.merger._is_word_level = False
+
+        self._pending: Dict[int, ASRData] = {}
+        self._next_idx = 0
+        self._merged: List[ASRDataSeg] = []
+        self._emitted = 0
+
+    @property
+    def is_complete(self) -> bool:
+        """是否所有 chunk 都已合并"""
+        return self._offsets_closed and self._next_idx >= len(self.chunk_offsets)
+
+    def append_offset(self, offset: int, overlap: Optional[int] = None):
+        """追加下一个 chunk 的绝对时间偏移
+
+        Args:
+            offset: chunk 的绝对时间偏移（毫秒）
+            overlap: 与上一个 chunk 的重叠时长（毫秒），None 则为 overlap_duration
+        """
+        if self._offsets_closed:
+            raise ValueError("chunk 边界已确定，不能再追加")
+        if self.chunk_offsets:
+            self.boundary_overlaps.append(
+                self.overlap_duration if overlap is None else overlap
+            )
+        self.chunk_offsets.append(offset)
+
+    def close_offsets(self):
+        """不再追加 chunk（边界全部确定）"""
+        self._offsets_closed = True
+
+    def add_chunk(self, idx: int, chunk: ASRData) -> List[ASRDataSeg]:
+        """加入一个 chunk 的转录结果
+
+        Args:
+            idx: chunk 序号
+            chunk: 该 chunk 的转录结果（时间从 0 开始）
+
+        Returns:
+            本次新增的定稿片段（绝对时间，按时间顺序）
+        """
+        if not 0 <= idx < len(self.chunk_offsets):
+            raise ValueError(f"chunk 序号越界: {idx}")
+        if idx < self._next_idx or idx in self._pending:
+            raise ValueError(f"chunk 重复加入: {idx}")
+
+        self._pending[idx] = chunk
+
+        # 按顺序合并所有已到达的 chunk
+        while self._next_idx in self._pending:
+            current = self._pending.pop(self._next_idx)
+            if current.is_word_timestamp():
+                self.merger._is_word_level = True
+
+            adjusted = self.merger._adjust_timestamps(
+                current.segments, self.chunk_offsets[self._next_idx]
+            )
+            if self._next_idx == 0:
+                self._merged = adjusted
+            else:
+                self._merged = self.merger._merge_two_sequences(
+                    self._merged, adjusted, self._overlap_before(self._next_idx)
+                )
+            self._next_idx += 1
+
+        if self.is_complete:
+            return self._take(len(self._merged))
+        if self._next_idx >= len(self.chunk_offsets):
+            # 下一个 chunk 的边界未知，暂不输出
+            return []
+        return self._take(self._stable_length())
+
+    def finish(self) -> List[ASRDataSeg]:
+        """结束合并，返回剩余未定稿的片段
+
+        Raises:
+            ValueError: 仍有 chunk 未加入
+        """
+        if not self.is_complete:
+            raise ValueError(
+                f"仍有 chunk 未加入: {self._next_idx}/{len(self.chunk_offsets)}"
+            )
+        return self._take(len(self._merged))
+
+    def get_result(self) -> ASRData:
+        """获取当前完整的合并结果"""
+        return ASRData(list(self._merged))
+
+    def _stable_length(self) -> int:
+        """计算不会被下一个 chunk 改变的前缀长度
+
+        下一次合并只会在 left 的重叠区域内切分（见 _merge_two_sequences），
+        未找到文本匹配时按时间边界切分，会保留最后一个在下一 chunk 起点前结束的片段之前的内容。
+        因此重叠区域之前、且结束时间不晚于下一 chunk 起点的前缀是安全的。
+        """
+        if self._next_idx == 0 or not self._merged:
+            return self._emitted
+
+        overlap = self.merger._extract_overlap_segments(
+            self._merged,
+            from_end=True,
+            duration=self._overlap_before(self._next_idx),
+        )
+        stable = len(self._merged) - len(overlap)
+
+        next_offset = self.chunk_offsets[self._next_idx]
+        while stable > 0 and self._merged[stable - 1].end_time > next_offset:
+            stable -= 1
+
+        return max(stable, self._emitted)
+
+    def _overlap_before(self, idx: int) -> int:
+        """第 idx 个 chunk 与前一个 chunk 的重叠时长"""
+        if self.boundary_overlaps:
+            return self.boundary_overlaps[idx - 1]
+        return self.overlap_duration
+
+    def _take(self, end: int) -> List[ASRDataSeg]:
+        segments = self._merged[self._emitted : end]
+        self._emitted = max(self._emitted, end)
+        return segments
@@ -4,16 +4,33 @@
 使用装饰器模式实现关注点分离。
 """
 
+import hashlib
 import io
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Callable, List, Optional, Tuple
+import queue
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from pydub import AudioSegment
 
+from ..utils.cache import get_asr_chunk_cache, is_cache_enabled
+from ..utils.cancel import current_cancel_token, submit_with_context
+from ..utils.checkpoint import NULL_CHECKPOINT, Checkpoint
 from ..utils.logger import setup_logger
-from .asr_data import ASRData
+from .adaptive_concurrency import (
+    MAX_THROTTLE_RETRIES,
+    concurrency_registry,
+    is_throttle_error,
+    wait_before_retry,
+)
+from .asr_data import ASRData, ASRDataSeg
+from .audio_source import AudioSource, PCMChunk
 from .base import BaseASR
-from .chunk_merger import ChunkMerger
+from .boundary_planner import ChunkPlan, plan_chunks
+from .chunk_cache import ChunkCache
+from .chunk_merger import MATCH_TIME_WINDOW_MS, ChunkMerger, StreamingChunkMerger
+from .pcm_stream import PCMStream, split_pcm_stream
+from .pcm_wav import parse_pcm_wav
 
 logger = setup_logger("chunked_asr")
 
@@ -23,6 +40,10 @@ DEFAULT_CHUNK_LENGTH_SEC = 60 * 10  # 20分钟
 DEFAULT_CHUNK_OVERLAP_SEC = 10  # 10秒重叠
 DEFAULT_CHUNK_CONCURRENCY = 3  # 3个并发
 
+# 音频块：PCM WAV 的惰性视图（转录时才读出）、WAV 数据（流式解码），
+# 或非 WAV 输入解码后编码的 MP3 数据
+AudioChunk = Union[bytes, PCMChunk]
+
 
 class ChunkedASR:
     """音频分块 ASR 包装器
@@ -31,8 +52,10 @@ class ChunkedASR:
     适用于长音频的分块转录，避免 API 超时或内存溢出。
 
     工作流程：
-        1. 将长音频切割为多个重叠的块
-        2. 为每个块创建独立的 ASR 实例并发转录
+        1. 将长音频切割为多个重叠的块（WAV 输入直接切分 PCM 数据，
+           需要上传压缩音频的在线引擎在转录时才编码为 MP3）
+        2. 为每个块创建独立的 ASR 实例并发转录；asr_kwargs 启用缓存时，
+           PCM 块按内容寻址的片段缓存复用（见 ChunkCache）
         3. 使用 ChunkMerger 合并结果，消除重叠区域的重复内容
 
     示例:
@@ -47,21 +70,32 @@ class ChunkedASR:
 
     Args:
         asr_class: ASR 类（非实例），如 BcutASR, JianYingASR
-        audio_path: 音频文件路径
+        audio_path: 音频文件路径，或 PCMStream（边解码边分块转录）
         asr_kwargs: 传递给 ASR 构造函数的参数字典
         chunk_length: 每块长度（秒），默认 480 秒（8分钟）
         chunk_overlap: 块之间重叠时长（秒），默认 10 秒
         chunk_concurrency: 并发转录数量，默认 3
+        checkpoint: 检查点存储，已完成的块在重新执行时直接复用
+        snap_to_silence: 是否把切分点移到附近的静音处（仅 PCM WAV 输入），
+            切在静音处的块之间不重叠
+        endpoint: 在线接口标识（base_url 或服务名），指定后按接口自适应调整并发：
+            以 chunk_concurrency 为初始值，延迟平稳时提高，被限流时减半并重试，
+            同一接口的上限在任务之间共享
+        max_concurrency: 接口并发上限，默认等于 chunk_concurrency
     """
 
     def __init__(
         self,
         asr_class: type[BaseASR],
-        audio_path: str,
+        audio_path: Union[str, PCMStream],
         asr_kwargs: Optional[dict] = None,
         chunk_length: int = DEFAULT_CHUNK_LENGTH_SEC,
         chunk_overlap: int = DEFAULT_CHUNK_OVERLAP_SEC,
         chunk_concurrency: int = DEFAULT_CHUNK_CONCURRENCY,
+        checkpoint: Optional[Checkpoint] = None,
+        snap_to_silence: bool = False,
+        endpoint: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
     ):
         self.asr_class = asr_class
         self.audio_path = audio_path
@@ -69,148 +103,479 @@ class ChunkedASR:
         self.chunk_length_ms = chunk_length * MS_PER_SECOND
         self.chunk_overlap_ms = chunk_overlap * MS_PER_SECOND
         self.chunk_concurrency = chunk_concurrency
-
-        # 读取完整音频文件（用于分块）
-        with open(audio_path, "rb") as f:
-            self.file_binary = f.read()
-
-    def run(self, callback: Optional[Callable[[int, str], None]] = None) -> ASRData:
+        self.checkpoint = checkpoint or NULL_CHECKPOINT
+        self.snap_to_silence = snap_to_silence
+        # 按接口共享的自适应并发控制器（本地引擎为 None，使用固定并发）
+        self.limiter = (
+            concurrency_registry.get(
+                endpoint, max_concurrency or chunk_concurrency, chunk_concurrency
+            )
+            if endpoint
+            else None
+        )
+        # 片段级转录缓存：启用后由它代替各块 ASR 实例的整块缓存
+        self.chunk_cache: Optional[ChunkCache] = None
+        self.chunk_asr_kwargs = self.asr_kwargs
+        if self.asr_kwargs.get("use_cache") and is_cache_enabled():
+            self.chunk_cache = ChunkCache(get_asr_chunk_cache(), self._engine_key())
+            self.chunk_asr_kwargs = {**self.asr_kwargs, "use_cache": False}
+        # 各相邻块之间的实际重叠时长（分块后确定）
+        self.boundary_overlaps: List[int] = []
+        self._work_callback: Optional[Callable[[int], None]] = None
+
+        if isinstance(audio_path, PCMStream):
+            # ffmpeg 管道流：每解码出一块就派发转录
+            self.stream: Optional[PCMStream] = audio_path
+            self.source: Optional[AudioSource] = None
+        else:
+            # 以内存映射打开音频，分块时不把整个文件读入内存
+            self.stream = None
+            self.source = AudioSource(audio_path)
+
+    def run(
+        self,
+        callback: Optional[Callable[[int, str], None]] = None,
+        segment_callback: Optional[Callable[[List[ASRDataSeg]], None]] = None,
+        work_callback: Optional[Callable[[int], None]] = None,
+    ) -> ASRData:
         """执行分块转录
 
         Args:
             callback: 进度回调函数(progress: int, message: str)
+            segment_callback: 定稿片段回调(segments)，每当有片段不会再被后续
+                chunk 的重叠合并改变时按时间顺序调用，用于流式处理下游
+            work_callback: 实际转录量回调(audio_ms)，每段 PCM 音频实际送入引擎
+                转录后调用（可能在多个线程中）；检查点和缓存复用的部分不报告，
+                用于按实际工作量统计转录吞吐量
 
         Returns:
             ASRData: 合并后的转录结果
         """
+        self._work_callback = work_callback
+        try:
+            if self.stream is not None:
+                return self._run_stream(callback, segment_callback)
+            return self._run(callback, segment_callback)
+        finally:
+            if self.stream is not None:
+                self.stream.close()
+            else:
+                self.source.close()
+
+    def _run(
+        self,
+        callback: Optional[Callable[[int, str], None]],
+        segment_callback: Optional[Callable[[List[ASRDataSeg]], None]],
+    ) -> ASRData:
         # 1. 分块音频
         chunks = self._split_audio()
 
         # 2. 如果只有一块，直接创建单个 ASR 实例转录
         if len(chunks) == 1:
             logger.info("音频短于分块长度，直接转录")
-            single_asr = self.asr_class(self.audio_path, **self.asr_kwargs)
-            return single_asr.run(callback)
+            checkpoint_key = self._checkpoint_key(0, self.source.sha1_hex())
+            cached = self.checkpoint.get(Checkpoint.STAGE_ASR_CHUNK, checkpoint_key)
+            if cached is not None:
+                logger.info("转录结果已有检查点，跳过转录")
+                result = ASRData.from_json(cached)
+            elif isinstance(chunks[0][0], PCMChunk):
+                result = self._transcribe_chunk(chunks[0][0], callback)
+                self.checkpoint.put(
+                    Checkpoint.STAGE_ASR_CHUNK, checkpoint_key, result.to_json()
+                )
+            else:
+                single_asr = self.asr_class(self.audio_path, **self.asr_kwargs)
+                result = self._run_chunk_asr(single_asr, callback, self.source.size)
+                self.checkpoint.put(
+                    Checkpoint.STAGE_ASR_CHUNK, checkpoint_key, result.to_json()
+                )
+            if segment_callback and result.segments:
+                segment_callback(list(result.segments))
+            return result
 
         logger.info(f"音频分为 {len(chunks)} 块，开始并发转录")
 
-        # 3. 并发转录所有块
-        chunk_results = self._transcribe_chunks(chunks, callback)
+        # 3. 并发转录所有块，流式模式下边转录边合并
+        streaming_merger = None
+        on_chunk_done = None
+        if segment_callback:
+            streaming_merger = StreamingChunkMerger(
+                chunk_offsets=[offset for _, offset in chunks],
+                overlap_duration=self.chunk_overlap_ms,
+                merger=self._new_merger(),
+                boundary_overlaps=self.boundary_overlaps,
+            )
+
+            def on_chunk_done(idx: int, asr_data: ASRData):
+                finalized = streaming_merger.add_chunk(idx, asr_data)
+                if finalized:
+                    segment_callback(finalized)
+
+        chunk_results = self._transcribe_chunks(chunks, callback, on_chunk_done)
 
         # 4. 合并结果
-        merged_result = self._merge_results(chunk_results, chunks)
+        if streaming_merger is not None:
+            merged_result = streaming_merger.get_result()
+        else:
+            merged_result = self._merge_results(chunk_results, chunks)
 
         logger.info(f"分块转录完成，共 {len(merged_result.segments)} 个片段")
         return merged_result
 
-    def _split_audio(self) -> List[Tuple[bytes, int]]:
-        """使用 pydub 将音频切割为重叠的块
+    def _run_stream(
+        self,
+        callback: Optional[Callable[[int, str], None]],
+        segment_callback: Optional[Callable[[List[ASRDataSeg]], None]],
+    ) -> ASRData:
+        """边解码边转录：块边界随解码进度确定，使用增量合并器合并"""
+        streaming_merger = StreamingChunkMerger(
+            overlap_duration=self.chunk_overlap_ms,
+            merger=self._new_merger(),
+        )
+        self.boundary_overlaps = streaming_merger.boundary_overlaps
+
+        def planned_chunks() -> Iterator[Tuple[AudioChunk, int]]:
+            for chunk, plan in self._split_stream():
+                streaming_merger.append_offset(plan.start_ms, plan.overlap_ms)
+                yield chunk, plan.start_ms
+            streaming_merger.close_offsets()
+
+        def on_chunk_done(idx: int, asr_data: ASRData):
+            finalized = streaming_merger.add_chunk(idx, asr_data)
+            if finalized and segment_callback:
+                segment_callback(finalized)
+
+        self._transcribe_chunks(
+            planned_chunks(),
+            callback,
+            on_chunk_done,
+            total_chunks=self._estimate_chunk_count(self.stream.duration_ms),
+        )
+
+        remaining = streaming_merger.finish()
+        if remaining and segment_callback:
+            segment_callback(remaining)
+
+        merged_result = streaming_merger.get_result()
+        snapped = sum(1 for overlap in self.boundary_overlaps if overlap == 0)
+        logger.info(
+            f"流式分块转录完成，共 {len(self.boundary_overlaps) + 1} 块"
+            f"（{snapped} 个边界切在静音处），{len(merged_result.segments)} 个片段"
+        )
+        return merged_result
+
+    def _split_stream(self) -> Iterator[Tuple[AudioChunk, ChunkPlan]]:
+        """从 PCM 流中按解码进度切出 WAV 音频块"""
+        for wav_bytes, plan in split_pcm_stream(
+            self.stream.read,
+            self.chunk_length_ms,
+            self.chunk_overlap_ms,
+            snap_to_silence=self.snap_to_silence,
+            info=self.stream.info,
+        ):
+            logger.debug(
+                f"解码出 chunk: {plan.start_ms/1000:.1f}s - {plan.end_ms/1000:.1f}s "
+                f"({len(wav_bytes)} bytes)"
+            )
+            yield wav_bytes, plan
+
+    def _estimate_chunk_count(self, total_duration_ms: Optional[int]) -> int:
+        """按固定分块估计块数（用于流式转录时计算进度）"""
+        if not total_duration_ms or total_duration_ms <= self.chunk_length_ms:
+            return 1
+        step_ms = self.chunk_length_ms - self.chunk_overlap_ms
+        return 1 + -(-(total_duration_ms - self.chunk_length_ms) // step_ms)
 
-        Returns:
-            List[(chunk_bytes, offset_ms), ...]
-            每个元素包含音频块的字节数据和时间偏移（毫秒）
-        """
-        # 从字节数据加载音频
-        if self.file_binary is None:
-            raise ValueError("file_binary is None, cannot split audio")
+    def _split_audio(self) -> List[Tuple[AudioChunk, int]]:
+        """将音频切割为重叠的块
 
-        audio = AudioSegment.from_file(io.BytesIO(self.file_binary))
-        total_duration_ms = len(audio)
+        输入为 PCM WAV 时按字节范围直接切分，不解码也不重新编码
+        （需要压缩音频的引擎在转录时才编码为 MP3）；否则使用 pydub 解码后编码为 MP3。
 
+        Returns:
+            List[(chunk, offset_ms), ...]
+        """
+        pcm_chunks = self._split_pcm()
+        if pcm_chunks is not None:
+            return pcm_chunks
+        return self._split_compressed()
+
+    def _plan_chunks(self, total_duration_ms: int) -> List[ChunkPlan]:
+        """规划分块边界：开启 snap_to_silence 时切在静音处，否则按固定长度 + 重叠"""
+        plans = None
+        if self.snap_to_silence:
+            plans = plan_chunks(self.source, self.chunk_length_ms, self.chunk_overlap_ms)
+            if plans is None:
+                logger.info("输入不是 16 位 PCM WAV，使用固定分块位置")
+
+        if plans is None:
+            plans = []
+            start_ms = 0
+            while start_ms < total_duration_ms:
+                end_ms = min(start_ms + self.chunk_length_ms, total_duration_ms)
+                plans.append(
+                    ChunkPlan(start_ms, end_ms, self.chunk_overlap_ms if plans else 0)
+                )
+                if end_ms >= total_duration_ms:
+                    break
+                # 下一个块的起始位置（有重叠）
+                start_ms += self.chunk_length_ms - self.chunk_overlap_ms
+
+        self.boundary_overlaps = [plan.overlap_ms for plan in plans[1:]]
+        snapped = sum(1 for overlap in self.boundary_overlaps if overlap == 0)
         logger.info(
             f"音频总时长: {total_duration_ms/1000:.1f}s, "
             f"分块长度: {self.chunk_length_ms/1000:.1f}s, "
-            f"重叠: {self.chunk_overlap_ms/1000:.1f}s"
+            f"重叠: {self.chunk_overlap_ms/1000:.1f}s, "
+            f"共 {len(plans)} 块（{snapped} 个边界切在静音处）"
         )
+        return plans
+
+    def _split_pcm(self) -> Optional[List[Tuple[PCMChunk, int]]]:
+        """按采样范围切分 PCM WAV，每块为数据源的惰性视图
+
+        Returns:
+            List[(chunk, offset_ms), ...]，输入不是 PCM WAV 时返回 None
+        """
+        total_duration_ms = self.source.duration_ms
+        if total_duration_ms is None:
+            logger.info("输入不是 PCM WAV，使用 MP3 分块")
+            return None
 
         chunks = []
-        start_ms = 0
+        for plan in self._plan_chunks(total_duration_ms):
+            chunk = self.source.pcm_chunk(plan.start_ms, plan.end_ms)
+            chunks.append((chunk, plan.start_ms))
+            logger.debug(
+                f"切割 chunk {len(chunks)}: "
+                f"{plan.start_ms/1000:.1f}s - {plan.end_ms/1000:.1f}s ({chunk.size} bytes)"
+            )
+        return chunks
+
+    def _split_compressed(self) -> List[Tuple[bytes, int]]:
+        """使用 pydub 将音频切割为重叠的块，每块编码为 MP3
 
-        while start_ms < total_duration_ms:
-            end_ms = min(start_ms + self.chunk_length_ms, total_duration_ms)
-            chunk = audio[start_ms:end_ms]
+        Returns:
+            List[(chunk_bytes, offset_ms), ...]
+            每个元素包含音频块的字节数据和时间偏移（毫秒）
+        """
+        audio = AudioSegment.from_file(self.audio_path)
 
+        chunks = []
+        for plan in self._plan_chunks(len(audio)):
             buffer = io.BytesIO()
-            chunk.export(buffer, format="mp3")
+            audio[plan.start_ms : plan.end_ms].export(buffer, format="mp3")
             chunk_bytes = buffer.getvalue()
 
-            chunks.append((chunk_bytes, start_ms))
+            chunks.append((chunk_bytes, plan.start_ms))
             logger.debug(
                 f"切割 chunk {len(chunks)}: "
-                f"{start_ms/1000:.1f}s - {end_ms/1000:.1f}s ({len(chunk_bytes)} bytes)"
+                f"{plan.start_ms/1000:.1f}s - {plan.end_ms/1000:.1f}s ({len(chunk_bytes)} bytes)"
             )
-
-            # 下一个块的起始位置（有重叠）
-            start_ms += self.chunk_length_ms - self.chunk_overlap_ms
-
-            # 如果已到末尾，停止
-            if end_ms >= total_duration_ms:
-                break
-
-        # logger.info(f"音频切割完成，共 {len(chunks)} 个块")
         return chunks
 
     def _transcribe_chunks(
         self,
-        chunks: List[Tuple[bytes, int]],
+        chunks: Iterable[Tuple[AudioChunk, int]],
         callback: Optional[Callable[[int, str], None]],
+        on_chunk_done: Optional[Callable[[int, ASRData], None]] = None,
+        total_chunks: Optional[int] = None,
     ) -> List[ASRData]:
         """并发转录多个音频块
 
+        块按迭代顺序提交，已提交未完成的块不超过并发数的两倍，
+        chunks 为边解码边产生的迭代器时，解码进度不会远超转录进度。
+
         Args:
-            chunks: 音频块列表 [(chunk_bytes, offset_ms), ...]
+            chunks: 音频块 [(chunk, offset_ms), ...]，可以是迭代器
             callback: 进度回调
+            on_chunk_done: 单个块转录完成回调(idx, asr_data)，在收集结果的线程中调用
+            total_chunks: 块总数，chunks 为迭代器时传入估计值（用于计算进度）
 
         Returns:
             List[ASRData]: 每个块的转录结果
         """
-        results: List[Optional[ASRData]] = [None] * len(chunks)
-        total_chunks = len(chunks)
+        results: Dict[int, ASRData] = {}
+        if total_chunks is None:
+            total_chunks = len(chunks)
 
         def transcribe_single_chunk(
-            idx: int, chunk_bytes: bytes, offset_ms: int
+            idx: int, chunk: AudioChunk, offset_ms: int
         ) -> Tuple[int, ASRData]:
             """转录单个音频块 - 为每个块创建独立的 ASR 实例"""
-            logger.info(f"开始转录 chunk {idx+1}/{total_chunks} (offset={offset_ms}ms)")
+            # 任务已取消时排队中的块直接退出
+            current_cancel_token().raise_if_cancelled()
+            total = max(total_chunks, idx + 1)  # 估计值可能偏小
+
+            if isinstance(chunk, PCMChunk):
+                audio_hash = chunk.sha1_hex()
+            else:
+                audio_hash = hashlib.sha1(chunk).hexdigest()
+            checkpoint_key = self._checkpoint_key(idx, audio_hash)
+            cached = self.checkpoint.get(Checkpoint.STAGE_ASR_CHUNK, checkpoint_key)
+            if cached is not None:
+                logger.info(f"Chunk {idx+1}/{total} 已有检查点，跳过转录")
+                return idx, ASRData.from_json(cached)
+
+            logger.info(f"开始转录 chunk {idx+1}/{total} (offset={offset_ms}ms)")
 
             # 包装进度回调
             def chunk_callback(progress: int, message: str):
                 if callback:
                     # 整体进度 = (已完成块 / 总块数) * 100 + (当前块进度 / 总块数)
-                    overall_progress = int(
-                        (idx / total_chunks) * 100 + progress / total_chunks
-                    )
-                    callback(overall_progress, f"{idx+1}/{total_chunks}: {message}")
+                    overall_progress = int((idx / total) * 100 + progress / total)
+                    callback(overall_progress, f"{idx+1}/{total}: {message}")
 
-            # 为当前 chunk 创建独立的 ASR 实例
-            # 使用 chunk_bytes 作为音频输入
-            chunk_asr = self.asr_class(chunk_bytes, **self.asr_kwargs)
-
-            # 调用 ASR 的 run() 方法转录
-            asr_data = chunk_asr.run(chunk_callback)
+            asr_data = self._transcribe_chunk(chunk, chunk_callback)
+            self.checkpoint.put(
+                Checkpoint.STAGE_ASR_CHUNK, checkpoint_key, asr_data.to_json()
+            )
 
             logger.info(
-                f"Chunk {idx+1}/{total_chunks} 转录完成，"
+                f"Chunk {idx+1}/{total} 转录完成，"
                 f"获得 {len(asr_data.segments)} 个片段"
             )
             return idx, asr_data
 
-        # 使用 ThreadPoolExecutor 并发转录
-        with ThreadPoolExecutor(max_workers=self.chunk_concurrency) as executor:
-            futures = {
-                executor.submit(transcribe_single_chunk, i, chunk_bytes, offset): i
-                for i, (chunk_bytes, offset) in enumerate(chunks)
-            }
+        # 使用 ThreadPoolExecutor 并发转录（块任务继承调用方的取消作用域）
+        # 有并发控制器时按接口上限开线程，实际并发由控制器的槽位限制
+        workers = self.limiter.max_limit if self.limiter else self.chunk_concurrency
+        done_futures: "queue.Queue[Future]" = queue.Queue()
+        max_pending = workers * 2
+        pending = 0
+
+        def collect(block: bool) -> bool:
+            """处理一个已完成的块，block=False 且没有已完成的块时返回 False"""
+            nonlocal pending
+            try:
+                future = done_futures.get(block=block)
+            except queue.Empty:
+                return False
+            pending -= 1
+            idx, asr_data = future.result()
+            results[idx] = asr_data
+            if on_chunk_done:
+                on_chunk_done(idx, asr_data)
+            return True
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for i, (chunk, offset) in enumerate(chunks):
+                future = submit_with_context(
+                    executor, transcribe_single_chunk, i, chunk, offset
+                )
+                future.add_done_callback(done_futures.put)
+                pending += 1
+                while collect(block=pending >= max_pending):
+                    pass
+
+            while pending:
+                collect(block=True)
+
+        logger.info(f"所有 {len(results)} 个块转录完成")
+        return [results[idx] for idx in sorted(results)]
+
+    def _transcribe_chunk(
+        self, chunk: AudioChunk, callback: Optional[Callable[[int, str], None]]
+    ) -> ASRData:
+        """转录单个块，结果时间相对块起点
 
-            for future in as_completed(futures):
-                idx, asr_data = future.result()
-                results[idx] = asr_data
+        PCM 块启用片段缓存时只转录缓存未覆盖的片段。
+        """
+        if isinstance(chunk, PCMChunk):
+            source, start_ms, end_ms = chunk.source, chunk.offset_ms, chunk.end_ms
+        else:
+            source = AudioSource(chunk)
+            if source.wav_info is None:
+                # 非 WAV 输入的 MP3 块，整块转录
+                return self._transcribe_audio(chunk, callback)
+            start_ms, end_ms = 0, source.duration_ms
+
+        def transcribe_range(range_start_ms: int, range_end_ms: int) -> ASRData:
+            # PCM 视图在此时才读出，同时驻留内存的只有正在转录的范围
+            audio = source.pcm_chunk(range_start_ms, range_end_ms).read()
+            return self._transcribe_audio(
+                audio, callback, duration_ms=range_end_ms - range_start_ms
+            )
 
-        logger.info(f"所有 {total_chunks} 个块转录完成")
-        return [r for r in results if r is not None]  # 过滤 None
+        if self.chunk_cache is None:
+            return transcribe_range(start_ms, end_ms)
+        return self.chunk_cache.transcribe(source, start_ms, end_ms, transcribe_range)
+
+    def _transcribe_audio(
+        self,
+        audio: bytes,
+        callback: Optional[Callable[[int, str], None]],
+        duration_ms: Optional[int] = None,
+    ) -> ASRData:
+        """为一段音频创建独立的 ASR 实例并转录（需要压缩音频的引擎先编码为 MP3）
+
+        Args:
+            duration_ms: 音频时长，已知时（PCM 输入）向 work_callback 报告实际转录量
+        """
+        if self.asr_class.NEEDS_COMPRESSED_AUDIO and parse_pcm_wav(audio) is not None:
+            buffer = io.BytesIO()
+            AudioSegment.from_wav(io.BytesIO(audio)).export(buffer, format="mp3")
+            audio = buffer.getvalue()
+        chunk_asr = self.asr_class(audio, **self.chunk_asr_kwargs)
+        asr_data = self._run_chunk_asr(chunk_asr, callback, len(audio))
+        if self._work_callback and duration_ms and not chunk_asr.cache_hit:
+            self._work_callback(duration_ms)
+        return asr_data
+
+    def _run_chunk_asr(
+        self,
+        chunk_asr: BaseASR,
+        callback: Optional[Callable[[int, str], None]],
+        chunk_size: int,
+    ) -> ASRData:
+        """执行单个块的 ASR；有并发控制器时占用接口槽位，被限流时退避重试"""
+        if self.limiter is None:
+            return chunk_asr.run(callback)
+
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            self.limiter.acquire()
+            start_time = time.monotonic()
+            try:
+                asr_data = chunk_asr.run(callback)
+            except Exception as e:
+                throttled = is_throttle_error(e)
+                self.limiter.release(throttled=throttled)
+                if not throttled or attempt == MAX_THROTTLE_RETRIES:
+                    raise
+                logger.warning(
+                    f"请求被限流，退避后重试 ({attempt + 1}/{MAX_THROTTLE_RETRIES}): {e}"
+                )
+                wait_before_retry(attempt)
+                continue
+
+            # 命中缓存的耗时不反映接口延迟，不参与调整
+            latency = None
+            if not chunk_asr.cache_hit:
+                latency = (time.monotonic() - start_time) / max(chunk_size, 1)
+            self.limiter.release(latency_per_unit=latency)
+            return asr_data
+
+    def _engine_key(self) -> str:
+        """ASR 引擎及参数标识（不含缓存开关）"""
+        params = sorted(
+            (key, value) for key, value in self.asr_kwargs.items() if key != "use_cache"
+        )
+        return f"{self.asr_class.__name__}:{params!r}"
+
+    def _checkpoint_key(self, idx: int, audio_hash: str) -> str:
+        """生成块检查点 key：块序号 + 音频内容哈希 + ASR 引擎及参数"""
+        params = f"{self.asr_class.__name__}:{sorted(self.asr_kwargs.items())!r}"
+        params_hash = hashlib.sha1(params.encode()).hexdigest()
+        return f"{idx}:{audio_hash}:{params_hash[:16]}"
+
+    def _new_merger(self) -> ChunkMerger:
+        """块偏移来自实际切分位置，可以按时间窗口排除远处的重复文本"""
+        return ChunkMerger(
+            min_match_count=2, fuzzy_threshold=0.7, time_window=MATCH_TIME_WINDOW_MS
+        )
 
     def _merge_results(
-        self, chunk_results: List[ASRData], chunks: List[Tuple[bytes, int]]
+        self, chunk_results: List[ASRData], chunks: List[Tuple[AudioChunk, int]]
     ) -> ASRData:
         """使用 ChunkMerger 合并转录结果
 
@@ -221,7 +586,7 @@ class ChunkedASR:
         Returns:
             合并后的 ASRData
         """
-        merger = ChunkMerger(min_match_count=2, fuzzy_threshold=0.7)
+        merger = self._new_merger()
 
         # 提取每个 chunk 的时间偏移
         chunk_offsets = [offset for _, offset in chunks]
@@ -231,5 +596,7 @@ class ChunkedASR:
             chunks=chunk_results,
             chunk_offsets=chunk_offsets,
             overlap_duration=self.chunk_overlap_ms,
+            boundary_overlaps=self.boundary_overlaps,
         )
         return merged
+
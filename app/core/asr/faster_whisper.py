@@ -9,6 +9,7 @@ from typing import Any, Callable, List, Optional, Union
 
 import GPUtil
 
+from ..utils.cancel import current_cancel_token
 from ..utils.logger import setup_logger
 from ..utils.subprocess_helper import StreamReader
 from .asr_data import ASRData, ASRDataSeg
@@ -25,6 +26,8 @@ class FasterWhisperASR(BaseASR):
     Supports CPU/CUDA acceleration and various VAD methods.
     """
 
+    NEEDS_COMPRESSED_AUDIO = False
+
     def __init__(
         self,
         audio_input: Union[str, bytes],
@@ -280,6 +283,9 @@ class FasterWhisperASR(BaseASR):
                 errors="ignore",
                 creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
             )
+            # 任务取消时终止进程
+            cancel_token = current_cancel_token()
+            cancel_token.register_process(self.process)
 
             # 使用 StreamReader 处理输出
             reader = StreamReader(self.process)
@@ -324,6 +330,9 @@ class FasterWhisperASR(BaseASR):
                         else:
                             logger.info(line)
 
+            cancel_token.unregister_process(self.process)
+            cancel_token.raise_if_cancelled()
+
             if not is_finish:
                 logger.error("Faster Whisper 错误: %s", error_msg)
                 raise RuntimeError(error_msg)
@@ -0,0 +1,189 @@
+"""进程内模型注册表
+
+按 key（模型、目录、设备、计算精度）复用已加载的本地模型：
+
+- 同一模型只加载一次，并发的块/任务共享同一个实例（引用计数）
+- 同一 key 并发加载时只有一个线程真正加载，其余等待
+- 已加载模型的估计内存超过预算时，按最近最少使用顺序卸载空闲模型，
+  正在使用的模型和最近使用的一个模型不会被卸载
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger("model_registry")
+
+MB = 1024 * 1024
+
+
+class _Entry:
+    """注册表条目"""
+
+    def __init__(self, size_bytes: int):
+        self.model: Any = None
+        self.size_bytes = size_bytes
+        self.refs = 0
+        self.loading = True
+        self.failed = False
+
+
+class ModelRegistry:
+    """模型注册表（单例模式）"""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self._condition = threading.Condition()
+        # 按最近使用顺序排列，最久未使用的在前
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        # 内存预算（字节），0 表示不限制
+        self.memory_budget = 0
+
+    def set_memory_budget(self, budget_bytes: int):
+        """设置内存预算（字节，0 表示不限制），超出时立即卸载空闲模型"""
+        with self._condition:
+            self.memory_budget = max(0, budget_bytes)
+            self._evict_locked()
+
+    @contextmanager
+    def acquire(
+        self, key: Hashable, loader: Callable[[], Any], size_bytes: int
+    ) -> Iterator[Any]:
+        """
+        获取模型（未加载时调用 loader 加载），with 块内模型不会被卸载
+
+        Args:
+            key: 模型 key
+            loader: 加载函数
+            size_bytes: 模型的估计内存占用（字节）
+
+        Raises:
+            RuntimeError: 其他线程加载同一模型失败
+        """
+        entry = self._checkout(key, loader, size_bytes)
+        try:
+            yield entry.model
+        finally:
+            with self._condition:
+                entry.refs -= 1
+                self._evict_locked()
+
+    def preload(self, key: Hashable, loader: Callable[[], Any], size_bytes: int):
+        """预加载模型，加载后保持空闲等待使用"""
+        with self.acquire(key, loader, size_bytes):
+            pass
+
+    def loaded_models(self) -> List[Dict[str, Any]]:
+        """
+        已加载的模型（按最近使用顺序，最近的在后）
+
+        Returns:
+            [{key, size_mb, refs}, ...]
+        """
+        with self._condition:
+            return [
+                {
+                    "key": key,
+                    "size_mb": entry.size_bytes // MB,
+                    "refs": entry.refs,
+                }
+                for key, entry in self._entries.items()
+                if not entry.loading
+            ]
+
+    def clear(self):
+        """卸载所有空闲模型"""
+        with self._condition:
+            for key in [k for k, e in self._entries.items() if self._is_idle(e)]:
+                self._unload_locked(key)
+
+    def _checkout(
+        self, key: Hashable, loader: Callable[[], Any], size_bytes: int
+    ) -> _Entry:
+        with self._condition:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refs += 1
+                self._entries.move_to_end(key)
+                while entry.loading:
+                    self._condition.wait()
+                if entry.failed:
+                    entry.refs -= 1
+                    raise RuntimeError(f"模型加载失败: {key}")
+                logger.info(f"复用已加载的模型: {key}")
+                return entry
+
+            entry = _Entry(size_bytes)
+            entry.refs = 1
+            self._entries[key] = entry
+            # 先为新模型腾出空间
+            self._evict_locked()
+
+        try:
+            logger.info(f"加载模型: {key} (估计 {size_bytes // MB} MB)")
+            model = loader()
+        except BaseException:
+            with self._condition:
+                entry.failed = True
+                entry.loading = False
+                entry.refs -= 1
+                self._entries.pop(key, None)
+                self._condition.notify_all()
+            raise
+
+        with self._condition:
+            entry.model = model
+            entry.loading = False
+            self._condition.notify_all()
+        return entry
+
+    def _evict_locked(self):
+        """超出预算时按 LRU 顺序卸载空闲模型（需持有锁）
+
+        最近使用的模型始终保留，即使单个模型就超出预算，也不会每次使用都重新加载。
+        """
+        if not self.memory_budget:
+            return
+        total = sum(entry.size_bytes for entry in self._entries.values())
+        for key in list(self._entries)[:-1]:
+            if total <= self.memory_budget:
+                return
+            entry = self._entries[key]
+            if self._is_idle(entry):
+                total -= entry.size_bytes
+                self._unload_locked(key)
+        if total > self.memory_budget:
+            logger.warning(
+                f"模型内存超出预算（{total // MB} MB > {self.memory_budget // MB} MB），"
+                "使用中及最近使用的模型不会卸载"
+            )
+
+    def _unload_locked(self, key: Hashable):
+        entry = self._entries.pop(key)
+        entry.model = None
+        logger.info(f"卸载空闲模型: {key}")
+
+    @staticmethod
+    def _is_idle(entry: _Entry) -> bool:
+        return entry.refs == 0 and not entry.loading
+
+
+# 全局单例实例
+model_registry = ModelRegistry()
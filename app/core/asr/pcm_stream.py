@@ -0,0 +1,230 @@
+"""ffmpeg PCM 管道流
+
+由 ffmpeg 把视频的音轨解码为 16 kHz 单声道 s16le，经管道直接读取，不写临时 WAV。
+分块转录时每凑满一块就切出并派发，第一块在解码开始后几秒即可开始转录，
+不必等整段音频解码完成；读取受管道背压控制，未派发的数据最多一块。
+"""
+
+import collections
+import os
+import re
+import subprocess
+import threading
+from typing import Callable, Iterator, Optional, Tuple
+
+from ..utils.cancel import current_cancel_token
+from ..utils.logger import setup_logger
+from .audio_source import AudioSource
+from .boundary_planner import ChunkPlan, next_boundary
+from .pcm_wav import PCMWavInfo, wav_header
+
+logger = setup_logger("pcm_stream")
+
+SAMPLE_RATE = 16000
+MS_PER_SECOND = 1000
+# ffmpeg 输出格式：单声道 16 位（data_offset/data_size 对管道流无意义）
+STREAM_WAV_INFO = PCMWavInfo(1, SAMPLE_RATE, 2, 16, 0, 0)
+# 等待 ffmpeg 输出输入文件信息（时长）的超时时间（秒）
+HEADER_TIMEOUT = 10
+# 解码失败时日志中保留的 ffmpeg 输出行数
+STDERR_TAIL_LINES = 20
+
+_DURATION_RE = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+
+
+class PCMStream:
+    """ffmpeg 解码输出的 PCM 流
+
+    首次读取（或访问 duration_ms）时启动 ffmpeg，进程注册到启动线程的取消作用域，
+    任务取消时随之终止。
+    """
+
+    def __init__(self, input_file: str, audio_track_index: int = 0):
+        self.input_file = input_file
+        self.audio_track_index = audio_track_index
+        self.info = STREAM_WAV_INFO
+
+        self._process: Optional[subprocess.Popen] = None
+        self._cancel_token = None
+        self._stderr_thread: Optional[threading.Thread] = None
+        self._stderr_tail = collections.deque(maxlen=STDERR_TAIL_LINES)
+        self._header_ready = threading.Event()
+        self._duration_ms: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def duration_ms(self) -> Optional[int]:
+        """输入文件时长（毫秒，来自 ffmpeg 输出的文件信息），未知时为 None"""
+        self.open()
+        self._header_ready.wait(timeout=HEADER_TIMEOUT)
+        return self._duration_ms
+
+    def open(self):
+        """启动 ffmpeg（重复调用无副作用）"""
+        with self._lock:
+            if self._process is not None:
+                return
+
+            cmd = [
+                "ffmpeg",
+                "-hide_banner",
+                "-nostdin",
+                "-i",
+                self.input_file,
+                "-map",
+                f"0:a:{self.audio_track_index}",
+                "-vn",
+                "-ac",
+                "1",  # 单声道
+                "-ar",
+                str(SAMPLE_RATE),  # 采样率16kHz
+                "-f",
+                "s16le",
+                "pipe:1",
+            ]
+            logger.info(f"流式解码音频执行命令: {' '.join(cmd)}")
+
+            self._process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                creationflags=(
+                    getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
+                ),
+            )
+            self._cancel_token = current_cancel_token()
+            self._cancel_token.register_process(self._process)
+
+            # 持续读取 stderr，避免管道写满阻塞 ffmpeg
+            self._stderr_thread = threading.Thread(
+                target=self._drain_stderr, name="ffmpeg-stderr", daemon=True
+            )
+            self._stderr_thread.start()
+
+    def read(self, size: int) -> bytes:
+        """
+        读取 PCM 数据，阻塞直到读满 size 字节或解码结束
+
+        Raises:
+            TaskCancelledError: 任务已取消
+            RuntimeError: ffmpeg 解码失败
+        """
+        self.open()
+        data = self._process.stdout.read(size)
+        if len(data) < size:
+            self._finish()
+        return data
+
+    def close(self):
+        """结束 ffmpeg 并释放管道（重复调用无副作用）"""
+        with self._lock:
+            process, self._process = self._process, None
+        if process is None:
+            return
+
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.wait()
+        if self._stderr_thread:
+            self._stderr_thread.join(timeout=1.0)
+        self._cancel_token.unregister_process(process)
+
+    def __enter__(self) -> "PCMStream":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _finish(self):
+        """读到末尾：等待 ffmpeg 退出并检查结果"""
+        returncode = self._process.wait()
+        if self._stderr_thread:
+            self._stderr_thread.join(timeout=1.0)
+        self._cancel_token.raise_if_cancelled()
+        if returncode != 0:
+            logger.error("== ffmpeg 执行失败 ==")
+            logger.error(f"返回码: {returncode}")
+            logger.error("标准错误: " + "\n".join(self._stderr_tail))
+            raise RuntimeError(f"音频解码失败 (ffmpeg 返回码 {returncode})")
+
+    def _drain_stderr(self):
+        try:
+            for raw in self._process.stderr:
+                line = raw.decode("utf-8", errors="replace").rstrip()
+                self._stderr_tail.append(line)
+                if not self._header_ready.is_set():
+                    match = _DURATION_RE.search(line)
+                    if match:
+                        h, m, s = match.groups()
+                        seconds = int(h) * 3600 + int(m) * 60 + float(s)
+                        self._duration_ms = int(seconds * MS_PER_SECOND)
+                        self._header_ready.set()
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._header_ready.set()
+
+
+def split_pcm_stream(
+    read: Callable[[int], bytes],
+    chunk_length_ms: int,
+    chunk_overlap_ms: int,
+    snap_to_silence: bool = False,
+    info: PCMWavInfo = STREAM_WAV_INFO,
+) -> Iterator[Tuple[bytes, ChunkPlan]]:
+    """
+    边读取边切分 PCM 流
+
+    切分位置与对同一音频的 WAV 文件调用 plan_chunks（或固定分块）的结果一致，
+    切出的 WAV 数据也与 PCMChunk.read() 相同。
+
+    Args:
+        read: 读取函数，返回不超过指定字节数的数据，返回不足时表示流结束
+        chunk_length_ms: 最大分块长度（毫秒）
+        chunk_overlap_ms: 重叠时长（毫秒）
+        snap_to_silence: 是否把切分点移到附近的静音处
+        info: PCM 格式
+
+    Yields:
+        (WAV 数据, 分块计划)
+    """
+    bytes_per_ms = info.sample_rate * info.block_align // MS_PER_SECOND
+    chunk_bytes = chunk_length_ms * bytes_per_ms
+
+    buffer = bytearray()
+    start_ms = 0
+    overlap_ms = 0
+    while True:
+        # 多读 1 毫秒，用于判断剩余音频是否超过一块（与按毫秒计算的文件时长一致）
+        wanted = chunk_bytes + bytes_per_ms - len(buffer)
+        data = read(wanted)
+        buffer += data
+        if len(data) < wanted:
+            # 流结束，剩余部分为最后一块
+            buffer_ms = len(buffer) // bytes_per_ms
+            end = buffer_ms * bytes_per_ms
+            yield (
+                wav_header(info, end) + buffer[:end],
+                ChunkPlan(start_ms, start_ms + buffer_ms, overlap_ms),
+            )
+            return
+
+        if snap_to_silence:
+            window = wav_header(info, chunk_bytes) + buffer[:chunk_bytes]
+            cut_ms, next_overlap_ms = next_boundary(
+                AudioSource(window), chunk_length_ms, chunk_length_ms, chunk_overlap_ms
+            )
+        else:
+            cut_ms, next_overlap_ms = chunk_length_ms, chunk_overlap_ms
+
+        cut = cut_ms * bytes_per_ms
+        yield (
+            wav_header(info, cut) + buffer[:cut],
+            ChunkPlan(start_ms, start_ms + cut_ms, overlap_ms),
+        )
+
+        advance_ms = cut_ms - next_overlap_ms
+        del buffer[: advance_ms * bytes_per_ms]
+        start_ms += advance_ms
+        overlap_ms = next_overlap_ms
@@ -0,0 +1,100 @@
+"""PCM WAV 工具
+
+本地 ASR 引擎直接使用 16 kHz 单声道 PCM WAV，分块时按字节范围切分，
+避免解码后再编码为 MP3。
+"""
+
+import struct
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+class PCMWavInfo(NamedTuple):
+    """PCM WAV 格式信息"""
+
+    channels: int
+    sample_rate: int
+    block_align: int
+    bits_per_sample: int
+    data_offset: int
+    data_size: int
+
+
+def parse_pcm_wav(buffer: bytes) -> Optional[PCMWavInfo]:
+    """解析 RIFF/WAVE 头，定位 PCM 数据区
+
+    Returns:
+        格式信息，非 PCM WAV（如 MP3、浮点或压缩 WAV）返回 None
+    """
+    if len(buffer) < 12 or buffer[:4] != b"RIFF" or buffer[8:12] != b"WAVE":
+        return None
+
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(buffer):
+        chunk_id = buffer[pos : pos + 4]
+        (chunk_size,) = struct.unpack_from("<I", buffer, pos + 4)
+        body = pos + 8
+        if chunk_id == b"fmt " and chunk_size >= 16:
+            fmt = struct.unpack_from("<HHIIHH", buffer, body)
+        elif chunk_id == b"data":
+            if fmt is None or fmt[0] != 1:  # 1 = WAVE_FORMAT_PCM
+                return None
+            channels, sample_rate, block_align, bits = fmt[1], fmt[2], fmt[4], fmt[5]
+            if block_align <= 0 or sample_rate <= 0:
+                return None
+            # ffmpeg 管道输出等场景下 data 长度可能未填写，以实际长度为准
+            data_size = min(chunk_size, len(buffer) - body)
+            data_size -= data_size % block_align
+            return PCMWavInfo(
+                channels, sample_rate, block_align, bits, body, data_size
+            )
+        # 块按偶数字节对齐
+        pos = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def wav_header(info: PCMWavInfo, data_size: int) -> bytes:
+    """生成 44 字节的标准 PCM WAV 头"""
+    byte_rate = info.sample_rate * info.block_align
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,
+        info.channels,
+        info.sample_rate,
+        byte_rate,
+        info.block_align,
+        info.bits_per_sample,
+        b"data",
+        data_size,
+    )
+
+
+def pcm_to_float32(buffer: bytes, sample_rate: int = 16000) -> Optional[np.ndarray]:
+    """把 16 位单声道 PCM WAV 数据转换为 [-1, 1] 的 float32 数组
+
+    Args:
+        buffer: WAV 数据
+        sample_rate: 要求的采样率
+
+    Returns:
+        采样数组，格式不符时返回 None
+    """
+    info = parse_pcm_wav(buffer)
+    if (
+        info is None
+        or info.channels != 1
+        or info.bits_per_sample != 16
+        or info.sample_rate != sample_rate
+    ):
+        return None
+    samples = np.frombuffer(
+        buffer, dtype="<i2", count=info.data_size // 2, offset=info.data_offset
+    )
+    return samples.astype(np.float32) / 32768.0
@@ -1,21 +1,42 @@
+from typing import Union
+
 from app.core.asr.asr_data import ASRData
 from app.core.asr.bcut import BcutASR
 from app.core.asr.chunked_asr import ChunkedASR
 from app.core.asr.faster_whisper import FasterWhisperASR
 from app.core.asr.faster_whisper_python import FasterWhisperPythonASR
 from app.core.asr.jianying import JianYingASR
+from app.core.asr.pcm_stream import PCMStream
 from app.core.asr.whisper_api import WhisperAPI
 from app.core.asr.whisper_cpp import WhisperCppASR
 from app.core.entities import TranscribeConfig, TranscribeModelEnum
 
+# 公共接口（必剪、剪映）的并发上限，超过后容易被限流
+PUBLIC_ENDPOINT_MAX_CONCURRENCY = 2
+
 
-def transcribe(audio_path: str, config: TranscribeConfig, callback=None) -> ASRData:
+def transcribe(
+    audio_path: Union[str, PCMStream],
+    config: TranscribeConfig,
+    callback=None,
+    segment_callback=None,
+    checkpoint=None,
+    work_callback=None,
+) -> ASRData:
     """Transcribe audio file using specified configuration.
 
     Args:
-        audio_path: Path to audio file
+        audio_path: Path to audio file, or a PCMStream to transcribe chunks
+            while ffmpeg is still decoding
         config: Transcription configuration
         callback: Progress callback function(progress: int, message: str)
+        segment_callback: Optional callback(segments) receiving finalized segments
+            in time order while chunks are still being transcribed (segments are
+            passed before timing optimization)
+        checkpoint: Optional Checkpoint used to reuse already transcribed chunks
+        work_callback: Optional callback(audio_ms) receiving the duration of PCM
+            audio actually sent to the engine (audio reused from the checkpoint or
+            cache is not reported)
 
     Returns:
         ASRData: Transcription result data
@@ -32,9 +53,15 @@ def transcribe(audio_path: str, config: TranscribeConfig, callback=None) -> ASRD
 
     # Create ASR instance based on model type
     asr = _create_asr_instance(audio_path, config)
+    if checkpoint is not None:
+        asr.checkpoint = checkpoint
 
     # Run transcription
-    asr_data = asr.run(callback=callback)
+    asr_data = asr.run(
+        callback=callback,
+        segment_callback=segment_callback,
+        work_callback=work_callback,
+    )
 
     # Optimize subtitle timing if not using word timestamps
     if not config.need_word_time_stamp:
@@ -43,7 +70,9 @@ def transcribe(audio_path: str, config: TranscribeConfig, callback=None) -> ASRD
     return asr_data
 
 
-def _create_asr_instance(audio_path: str, config: TranscribeConfig) -> ChunkedASR:
+def _create_asr_instance(
+    audio_path: Union[str, PCMStream], config: TranscribeConfig
+) -> ChunkedASR:
     """Create appropriate ASR instance based on configuration.
 
     Args:
@@ -77,33 +106,52 @@ def _create_asr_instance(audio_path: str, config: TranscribeConfig) -> ChunkedAS
         raise ValueError(f"Invalid transcription model: {model_type}")
 
 
-def _create_jianying_asr(audio_path: str, config: TranscribeConfig) -> ChunkedASR:
+def _create_jianying_asr(
+    audio_path: Union[str, PCMStream], config: TranscribeConfig
+) -> ChunkedASR:
     """Create JianYing ASR instance with chunking support."""
     asr_kwargs = {
         "use_cache": True,
         "need_word_time_stamp": config.need_word_time_stamp,
     }
     return ChunkedASR(
-        asr_class=JianYingASR, audio_path=audio_path, asr_kwargs=asr_kwargs
+        asr_class=JianYingASR,
+        audio_path=audio_path,
+        asr_kwargs=asr_kwargs,
+        snap_to_silence=config.chunk_snap_to_silence,
+        endpoint="jianying",
+        max_concurrency=PUBLIC_ENDPOINT_MAX_CONCURRENCY,
     )
 
 
-def _create_bijian_asr(audio_path: str, config: TranscribeConfig) -> ChunkedASR:
+def _create_bijian_asr(
+    audio_path: Union[str, PCMStream], config: TranscribeConfig
+) -> ChunkedASR:
     """Create Bijian ASR instance with chunking support."""
     asr_kwargs = {
         "use_cache": True,
         "need_word_time_stamp": config.need_word_time_stamp,
     }
-    return ChunkedASR(asr_class=BcutASR, audio_path=audio_path, asr_kwargs=asr_kwargs)
+    return ChunkedASR(
+        asr_class=BcutASR,
+        audio_path=audio_path,
+        asr_kwargs=asr_kwargs,
+        snap_to_silence=config.chunk_snap_to_silence,
+        endpoint="bcut",
+        max_concurrency=PUBLIC_ENDPOINT_MAX_CONCURRENCY,
+    )
 
 
-def _create_whisper_cpp_asr(audio_path: str, config: TranscribeConfig) -> ChunkedASR:
+def _create_whisper_cpp_asr(
+    audio_path: Union[str, PCMStream], config: TranscribeConfig
+) -> ChunkedASR:
     """Create WhisperCpp ASR instance with chunking support."""
     asr_kwargs = {
         "use_cache": True,
         "need_word_time_stamp": config.need_word_time_stamp,
         "language": config.transcribe_language,
         "whisper_model": config.whisper_model.value if config.whisper_model else None,
+        "use_server": config.whisper_cpp_server_mode,
     }
     return ChunkedASR(
         asr_class=WhisperCppASR,
@@ -111,10 +159,13 @@ def _create_whisper_cpp_asr(audio_path: str, config: TranscribeConfig) -> Chunke
         asr_kwargs=asr_kwargs,
         chunk_concurrency=1,  # 本地转录使用单线程
         chunk_length=60 * 20,  # 每块20分钟
+        snap_to_silence=config.chunk_snap_to_silence,
     )
 
 
-def _create_whisper_api_asr(audio_path: str, config: TranscribeConfig) -> ChunkedASR:
+def _create_whisper_api_asr(
+    audio_path: Union[str, PCMStream], config: TranscribeConfig
+) -> ChunkedASR:
     """Create Whisper API ASR instance with chunking support."""
     asr_kwargs = {
         "use_cache": True,
@@ -126,11 +177,18 @@ def _create_whisper_api_asr(audio_path: str, config: TranscribeConfig) -> Chunke
         "prompt": config.whisper_api_prompt or "",
     }
     return ChunkedASR(
-        asr_class=WhisperAPI, audio_path=audio_path, asr_kwargs=asr_kwargs
+        asr_class=WhisperAPI,
+        audio_path=audio_path,
+        asr_kwargs=asr_kwargs,
+        snap_to_silence=config.chunk_snap_to_silence,
+        endpoint=f"whisper_api:{asr_kwargs['base_url']}",
+        max_concurrency=config.whisper_api_max_concurrency,
     )
 
 
-def _create_faster_whisper_asr(audio_path: str, config: TranscribeConfig) -> ChunkedASR:
+def _create_faster_whisper_asr(
+    audio_path: Union[str, PCMStream], config: TranscribeConfig
+) -> ChunkedASR:
     """Create FasterWhisper ASR instance with chunking support."""
     asr_kwargs = {
         "use_cache": True,
@@ -159,10 +217,13 @@ def _create_faster_whisper_asr(audio_path: str, config: TranscribeConfig) -> Chu
         asr_kwargs=asr_kwargs,
         chunk_concurrency=1,  # 本地转录使用单线程
         chunk_length=60 * 20,  # 每块20分钟
+        snap_to_silence=config.chunk_snap_to_silence,
     )
 
 
-def _create_faster_whisper_python_asr(audio_path: str, config: TranscribeConfig) -> ChunkedASR:
+def _create_faster_whisper_python_asr(
+    audio_path: Union[str, PCMStream], config: TranscribeConfig
+) -> ChunkedASR:
     """Create FasterWhisper Python ASR instance with chunking support."""
     asr_kwargs = {
         "use_cache": True,
@@ -176,6 +237,7 @@ def _create_faster_whisper_python_asr(audio_path: str, config: TranscribeConfig)
         "vad_filter": config.faster_whisper_vad_filter,
         "vad_threshold": config.faster_whisper_vad_threshold,
         "prompt": config.faster_whisper_prompt,
+        "batch_size": config.faster_whisper_batch_size,
     }
     return ChunkedASR(
         asr_class=FasterWhisperPythonASR,
@@ -183,6 +245,7 @@ def _create_faster_whisper_python_asr(audio_path: str, config: TranscribeConfig)
         asr_kwargs=asr_kwargs,
         chunk_concurrency=1,  # 本地转录使用单线程
         chunk_length=60 * 20,  # 每块20分钟
+        snap_to_silence=config.chunk_snap_to_silence,
     )
 
 
@@ -9,21 +9,29 @@ from pathlib import Path
 from typing import Any, Callable, List, Optional, Union
 
 from ...config import MODEL_PATH
+from ..utils.cancel import TaskCancelledError, current_cancel_token
 from ..utils.logger import setup_logger
 from ..utils.subprocess_helper import StreamReader
 from .asr_data import ASRData, ASRDataSeg
 from .base import BaseASR
 from .status import ASRStatus
+from .whisper_cpp_server import detect_whisper_server_executable, whisper_cpp_servers
 
 logger = setup_logger("whisper_asr")
 
+ZH_PROMPT = "你好，我们需要使用简体中文，以下是普通话的句子。"
+
 
 class WhisperCppASR(BaseASR):
     """Whisper.cpp local ASR implementation.
 
-    Runs whisper.cpp binary for local ASR processing.
+    Runs whisper.cpp binary for local ASR processing. With ``use_server``
+    and a whisper-server executable available, audio is sent to a long-lived
+    whisper-server process instead, so the model is loaded only once.
     """
 
+    NEEDS_COMPRESSED_AUDIO = False
+
     def __init__(
         self,
         audio_input: Union[str, bytes],
@@ -32,6 +40,8 @@ class WhisperCppASR(BaseASR):
         whisper_model=None,
         use_cache: bool = False,
         need_word_time_stamp: bool = False,
+        use_server: bool = False,
+        whisper_server_path: Optional[str] = None,
     ):
         super().__init__(audio_input, use_cache)
 
@@ -41,8 +51,17 @@ class WhisperCppASR(BaseASR):
                 ".wav"
             ), f"Audio must be WAV format: {audio_input}"
 
+        # 常驻服务模式：找不到 whisper-server 时回退为每块启动 whisper-cli
+        self.whisper_server_path = None
+        if use_server:
+            self.whisper_server_path = (
+                whisper_server_path or detect_whisper_server_executable()
+            )
+            if self.whisper_server_path is None:
+                logger.warning("未找到 whisper-server，回退为命令行模式")
+
         # Auto-detect whisper executable if not provided
-        if whisper_cpp_path is None:
+        if whisper_cpp_path is None and self.whisper_server_path is None:
             whisper_cpp_path = detect_whisper_executable()
 
         # Find model file in models directory
@@ -59,7 +78,7 @@ class WhisperCppASR(BaseASR):
             raise ValueError("whisper_model cannot be empty")
 
         self.model_path = model_path
-        self.whisper_cpp_path = Path(whisper_cpp_path)
+        self.whisper_cpp_path = Path(whisper_cpp_path) if whisper_cpp_path else None
         self.need_word_time_stamp = need_word_time_stamp
         self.language = language
 
@@ -105,9 +124,7 @@ class WhisperCppASR(BaseASR):
             )
 
         if self.language == "zh":
-            whisper_params.extend(
-                ["--prompt", "你好，我们需要使用简体中文，以下是普通话的句子。"]
-            )
+            whisper_params.extend(["--prompt", ZH_PROMPT])
 
         return whisper_params
 
@@ -120,7 +137,11 @@ class WhisperCppASR(BaseASR):
         if callback is None:
             callback = _default_callback
 
+        if self.whisper_server_path:
+            return self._run_server(callback)
+
         is_const_me_version = True if os.name == "nt" else False
+        cancel_token = current_cancel_token()
 
         with tempfile.TemporaryDirectory() as temp_path:
             temp_dir = Path(temp_path)
@@ -158,6 +179,8 @@ class WhisperCppASR(BaseASR):
                 )
 
                 logger.info(f"Whisper.cpp process started, PID: {self.process.pid}")
+                # 任务取消时终止进程
+                cancel_token.register_process(self.process)
 
                 # Process output with StreamReader
                 reader = StreamReader(self.process)
@@ -205,6 +228,8 @@ class WhisperCppASR(BaseASR):
                         else:
                             logger.debug(f"[stderr] {line.strip()}")
 
+                cancel_token.raise_if_cancelled()
+
                 # Check return code
                 if self.process.returncode != 0:
                     raise RuntimeError(
@@ -223,6 +248,10 @@ class WhisperCppASR(BaseASR):
 
                 return srt_path.read_text(encoding="utf-8")
 
+            except TaskCancelledError:
+                logger.info("任务已取消，Whisper.cpp 转录中止")
+                raise
+
             except Exception as e:
                 logger.exception("ASR processing failed")
                 if self.process and self.process.poll() is None:
@@ -234,6 +263,42 @@ class WhisperCppASR(BaseASR):
                         self.process.wait()
                 raise RuntimeError(f"SRT generation failed: {str(e)}")
 
+            finally:
+                if self.process:
+                    cancel_token.unregister_process(self.process)
+
+    def _run_server(self, callback: Callable[[int, str], None]) -> str:
+        """经常驻 whisper-server 转录（模型只在服务启动时加载一次）"""
+        if isinstance(self.audio_input, str):
+            wav_data = Path(self.audio_input).read_bytes()
+        elif self.file_binary:
+            wav_data = self.file_binary
+        else:
+            raise ValueError("No audio data available")
+
+        server = whisper_cpp_servers.get_server(
+            self.whisper_server_path,
+            self.model_path,
+            use_gpu=sys.platform == "darwin",
+        )
+        callback(*ASRStatus.TRANSCRIBING.callback_tuple())
+        try:
+            srt = server.transcribe(
+                wav_data,
+                language=self.language,
+                prompt=ZH_PROMPT if self.language == "zh" else None,
+            )
+        except TaskCancelledError:
+            logger.info("任务已取消，Whisper.cpp 转录中止")
+            raise
+        except Exception as e:
+            logger.exception("ASR processing failed")
+            raise RuntimeError(f"SRT generation failed: {str(e)}")
+
+        callback(*ASRStatus.COMPLETED.callback_tuple())
+        logger.info("Whisper.cpp ASR completed (server)")
+        return srt
+
     def _get_key(self):
         return f"{self.crc32_hex}-{self.need_word_time_stamp}-{self.model_path}-{self.language}"
 
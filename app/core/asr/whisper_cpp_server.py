@@ -0,0 +1,310 @@
+"""whisper.cpp 常驻服务
+
+由 Worker 管理一个长期运行的 whisper-server 进程（只监听本机），音频经 HTTP
+/inference 接口提交：模型在进程生命周期内只加载一次，不必每个分块都启动
+whisper-cli、重新加载 ggml 模型。
+
+- 首次使用时启动，等待 /health 就绪后才提交请求
+- 每次请求前检查进程状态，进程崩溃后自动重启；请求因连接中断失败时重启并重试一次
+- whisper-server 串行处理请求，同一服务的请求在客户端排队，
+  任务取消时结束服务进程以中止进行中的请求，下次使用时重新启动
+"""
+
+import atexit
+import collections
+import os
+import shutil
+import socket
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from ..utils.cancel import current_cancel_token
+from ..utils.logger import setup_logger
+
+logger = setup_logger("whisper_cpp_server")
+
+HOST = "127.0.0.1"
+# 等待服务就绪（含模型加载）的超时时间（秒）
+STARTUP_TIMEOUT = 120
+# 就绪检查间隔（秒）
+HEALTH_POLL_INTERVAL = 0.2
+# 单次就绪检查的请求超时（秒）
+HEALTH_TIMEOUT = 2
+# 转录请求超时（秒），分块最长 20 分钟，留足 CPU 推理时间
+INFERENCE_TIMEOUT = 60 * 60
+# 等待排队请求时检查取消的间隔（秒）
+QUEUE_POLL_INTERVAL = 0.5
+# 启动失败时日志中保留的服务输出行数
+OUTPUT_TAIL_LINES = 20
+
+
+def detect_whisper_server_executable() -> Optional[str]:
+    """查找 whisper-server 可执行文件，未找到时返回 None"""
+    return shutil.which("whisper-server")
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+class WhisperCppServer:
+    """单个 whisper-server 进程（一个可执行文件 + 一个模型）"""
+
+    def __init__(self, executable: str, model_path: str, use_gpu: bool = False):
+        self.executable = executable
+        self.model_path = model_path
+        self.use_gpu = use_gpu
+        self.port: Optional[int] = None
+        # 启动次数（大于 1 说明发生过重启）
+        self.starts = 0
+
+        self._process: Optional[subprocess.Popen] = None
+        self._output_tail = collections.deque(maxlen=OUTPUT_TAIL_LINES)
+        self._lock = threading.Lock()
+        self._request_lock = threading.Lock()
+        # 本机服务，不走环境变量中的代理
+        self._session = requests.Session()
+        self._session.trust_env = False
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{HOST}:{self.port}"
+
+    @property
+    def pid(self) -> Optional[int]:
+        process = self._process
+        return process.pid if process else None
+
+    def is_running(self) -> bool:
+        process = self._process
+        return process is not None and process.poll() is None
+
+    def health(self) -> bool:
+        """服务进程存活且模型已加载"""
+        if not self.is_running():
+            return False
+        try:
+            response = self._session.get(f"{self.base_url}/health", timeout=HEALTH_TIMEOUT)
+        except requests.RequestException:
+            return False
+        # 旧版本没有 /health，能响应请求即视为就绪
+        return response.status_code in (200, 404)
+
+    def ensure_running(self):
+        """确保服务已启动并就绪（未启动或已崩溃时启动）
+
+        Raises:
+            RuntimeError: 服务启动失败或超时未就绪
+        """
+        with self._lock:
+            if self.is_running():
+                return
+            if self._process is not None:
+                logger.warning(
+                    f"whisper-server 已退出 (返回码 {self._process.returncode})，重新启动"
+                )
+                self._process = None
+            self._start()
+
+    def transcribe(
+        self, wav_data: bytes, language: str = "", prompt: Optional[str] = None
+    ) -> str:
+        """
+        提交音频并返回 SRT 字幕
+
+        Args:
+            wav_data: 16 kHz WAV 数据
+            language: 语言代码，为空时自动检测
+            prompt: 初始提示词
+
+        Raises:
+            TaskCancelledError: 任务已取消
+            RuntimeError: 服务启动或转录失败
+        """
+        cancel_token = current_cancel_token()
+        # whisper-server 串行处理请求，在客户端排队，便于取消时只中止自己的请求
+        while not self._request_lock.acquire(timeout=QUEUE_POLL_INTERVAL):
+            cancel_token.raise_if_cancelled()
+
+        try:
+            for attempt in range(2):
+                cancel_token.raise_if_cancelled()
+                self.ensure_running()
+                process = self._process
+                cancel_token.register_process(process)
+                try:
+                    return self._post_inference(wav_data, language, prompt)
+                except requests.ConnectionError as e:
+                    cancel_token.raise_if_cancelled()
+                    if attempt:
+                        raise RuntimeError(f"whisper-server 连接中断: {e}") from e
+                    logger.warning(f"whisper-server 连接中断，重启后重试: {e}")
+                finally:
+                    cancel_token.unregister_process(process)
+        finally:
+            self._request_lock.release()
+
+    def stop(self):
+        """结束服务进程（重复调用无副作用）"""
+        with self._lock:
+            process, self._process = self._process, None
+        if process is None or process.poll() is not None:
+            return
+        logger.info(f"停止 whisper-server: PID={process.pid}")
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def _build_command(self) -> List[str]:
+        command = [
+            self.executable,
+            "-m",
+            self.model_path,
+            "--host",
+            HOST,
+            "--port",
+            str(self.port),
+        ]
+        if not self.use_gpu:
+            command.append("--no-gpu")
+        return command
+
+    def _start(self):
+        """启动服务进程并等待就绪（需持有锁）"""
+        self.port = _free_port()
+        command = self._build_command()
+        logger.info(f"启动 whisper-server: {' '.join(command)}")
+
+        self._output_tail.clear()
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            creationflags=(
+                getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
+            ),
+        )
+        self._process = process
+        self.starts += 1
+        # 持续读取输出，避免管道写满阻塞服务
+        threading.Thread(
+            target=self._drain_output,
+            args=(process,),
+            name="whisper-server-output",
+            daemon=True,
+        ).start()
+
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                break
+            if self.health():
+                logger.info(f"whisper-server 已就绪: {self.base_url}, PID={process.pid}")
+                return
+            time.sleep(HEALTH_POLL_INTERVAL)
+
+        returncode = process.poll()
+        self._process = None
+        if returncode is None:
+            process.kill()
+            process.wait()
+        logger.error("whisper-server 输出: " + "\n".join(self._output_tail))
+        raise RuntimeError(
+            f"whisper-server 启动失败 (返回码 {returncode})"
+            if returncode is not None
+            else f"whisper-server 启动超时 ({STARTUP_TIMEOUT}s)"
+        )
+
+    def _post_inference(
+        self, wav_data: bytes, language: str, prompt: Optional[str]
+    ) -> str:
+        data = {
+            "response_format": "srt",
+            "temperature": "0.0",
+            "language": language or "auto",
+        }
+        if prompt:
+            data["prompt"] = prompt
+
+        response = self._session.post(
+            f"{self.base_url}/inference",
+            files={"file": ("audio.wav", wav_data, "audio/wav")},
+            data=data,
+            timeout=INFERENCE_TIMEOUT,
+        )
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"whisper-server 转录失败: HTTP {response.status_code} {response.text[:200]}"
+            )
+        response.encoding = "utf-8"
+        return response.text
+
+    def _drain_output(self, process: subprocess.Popen):
+        try:
+            for raw in process.stdout:
+                line = raw.decode("utf-8", errors="replace").rstrip()
+                self._output_tail.append(line)
+                logger.debug(f"[whisper-server] {line}")
+        except (OSError, ValueError):
+            pass
+
+
+class WhisperCppServerManager:
+    """whisper-server 进程管理器（单例模式）
+
+    按 (可执行文件, 模型, 是否使用 GPU) 复用服务进程，Worker 退出时统一结束。
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self._servers: Dict[Tuple[str, str, bool], WhisperCppServer] = {}
+        self._servers_lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def get_server(
+        self, executable: str, model_path: str, use_gpu: bool = False
+    ) -> WhisperCppServer:
+        """获取服务（不会立即启动，首次转录时启动）"""
+        key = (executable, model_path, use_gpu)
+        with self._servers_lock:
+            server = self._servers.get(key)
+            if server is None:
+                server = WhisperCppServer(executable, model_path, use_gpu)
+                self._servers[key] = server
+            return server
+
+    def shutdown(self):
+        """结束所有服务进程"""
+        with self._servers_lock:
+            servers = list(self._servers.values())
+            self._servers.clear()
+        for server in servers:
+            server.stop()
+
+
+# 全局单例实例
+whisper_cpp_servers = WhisperCppServerManager()
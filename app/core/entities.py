@@ -571,13 +571,19 @@ class TranscribeConfig:
     transcribe_language: str = ""
     need_word_time_stamp: bool = True
     output_format: Optional[TranscribeOutputFormatEnum] = None
+    # 分块配置：切分点移到静音处
+    chunk_snap_to_silence: bool = False
     # Whisper Cpp 配置
     whisper_model: Optional[WhisperModelEnum] = None
+    # 使用常驻 whisper-server（找不到时回退为命令行）
+    whisper_cpp_server_mode: bool = False
     # Whisper API 配置
     whisper_api_key: Optional[str] = None
     whisper_api_base: Optional[str] = None
     whisper_api_model: Optional[str] = None
     whisper_api_prompt: Optional[str] = None
+    # 接口并发上限（自适应并发不会超过该值）
+    whisper_api_max_concurrency: int = 16
     # Faster Whisper 配置
     faster_whisper_program: Optional[str] = None
     faster_whisper_model: Optional[FasterWhisperModelEnum] = None
@@ -589,6 +595,8 @@ class TranscribeConfig:
     faster_whisper_ff_mdx_kim2: bool = False
     faster_whisper_one_word: bool = True
     faster_whisper_prompt: Optional[str] = None
+    # 批量推理的批大小（仅 Python 版，1 为逐段解码）
+    faster_whisper_batch_size: int = 1
 
     def _mask_key(self, key: Optional[str]) -> str:
         """Mask sensitive key for display"""
@@ -626,10 +634,21 @@ class TranscribeConfig:
                 lines.append(f"VAD Threshold: {self.faster_whisper_vad_threshold}")
             lines.append(f"One Word Per Segment: {self.faster_whisper_one_word}")
 
+        elif self.transcribe_model == TranscribeModelEnum.FASTER_WHISPER_PYTHON:
+            lines.append(
+                f"Model: {self.faster_whisper_model.value if self.faster_whisper_model else 'None'}"
+            )
+            lines.append(f"Device: {self.faster_whisper_device}")
+            lines.append(f"VAD Filter: {self.faster_whisper_vad_filter}")
+            if self.faster_whisper_vad_filter:
+                lines.append(f"VAD Threshold: {self.faster_whisper_vad_threshold}")
+            lines.append(f"Batch Size: {self.faster_whisper_batch_size}")
+
         elif self.transcribe_model == TranscribeModelEnum.WHISPER_CPP:
             lines.append(
                 f"Model: {self.whisper_model.value if self.whisper_model else 'None'}"
             )
+            lines.append(f"Server Mode: {self.whisper_cpp_server_mode}")
 
         lines.append("=" * 42)
         return "\n".join(lines)
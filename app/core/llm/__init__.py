@@ -2,11 +2,32 @@
 
 from .check_llm import check_llm_connection, get_available_models
 from .check_whisper import check_whisper_connection
-from .client import call_llm, get_llm_client
+from .client import (
+    acall_llm,
+    acall_llm_cached,
+    call_llm,
+    get_async_llm_client,
+    get_llm_client,
+    llm_pool,
+)
+from .rate_limiter import rate_limiters
+from .response_cache import llm_response_cache
+from .router import LLMProvider, llm_router
+from .usage import llm_usage, usage_scope
 
 __all__ = [
     "get_llm_client",
+    "get_async_llm_client",
     "call_llm",
+    "acall_llm",
+    "acall_llm_cached",
+    "llm_pool",
+    "rate_limiters",
+    "llm_response_cache",
+    "llm_router",
+    "LLMProvider",
+    "llm_usage",
+    "usage_scope",
     "check_llm_connection",
     "get_available_models",
     "check_whisper_connection",
@@ -1,12 +1,31 @@
-"""Unified LLM client for the application."""
-
+"""Unified LLM client for the application.
+
+All LLM requests run as coroutines on one background asyncio event loop
+(see AsyncLLMPool): endpoints share a single HTTP connection pool and a
+per-(base_url, model) semaphore bounds in-flight requests process-wide,
+and a per-base_url token bucket (see rate_limiter) paces requests to the
+provider's RPM/TPM limits before they are sent.
+Requests for the configured providers are routed by llm_router (see router),
+which hedges slow requests and fails over between providers.
+acall_llm_cached adds the response cache and per-task usage accounting;
+stages fan out their batches with asyncio.gather over it (see
+SubtitleOptimizer), and call_llm is its blocking facade for the remaining
+thread-based stages.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import contextvars
 import os
 import threading
-from typing import Any, List, Optional
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple, TypeVar
 from urllib.parse import urlparse, urlunparse
 
 import openai
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
 from tenacity import (
     RetryCallState,
     retry,
@@ -15,14 +34,27 @@ from tenacity import (
     wait_random_exponential,
 )
 
-from app.core.utils.cache import get_llm_cache, memoize
+from app.core.utils.cache import is_cache_enabled
+from app.core.utils.cancel import current_cancel_token
 from app.core.utils.logger import setup_logger
 
+from .rate_limiter import estimate_tokens, rate_limiters
+from .response_cache import llm_response_cache, request_key
+from .router import LLMProvider, llm_router
+from .usage import current_usage, llm_usage, parse_usage
+
 _global_client: Optional[OpenAI] = None
 _client_lock = threading.Lock()
 
 logger = setup_logger("llm_client")
 
+T = TypeVar("T")
+
+# 同一 (base_url, model) 同时进行的请求数上限默认值（进程内所有任务共享）
+DEFAULT_MAX_CONCURRENCY = 32
+# 同步等待结果时检查任务取消的间隔（秒）
+CANCEL_POLL_INTERVAL = 0.5
+
 
 def normalize_base_url(base_url: str) -> str:
     """Normalize API base URL by ensuring /v1 suffix when needed.
@@ -105,28 +137,203 @@ def get_llm_client() -> OpenAI:
     return _global_client
 
 
+def _endpoint_from_env() -> Tuple[str, str]:
+    """读取当前任务配置的 API 地址与密钥
+
+    Raises:
+        ValueError: If OPENAI_BASE_URL or OPENAI_API_KEY env vars not set
+    """
+    base_url = os.getenv("OPENAI_BASE_URL", "").strip()
+    api_key = os.getenv("OPENAI_API_KEY", "").strip()
+    if not base_url or not api_key:
+        raise ValueError(
+            "OPENAI_BASE_URL and OPENAI_API_KEY environment variables must be set"
+        )
+    return normalize_base_url(base_url), api_key
+
+
+class AsyncLLMPool:
+    """异步 LLM 请求池（单例模式）
+
+    在后台线程运行一个 asyncio 事件循环，LLM 请求以协程在其中执行，
+    等待响应的请求不占用线程：
+    - 各 API 端点的 AsyncOpenAI 客户端共用同一个 HTTP 连接池
+    - 每个 (base_url, model) 一个信号量，限制整个进程对该模型的并发请求数
+    - run() 供同步代码提交请求并等待结果，期间响应任务取消；
+      协程继承调用方线程的上下文（任务取消作用域、用量统计作用域）
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self.max_concurrency = DEFAULT_MAX_CONCURRENCY
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._clients: Dict[Tuple[str, str], AsyncOpenAI] = {}
+        self._semaphores: Dict[Tuple[str, str], asyncio.Semaphore] = {}
+        self._state_lock = threading.Lock()
+
+        atexit.register(self.shutdown)
+
+    def set_max_concurrency(self, limit: int):
+        """设置每个 (base_url, model) 的并发上限，对之后发起的请求生效"""
+        limit = max(1, limit)
+        with self._state_lock:
+            if limit != self.max_concurrency:
+                self.max_concurrency = limit
+                self._semaphores.clear()
+
+    def client(self, base_url: str, api_key: str) -> AsyncOpenAI:
+        """获取端点对应的异步客户端（不存在时创建，复用已有客户端的连接池）"""
+        key = (base_url, api_key)
+        with self._state_lock:
+            client = self._clients.get(key)
+            if client is None:
+                if self._clients:
+                    # with_options 生成的客户端与原客户端共用 HTTP 连接池
+                    shared = next(iter(self._clients.values()))
+                    client = shared.with_options(base_url=base_url, api_key=api_key)
+                else:
+                    client = AsyncOpenAI(
+                        base_url=base_url,
+                        api_key=api_key,
+                        timeout=300.0,  # 5分钟总超时
+                        max_retries=2,  # 最多重试2次
+                    )
+                self._clients[key] = client
+            return client
+
+    def semaphore(self, base_url: str, model: str) -> asyncio.Semaphore:
+        """获取 (base_url, model) 的并发信号量"""
+        key = (base_url, model)
+        with self._state_lock:
+            semaphore = self._semaphores.get(key)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._semaphores[key] = semaphore
+            return semaphore
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """在事件循环中执行协程并阻塞等待结果
+
+        Raises:
+            TaskCancelledError: 等待期间任务被取消（协程随之取消）
+        """
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("不能在 LLM 事件循环线程内同步等待请求")
+
+        future = asyncio.run_coroutine_threadsafe(
+            _in_context(coro, contextvars.copy_context()), loop
+        )
+        cancel_token = current_cancel_token()
+        while True:
+            try:
+                return future.result(timeout=CANCEL_POLL_INTERVAL)
+            except concurrent.futures.TimeoutError:
+                if cancel_token.cancelled:
+                    future.cancel()
+                    cancel_token.raise_if_cancelled()
+
+    def shutdown(self):
+        """关闭连接池并停止事件循环（之后的请求会重新启动）"""
+        with self._state_lock:
+            loop, thread = self._loop, self._thread
+            clients = list(self._clients.values())
+            self._loop, self._thread = None, None
+            self._clients.clear()
+            self._semaphores.clear()
+
+        if loop is None:
+            return
+        if clients:
+            # 所有客户端共用一个连接池，关闭任意一个即可
+            try:
+                asyncio.run_coroutine_threadsafe(clients[0].close(), loop).result(
+                    timeout=5
+                )
+            except Exception as e:
+                logger.warning(f"关闭 LLM 连接池失败: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+        loop.close()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._state_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="llm-event-loop", daemon=True
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+
+async def _in_context(coro: Coroutine[Any, Any, T], context: contextvars.Context) -> T:
+    """在事件循环的任务中恢复调用方的上下文变量后执行协程
+
+    任务在创建时复制事件循环线程的上下文，这里把调用方的值写入任务自己的上下文，
+    协程内 gather 创建的子任务随之继承。
+    """
+    for var, value in context.items():
+        var.set(value)
+    return await coro
+
+
+# 全局单例实例
+llm_pool = AsyncLLMPool()
+
+
+def get_async_llm_client() -> AsyncOpenAI:
+    """获取环境变量配置的接口对应的异步客户端（不经过多服务商路由的请求使用）
+
+    Raises:
+        ValueError: If OPENAI_BASE_URL or OPENAI_API_KEY env vars not set
+    """
+    return llm_pool.client(*_endpoint_from_env())
+
+
 def before_sleep_log(retry_state: RetryCallState) -> None:
     logger.warning(
         "Rate Limit Error, sleeping and retrying... Please lower your thread concurrency or use better OpenAI API."
     )
 
 
-@memoize(get_llm_cache(), expire=3600, typed=True)
+# 限流器会按 retry-after 暂停该接口的请求，这里的退避只作兜底
 @retry(
     stop=stop_after_attempt(10),
-    wait=wait_random_exponential(multiplier=1, min=5, max=60),
+    wait=wait_random_exponential(multiplier=1, min=1, max=60),
     retry=retry_if_exception_type(openai.RateLimitError),
     before_sleep=before_sleep_log,
 )
-def call_llm(
+async def acall_llm(
     messages: List[dict],
     model: str,
     temperature: float = 1,
     **kwargs: Any,
 ) -> Any:
-    """Call LLM API with automatic caching.
+    """Call LLM API asynchronously (without caching).
 
-    Uses global LLM client configured via environment variables.
+    Runs on the AsyncLLMPool event loop. Requests for the primary model of
+    the configured providers go through llm_router (latency/health routing,
+    hedging and failover); otherwise the endpoint from environment variables
+    is used.
 
     Args:
         messages: Chat messages list
@@ -140,32 +347,184 @@ def call_llm(
     Raises:
         ValueError: If response is invalid (empty choices or content)
     """
-    client = get_llm_client()
+    if llm_router.routes(model):
+
+        async def send(provider: LLMProvider, on_sent: Callable[[], None]) -> Any:
+            client = llm_pool.client(provider.base_url, provider.api_key)
+            return await _send(
+                client, messages, provider.model, temperature, on_sent, **kwargs
+            )
+
+        return await llm_router.request(send)
+
+    return await _send(get_async_llm_client(), messages, model, temperature, **kwargs)
+
+
+async def _send(
+    client: AsyncOpenAI,
+    messages: List[dict],
+    model: str,
+    temperature: float,
+    on_sent: Optional[Callable[[], None]] = None,
+    **kwargs: Any,
+) -> Any:
+    """向单个接口发送一次请求
+
+    先等待 (base_url, model) 信号量，再等待接口限流器的 RPM/TPM 额度，
+    真正发出请求时调用 on_sent。
+    """
+    base_url = normalize_base_url(str(client.base_url))
+    limiter = rate_limiters.get(base_url)
+    estimated_tokens = estimate_tokens(messages, kwargs.get("max_tokens"))
+
+    async with llm_pool.semaphore(base_url, model):
+        await limiter.acquire(estimated_tokens)
+        if on_sent is not None:
+            on_sent()
+        logger.debug(f"调用 LLM API: model={model}, temperature={temperature}")
+
+        try:
+            raw_response = await client.chat.completions.with_raw_response.create(
+                model=model,
+                messages=messages,  # pyright: ignore[reportArgumentType]
+                temperature=temperature,
+                **kwargs,
+            )
+            limiter.update_from_headers(raw_response.headers)
+            response = raw_response.parse()
+            usage = parse_usage(response)
+            if usage is not None:
+                limiter.record_usage(
+                    estimated_tokens, usage.prompt_tokens + usage.completion_tokens
+                )
+                llm_usage.add(usage)
+                logger.debug(
+                    f"LLM 用量: model={model}, 提示词 {usage.prompt_tokens} tokens"
+                    f"（缓存命中 {usage.cached_tokens}，未命中 "
+                    f"{usage.prompt_tokens - usage.cached_tokens}），"
+                    f"输出 {usage.completion_tokens} tokens"
+                )
 
-    logger.debug(f"调用 LLM API: model={model}, temperature={temperature}")
+            # Validate response (exceptions are not cached by diskcache)
+            if not (
+                response
+                and hasattr(response, "choices")
+                and response.choices
+                and len(response.choices) > 0
+                and hasattr(response.choices[0], "message")
+                and response.choices[0].message.content
+            ):
+                raise ValueError("Invalid OpenAI API response: empty choices or content")
 
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,  # pyright: ignore[reportArgumentType]
-            temperature=temperature,
-            **kwargs,
+            logger.debug("LLM API 调用成功")
+            return response
+
+        except Exception as e:
+            if isinstance(e, openai.RateLimitError):
+                limiter.on_rate_limited(e.response.headers)
+            logger.error(f"LLM API 调用失败: {type(e).__name__}: {e}")
+            raise
+
+
+async def acall_llm_cached(
+    messages: List[dict],
+    model: str,
+    temperature: float = 1,
+    **kwargs: Any,
+) -> Any:
+    """Call LLM API asynchronously with automatic caching.
+
+    Responses are cached by canonical request hash (see response_cache);
+    a cache hit returns a ChatCompletion rebuilt from the cached content.
+    Token usage of requests actually sent is added to the usage_scope of
+    the context the coroutine runs in (llm_pool.run carries the caller's
+    context over, see usage).
+
+    Args:
+        messages: Chat messages list
+        model: Model name
+        temperature: Sampling temperature
+        **kwargs: Additional parameters for API call
+
+    Returns:
+        API response object
+
+    Raises:
+        ValueError: If response is invalid (empty choices or content)
+    """
+    if not is_cache_enabled():
+        return _record_task_usage(
+            await acall_llm(messages, model, temperature, **kwargs)
         )
 
-        # Validate response (exceptions are not cached by diskcache)
-        if not (
-            response
-            and hasattr(response, "choices")
-            and response.choices
-            and len(response.choices) > 0
-            and hasattr(response.choices[0], "message")
-            and response.choices[0].message.content
-        ):
-            raise ValueError("Invalid OpenAI API response: empty choices or content")
-
-        logger.debug("LLM API 调用成功")
-        return response
-
-    except Exception as e:
-        logger.error(f"LLM API 调用失败: {type(e).__name__}: {e}")
-        raise
+    # 路由接管的请求无论由哪个服务商返回，都按主服务缓存
+    primary = llm_router.primary if llm_router.routes(model) else None
+    if primary is not None:
+        base_url = primary.base_url
+    else:
+        base_url = normalize_base_url(str(get_async_llm_client().base_url))
+    key = request_key(base_url, model, messages, temperature, **kwargs)
+    content = llm_response_cache.get(key)
+    if content is not None:
+        logger.debug(f"LLM 缓存命中: model={model}")
+        return _cached_completion(model, content)
+
+    response = _record_task_usage(
+        await acall_llm(messages, model, temperature, **kwargs)
+    )
+    llm_response_cache.set(key, response.choices[0].message.content)
+    return response
+
+
+def call_llm(
+    messages: List[dict],
+    model: str,
+    temperature: float = 1,
+    **kwargs: Any,
+) -> Any:
+    """Call LLM API with automatic caching.
+
+    Blocking facade over acall_llm_cached: the request itself runs as a
+    coroutine on the shared event loop, the calling thread only waits for
+    the result.
+
+    Args:
+        messages: Chat messages list
+        model: Model name
+        temperature: Sampling temperature
+        **kwargs: Additional parameters for API call
+
+    Returns:
+        API response object
+
+    Raises:
+        ValueError: If response is invalid (empty choices or content)
+        TaskCancelledError: If the current task is cancelled while waiting
+    """
+    return llm_pool.run(acall_llm_cached(messages, model, temperature, **kwargs))
+
+
+def _record_task_usage(response: Any) -> Any:
+    """计入当前上下文中任务的用量（usage_scope）"""
+    stats = current_usage()
+    usage = parse_usage(response)
+    if stats is not None and usage is not None:
+        stats.add(usage)
+    return response
+
+
+def _cached_completion(model: str, content: str) -> ChatCompletion:
+    """用缓存的文本构造响应对象（与接口返回的结构一致）"""
+    return ChatCompletion(
+        id="cached",
+        object="chat.completion",
+        created=0,
+        model=model,
+        choices=[
+            Choice(
+                index=0,
+                finish_reason="stop",
+                message=ChatCompletionMessage(role="assistant", content=content),
+            )
+        ],
+    )
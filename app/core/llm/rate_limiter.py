@@ -0,0 +1,279 @@
+"""LLM 接口的主动限流（RPM / TPM 令牌桶）
+
+按 API 地址维护两个令牌桶：每分钟请求数（RPM）与每分钟 token 数（TPM），
+进程内所有任务、所有处理阶段共享。请求发出前先估算 token 数并等待两个桶都有余量，
+而不是发出后收到 429 再退避：
+
+- 上限来自配置；未配置时从响应头 x-ratelimit-limit-*（按每分钟额度）学习
+- 响应头 x-ratelimit-remaining-* 比本地估计更少时，以服务端为准
+- 收到 429 时按 retry-after 暂停该接口的所有请求
+- 响应返回实际用量后修正 token 桶（估算只用于发出前的等待）
+
+令牌桶的状态只在锁内计算，等待在锁外用 asyncio.sleep 完成，不依赖特定事件循环。
+"""
+
+import asyncio
+import math
+import re
+import threading
+import time
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger("llm_rate_limiter")
+
+# 每条消息的格式开销（token）
+MESSAGE_TOKEN_OVERHEAD = 4
+# 429 未带 retry-after 时的暂停时间（秒）
+DEFAULT_RETRY_AFTER = 5.0
+
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def estimate_tokens(messages: List[dict], max_tokens: Optional[int] = None) -> int:
+    """估算一次请求消耗的 token 数（提示词 + 预留的输出）
+
+    ASCII 字符约 4 个一个 token，其余字符（CJK 等）按每字一个 token 计，偏保守。
+    """
+    prompt_tokens = 3
+    for message in messages:
+        content = message.get("content") or ""
+        if not isinstance(content, str):
+            content = str(content)
+        ascii_chars = sum(1 for ch in content if ord(ch) < 128)
+        prompt_tokens += (
+            MESSAGE_TOKEN_OVERHEAD
+            + math.ceil(ascii_chars / 4)
+            + (len(content) - ascii_chars)
+        )
+    return prompt_tokens + (max_tokens or 0)
+
+
+def parse_reset_duration(value: str) -> Optional[float]:
+    """解析 x-ratelimit-reset-* 的时长（如 "1s"、"6m0s"、"20ms"），单位秒"""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PATTERN.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+class TokenBucket:
+    """每分钟额度的令牌桶，capacity 为 0 表示不限制（非线程安全，由 RateLimiter 加锁）"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = 0.0
+        self.level = 0.0
+        self._updated = time.monotonic()
+        self.set_capacity(per_minute)
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def set_capacity(self, per_minute: int):
+        self._refill()
+        was_enabled = self.enabled
+        self.capacity = float(max(0, per_minute))
+        self.level = self.capacity if not was_enabled else min(self.level, self.capacity)
+
+    def wait_time(self, amount: float) -> float:
+        """取出 amount 需要等待的时间（秒）"""
+        if not self.enabled:
+            return 0.0
+        self._refill()
+        # 超过桶容量的请求等桶满即可，否则永远等不到
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing * 60.0 / self.capacity)
+
+    def take(self, amount: float):
+        if self.enabled:
+            self._refill()
+            self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        """归还（amount 为负时追扣）额度"""
+        if self.enabled:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+
+    def limit_to(self, remaining: float):
+        """服务端报告的剩余额度比本地少时以服务端为准"""
+        if self.enabled:
+            self._refill()
+            self.level = min(self.level, remaining)
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.enabled:
+            self.level = min(
+                self.capacity, self.level + (now - self._updated) * self.capacity / 60.0
+            )
+        self._updated = now
+
+
+class RateLimiter:
+    """单个 API 地址的 RPM / TPM 限流器"""
+
+    def __init__(self, endpoint: str, rpm: int = 0, tpm: int = 0):
+        self.endpoint = endpoint
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        # 配置了的上限不被响应头覆盖
+        self._configured_rpm = rpm
+        self._configured_tpm = tpm
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, rpm: int, tpm: int):
+        """更新配置的上限（0 表示不限制，由响应头学习）"""
+        with self._lock:
+            if rpm != self._configured_rpm:
+                self._configured_rpm = rpm
+                self.requests.set_capacity(rpm)
+            if tpm != self._configured_tpm:
+                self._configured_tpm = tpm
+                self.tokens.set_capacity(tpm)
+
+    async def acquire(self, tokens: int):
+        """等待直到可以发出一个消耗 tokens 的请求，并扣除额度"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                wait = max(
+                    self.requests.wait_time(1),
+                    self.tokens.wait_time(tokens),
+                    self._paused_until - time.monotonic(),
+                )
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    break
+            waited += wait
+            await asyncio.sleep(wait)
+
+        if waited >= 1:
+            logger.info(f"[{self.endpoint}] 主动限流，等待 {waited:.1f}s 后发出请求")
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """用响应中的实际用量修正 token 桶"""
+        if not isinstance(actual_tokens, int):
+            return
+        with self._lock:
+            self.tokens.give_back(estimated_tokens - actual_tokens)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """根据 x-ratelimit-* 响应头学习上限、同步剩余额度"""
+        with self._lock:
+            for bucket, kind, configured in (
+                (self.requests, "requests", self._configured_rpm),
+                (self.tokens, "tokens", self._configured_tpm),
+            ):
+                limit = _header_number(headers, f"x-ratelimit-limit-{kind}")
+                remaining = _header_number(headers, f"x-ratelimit-remaining-{kind}")
+                reset = headers.get(f"x-ratelimit-reset-{kind}")
+
+                if limit and not configured and bucket.capacity != limit:
+                    logger.info(f"[{self.endpoint}] 从响应头获取 {kind} 上限: {int(limit)}/min")
+                    bucket.set_capacity(int(limit))
+                if remaining is not None:
+                    bucket.limit_to(remaining)
+                    # 额度已用完：等服务端重置后再发
+                    reset_seconds = parse_reset_duration(reset) if reset else None
+                    if remaining <= 0 and reset_seconds:
+                        self._pause(reset_seconds)
+
+    def on_rate_limited(self, headers: Optional[Mapping[str, str]] = None):
+        """收到 429：按 retry-after 暂停该接口的所有请求"""
+        retry_after = None
+        if headers:
+            retry_after = _header_number(headers, "retry-after")
+            if retry_after is None:
+                retry_after_ms = _header_number(headers, "retry-after-ms")
+                if retry_after_ms is not None:
+                    retry_after = retry_after_ms / 1000
+        with self._lock:
+            self._pause(retry_after if retry_after is not None else DEFAULT_RETRY_AFTER)
+        if headers:
+            self.update_from_headers(headers)
+
+    def _pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class RateLimiterRegistry:
+    """按 API 地址共享的限流器（单例模式）"""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._limiters_lock = threading.Lock()
+
+    def get(self, endpoint: str) -> RateLimiter:
+        """获取接口的限流器（不存在时创建，上限为 0 时从响应头学习）"""
+        with self._limiters_lock:
+            limiter = self._limiters.get(endpoint)
+            if limiter is None:
+                limiter = RateLimiter(endpoint)
+                self._limiters[endpoint] = limiter
+            return limiter
+
+    def configure(self, endpoint: str, rpm: int, tpm: int):
+        """设置接口的 RPM / TPM 上限（0 表示不限制）"""
+        self.get(endpoint).configure(rpm, tpm)
+
+    def configure_endpoints(self, limits: Dict[str, Tuple[int, int]]):
+        """
+        按 API 地址批量设置上限，未列出的接口清除配置的上限（改由响应头学习）
+
+        Args:
+            limits: API 地址 -> (rpm, tpm)，0 表示不限制
+        """
+        with self._limiters_lock:
+            stale = [
+                limiter
+                for endpoint, limiter in self._limiters.items()
+                if endpoint not in limits
+            ]
+        for limiter in stale:
+            limiter.configure(0, 0)
+        for endpoint, (rpm, tpm) in limits.items():
+            self.configure(endpoint, rpm, tpm)
+
+    def clear(self):
+        with self._limiters_lock:
+            self._limiters.clear()
+
+
+# 全局单例实例
+rate_limiters = RateLimiterRegistry()
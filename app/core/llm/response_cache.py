@@ -0,0 +1,116 @@
+"""LLM 响应缓存
+
+以规范化请求（API 地址、模型、消息、温度及影响生成结果的参数）的 SHA-256 为 key，
+只保存响应文本：
+
+- key 与参数书写顺序、温度写成 1 还是 1.0 无关，超时等传输层参数不参与
+- 缓存目录按磁盘预算做 LRU 淘汰，有效期按天计，重跑同一批提示词几乎不花钱
+- 记录本进程的命中/未命中次数，随容量信息上报
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from diskcache import Cache
+
+from ..utils.cache import get_llm_cache
+from ..utils.logger import setup_logger
+
+logger = setup_logger("llm_response_cache")
+
+# 缓存有效期（秒）
+CACHE_EXPIRE = 86400 * 30
+
+# 不影响生成结果的传输层参数，不参与缓存 key
+_TRANSPORT_KWARGS = frozenset(
+    {"timeout", "extra_headers", "extra_query", "user", "stream_options"}
+)
+
+
+def request_key(
+    base_url: str,
+    model: str,
+    messages: List[dict],
+    temperature: float,
+    **kwargs: Any,
+) -> str:
+    """计算请求的规范化哈希
+
+    Args:
+        base_url: 规范化后的 API 地址
+        model: 模型名称
+        messages: 对话消息
+        temperature: 采样温度
+        **kwargs: 其他请求参数（传输层参数会被忽略）
+    """
+    payload = {
+        "base_url": base_url,
+        "model": model,
+        "messages": messages,
+        "temperature": float(temperature),
+        "params": {k: v for k, v in kwargs.items() if k not in _TRANSPORT_KWARGS},
+    }
+    canonical = json.dumps(
+        payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """按请求哈希缓存 LLM 响应文本
+
+    Args:
+        cache: 缓存存储（应使用 LRU 淘汰策略）
+    """
+
+    def __init__(self, cache: Cache):
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        content = self.cache.get(key)
+        with self._lock:
+            if content is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return content
+
+    def set(self, key: str, content: str):
+        self.cache.set(key, content, expire=CACHE_EXPIRE)
+
+    def set_size_limit(self, size_limit: int):
+        """设置磁盘预算（字节），超出的部分按最近最少使用淘汰"""
+        if size_limit == self.cache.size_limit:
+            return
+        self.cache.reset("size_limit", size_limit)
+        removed = self.cache.cull()
+        if removed:
+            logger.info(f"LLM 缓存磁盘预算调整为 {size_limit / 1024**2:.0f}MB，淘汰 {removed} 条")
+
+    def metrics(self) -> Dict[str, Any]:
+        """命中/未命中次数（本进程）与缓存占用"""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+            "entries": len(self.cache),
+            "volume_bytes": self.cache.volume(),
+            "size_limit_bytes": self.cache.size_limit,
+        }
+
+    def reset_metrics(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+# 全局实例
+llm_response_cache = LLMResponseCache(get_llm_cache())
@@ -0,0 +1,305 @@
+"""多服务商 LLM 路由
+
+持有配置的多个 OpenAI 兼容接口（主服务 + 备用服务），每个请求：
+
+- 按健康状况与近期延迟（中位数）排序选择服务商，连续失败的服务商冷却一段时间后再试
+- 请求发出后超过该服务商近期延迟的 p95 仍未返回时，向下一个服务商发送对冲请求，
+  先返回的结果生效，另一个随即取消（延迟样本不足时不对冲）
+- 出错时依次切换到下一个服务商，全部失败时抛出最后一个错误
+
+一批字幕中最慢的请求决定任务的完成时间，对冲只针对尾部约 5% 的请求，额外开销有限。
+路由只负责选择与调度，实际发送由调用方传入的 send 协程完成。
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import openai
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger("llm_router")
+
+T = TypeVar("T")
+
+# 每个服务商保留的延迟样本数
+LATENCY_WINDOW = 100
+# 计算对冲延迟所需的最少样本数
+MIN_HEDGE_SAMPLES = 10
+# 对冲延迟下限（秒），避免对快速请求也发送重复请求
+MIN_HEDGE_DELAY = 1.0
+# 连续失败次数达到该值后进入冷却
+FAILURE_THRESHOLD = 3
+# 冷却时间（秒）
+COOLDOWN_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class LLMProvider:
+    """一个 OpenAI 兼容的 LLM 服务
+
+    Attributes:
+        name: 服务名称（如 "OpenAI"、"DeepSeek"）
+        base_url: 规范化后的 API 地址
+        api_key: API 密钥
+        model: 在该服务上使用的模型
+        rpm: 配置的每分钟请求数上限（0 表示不限制，从响应头学习）
+        tpm: 配置的每分钟 token 数上限（0 表示不限制，从响应头学习）
+    """
+
+    name: str
+    base_url: str
+    api_key: str
+    model: str
+    rpm: int = 0
+    tpm: int = 0
+
+
+class ProviderHealth:
+    """服务商的延迟样本与失败记录（非线程安全，由 LLMRouter 加锁）"""
+
+    def __init__(self):
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= FAILURE_THRESHOLD:
+            self.cooldown_until = time.monotonic() + COOLDOWN_SECONDS
+
+    def available(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    def percentile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        """延迟的 q 分位数（秒），样本不足时为 None"""
+        if len(self.latencies) < max(1, min_samples):
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+class LLMRouter:
+    """多服务商路由（单例模式）"""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self.hedge = True
+        self._providers: List[LLMProvider] = []
+        self._health: Dict[Tuple[str, str], ProviderHealth] = {}
+        self._state_lock = threading.Lock()
+
+    def configure(self, providers: List[LLMProvider], hedge: bool = True):
+        """设置服务商列表（第一个为主服务），已有服务商的延迟与失败记录保留"""
+        with self._state_lock:
+            self._providers = list(providers)
+            self.hedge = hedge
+            for provider in self._providers:
+                self._health.setdefault(_health_key(provider), ProviderHealth())
+
+    def clear(self):
+        with self._state_lock:
+            self._providers = []
+            self._health.clear()
+
+    @property
+    def primary(self) -> Optional[LLMProvider]:
+        with self._state_lock:
+            return self._providers[0] if self._providers else None
+
+    def routes(self, model: str) -> bool:
+        """请求是否由路由处理（模型名因服务商而异，只接管主服务模型的请求）"""
+        primary = self.primary
+        return primary is not None and primary.model == model
+
+    def ordered(self) -> List[LLMProvider]:
+        """按可用性、延迟中位数、配置顺序排列的服务商（无延迟样本的排在有样本的之后）"""
+        with self._state_lock:
+
+            def sort_key(item: Tuple[int, LLMProvider]):
+                index, provider = item
+                health = self._health[_health_key(provider)]
+                median = health.percentile(0.5)
+                return (
+                    not health.available(),
+                    median if median is not None else math.inf,
+                    index,
+                )
+
+            return [p for _, p in sorted(enumerate(self._providers), key=sort_key)]
+
+    def hedge_delay(self, provider: LLMProvider) -> Optional[float]:
+        """请求发出后多久未返回时对冲（秒），样本不足时为 None"""
+        with self._state_lock:
+            health = self._health.get(_health_key(provider))
+            p95 = health.percentile(0.95, MIN_HEDGE_SAMPLES) if health else None
+        return None if p95 is None else max(MIN_HEDGE_DELAY, p95)
+
+    async def request(
+        self, send: Callable[[LLMProvider, Callable[[], None]], Awaitable[T]]
+    ) -> T:
+        """按路由策略发送请求
+
+        Args:
+            send: 向指定服务商发送请求的协程函数；第二个参数在请求真正发出时
+                （通过并发与限流等待后）调用，对冲计时从此刻开始
+
+        Raises:
+            所有服务商都失败时抛出最后一个错误
+        """
+        candidates = self.ordered()
+        attempts: Dict[asyncio.Future, LLMProvider] = {}
+        hedge_timer: Optional[asyncio.Future] = None
+        next_index = 0
+        last_error: Optional[BaseException] = None
+
+        def launch() -> asyncio.Event:
+            nonlocal next_index
+            provider = candidates[next_index]
+            next_index += 1
+            sent = asyncio.Event()
+            attempts[asyncio.ensure_future(self._attempt(provider, send, sent))] = provider
+            return sent
+
+        sent = launch()
+        delay = self.hedge_delay(candidates[0]) if self.hedge else None
+        if delay is not None and len(candidates) > 1:
+            hedge_timer = asyncio.ensure_future(_after_event(sent, delay))
+
+        try:
+            while attempts:
+                waiting = set(attempts)
+                if hedge_timer is not None:
+                    waiting.add(hedge_timer)
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    if task is hedge_timer:
+                        continue
+                    provider = attempts.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        last_error = e
+                        logger.warning(f"[{provider.name}] 请求失败: {type(e).__name__}: {e}")
+
+                if hedge_timer is not None and hedge_timer in done:
+                    hedge_timer = None
+                    if attempts and next_index < len(candidates):
+                        logger.info(
+                            f"[{attempts[next(iter(attempts))].name}] 超过 p95 延迟 "
+                            f"{delay:.1f}s 未返回，对冲请求 {candidates[next_index].name}"
+                        )
+                        launch()
+
+                # 没有进行中的请求时切换到下一个服务商（不再对冲）
+                if not attempts and next_index < len(candidates):
+                    if hedge_timer is not None:
+                        hedge_timer.cancel()
+                        hedge_timer = None
+                    logger.info(f"切换到备用服务商: {candidates[next_index].name}")
+                    launch()
+
+            assert last_error is not None
+            raise last_error
+        finally:
+            if hedge_timer is not None:
+                hedge_timer.cancel()
+            for task in attempts:
+                task.cancel()
+                # 被取消前已失败的请求不再报告 "exception was never retrieved"
+                task.add_done_callback(_consume_result)
+
+    async def _attempt(
+        self,
+        provider: LLMProvider,
+        send: Callable[[LLMProvider, Callable[[], None]], Awaitable[T]],
+        sent: asyncio.Event,
+    ) -> T:
+        """向单个服务商发送请求，并记录延迟（从发出时算起）或失败"""
+        sent_at: List[float] = []
+
+        def on_sent():
+            sent_at.append(time.monotonic())
+            sent.set()
+
+        try:
+            result = await send(provider, on_sent)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 请求本身有误（如超出上下文长度）不计入服务商的失败
+            if not isinstance(e, openai.BadRequestError):
+                with self._state_lock:
+                    health = self._health.get(_health_key(provider))
+                    if health is not None:
+                        health.record_failure()
+            raise
+
+        if sent_at:
+            with self._state_lock:
+                health = self._health.get(_health_key(provider))
+                if health is not None:
+                    health.record_success(time.monotonic() - sent_at[0])
+        return result
+
+    def status(self) -> List[Dict[str, Any]]:
+        """各服务商的健康状况与延迟（秒）"""
+        with self._state_lock:
+            result = []
+            for provider in self._providers:
+                health = self._health[_health_key(provider)]
+                p50, p95 = health.percentile(0.5), health.percentile(0.95)
+                result.append(
+                    {
+                        "name": provider.name,
+                        "model": provider.model,
+                        "available": health.available(),
+                        "consecutive_failures": health.consecutive_failures,
+                        "latency_p50": round(p50, 3) if p50 is not None else None,
+                        "latency_p95": round(p95, 3) if p95 is not None else None,
+                    }
+                )
+            return result
+
+
+def _health_key(provider: LLMProvider) -> Tuple[str, str]:
+    return provider.base_url, provider.model
+
+
+async def _after_event(event: asyncio.Event, delay: float):
+    await event.wait()
+    await asyncio.sleep(delay)
+
+
+def _consume_result(task: asyncio.Future):
+    if not task.cancelled():
+        task.exception()
+
+
+# 全局单例实例
+llm_router = LLMRouter()
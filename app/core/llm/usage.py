@@ -0,0 +1,107 @@
+"""LLM token 用量统计（区分命中服务商前缀缓存的提示词 token）
+
+每次请求的用量来自响应的 usage：
+- prompt_tokens_details.cached_tokens（OpenAI 及兼容接口）
+- prompt_cache_hit_tokens（DeepSeek）
+
+进程级累计随容量信息上报；任务级累计通过 usage_scope() 收集，
+作用域以 contextvars 传递，与取消作用域一样需要 submit_with_context() 才能跨线程继承
+（llm_pool.run() 会把调用方的上下文带到事件循环中的协程）。
+"""
+
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+
+class CallUsage(NamedTuple):
+    """单次请求的 token 用量"""
+
+    prompt_tokens: int
+    cached_tokens: int
+    completion_tokens: int
+
+
+def parse_usage(response: Any) -> Optional[CallUsage]:
+    """从响应中读取用量，接口未返回 usage 时为 None"""
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    if not isinstance(prompt_tokens, int):
+        return None
+
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None)
+    if not isinstance(cached_tokens, int):
+        # DeepSeek 的字段在 usage 顶层（pydantic 保留的额外字段）
+        cached_tokens = getattr(usage, "prompt_cache_hit_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    return CallUsage(
+        prompt_tokens=prompt_tokens,
+        cached_tokens=cached_tokens if isinstance(cached_tokens, int) else 0,
+        completion_tokens=completion_tokens if isinstance(completion_tokens, int) else 0,
+    )
+
+
+class UsageStats:
+    """token 用量累计（线程安全）"""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def add(self, usage: CallUsage):
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += usage.prompt_tokens
+            self.cached_tokens += usage.cached_tokens
+            self.completion_tokens += usage.completion_tokens
+
+    def snapshot(self) -> Dict[str, Any]:
+        """调用次数、提示词 token（缓存命中 / 未命中）与输出 token"""
+        with self._lock:
+            prompt, cached = self.prompt_tokens, self.cached_tokens
+            result = {
+                "calls": self.calls,
+                "prompt_tokens": prompt,
+                "cached_tokens": cached,
+                "uncached_tokens": prompt - cached,
+                "completion_tokens": self.completion_tokens,
+            }
+        result["cache_hit_rate"] = round(cached / prompt, 3) if prompt else 0.0
+        return result
+
+    def summary(self) -> str:
+        stats = self.snapshot()
+        return (
+            f"{stats['calls']} 次请求，提示词 {stats['prompt_tokens']} tokens"
+            f"（缓存命中 {stats['cached_tokens']}，{stats['cache_hit_rate']:.0%}），"
+            f"输出 {stats['completion_tokens']} tokens"
+        )
+
+
+# 进程级累计
+llm_usage = UsageStats()
+
+_current_usage: contextvars.ContextVar[Optional[UsageStats]] = contextvars.ContextVar(
+    "llm_usage_scope", default=None
+)
+
+
+def current_usage() -> Optional[UsageStats]:
+    """当前任务的用量累计，不在 usage_scope() 内时为 None"""
+    return _current_usage.get()
+
+
+@contextmanager
+def usage_scope() -> Iterator[UsageStats]:
+    """在作用域内统计（同一上下文中发出的）LLM 请求用量"""
+    stats = UsageStats()
+    reset = _current_usage.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_usage.reset(reset)
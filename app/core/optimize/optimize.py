@@ -3,19 +3,20 @@
 使用LLM优化字幕内容，支持agent loop自动验证和修正。
 """
 
-import atexit
+import asyncio
 import difflib
 import re
-from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Dict, List, Optional, Tuple, Union
 
 import json_repair
 
 from ..asr.asr_data import ASRData, ASRDataSeg
 from ..entities import SubtitleProcessData
-from ..llm import call_llm
+from ..llm import acall_llm_cached, llm_pool
 from ..prompts import get_prompt
 from ..split.alignment import SubtitleAligner
+from ..utils.cache import generate_cache_key
+from ..utils.checkpoint import NULL_CHECKPOINT, Checkpoint
 from ..utils.logger import setup_logger
 from ..utils.text_utils import count_words
 
@@ -29,7 +30,7 @@ class SubtitleOptimizer:
 
     使用LLM优化字幕内容，支持：
     - Agent loop自动验证和修正
-    - 并发批量处理
+    - 并发批量处理（各批次以协程在 LLM 事件循环中并发，等待响应不占用线程）
     - 自动对齐修复
     """
 
@@ -40,31 +41,27 @@ class SubtitleOptimizer:
         model: str,
         custom_prompt: str,
         update_callback: Optional[Callable] = None,
+        checkpoint: Optional[Checkpoint] = None,
     ):
         """初始化优化器
 
         Args:
-            thread_num: 并发线程数
+            thread_num: 同时优化的批次数
             batch_num: 每批处理的字幕数量
             model: LLM模型名称
             custom_prompt: 自定义优化提示词
             temperature: LLM温度参数
             update_callback: 进度更新回调函数
+            checkpoint: 检查点存储，已完成的批次在重新执行时直接复用
         """
         self.thread_num = thread_num
         self.batch_num = batch_num
         self.model = model
         self.custom_prompt = custom_prompt
         self.update_callback = update_callback
+        self.checkpoint = checkpoint or NULL_CHECKPOINT
 
         self.is_running = True
-        self.executor: Optional[ThreadPoolExecutor] = None
-        self._init_thread_pool()
-
-    def _init_thread_pool(self) -> None:
-        """初始化线程池并注册清理函数"""
-        self.executor = ThreadPoolExecutor(max_workers=self.thread_num)
-        atexit.register(self.stop)
 
     def optimize_subtitle(self, subtitle_data: Union[str, ASRData]) -> ASRData:
         """优化字幕
@@ -118,7 +115,7 @@ class SubtitleOptimizer:
         ]
 
     def _parallel_optimize(self, chunks: List[Dict[str, str]]) -> Dict[str, str]:
-        """并行优化所有批次
+        """并行优化所有批次（阻塞等待，期间响应任务取消）
 
         Args:
             chunks: 字幕批次列表
@@ -126,46 +123,50 @@ class SubtitleOptimizer:
         Returns:
             优化后的字幕字典
         """
-        if not self.executor:
-            raise ValueError("线程池未初始化")
-
-        futures = []
-        optimized_dict: Dict[str, str] = {}
-
-        # 提交所有任务
-        for chunk in chunks:
-            future = self.executor.submit(self._optimize_chunk, chunk)
-            futures.append((future, chunk))
+        return llm_pool.run(self._optimize_chunks(chunks))
 
-        # 收集结果
-        for future, chunk in futures:
-            if not self.is_running:
-                break
+    async def _optimize_chunks(self, chunks: List[Dict[str, str]]) -> Dict[str, str]:
+        """以协程并发优化所有批次，同时进行的批次数不超过 thread_num"""
+        limit = asyncio.Semaphore(max(1, self.thread_num))
 
-            try:
-                result = future.result()
-                optimized_dict.update(result)
-            except Exception as e:
-                logger.error(f"优化批次失败：{str(e)}")
-                optimized_dict.update(chunk)  # 失败时保留原文
+        async def optimize(chunk: Dict[str, str]) -> Dict[str, str]:
+            async with limit:
+                if not self.is_running:
+                    return chunk
+                return await self._optimize_chunk(chunk)
 
+        optimized_dict: Dict[str, str] = {}
+        for result in await asyncio.gather(*(optimize(chunk) for chunk in chunks)):
+            optimized_dict.update(result)
         return optimized_dict
 
-    def _optimize_chunk(self, subtitle_chunk: Dict[str, str]) -> Dict[str, str]:
+    async def _optimize_chunk(self, subtitle_chunk: Dict[str, str]) -> Dict[str, str]:
         """优化单个字幕批次
 
         Args:
             subtitle_chunk: 字幕批次字典
 
         Returns:
-            优化后的字幕批次
+            优化后的字幕批次（失败时为原文）
         """
         start_idx = next(iter(subtitle_chunk))
         end_idx = next(reversed(subtitle_chunk))
         logger.info(f"[+]正在优化字幕：{start_idx} - {end_idx}")
 
         try:
-            result = self.agent_loop(subtitle_chunk)
+            checkpoint_key = generate_cache_key(
+                {
+                    "chunk": subtitle_chunk,
+                    "model": self.model,
+                    "custom_prompt": self.custom_prompt,
+                }
+            )
+            result = self.checkpoint.get(Checkpoint.STAGE_OPTIMIZE, checkpoint_key)
+            if result is None:
+                result = await self.agent_loop(subtitle_chunk)
+                self.checkpoint.put(Checkpoint.STAGE_OPTIMIZE, checkpoint_key, result)
+            else:
+                logger.info(f"[+]批次已有检查点：{start_idx} - {end_idx}")
 
             if self.update_callback:
                 callback_data = [
@@ -184,7 +185,7 @@ class SubtitleOptimizer:
             logger.error(f"优化失败：{str(e)}")
             return subtitle_chunk
 
-    def agent_loop(self, subtitle_chunk: Dict[str, str]) -> Dict[str, str]:
+    async def agent_loop(self, subtitle_chunk: Dict[str, str]) -> Dict[str, str]:
         """使用agent loop优化字幕
 
         LLM → 验证 → 反馈 → 重试 (最多MAX_STEPS次)
@@ -198,19 +199,19 @@ class SubtitleOptimizer:
         Raises:
             ValueError: LLM返回空结果
         """
-        # 构建提示词
+        # 构建提示词（参考信息在 system 提示词末尾，每批变化的字幕放最后）
         user_prompt = (
             f"Correct the following subtitles. Keep the original language, do not translate:\n"
             f"<input_subtitle>{str(subtitle_chunk)}</input_subtitle>"
         )
 
-        if self.custom_prompt:
-            user_prompt += (
-                f"\nReference content:\n<reference>{self.custom_prompt}</reference>"
-            )
-
         messages = [
-            {"role": "system", "content": get_prompt("optimize/subtitle")},
+            {
+                "role": "system",
+                "content": get_prompt(
+                    "optimize/subtitle", custom_prompt=self.custom_prompt
+                ),
+            },
             {"role": "user", "content": user_prompt},
         ]
 
@@ -219,7 +220,7 @@ class SubtitleOptimizer:
         # Agent loop
         for step in range(MAX_STEPS):
             # 调用LLM
-            response = call_llm(
+            response = await acall_llm_cached(
                 messages=messages,
                 model=self.model,
                 temperature=0.2,
@@ -409,11 +410,3 @@ class SubtitleOptimizer:
             return
 
         self.is_running = False
-
-        if self.executor:
-            try:
-                self.executor.shutdown(wait=False, cancel_futures=True)
-            except Exception:
-                pass
-            finally:
-                self.executor = None
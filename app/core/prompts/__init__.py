@@ -2,6 +2,10 @@
 
 所有提示词以 Markdown 文件形式存储，支持模板变量替换。
 
+提示词作为 system 消息放在最前面，同一任务内逐字节相同（只依赖任务级参数），
+用户自定义提示词统一追加在末尾的 <reference> 中；每批变化的内容放在其后的 user 消息里。
+这样服务商的前缀缓存（prompt caching）可以在同一任务的所有批次间命中。
+
 使用示例:
     from app.core.prompts import get_prompt
 
@@ -11,6 +15,9 @@
     # 带参数替换
     prompt = get_prompt("split/semantic", max_word_count_cjk=18)
     prompt = get_prompt("translate/reflect", target_language="简体中文")
+
+    # 带用户自定义提示词（追加在末尾）
+    prompt = get_prompt("optimize/subtitle", custom_prompt="术语: LLM")
 """
 
 import functools
@@ -20,6 +27,9 @@ from typing import Dict
 
 PROMPTS_DIR = Path(__file__).parent
 
+# 用户自定义提示词（术语、参考信息等）在 system 提示词末尾的固定格式
+CUSTOM_PROMPT_SECTION = "\n\n<reference>\n{}\n</reference>"
+
 
 @functools.lru_cache(maxsize=32)
 def _load_prompt_file(prompt_path: str) -> str:
@@ -45,11 +55,14 @@ def _load_prompt_file(prompt_path: str) -> str:
     return file_path.read_text(encoding="utf-8")
 
 
-def get_prompt(prompt_path: str, **kwargs) -> str:
+def get_prompt(prompt_path: str, custom_prompt: str = "", **kwargs) -> str:
     """获取提示词并进行变量替换
 
+    结果只取决于参数，同一任务的各批次得到逐字节相同的提示词。
+
     Args:
         prompt_path: 提示词路径，如 "split/semantic", "optimize/subtitle"
+        custom_prompt: 用户自定义提示词，非空时以 <reference> 追加在末尾
         **kwargs: 模板变量，用于替换提示词中的 $variable 或 ${variable}
 
     Returns:
@@ -61,15 +74,16 @@ def get_prompt(prompt_path: str, **kwargs) -> str:
         >>> get_prompt("translate/reflect", target_language="简体中文", custom_prompt="保持术语")
     """
     # 加载原始提示词
-    raw_prompt = _load_prompt_file(prompt_path)
-
-    # 如果没有参数，直接返回
-    if not kwargs:
-        return raw_prompt
+    prompt = _load_prompt_file(prompt_path)
 
     # 使用 Template 进行变量替换
-    template = Template(raw_prompt)
-    return template.safe_substitute(**kwargs)
+    if kwargs:
+        prompt = Template(prompt).safe_substitute(**kwargs)
+
+    custom_prompt = custom_prompt.strip()
+    if custom_prompt:
+        prompt = prompt.rstrip() + CUSTOM_PROMPT_SECTION.format(custom_prompt)
+    return prompt
 
 
 def list_prompts() -> list[str]:
@@ -0,0 +1,171 @@
+"""字幕片段流
+
+转录与字幕处理之间的线程安全缓冲区：转录线程持续写入定稿片段，
+字幕处理线程按"块"读取，每块约 SEGMENT_WORD_THRESHOLD 字，
+切分点选在目标位置附近的最大时间间隔处（与 SubtitleSplitter 的分段策略一致），
+从而在转录完成前就能开始断句、优化和翻译。
+"""
+
+import threading
+from typing import Iterator, List, Optional
+
+from app.core.asr.asr_data import ASRDataSeg
+from app.core.split.split import SEGMENT_WORD_THRESHOLD, SPLIT_SEARCH_RANGE
+from app.core.utils.logger import setup_logger
+from app.core.utils.text_utils import count_words
+
+logger = setup_logger("segment_stream")
+
+
+class SegmentStream:
+    """按块读取的字幕片段流
+
+    示例:
+        >>> stream = SegmentStream()
+        >>> stream.put(segments)  # 生产者线程
+        >>> stream.close()
+        >>> for block in stream:  # 消费者线程
+        ...     process(block)
+    """
+
+    def __init__(
+        self,
+        block_word_count: int = SEGMENT_WORD_THRESHOLD,
+        search_range: int = SPLIT_SEARCH_RANGE,
+    ):
+        """初始化片段流
+
+        Args:
+            block_word_count: 每块目标字数
+            search_range: 在目标切分点前后搜索最大时间间隔的片段数
+        """
+        self.block_word_count = block_word_count
+        self.search_range = search_range
+
+        self._segments: List[ASRDataSeg] = []
+        self._word_counts: List[int] = []
+        self._buffered_words = 0
+        self._closed = False
+        self._error: Optional[str] = None
+        self._condition = threading.Condition()
+
+    def put(self, segments: List[ASRDataSeg]):
+        """写入定稿片段（按时间顺序）
+
+        写入的是副本，下游处理修改片段时不会影响转录结果本身。
+        """
+        copies = [
+            ASRDataSeg(
+                text=seg.text,
+                start_time=seg.start_time,
+                end_time=seg.end_time,
+                translated_text=seg.translated_text,
+            )
+            for seg in segments
+        ]
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("片段流已关闭")
+            for seg in copies:
+                words = count_words(seg.text)
+                self._segments.append(seg)
+                self._word_counts.append(words)
+                self._buffered_words += words
+            self._condition.notify_all()
+
+    def close(self):
+        """标记写入结束，消费者读完剩余片段后退出"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def fail(self, error: str):
+        """标记生产者失败，消费者将抛出异常"""
+        with self._condition:
+            self._error = error
+            self._closed = True
+            self._condition.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __iter__(self) -> Iterator[List[ASRDataSeg]]:
+        while True:
+            block = self.next_block()
+            if block is None:
+                return
+            yield block
+
+    def next_block(self, timeout: Optional[float] = None) -> Optional[List[ASRDataSeg]]:
+        """读取下一块（阻塞）
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            片段列表；流结束返回 None
+
+        Raises:
+            RuntimeError: 生产者调用了 fail()
+            TimeoutError: 等待超时
+        """
+        with self._condition:
+            while True:
+                if self._error is not None:
+                    raise RuntimeError(self._error)
+
+                cut = self._find_cut()
+                if cut is not None:
+                    return self._take(cut)
+
+                if self._closed:
+                    if self._segments:
+                        return self._take(len(self._segments))
+                    return None
+
+                if not self._condition.wait(timeout=timeout):
+                    raise TimeoutError("等待字幕片段超时")
+
+    def _find_cut(self) -> Optional[int]:
+        """寻找切分位置，返回块的片段数；数据不足时返回 None"""
+        if self._buffered_words < self.block_word_count:
+            return None
+
+        # 累计字数达到目标的位置
+        target = 0
+        words = 0
+        for i, count in enumerate(self._word_counts):
+            words += count
+            if words >= self.block_word_count:
+                target = i
+                break
+
+        total = len(self._segments)
+        # 未关闭时需要目标点之后有足够的片段，保证搜索窗口完整
+        if not self._closed and target + self.search_range >= total:
+            return None
+
+        start = max(0, target - self.search_range)
+        end = min(total - 1, target + self.search_range)
+        if start >= end:
+            return total
+
+        # 在窗口内寻找最大时间间隔
+        best_index = target
+        max_gap = -1
+        for j in range(start, end):
+            gap = self._segments[j + 1].start_time - self._segments[j].end_time
+            if gap > max_gap:
+                max_gap = gap
+                best_index = j
+
+        return best_index + 1
+
+    def _take(self, count: int) -> List[ASRDataSeg]:
+        block = self._segments[:count]
+        self._segments = self._segments[count:]
+        self._buffered_words -= sum(self._word_counts[:count])
+        self._word_counts = self._word_counts[count:]
+        logger.debug(f"输出字幕块: {len(block)} 个片段")
+        return block
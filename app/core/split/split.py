@@ -1,9 +1,12 @@
 import difflib
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Union
+from typing import List, Optional, Union
 
 from app.core.asr.asr_data import ASRData, ASRDataSeg
 from app.core.split.split_by_llm import split_by_llm
+from app.core.utils.cache import generate_cache_key
+from app.core.utils.cancel import submit_with_context
+from app.core.utils.checkpoint import NULL_CHECKPOINT, Checkpoint
 from app.core.utils.logger import setup_logger
 from app.core.utils.text_utils import (
     count_words,
@@ -93,6 +96,7 @@ class SubtitleSplitter:
         model,
         max_word_count_cjk: int = MAX_WORD_COUNT_CJK,
         max_word_count_english: int = MAX_WORD_COUNT_ENGLISH,
+        checkpoint: Optional[Checkpoint] = None,
     ):
         """初始化分割器
 
@@ -101,11 +105,13 @@ class SubtitleSplitter:
             model: LLM模型名称
             max_word_count_cjk: CJK最大字数
             max_word_count_english: 英文最大单词数
+            checkpoint: 检查点存储，已完成的分组在重新执行时直接复用
         """
         self.thread_num = thread_num
         self.model = model
         self.max_word_count_cjk = max_word_count_cjk
         self.max_word_count_english = max_word_count_english
+        self.checkpoint = checkpoint or NULL_CHECKPOINT
         self.is_running = True
         self._init_thread_pool()
 
@@ -252,7 +258,9 @@ class SubtitleSplitter:
         for asr_data in asr_data_list:
             if not self.executor:
                 raise ValueError("线程池未初始化")
-            future = self.executor.submit(self._process_single_segment, asr_data)
+            future = submit_with_context(
+                self.executor, self._process_single_segment, asr_data
+            )
             futures.append(future)
 
         processed_segments = []
@@ -271,12 +279,36 @@ class SubtitleSplitter:
         """处理单个分段(带重试和降级)"""
         if not asr_data_part.segments:
             return []
+
+        checkpoint_key = self._checkpoint_key(asr_data_part.segments)
+        cached = self.checkpoint.get(Checkpoint.STAGE_SPLIT, checkpoint_key)
+        if cached is not None:
+            logger.info("分组已有检查点，跳过断句")
+            return [ASRDataSeg(text, start, end) for text, start, end in cached]
+
         try:
-            return self._process_by_llm(asr_data_part.segments)
+            result = self._process_by_llm(asr_data_part.segments)
+            self.checkpoint.put(
+                Checkpoint.STAGE_SPLIT,
+                checkpoint_key,
+                [[seg.text, seg.start_time, seg.end_time] for seg in result],
+            )
+            return result
         except Exception as e:
             logger.warning(f"LLM处理失败,使用规则降级: {str(e)}")
             return self._process_by_rules(asr_data_part.segments)
 
+    def _checkpoint_key(self, segments: List[ASRDataSeg]) -> str:
+        """由分组内容和断句参数生成检查点 key"""
+        return generate_cache_key(
+            {
+                "segments": [[s.text, s.start_time, s.end_time] for s in segments],
+                "model": self.model,
+                "max_word_count_cjk": self.max_word_count_cjk,
+                "max_word_count_english": self.max_word_count_english,
+            }
+        )
+
     def _process_by_llm(self, segments: List[ASRDataSeg]) -> List[ASRDataSeg]:
         """使用LLM进行智能分段
 
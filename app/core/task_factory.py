@@ -62,8 +62,10 @@ class TaskFactory:
             transcribe_language=LANGUAGES[cfg.transcribe_language.value.value],
             need_word_time_stamp=need_word_time_stamp,
             output_format=cfg.transcribe_output_format.value,
+            chunk_snap_to_silence=cfg.transcribe_chunk_snap_to_silence.value,
             # Whisper Cpp 配置
             whisper_model=cfg.whisper_model.value,
+            whisper_cpp_server_mode=cfg.whisper_cpp_server_mode.value,
             # Whisper API 配置
             whisper_api_key=cfg.whisper_api_key.value,
             whisper_api_base=cfg.whisper_api_base.value,
@@ -1,6 +1,7 @@
 """翻译器基类"""
 
 from abc import ABC, abstractmethod
+from dataclasses import asdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Callable, List, Optional
 
@@ -8,6 +9,8 @@ from app.core.asr.asr_data import ASRData, ASRDataSeg
 from app.core.entities import SubtitleProcessData
 from app.core.translate.types import TargetLanguage
 from app.core.utils.cache import generate_cache_key, get_translate_cache
+from app.core.utils.cancel import submit_with_context
+from app.core.utils.checkpoint import NULL_CHECKPOINT, Checkpoint
 from app.core.utils.logger import setup_logger
 
 logger = setup_logger("subtitle_translator")
@@ -22,6 +25,7 @@ class BaseTranslator(ABC):
         batch_num: int,
         target_language: TargetLanguage,
         update_callback: Optional[Callable],
+        checkpoint: Optional[Checkpoint] = None,
     ):
         self.thread_num = thread_num
         self.batch_num = batch_num
@@ -30,6 +34,8 @@ class BaseTranslator(ABC):
         self.update_callback = update_callback
         self.executor = None
         self._cache = get_translate_cache()
+        # 检查点存储，已完成的批次在重新执行时直接复用
+        self.checkpoint = checkpoint or NULL_CHECKPOINT
 
         self._init_thread_pool()
 
@@ -84,7 +90,9 @@ class BaseTranslator(ABC):
         translated_list = []
 
         for chunk in chunks:
-            future = self.executor.submit(self._safe_translate_chunk, chunk)
+            future = submit_with_context(
+                self.executor, self._safe_translate_chunk, chunk
+            )
             futures.append(future)
 
         for future in as_completed(futures):
@@ -112,6 +120,13 @@ class BaseTranslator(ABC):
         """安全的翻译块"""
         try:
             cache_key = self._get_cache_key(chunk)
+            checkpointed = self.checkpoint.get(Checkpoint.STAGE_TRANSLATE, cache_key)
+            if checkpointed is not None:
+                result = [SubtitleProcessData(**data) for data in checkpointed]
+                if self.update_callback:
+                    self.update_callback(result)
+                return result
+
             cached_result = self._cache.get(cache_key, default=None)
             if cached_result is not None:
                 return cached_result
@@ -122,6 +137,9 @@ class BaseTranslator(ABC):
                 self.update_callback(result)
 
             self._cache.set(cache_key, result, expire=86400 * 7)
+            self.checkpoint.put(
+                Checkpoint.STAGE_TRANSLATE, cache_key, [asdict(data) for data in result]
+            )
             return result
 
         except Exception as e:
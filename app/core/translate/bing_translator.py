@@ -7,6 +7,7 @@ import requests
 from app.core.entities import SubtitleProcessData
 from app.core.translate.base import BaseTranslator, logger
 from app.core.translate.types import TargetLanguage, get_language_code
+from app.core.utils.checkpoint import Checkpoint
 
 
 class BingTranslator(BaseTranslator):
@@ -18,12 +19,14 @@ class BingTranslator(BaseTranslator):
         batch_num: int,
         target_language: TargetLanguage,
         update_callback: Optional[Callable],
+        checkpoint: Optional[Checkpoint] = None,
     ):
         super().__init__(
             thread_num=thread_num,
             batch_num=batch_num,
             target_language=target_language,
             update_callback=update_callback,
+            checkpoint=checkpoint,
         )
         self.timeout = 20
         self.session = requests.Session()
@@ -7,6 +7,7 @@ import requests
 
 from app.core.translate.base import BaseTranslator, SubtitleProcessData, logger
 from app.core.translate.types import TargetLanguage, get_language_code
+from app.core.utils.checkpoint import Checkpoint
 
 
 class DeepLXTranslator(BaseTranslator):
@@ -19,12 +20,14 @@ class DeepLXTranslator(BaseTranslator):
         target_language: TargetLanguage,
         timeout: int,
         update_callback: Optional[Callable],
+        checkpoint: Optional[Checkpoint] = None,
     ):
         super().__init__(
             thread_num=thread_num,
             batch_num=batch_num,
             target_language=target_language,
             update_callback=update_callback,
+            checkpoint=checkpoint,
         )
         self.timeout = timeout
         self.session = requests.Session()
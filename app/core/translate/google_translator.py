@@ -9,6 +9,7 @@ import requests
 from app.core.entities import SubtitleProcessData
 from app.core.translate.base import BaseTranslator, logger
 from app.core.translate.types import TargetLanguage, get_language_code
+from app.core.utils.checkpoint import Checkpoint
 
 
 class GoogleTranslator(BaseTranslator):
@@ -21,12 +22,14 @@ class GoogleTranslator(BaseTranslator):
         target_language: TargetLanguage,
         timeout: int,
         update_callback: Optional[Callable],
+        checkpoint: Optional[Checkpoint] = None,
     ):
         super().__init__(
             thread_num=thread_num,
             batch_num=batch_num,
             target_language=target_language,
             update_callback=update_callback,
+            checkpoint=checkpoint,
         )
         self.timeout = timeout
         self.session = requests.Session()
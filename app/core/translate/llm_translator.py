@@ -10,6 +10,7 @@ from app.core.llm import call_llm
 from app.core.prompts import get_prompt
 from app.core.translate.base import BaseTranslator, SubtitleProcessData, logger
 from app.core.translate.types import TargetLanguage
+from app.core.utils.checkpoint import Checkpoint
 
 
 class LLMTranslator(BaseTranslator):
@@ -26,12 +27,14 @@ class LLMTranslator(BaseTranslator):
         custom_prompt: str,
         is_reflect: bool,
         update_callback: Optional[Callable],
+        checkpoint: Optional[Checkpoint] = None,
     ):
         super().__init__(
             thread_num=thread_num,
             batch_num=batch_num,
             target_language=target_language,
             update_callback=update_callback,
+            checkpoint=checkpoint,
         )
 
         self.model = model
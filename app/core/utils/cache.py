@@ -35,16 +35,25 @@ def is_cache_enabled() -> bool:
     return _cache_enabled
 
 
+# Default disk budget of the LLM response cache (bytes)
+DEFAULT_LLM_CACHE_SIZE_LIMIT = 512 * 1024**2
+
 # Predefined cache instances for common use cases
-_llm_cache = Cache(str(CACHE_PATH / "llm_translation"))
+_llm_cache = Cache(
+    str(CACHE_PATH / "llm_responses"),
+    size_limit=DEFAULT_LLM_CACHE_SIZE_LIMIT,
+    eviction_policy="least-recently-used",
+)
 _asr_cache = Cache(str(CACHE_PATH / "asr_results"), tag_index=True)
+_asr_chunk_cache = Cache(str(CACHE_PATH / "asr_chunks"))
 _tts_cache = Cache(str(CACHE_PATH / "tts_audio"))
 _translate_cache = Cache(str(CACHE_PATH / "translate_results"))
 _version_state_cache = Cache(str(CACHE_PATH / "version_state"))
+_eta_history_cache = Cache(str(CACHE_PATH / "eta_history"))
 
 
 def get_llm_cache() -> Cache:
-    """Get LLM translation cache instance."""
+    """Get LLM response cache instance (LRU-evicted, see LLMResponseCache)."""
     return _llm_cache
 
 
@@ -53,6 +62,11 @@ def get_asr_cache() -> Cache:
     return _asr_cache
 
 
+def get_asr_chunk_cache() -> Cache:
+    """Get content-addressed ASR piece cache instance (see ChunkCache)."""
+    return _asr_chunk_cache
+
+
 def get_translate_cache() -> Cache:
     """Get translate cache instance."""
     return _translate_cache
@@ -68,6 +82,11 @@ def get_version_state_cache() -> Cache:
     return _version_state_cache
 
 
+def get_eta_history_cache() -> Cache:
+    """Get per-stage throughput history cache instance (used for ETA estimation)."""
+    return _eta_history_cache
+
+
 def memoize(cache_instance: Cache, **kwargs):
     """Decorator to cache function results with global switch support.
 
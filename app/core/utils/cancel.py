@@ -0,0 +1,254 @@
+"""任务取消作用域
+
+为一个任务的所有重量级操作（ffmpeg、whisper 子进程、LLM 线程池）提供统一的取消入口：
+
+- 子进程在启动后注册到当前作用域，取消时先 terminate，宽限期后 kill
+- LLM 处理器把 stop() 注册为取消回调，取消时立即关闭线程池并丢弃排队批次
+- 进程内的循环（如 faster-whisper 的 segment 迭代）调用 raise_if_cancelled() 主动退出
+
+当前作用域通过 contextvars 传递，提交到线程池的任务需使用 submit_with_context()
+才能继承调用方的作用域。
+
+run_cancellable() 被取消时不等待后台线程结束；仍在运行的线程会被记录下来，
+下一个同类任务开始前可用 wait_abandoned_runners() 有限时地等待其退出，
+避免新旧任务同时占用 GPU 或内存。
+"""
+
+import contextvars
+import subprocess
+import threading
+import time
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .logger import setup_logger
+
+logger = setup_logger("cancel")
+
+# 子进程 terminate 后等待退出的宽限期（秒），超时则 kill
+KILL_GRACE_SECONDS = 0.5
+
+
+class TaskCancelledError(RuntimeError):
+    """任务已被取消"""
+
+
+class CancelToken:
+    """可取消作用域"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._processes: List[subprocess.Popen] = []
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待取消，返回是否已取消"""
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self):
+        """已取消时抛出 TaskCancelledError"""
+        if self._event.is_set():
+            raise TaskCancelledError("任务已取消")
+
+    def cancel(self):
+        """取消作用域：终止已注册的子进程并调用取消回调（重复调用无副作用）"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            processes = list(self._processes)
+            callbacks = list(self._callbacks)
+            self._processes.clear()
+            self._callbacks.clear()
+
+        for process in processes:
+            _terminate_process(process)
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"取消回调执行失败: {e}")
+
+    def register_process(self, process: subprocess.Popen):
+        """注册子进程；作用域已取消时立即终止"""
+        with self._lock:
+            if not self._event.is_set():
+                self._processes.append(process)
+                return
+        _terminate_process(process)
+
+    def unregister_process(self, process: subprocess.Popen):
+        with self._lock:
+            if process in self._processes:
+                self._processes.remove(process)
+
+    def add_callback(self, callback: Callable[[], None]):
+        """注册取消回调；作用域已取消时立即调用"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+# 永不取消的默认作用域
+_NEVER_CANCELLED = CancelToken()
+
+_current_token: contextvars.ContextVar[CancelToken] = contextvars.ContextVar(
+    "cancel_token", default=_NEVER_CANCELLED
+)
+
+
+def current_cancel_token() -> CancelToken:
+    """获取当前线程上下文的取消作用域"""
+    return _current_token.get()
+
+
+@contextmanager
+def cancel_scope(token: CancelToken) -> Iterator[CancelToken]:
+    """在 with 块内把 token 设为当前取消作用域"""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+def submit_with_context(executor: Executor, fn: Callable, *args, **kwargs) -> Future:
+    """向线程池提交任务，并让其继承调用方的取消作用域"""
+    context = contextvars.copy_context()
+    return executor.submit(context.run, fn, *args, **kwargs)
+
+
+@contextmanager
+def cancellable_process(process: subprocess.Popen) -> Iterator[subprocess.Popen]:
+    """在当前取消作用域内管理子进程：取消时终止，退出 with 时注销"""
+    token = current_cancel_token()
+    token.register_process(process)
+    try:
+        yield process
+    finally:
+        token.unregister_process(process)
+
+
+def _terminate_process(process: subprocess.Popen):
+    """先 terminate，宽限期后仍未退出则 kill（后台执行，不阻塞调用方）"""
+    if process.poll() is not None:
+        return
+
+    logger.info(f"终止子进程: PID={process.pid}")
+    try:
+        process.terminate()
+    except Exception as e:
+        logger.debug(f"terminate 失败: {e}")
+
+    def _kill_after_grace():
+        try:
+            process.wait(timeout=KILL_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            logger.info(f"子进程未响应 terminate，强制结束: PID={process.pid}")
+            try:
+                process.kill()
+            except Exception as e:
+                logger.debug(f"kill 失败: {e}")
+
+    threading.Thread(target=_kill_after_grace, daemon=True).start()
+
+
+# 被取消后仍在运行的 run_cancellable 后台线程：(函数名, 线程)
+_abandoned_runners: List[Tuple[str, threading.Thread]] = []
+_abandoned_lock = threading.Lock()
+
+
+def wait_abandoned_runners(timeout: float, name: Optional[str] = None) -> bool:
+    """
+    等待被取消后仍在运行的 run_cancellable 后台线程退出
+
+    Args:
+        timeout: 最长等待时间（秒）
+        name: 只等待执行该函数（按 __name__）的线程，None 表示全部
+
+    Returns:
+        是否已全部退出
+    """
+    with _abandoned_lock:
+        _abandoned_runners[:] = [
+            (fn_name, thread)
+            for fn_name, thread in _abandoned_runners
+            if thread.is_alive()
+        ]
+        threads = [
+            thread
+            for fn_name, thread in _abandoned_runners
+            if name is None or fn_name == name
+        ]
+
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    return not any(thread.is_alive() for thread in threads)
+
+
+def run_cancellable(token: CancelToken, fn: Callable, *args, **kwargs):
+    """在后台线程中以 token 为作用域执行 fn，并等待其结果
+
+    作用域被取消时立即抛出 TaskCancelledError，不等待后台线程结束：
+    已注册的子进程会被终止，进行中的网络请求在返回后自行退出，
+    调用方线程可以马上去处理下一个任务。仍在运行的后台线程记录在
+    wait_abandoned_runners() 中。
+
+    Returns:
+        fn 的返回值
+
+    Raises:
+        TaskCancelledError: 作用域已取消
+        Exception: fn 抛出的异常
+    """
+    token.raise_if_cancelled()
+
+    outcome = {}
+    wake = threading.Event()
+    fn_name = getattr(fn, "__name__", "task")
+
+    def runner():
+        try:
+            with cancel_scope(token):
+                outcome["value"] = fn(*args, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            wake.set()
+
+    thread = threading.Thread(
+        target=contextvars.copy_context().run,
+        args=(runner,),
+        name=f"cancellable-{fn_name}",
+        daemon=True,
+    )
+    token.add_callback(wake.set)
+    try:
+        thread.start()
+        wake.wait()
+    finally:
+        token.remove_callback(wake.set)
+
+    if "error" in outcome:
+        raise outcome["error"]
+    if "value" not in outcome:
+        if thread.is_alive():
+            with _abandoned_lock:
+                _abandoned_runners.append((fn_name, thread))
+        raise TaskCancelledError("任务已取消")
+    return outcome["value"]
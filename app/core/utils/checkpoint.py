@@ -0,0 +1,35 @@
+"""处理阶段检查点接口
+
+ASR 分块、断句分组、优化批次、翻译批次在完成后写入检查点，
+重新执行同一任务时直接读取已完成的结果。
+
+核心模块只依赖这里的基类，默认实现不做任何持久化；
+RPC 服务通过任务日志（app.rpc.task_journal）提供按任务持久化的实现。
+检查点的 key 应由输入内容的哈希生成，输入变化时自然失效。
+"""
+
+from typing import Any, Optional
+
+
+class Checkpoint:
+    """检查点存储（默认不持久化）
+
+    value 必须可以被 JSON 序列化。
+    """
+
+    # 阶段名称
+    STAGE_ASR_CHUNK = "asr_chunk"
+    STAGE_SPLIT = "split"
+    STAGE_OPTIMIZE = "optimize"
+    STAGE_TRANSLATE = "translate"
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        """读取检查点，不存在返回 None"""
+        return None
+
+    def put(self, stage: str, key: str, value: Any) -> None:
+        """写入检查点"""
+
+
+# 不持久化的默认实例
+NULL_CHECKPOINT = Checkpoint()
@@ -9,6 +9,7 @@ from typing import Callable, Literal, Optional
 
 from ..entities import AudioStreamInfo, VideoInfo
 from ..utils.ass_auto_wrap import auto_wrap_ass_file
+from ..utils.cancel import cancellable_process, current_cancel_token
 from ..utils.logger import setup_logger
 
 logger = setup_logger("video_utils")
@@ -75,17 +76,28 @@ def video2audio(input_file: str, output: str = "", audio_track_index: int = 0) -
     logger.info(f"转换为音频执行命令: {' '.join(cmd)}")
 
     try:
-        result = subprocess.run(
+        # 使用 Popen 以便任务取消时终止 ffmpeg
+        process = subprocess.Popen(
             cmd,
-            capture_output=True,
-            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             encoding="utf-8",
             errors="replace",
             creationflags=(
                 getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
             ),
         )
-        if result.returncode == 0 and Path(output).is_file():
+        with cancellable_process(process):
+            stdout, stderr = process.communicate()
+
+        if current_cancel_token().cancelled:
+            logger.info("任务已取消，音频转换中止")
+            return False
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(
+                process.returncode, cmd, output=stdout, stderr=stderr
+            )
+        if Path(output).is_file():
             logger.info("音频转换成功")
             return True
         else:
@@ -1,6 +1,13 @@
 # coding:utf-8
 """RPC 模块 - 基于 SignalR 的远程过程调用"""
 
+from typing import Optional
+
+from app.core.asr.whisper_cpp_server import whisper_cpp_servers
+from app.core.llm import llm_pool
+
+from .capacity import capacity_reporter
+from .event_bus import event_bus
 from .flask_server import flask_server
 from .rpc_handler import rpc_handler
 from .rpc_service import rpc_service
@@ -9,6 +16,8 @@ from .subtitize_executor import subtitize_executor
 from .task_manager import task_manager
 
 __all__ = [
+    "capacity_reporter",
+    "event_bus",
     "flask_server",
     "signalr_client",
     "rpc_handler",
@@ -18,13 +27,16 @@ __all__ = [
 ]
 
 
-def start_rpc_server(host: str = "0.0.0.0", port: int = 5000):
+def start_rpc_server(
+    host: str = "0.0.0.0", port: int = 5000, backend: Optional[str] = None
+):
     """
     启动 RPC 服务器
 
     Args:
         host: Flask 服务器监听地址
         port: Flask 服务器监听端口
+        backend: HTTP 服务器实现（waitress / werkzeug），默认读取 RPC.ServerBackend
     """
     # 加载配置文件
     from app.common.config import cfg
@@ -33,15 +45,42 @@ def start_rpc_server(host: str = "0.0.0.0", port: int = 5000):
     # 初始化 RPC 处理器
     rpc_handler.initialize()
 
+    # 启动出站事件发送线程
+    event_bus.start()
+
+    # 后台预加载本地转录模型
+    subtitize_executor.preload_models()
+
+    # 恢复上次未完成的任务
+    rpc_service.resume_tasks()
+
+    # 启动流水线工作线程，容量上报按实际线程数通告空闲容量
+    subtitize_executor.start()
+
+    # 启动容量上报（连接 Master 后生效）
+    capacity_reporter.start()
+
     # 启动 Flask API 服务器
-    flask_server.start(host=host, port=port)
+    flask_server.start(host=host, port=port, backend=backend)
 
 
 def stop_rpc_server():
-    """停止 RPC 服务器"""
+    """停止 RPC 服务器（拒绝新任务，排空进行中的请求后关闭）"""
+    # 停止 Flask 服务器
+    flask_server.stop()
+
+    # 停止容量上报，不再请求新任务
+    capacity_reporter.stop()
+
+    # 尽量发完剩余的完成/失败通知
+    event_bus.stop()
+
     # 断开 SignalR 连接
     signalr_client.disconnect()
 
-    # 停止 Flask 服务器
-    flask_server.stop()
+    # 结束常驻的 whisper-server
+    whisper_cpp_servers.shutdown()
+
+    # 关闭 LLM 连接池
+    llm_pool.shutdown()
 
@@ -0,0 +1,203 @@
+# coding:utf-8
+"""Worker 容量上报 - 向 Master 通告可用容量，可选主动拉取任务
+
+连接 Master 后，后台线程每隔 RPC.CapacityInterval 秒（任务状态变化时立即）
+通过 SignalR 发送 WorkerCapacity 消息：空闲转录/字幕处理线程数、已加载模型、
+设备、队列深度和各阶段历史吞吐量，供 Master 在 CPU/GPU 混合集群中分配任务。
+
+开启拉取模式（RPC.PullMode）后，有空闲转录线程且等待队列为空时，
+Worker 发送 RequestWork 请求任务，Master 通过 AssignWork 下发任务列表。
+同一时间只有一个未应答的请求，超时未应答则在下个周期重新请求。
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.common.config import cfg
+from app.core.asr.faster_whisper_python import get_loaded_models
+from app.core.entities import TranscribeModelEnum
+from app.core.llm import llm_response_cache, llm_router, llm_usage
+
+from .flask_server import flask_server
+from .signalr_client import signalr_client
+from .subtitize_executor import subtitize_executor
+from .task_manager import task_manager
+
+logger = logging.getLogger(__name__)
+
+# RequestWork 未应答时，经过多少个上报周期后重新请求
+REQUEST_WORK_TIMEOUT_INTERVALS = 3
+
+
+class CapacityReporter:
+    """Worker 容量上报器（单例模式）"""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self._condition = threading.Condition()
+        self._running = False
+        self._dirty = False
+        self._thread: Optional[threading.Thread] = None
+        # 最近一次未应答的 RequestWork 发送时间
+        self._work_requested_at: Optional[float] = None
+
+    def start(self):
+        """启动后台上报线程（重复调用无副作用）"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._report_loop, name="capacity-reporter", daemon=True
+            )
+            self._thread.start()
+        logger.info("容量上报已启动")
+
+    def stop(self):
+        """停止后台上报线程"""
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        logger.info("容量上报已停止")
+
+    def notify(self):
+        """任务状态变化，尽快上报一次容量"""
+        with self._condition:
+            self._dirty = True
+            self._condition.notify_all()
+
+    def on_work_assigned(self):
+        """收到 AssignWork 应答（任务列表可能为空），允许再次请求任务"""
+        with self._condition:
+            self._work_requested_at = None
+            self._dirty = True
+            self._condition.notify_all()
+
+    def get_capacity(self) -> Dict[str, Any]:
+        """
+        获取当前容量
+
+        Returns:
+            容量信息字典
+                asr_slots / asr_slots_free: 转录线程总数 / 可接收新任务的空闲数
+                llm_slots / llm_slots_free: 字幕处理线程总数 / 空闲数
+                device: 转录设备（cpu / cuda / remote）
+                transcribe_model: 当前转录引擎
+                loaded_models: 进程内已加载的本地模型
+                llm_cache: LLM 响应缓存的命中/未命中次数与磁盘占用
+                llm_usage: LLM token 用量（提示词中命中服务商前缀缓存 / 未命中的部分）
+                llm_providers: 各 LLM 服务的可用状态与延迟 p50 / p95
+                queue_length: 等待转录的任务数
+                subtitle_backlog: 等待字幕处理的任务数
+                throughput: 各阶段历史吞吐量（转录为音频秒/秒，其余为片段/秒）
+                pull_mode: 是否开启拉取模式
+                accepting: 是否接收新任务
+        """
+        usage = subtitize_executor.get_slot_usage()
+        asr_busy, asr_total = usage["transcribe"]
+        llm_busy, llm_total = usage["subtitle"]
+        queue_length = task_manager.get_queue_length()
+        subtitle_backlog = subtitize_executor.get_stage_backlog()
+
+        return {
+            "asr_slots": asr_total,
+            # 排队中的任务会占用下一个空闲的转录线程
+            "asr_slots_free": max(0, asr_total - asr_busy - queue_length),
+            "llm_slots": llm_total,
+            "llm_slots_free": max(0, llm_total - llm_busy - subtitle_backlog),
+            "device": _get_asr_device(),
+            "transcribe_model": cfg.get(cfg.transcribe_model).name,
+            "loaded_models": get_loaded_models(),
+            "llm_cache": llm_response_cache.metrics(),
+            "llm_usage": llm_usage.snapshot(),
+            "llm_providers": llm_router.status(),
+            "queue_length": queue_length,
+            "subtitle_backlog": subtitle_backlog,
+            "throughput": subtitize_executor.get_throughput(),
+            "pull_mode": cfg.get(cfg.rpc_pull_mode),
+            "accepting": not flask_server.is_draining,
+        }
+
+    # ==================== 上报线程 ====================
+
+    def _report_loop(self):
+        while True:
+            with self._condition:
+                if not self._dirty:
+                    self._condition.wait(timeout=cfg.get(cfg.rpc_capacity_interval))
+                if not self._running:
+                    return
+                self._dirty = False
+
+            if not signalr_client.is_connected:
+                continue
+
+            try:
+                capacity = self.get_capacity()
+                signalr_client.send("WorkerCapacity", capacity)
+                self._maybe_request_work(capacity)
+            except Exception as e:
+                logger.error(f"上报容量失败: {e}", exc_info=True)
+
+    def _maybe_request_work(self, capacity: Dict[str, Any]):
+        """拉取模式下有空闲转录线程时向 Master 请求任务"""
+        if not capacity["pull_mode"] or not capacity["accepting"]:
+            return
+        slots = capacity["asr_slots_free"]
+        if slots <= 0:
+            return
+
+        now = time.monotonic()
+        timeout = cfg.get(cfg.rpc_capacity_interval) * REQUEST_WORK_TIMEOUT_INTERVALS
+        with self._condition:
+            if (
+                self._work_requested_at is not None
+                and now - self._work_requested_at < timeout
+            ):
+                return
+            self._work_requested_at = now
+
+        if signalr_client.send("RequestWork", {"slots": slots, "capacity": capacity}):
+            logger.info(f"已向 Master 请求任务: slots={slots}")
+        else:
+            with self._condition:
+                self._work_requested_at = None
+
+
+def _get_asr_device() -> str:
+    """当前转录引擎使用的设备"""
+    transcribe_model = cfg.get(cfg.transcribe_model)
+    if transcribe_model in (
+        TranscribeModelEnum.FASTER_WHISPER,
+        TranscribeModelEnum.FASTER_WHISPER_PYTHON,
+    ):
+        return cfg.get(cfg.faster_whisper_device)
+    if transcribe_model == TranscribeModelEnum.WHISPER_CPP:
+        return "cpu"
+    # 在线接口，转录不占用本机算力
+    return "remote"
+
+
+# 全局单例实例
+capacity_reporter = CapacityReporter()
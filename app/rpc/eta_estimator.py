@@ -0,0 +1,268 @@
+# coding:utf-8
+"""ETA 估算 - 根据历史吞吐量估算任务完成时间
+
+每个阶段按引擎/模型记录吞吐量的指数加权移动平均（EWMA），保存在
+CACHE_PATH/eta_history 中，Worker 重启后仍然有效：
+
+- 转录：音频秒数 / 耗时秒数，按 ASR 引擎和模型区分
+- 断句、优化、翻译：字幕片段数 / 耗时秒数，按 LLM 模型或翻译服务区分
+- 片段密度：每秒音频产生的片段数，用于转录完成前估算字幕处理的工作量
+
+任务执行时，当前阶段的剩余时间由"已观察到的速度"和"历史速度"按完成比例加权，
+后续阶段直接使用历史速度估算。
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.core.utils.cache import get_eta_history_cache
+
+logger = logging.getLogger(__name__)
+
+# 阶段名称
+STAGE_ASR = "asr"
+STAGE_SPLIT = "split"
+STAGE_OPTIMIZE = "optimize"
+STAGE_TRANSLATE = "translate"
+
+# 没有历史记录时使用的默认吞吐量（转录为音频秒/秒，其余为片段/秒）
+DEFAULT_THROUGHPUT = {
+    STAGE_ASR: 5.0,
+    STAGE_SPLIT: 2.0,
+    STAGE_OPTIMIZE: 3.0,
+    STAGE_TRANSLATE: 3.0,
+}
+# 默认片段密度（片段/音频秒）
+DEFAULT_SEGMENT_DENSITY = 0.3
+
+# EWMA 平滑系数，越大越偏向最近的运行
+EWMA_ALPHA = 0.3
+# 耗时低于该值的阶段（如命中缓存）不计入历史
+MIN_RECORD_SECONDS = 1.0
+# 当前阶段完成比例达到该值后才参考已观察到的速度
+MIN_OBSERVED_FRACTION = 0.05
+
+
+class ETAEstimator:
+    """ETA 估算器（单例模式）"""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self._history = get_eta_history_cache()
+        self._trackers: Dict[int, "TaskETATracker"] = {}
+        self._trackers_lock = threading.Lock()
+
+    # ==================== 历史吞吐量 ====================
+
+    def get_throughput(self, stage_key: str, stage: str) -> float:
+        """获取阶段吞吐量（无历史记录时返回默认值）"""
+        record = self._history.get(f"throughput:{stage_key}")
+        if record:
+            return record["rate"]
+        return DEFAULT_THROUGHPUT[stage]
+
+    def record_throughput(self, stage_key: str, units: float, elapsed: float):
+        """
+        记录一次阶段运行
+
+        Args:
+            stage_key: 阶段 key（含引擎/模型）
+            units: 工作量（音频秒数或片段数）
+            elapsed: 耗时（秒）
+        """
+        if units <= 0 or elapsed < MIN_RECORD_SECONDS:
+            return
+        self._update_ewma(f"throughput:{stage_key}", units / elapsed)
+
+    def get_segment_density(self, asr_key: str) -> float:
+        """获取片段密度（片段/音频秒）"""
+        record = self._history.get(f"density:{asr_key}")
+        if record:
+            return record["rate"]
+        return DEFAULT_SEGMENT_DENSITY
+
+    def record_segment_density(self, asr_key: str, segments: int, audio_seconds: float):
+        """记录一次转录产生的片段密度"""
+        if segments <= 0 or audio_seconds <= 0:
+            return
+        self._update_ewma(f"density:{asr_key}", segments / audio_seconds)
+
+    def _update_ewma(self, key: str, value: float):
+        try:
+            with self._history.transact():
+                record = self._history.get(key)
+                if record:
+                    rate = EWMA_ALPHA * value + (1 - EWMA_ALPHA) * record["rate"]
+                    samples = record["samples"] + 1
+                else:
+                    rate, samples = value, 1
+                self._history.set(key, {"rate": rate, "samples": samples})
+            logger.debug(f"吞吐量历史已更新: {key}={rate:.3f} (样本数 {samples})")
+        except Exception as e:
+            logger.error(f"记录吞吐量历史失败: {key}, error={e}")
+
+    # ==================== 任务跟踪 ====================
+
+    def track(self, task_id: int, stage_keys: Dict[str, str]) -> "TaskETATracker":
+        """
+        开始跟踪任务
+
+        Args:
+            task_id: 任务ID
+            stage_keys: 需要执行的阶段 -> 阶段 key（未启用的阶段不包含在内）
+        """
+        tracker = TaskETATracker(self, stage_keys)
+        with self._trackers_lock:
+            self._trackers[task_id] = tracker
+        return tracker
+
+    def get_tracker(self, task_id: int) -> "TaskETATracker":
+        """获取任务的跟踪器，未跟踪的任务返回不估算的空跟踪器"""
+        with self._trackers_lock:
+            tracker = self._trackers.get(task_id)
+        return tracker if tracker is not None else TaskETATracker(self, {})
+
+    def untrack(self, task_id: int):
+        with self._trackers_lock:
+            self._trackers.pop(task_id, None)
+
+
+class TaskETATracker:
+    """单个任务的 ETA 跟踪"""
+
+    def __init__(self, estimator: ETAEstimator, stage_keys: Dict[str, str]):
+        self._estimator = estimator
+        self._stage_keys = dict(stage_keys)
+        self._lock = threading.Lock()
+        self._audio_seconds: Optional[float] = None
+        self._segment_count: Optional[int] = None
+        self._started_at: Dict[str, float] = {}
+        self._fractions: Dict[str, float] = {}
+        self._finished: List[str] = []
+        # 流式模式下转录和字幕处理同时进行
+        self.overlapped = False
+
+    def set_audio_duration(self, seconds: float):
+        with self._lock:
+            self._audio_seconds = seconds
+
+    def set_segment_count(self, count: int):
+        with self._lock:
+            self._segment_count = count
+
+    def start_stage(self, stage: str):
+        """标记阶段开始"""
+        with self._lock:
+            if stage in self._stage_keys and stage not in self._started_at:
+                self._started_at[stage] = time.monotonic()
+                self._fractions[stage] = 0.0
+
+    def update_stage(self, stage: str, fraction: float):
+        """更新阶段完成比例 (0-1)"""
+        with self._lock:
+            if stage in self._started_at and stage not in self._finished:
+                self._fractions[stage] = max(0.0, min(fraction, 1.0))
+
+    def finish_stage(self, stage: str, units: Optional[float] = None):
+        """
+        标记阶段完成，并把本次吞吐量计入历史
+
+        Args:
+            stage: 阶段名称
+            units: 本次实际完成的工作量（如未命中检查点和缓存的音频秒数），
+                默认为阶段的全部工作量；为 0 时不计入历史
+        """
+        with self._lock:
+            if stage not in self._started_at or stage in self._finished:
+                return
+            self._finished.append(stage)
+            self._fractions[stage] = 1.0
+            elapsed = time.monotonic() - self._started_at[stage]
+            if units is None:
+                units = self._stage_units(stage)
+            record = not (self.overlapped and stage != STAGE_ASR)
+
+        # 流式模式下字幕处理受转录速度限制，其耗时不代表真实吞吐量
+        if record and units:
+            self._estimator.record_throughput(self._stage_keys[stage], units, elapsed)
+        if stage == STAGE_ASR and STAGE_ASR in self._stage_keys:
+            if self._segment_count is not None and self._audio_seconds:
+                self._estimator.record_segment_density(
+                    self._stage_keys[STAGE_ASR], self._segment_count, self._audio_seconds
+                )
+
+    def eta(self) -> Optional[datetime]:
+        """估算完成时间，工作量未知时返回 None"""
+        if not self._stage_keys:
+            return None
+        with self._lock:
+            remaining = {}
+            for stage in self._stage_keys:
+                seconds = self._stage_remaining(stage)
+                if seconds is None:
+                    return None
+                remaining[stage] = seconds
+
+        asr_remaining = remaining.pop(STAGE_ASR, 0.0)
+        subtitle_remaining = sum(remaining.values())
+        if self.overlapped:
+            total = max(asr_remaining, subtitle_remaining)
+        else:
+            total = asr_remaining + subtitle_remaining
+        return datetime.now() + timedelta(seconds=total)
+
+    def _stage_units(self, stage: str) -> Optional[float]:
+        """阶段工作量（调用方需持有锁）"""
+        if stage == STAGE_ASR:
+            return self._audio_seconds
+        if self._segment_count is not None:
+            return self._segment_count
+        if self._audio_seconds is None:
+            return None
+        density = self._estimator.get_segment_density(
+            self._stage_keys.get(STAGE_ASR, "")
+        )
+        return self._audio_seconds * density
+
+    def _stage_remaining(self, stage: str) -> Optional[float]:
+        """阶段剩余秒数（调用方需持有锁）"""
+        if stage in self._finished:
+            return 0.0
+
+        fraction = self._fractions.get(stage, 0.0)
+        units = self._stage_units(stage)
+        history = None
+        if units is not None:
+            rate = self._estimator.get_throughput(self._stage_keys[stage], stage)
+            history = units * (1 - fraction) / rate
+
+        if stage not in self._started_at or fraction < MIN_OBSERVED_FRACTION:
+            return history
+
+        # 按完成比例在观察速度和历史速度之间加权
+        elapsed = time.monotonic() - self._started_at[stage]
+        observed = elapsed * (1 - fraction) / fraction
+        if history is None:
+            return observed
+        return fraction * observed + (1 - fraction) * history
+
+
+# 全局单例实例
+eta_estimator = ETAEstimator()
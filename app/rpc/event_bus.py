@@ -0,0 +1,286 @@
+# coding:utf-8
+"""出站事件总线 - 异步发送任务回调到 Master
+
+任务线程只把事件放入内存队列，由后台发送线程负责网络 I/O：
+
+- 进度事件按任务合并，只保留最新一条，按 RPC.ProgressMaxRate 限制发送频率，
+  开启 RPC.ProgressBatch 时同一批次合并为一条 SubtitizeProgressBatch 消息
+- 终止事件（SubtitizeCompleted / SubtitizeFaulted）按产生顺序发送，
+  未连接 Master 时暂存，连接建立后立即发送；已连接但发送失败时保留在队首退避重试，
+  连续失败 TERMINAL_MAX_ATTEMPTS 次或积压超过 TERMINAL_QUEUE_LIMIT 条时丢弃并记录日志
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional
+
+from app.common.config import cfg
+
+from .signalr_client import signalr_client
+
+logger = logging.getLogger(__name__)
+
+# 终止事件重试退避（秒）
+RETRY_INITIAL_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+# 单个终止事件在已连接状态下的最大发送次数
+TERMINAL_MAX_ATTEMPTS = 10
+# 未送达终止事件的最大积压数，超出时丢弃最早的事件
+TERMINAL_QUEUE_LIMIT = 1000
+
+
+@dataclass(eq=False)
+class _TerminalEvent:
+    method_name: str
+    payload: Any
+    attempts: int = 0
+
+
+class OutboundEventBus:
+    """出站事件总线（单例模式）"""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(
+        self,
+        send: Optional[Callable[..., bool]] = None,
+        is_connected: Optional[Callable[[], bool]] = None,
+    ):
+        """
+        Args:
+            send: 发送函数 send(method_name, payload) -> 是否成功，默认使用 SignalR 客户端
+            is_connected: 是否已连接 Master，默认使用 SignalR 客户端的连接状态
+        """
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self._send = send or signalr_client.send
+        self._is_connected = is_connected or (lambda: signalr_client.is_connected)
+        self._condition = threading.Condition()
+        # task_id -> 最新进度数据（保持首次入队顺序）
+        self._progress: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        # 终止事件按产生顺序排列
+        self._terminal: Deque[_TerminalEvent] = deque()
+        self._retry_delay = 0.0
+        self._next_retry_at = 0.0
+        self._last_progress_flush = 0.0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        if send is None:
+            signalr_client.add_connected_callback(self.on_connected)
+
+    def start(self):
+        """启动后台发送线程（重复调用无副作用）"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._sender_loop, name="event-bus-sender", daemon=True
+            )
+            self._thread.start()
+        logger.info("出站事件总线已启动")
+
+    def stop(self, timeout: float = 5.0):
+        """
+        停止发送线程，已连接时在超时时间内尽量发完剩余的终止事件
+
+        Args:
+            timeout: 最长等待时间（秒）
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            if not self._running:
+                return
+            # 立即重试一次剩余事件
+            self._next_retry_at = 0.0
+            self._condition.notify_all()
+            while (
+                self._terminal
+                and self._is_connected()
+                and time.monotonic() < deadline
+            ):
+                self._condition.wait(timeout=0.1)
+            self._running = False
+            self._condition.notify_all()
+            remaining = len(self._terminal)
+
+        if self._thread:
+            self._thread.join(timeout=max(0.0, deadline - time.monotonic()))
+            self._thread = None
+        if remaining:
+            logger.warning(f"出站事件总线已停止，{remaining} 个终止事件未送达")
+        else:
+            logger.info("出站事件总线已停止")
+
+    def publish_progress(self, task_id: int, payload: Dict[str, Any]):
+        """
+        发布进度事件（同一任务未发送的旧进度会被覆盖）
+
+        Args:
+            task_id: 任务ID
+            payload: SubtitizeProgress 消息数据
+        """
+        with self._condition:
+            self._progress[task_id] = payload
+            self._condition.notify_all()
+        self.start()
+
+    def publish_terminal(self, method_name: str, task_id: int, payload: Any):
+        """
+        发布终止事件（保证按顺序送达），同时丢弃该任务未发送的进度
+
+        Args:
+            method_name: 回调名称（SubtitizeCompleted / SubtitizeFaulted）
+            task_id: 任务ID
+            payload: 消息数据
+        """
+        with self._condition:
+            self._progress.pop(task_id, None)
+            if len(self._terminal) >= TERMINAL_QUEUE_LIMIT:
+                dropped = self._terminal.popleft()
+                logger.error(
+                    f"未送达的终止事件超过 {TERMINAL_QUEUE_LIMIT} 条，"
+                    f"丢弃最早的事件: {dropped.method_name} {dropped.payload}"
+                )
+            self._terminal.append(_TerminalEvent(method_name, payload))
+            self._condition.notify_all()
+        self.start()
+
+    def on_connected(self):
+        """连接已建立：立即发送积压的终止事件"""
+        with self._condition:
+            self._retry_delay = 0.0
+            self._next_retry_at = 0.0
+            self._condition.notify_all()
+
+    def get_pending_count(self) -> Dict[str, int]:
+        """获取待发送事件数"""
+        with self._condition:
+            return {"progress": len(self._progress), "terminal": len(self._terminal)}
+
+    # ==================== 发送线程 ====================
+
+    def _sender_loop(self):
+        while True:
+            with self._condition:
+                while self._running:
+                    wait = self._next_wait()
+                    if wait is not None and wait <= 0:
+                        break
+                    self._condition.wait(timeout=wait)
+                if not self._running:
+                    return
+
+                terminal = None
+                if self._terminal_due():
+                    terminal = self._terminal[0]
+
+                progress = []
+                if self._progress and self._progress_due():
+                    progress = list(self._progress.values())
+                    self._progress.clear()
+                    self._last_progress_flush = time.monotonic()
+
+            # 网络 I/O 在锁外执行
+            if progress:
+                self._send_progress(progress)
+            if terminal is not None:
+                self._send_terminal(terminal)
+
+    def _progress_due(self) -> bool:
+        interval = 1.0 / cfg.get(cfg.rpc_progress_max_rate)
+        return time.monotonic() - self._last_progress_flush >= interval
+
+    def _terminal_due(self) -> bool:
+        """队首终止事件是否可以发送（调用方需持有锁）"""
+        return (
+            bool(self._terminal)
+            and self._is_connected()
+            and time.monotonic() >= self._next_retry_at
+        )
+
+    def _next_wait(self) -> Optional[float]:
+        """距离下一次可发送的时间，None 表示无事可做（调用方需持有锁）
+
+        未连接时终止事件不参与计时，由 on_connected 唤醒
+        """
+        now = time.monotonic()
+        waits = []
+        if self._terminal and self._is_connected():
+            waits.append(self._next_retry_at - now)
+        if self._progress:
+            interval = 1.0 / cfg.get(cfg.rpc_progress_max_rate)
+            waits.append(self._last_progress_flush + interval - now)
+        return min(waits) if waits else None
+
+    def _send_progress(self, payloads):
+        """发送一批进度（尽力而为，失败不重试，后续进度会覆盖）"""
+        try:
+            if cfg.get(cfg.rpc_progress_batch) and len(payloads) > 1:
+                self._send("SubtitizeProgressBatch", payloads)
+            else:
+                for payload in payloads:
+                    self._send("SubtitizeProgress", payload)
+        except Exception as e:
+            logger.error(f"发送进度失败: {e}", exc_info=True)
+
+    def _finish_terminal(self, event: _TerminalEvent):
+        """队首事件出队并重置退避（调用方需持有锁）"""
+        if self._terminal and self._terminal[0] is event:
+            self._terminal.popleft()
+        self._retry_delay = 0.0
+        self._next_retry_at = 0.0
+
+    def _send_terminal(self, event: _TerminalEvent):
+        """发送队首终止事件，成功后出队，失败则退避重试，超过次数上限时丢弃"""
+        method_name = event.method_name
+        try:
+            delivered = bool(self._send(method_name, event.payload))
+        except Exception as e:
+            logger.error(f"发送 {method_name} 失败: {e}", exc_info=True)
+            delivered = False
+
+        with self._condition:
+            if delivered:
+                self._finish_terminal(event)
+                logger.debug(f"已发送终止事件: {method_name}")
+            elif not self._is_connected():
+                # 连接已断开：等待 on_connected 唤醒后再发送，不计入失败次数
+                pass
+            else:
+                event.attempts += 1
+                if event.attempts >= TERMINAL_MAX_ATTEMPTS:
+                    self._finish_terminal(event)
+                    logger.error(
+                        f"终止事件发送 {event.attempts} 次均失败，已丢弃: "
+                        f"{method_name} {event.payload}"
+                    )
+                else:
+                    self._retry_delay = min(
+                        max(self._retry_delay * 2, RETRY_INITIAL_DELAY),
+                        RETRY_MAX_DELAY,
+                    )
+                    self._next_retry_at = time.monotonic() + self._retry_delay
+                    logger.warning(
+                        f"终止事件发送失败，{self._retry_delay:.0f} 秒后重试: {method_name}"
+                    )
+            self._condition.notify_all()
+
+
+# 全局单例实例
+event_bus = OutboundEventBus()
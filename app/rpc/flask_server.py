@@ -3,11 +3,14 @@
 
 import logging
 import threading
-from typing import Optional
+import time
+from typing import Any, Optional
 
 from flasgger import Swagger
 from flask import Flask, jsonify, request
 
+from app.common.config import cfg
+
 from .signalr_client import signalr_client
 
 logger = logging.getLogger(__name__)
@@ -34,8 +37,15 @@ class FlaskAPIServer:
         self._initialized = True
         self.app = Flask(__name__)
         self._server_thread: Optional[threading.Thread] = None
+        self._server: Any = None
+        self._backend: Optional[str] = None
         self._is_running = False
 
+        # 优雅关闭：排空期间拒绝新任务，等待进行中的请求完成
+        self._draining = False
+        self._in_flight = 0
+        self._in_flight_cond = threading.Condition()
+
         # 配置 Swagger
         swagger_config = {
             "headers": [],
@@ -70,8 +80,28 @@ class FlaskAPIServer:
 
         logger.info("Flask API 服务器已初始化")
 
+    @property
+    def is_draining(self) -> bool:
+        """是否正在排空（准备关闭）"""
+        return self._draining
+
+    def _register_request_tracking(self):
+        """统计进行中的请求数，供关闭时排空"""
+
+        @self.app.before_request
+        def _enter_request():
+            with self._in_flight_cond:
+                self._in_flight += 1
+
+        @self.app.teardown_request
+        def _leave_request(exc):
+            with self._in_flight_cond:
+                self._in_flight -= 1
+                self._in_flight_cond.notify_all()
+
     def _register_routes(self):
         """注册 API 路由"""
+        self._register_request_tracking()
 
         @self.app.route("/health", methods=["GET"])
         def health():
@@ -89,7 +119,11 @@ class FlaskAPIServer:
                       type: boolean
                     status:
                       type: string
+              503:
+                description: 服务正在关闭，负载均衡器应停止转发新请求
             """
+            if self._draining:
+                return jsonify({"success": False, "status": "draining"}), 503
             return jsonify({"success": True, "status": "healthy"})
 
         @self.app.route("/set-master", methods=["GET"])
@@ -199,6 +233,12 @@ class FlaskAPIServer:
                     current_task:
                       type: object
                       description: 当前任务信息（如果有）
+                    tasks:
+                      type: array
+                      description: 所有排队中和运行中的任务
+                    queue_length:
+                      type: integer
+                      description: 等待队列长度
             """
             from .rpc_service import rpc_service
 
@@ -250,9 +290,13 @@ class FlaskAPIServer:
                         - ISO 语言代码: "en", "zh", "ja", "ko" 等
                         - 语言名称: "英语", "中文", "日本語" 等
                       example: "en"
+                    priority:
+                      type: integer
+                      description: 优先级，数值越大越先执行（默认 0）
+                      example: 0
             responses:
               200:
-                description: 任务已启动
+                description: 任务已入队
                 schema:
                   type: object
                   properties:
@@ -260,7 +304,7 @@ class FlaskAPIServer:
                       type: boolean
                     task_id:
                       type: integer
-                      description: 任务ID (>0 成功, -1 已有任务运行, -2 参数无效, -3 启动失败)
+                      description: 任务ID (>0 成功, -1 等待队列已满, -2 参数无效, -3 启动失败, -4 正在关闭)
                     message:
                       type: string
               400:
@@ -276,6 +320,10 @@ class FlaskAPIServer:
             raw_subtitle_path = data.get("raw_subtitle_path")
             translated_subtitle_path = data.get("translated_subtitle_path")
             language = data.get("language")  # 获取可选的语言参数
+            priority = data.get("priority", 0)
+
+            if not isinstance(priority, int):
+                return jsonify({"success": False, "error": "priority 必须是整数"}), 400
 
             if not video_path or not raw_subtitle_path:
                 return (
@@ -290,7 +338,11 @@ class FlaskAPIServer:
 
             try:
                 task_id = rpc_service.start_subtitize(
-                    video_path, raw_subtitle_path, translated_subtitle_path, language
+                    video_path,
+                    raw_subtitle_path,
+                    translated_subtitle_path,
+                    language,
+                    priority,
                 )
 
                 if task_id > 0:
@@ -298,7 +350,7 @@ class FlaskAPIServer:
                         {
                             "success": True,
                             "task_id": task_id,
-                            "message": f"任务已启动: task_id={task_id}",
+                            "message": f"任务已入队: task_id={task_id}",
                         }
                     )
                 elif task_id == -1:
@@ -306,13 +358,24 @@ class FlaskAPIServer:
                         {
                             "success": False,
                             "task_id": task_id,
-                            "message": "已有任务正在运行",
+                            "message": "等待队列已满",
                         }
                     )
                 elif task_id == -2:
                     return jsonify(
                         {"success": False, "task_id": task_id, "message": "参数无效"}
                     )
+                elif task_id == -4:
+                    return (
+                        jsonify(
+                            {
+                                "success": False,
+                                "task_id": task_id,
+                                "message": "Worker 正在关闭",
+                            }
+                        ),
+                        503,
+                    )
                 else:  # -3
                     return jsonify(
                         {
@@ -326,6 +389,83 @@ class FlaskAPIServer:
                 logger.error(f"启动任务失败: {e}", exc_info=True)
                 return jsonify({"success": False, "error": str(e)}), 500
 
+        @self.app.route("/api/rpc/start-subtitize-batch", methods=["POST"])
+        def start_subtitize_batch():
+            """批量启动字幕化任务
+            ---
+            tags:
+              - RPC
+            parameters:
+              - name: body
+                in: body
+                required: true
+                schema:
+                  type: object
+                  required:
+                    - jobs
+                  properties:
+                    jobs:
+                      type: array
+                      description: 任务列表，字段同 start-subtitize
+                      items:
+                        type: object
+                        properties:
+                          video_path:
+                            type: string
+                          raw_subtitle_path:
+                            type: string
+                          translated_subtitle_path:
+                            type: string
+                          language:
+                            type: string
+                          priority:
+                            type: integer
+            responses:
+              200:
+                description: 批量提交结果
+                schema:
+                  type: object
+                  properties:
+                    success:
+                      type: boolean
+                      description: 是否至少有一个任务入队
+                    task_ids:
+                      type: array
+                      items:
+                        type: integer
+                      description: 与 jobs 一一对应的任务ID或错误代码
+                    accepted:
+                      type: integer
+                      description: 入队的任务数
+              400:
+                description: 参数错误
+              503:
+                description: Worker 正在关闭
+            """
+            from .rpc_service import rpc_service
+
+            data = request.get_json()
+            jobs = data.get("jobs") if isinstance(data, dict) else None
+            if not isinstance(jobs, list) or not jobs:
+                return jsonify({"success": False, "error": "缺少参数: jobs"}), 400
+
+            if self._draining:
+                return (
+                    jsonify({"success": False, "error": "Worker 正在关闭"}),
+                    503,
+                )
+
+            try:
+                task_ids = rpc_service.start_subtitize_batch(jobs)
+            except Exception as e:
+                logger.error(f"批量启动任务失败: {e}", exc_info=True)
+                return jsonify({"success": False, "error": str(e)}), 500
+
+            accepted = sum(1 for task_id in task_ids if task_id > 0)
+            return jsonify(
+                {"success": accepted > 0, "task_ids": task_ids, "accepted": accepted}
+            )
+
         @self.app.route("/api/rpc/stop-subtitize", methods=["POST"])
         def stop_subtitize():
             """停止字幕化任务
@@ -394,43 +534,178 @@ class FlaskAPIServer:
                     current_task:
                       type: object
                       description: 当前任务信息
+                    tasks:
+                      type: array
+                      description: 所有排队中和运行中的任务
+                    queue_length:
+                      type: integer
+                      description: 等待队列长度
             """
             from .rpc_service import rpc_service
 
             return jsonify(rpc_service.get_status())
 
-    def start(self, host: str = "0.0.0.0", port: int = 5000):
+        @self.app.route("/api/rpc/get-capacity", methods=["GET"])
+        def get_capacity():
+            """获取 Worker 容量
+            ---
+            tags:
+              - RPC
+            responses:
+              200:
+                description: Worker 容量
+                schema:
+                  type: object
+                  properties:
+                    asr_slots:
+                      type: integer
+                      description: 转录线程总数
+                    asr_slots_free:
+                      type: integer
+                      description: 可接收新任务的空闲转录线程数
+                    llm_slots:
+                      type: integer
+                      description: 字幕处理线程总数
+                    llm_slots_free:
+                      type: integer
+                      description: 空闲字幕处理线程数
+                    device:
+                      type: string
+                      description: 转录设备 (cpu/cuda/remote)
+                    transcribe_model:
+                      type: string
+                      description: 当前转录引擎
+                    loaded_models:
+                      type: array
+                      description: 已加载的本地模型
+                    queue_length:
+                      type: integer
+                      description: 等待转录的任务数
+                    subtitle_backlog:
+                      type: integer
+                      description: 等待字幕处理的任务数
+                    throughput:
+                      type: object
+                      description: 各阶段历史吞吐量
+                    pull_mode:
+                      type: boolean
+                      description: 是否开启拉取模式
+                    accepting:
+                      type: boolean
+                      description: 是否接收新任务
+            """
+            from .rpc_service import rpc_service
+
+            return jsonify(rpc_service.get_capacity())
+
+    def start(
+        self, host: str = "0.0.0.0", port: int = 5000, backend: Optional[str] = None
+    ):
         """
-        启动 Flask 服务器
+        启动 HTTP 服务器
 
         Args:
             host: 监听地址
             port: 监听端口
+            backend: waitress / werkzeug，默认读取 RPC.ServerBackend
         """
         if self._is_running:
             logger.warning("Flask 服务器已在运行")
             return
 
-        def run_server():
-            logger.info(f"Flask API 服务器正在启动: http://{host}:{port}")
-            logger.info(f"Swagger UI: http://{host}:{port}/api/docs")
-            self.app.run(host=host, port=port, debug=False, use_reloader=False)
-
-        self._server_thread = threading.Thread(target=run_server, daemon=True)
+        backend = backend or cfg.get(cfg.rpc_server_backend)
+        if backend == "waitress":
+            try:
+                self._server = self._create_waitress_server(host, port)
+            except ImportError:
+                logger.warning("未安装 waitress，回退到 werkzeug 服务器")
+                backend = "werkzeug"
+        if backend == "werkzeug":
+            from werkzeug.serving import make_server
+
+            self._server = make_server(host, port, self.app, threaded=True)
+
+        self._backend = backend
+        self._draining = False
+        serve = self._server.run if backend == "waitress" else self._server.serve_forever
+        self._server_thread = threading.Thread(
+            target=serve, name="flask-server", daemon=True
+        )
         self._server_thread.start()
         self._is_running = True
 
-        logger.info(f"Flask API 服务器已启动: http://{host}:{port}")
+        logger.info(f"Flask API 服务器已启动 ({backend}): http://{host}:{port}")
         logger.info(f"访问 Swagger UI: http://{host}:{port}/api/docs")
 
-    def stop(self):
-        """停止 Flask 服务器"""
+    def _create_waitress_server(self, host: str, port: int):
+        """创建 waitress 服务器：固定大小的请求线程池，支持 HTTP/1.1 keep-alive"""
+        from waitress import create_server
+
+        threads = cfg.get(cfg.rpc_server_threads)
+        return create_server(
+            self.app,
+            host=host,
+            port=port,
+            threads=threads,
+            # 超出线程数的连接在队列中等待，避免无限制占用内存
+            connection_limit=threads * 16,
+            # keep-alive 连接空闲超时（秒）
+            channel_timeout=60,
+            ident="VideoCaptioner",
+        )
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        进入排空状态并等待进行中的请求完成
+
+        排空期间 /health 返回 503，新的字幕化任务被拒绝，状态查询正常响应。
+
+        Args:
+            timeout: 最长等待时间（秒），默认读取 RPC.DrainTimeout
+
+        Returns:
+            进行中的请求是否已全部完成
+        """
+        if timeout is None:
+            timeout = cfg.get(cfg.rpc_drain_timeout)
+
+        self._draining = True
+        deadline = time.monotonic() + timeout
+        with self._in_flight_cond:
+            while self._in_flight > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"排空超时，仍有 {self._in_flight} 个请求未完成")
+                    return False
+                self._in_flight_cond.wait(timeout=remaining)
+        logger.info("进行中的请求已全部完成")
+        return True
+
+    def stop(self, drain_timeout: Optional[float] = None):
+        """
+        优雅停止 HTTP 服务器：先排空进行中的请求，再关闭监听
+
+        Args:
+            drain_timeout: 排空等待时间（秒），默认读取 RPC.DrainTimeout
+        """
         if not self._is_running:
             logger.warning("Flask 服务器未在运行")
             return
 
-        # Flask 在生产环境中停止比较复杂，这里使用 daemon 线程
-        # 当主程序退出时会自动停止
+        self.drain(drain_timeout)
+
+        try:
+            if self._backend == "waitress":
+                self._server.close()
+            else:
+                self._server.shutdown()
+        except Exception as e:
+            logger.error(f"关闭 HTTP 服务器失败: {e}", exc_info=True)
+
+        if self._server_thread:
+            self._server_thread.join(timeout=5)
+        self._server = None
+        self._server_thread = None
         self._is_running = False
         logger.info("Flask API 服务器已停止")
 
@@ -5,6 +5,9 @@ import logging
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+from .capacity import capacity_reporter
+from .event_bus import event_bus
+from .flask_server import flask_server
 from .rpc_handler import rpc_handler
 from .subtitize_executor import subtitize_executor
 from .task_manager import task_manager
@@ -34,10 +37,26 @@ class VideoCaptionerRPCService:
         rpc_handler.register_method("GetInfo", self.get_info)
         rpc_handler.register_method("GetStatus", self.get_status)
         rpc_handler.register_method("StartSubtitize", self.start_subtitize)
+        rpc_handler.register_method("StartSubtitizeBatch", self.start_subtitize_batch)
         rpc_handler.register_method("StopSubtitize", self.stop_subtitize)
+        rpc_handler.register_method("GetCapacity", self.get_capacity)
+        rpc_handler.register_method("AssignWork", self.assign_work)
 
         logger.info("VideoCaptioner RPC 服务方法已注册")
 
+    def resume_tasks(self) -> int:
+        """
+        恢复上次进程退出时未完成的任务（启动时调用）
+
+        Returns:
+            恢复的任务数
+        """
+        restored = task_manager.restore_tasks()
+        if restored:
+            subtitize_executor.start()
+            logger.info(f"已从任务日志恢复 {restored} 个未完成任务")
+        return restored
+
     # ==================== RPC 回调方法 ====================
 
     def _on_subtitize_progress(
@@ -61,9 +80,9 @@ class VideoCaptionerRPCService:
                 f"进度更新: task_id={task_id}, progress={current_progress}, state={current_state}"
             )
 
-            # 发送进度到 Master
-            rpc_handler.send_callback(
-                "SubtitizeProgress",
+            # 进度交给事件总线合并、限速后异步发送，不阻塞任务线程
+            event_bus.publish_progress(
+                task_id,
                 {
                     "task_id": task_id,
                     "current_progress": current_progress,
@@ -93,9 +112,10 @@ class VideoCaptionerRPCService:
         try:
             logger.info(f"任务完成: task_id={task_id}")
 
-            # 发送完成通知到 Master
-            rpc_handler.send_callback(
+            # 发送完成通知到 Master（保证按顺序送达）
+            event_bus.publish_terminal(
                 "SubtitizeCompleted",
+                task_id,
                 {
                     "task_id": task_id,
                     "video_path": video_path,
@@ -105,7 +125,8 @@ class VideoCaptionerRPCService:
             )
 
             # 清除任务
-            task_manager.clear_task()
+            task_manager.clear_task(task_id)
+            capacity_reporter.notify()
 
         except Exception as e:
             logger.error(f"发送完成回调失败: {e}", exc_info=True)
@@ -122,9 +143,10 @@ class VideoCaptionerRPCService:
         try:
             logger.error(f"任务失败: task_id={task_id}, fault={fault}")
 
-            # 发送失败通知到 Master
-            rpc_handler.send_callback(
+            # 发送失败通知到 Master（保证按顺序送达）
+            event_bus.publish_terminal(
                 "SubtitizeFaulted",
+                task_id,
                 {
                     "task_id": task_id,
                     "video_path": video_path,
@@ -133,7 +155,8 @@ class VideoCaptionerRPCService:
             )
 
             # 清除任务
-            task_manager.clear_task()
+            task_manager.clear_task(task_id)
+            capacity_reporter.notify()
 
         except Exception as e:
             logger.error(f"发送失败回调失败: {e}", exc_info=True)
@@ -161,37 +184,37 @@ class VideoCaptionerRPCService:
 
         Returns:
             应用状态字典
+                status: idle / busy
+                current_task: 最早开始运行的任务（兼容旧接口）
+                tasks: 所有排队中和运行中的任务
+                queue_length: 等待队列长度
         """
-        current_task = task_manager.get_current_task()
-
-        if current_task is None:
-            return {
-                "status": "idle",
-                "current_task": None,
-            }
+        tasks = [task for task in task_manager.get_tasks() if not task.is_finished]
+        running_tasks = [task for task in tasks if task.started_at is not None]
 
         return {
-            "status": "busy",
-            "current_task": {
-                "task_id": current_task.task_id,
-                "state": current_task.state.value,
-                "progress": current_task.current_progress,
-                "video_path": current_task.video_path,
-                "created_at": current_task.created_at.isoformat(),
-                "started_at": (
-                    current_task.started_at.isoformat()
-                    if current_task.started_at
-                    else None
-                ),
-            },
+            "status": "busy" if tasks else "idle",
+            "current_task": running_tasks[0].to_dict() if running_tasks else None,
+            "tasks": [task.to_dict() for task in tasks],
+            "queue_length": task_manager.get_queue_length(),
         }
 
+    def get_capacity(self) -> Dict[str, Any]:
+        """
+        获取 Worker 容量（空闲线程、已加载模型、设备、队列深度、吞吐量）
+
+        Returns:
+            容量信息字典，字段同 WorkerCapacity 消息
+        """
+        return capacity_reporter.get_capacity()
+
     def start_subtitize(
         self,
         video_path: str,
         raw_subtitle_path: str,
         translated_subtitle_path: str,
         language: Optional[str] = None,
+        priority: int = 0,
     ) -> int:
         """
         启动字幕化任务
@@ -202,13 +225,19 @@ class VideoCaptionerRPCService:
             translated_subtitle_path: 翻译字幕输出路径
             language: 转录语言（可选，ISO 语言代码如 'en', 'zh'，或语言名称如 '英语', '中文'）
                      如果不提供，将使用配置文件中的语言设置
+            priority: 优先级，数值越大越先执行（默认 0）
 
         Returns:
             task_id: 正数表示任务ID，负数表示错误代码
-                -1: 已有任务正在运行
+                -1: 等待队列已满
                 -2: 参数无效
                 -3: 启动执行器失败
+                -4: Worker 正在关闭
         """
+        if flask_server.is_draining:
+            logger.warning("Worker 正在关闭，拒绝新任务")
+            return -4
+
         try:
             logger.info(
                 f"收到 StartSubtitize 请求: video_path={video_path}, "
@@ -223,6 +252,7 @@ class VideoCaptionerRPCService:
                 raw_subtitle_path=raw_subtitle_path,
                 translated_subtitle_path=translated_subtitle_path,
                 language=language,
+                priority=priority,
             )
 
             if task_id < 0:
@@ -234,16 +264,77 @@ class VideoCaptionerRPCService:
 
             if not success:
                 logger.error(f"启动执行器失败: task_id={task_id}")
-                task_manager.clear_task()
+                # Master 尚未收到 task_id，撤销任务而不发送失败回调
+                task_manager.discard_task(task_id)
                 return -3  # 启动执行器失败
 
-            logger.info(f"任务已启动: task_id={task_id}")
+            logger.info(f"任务已入队: task_id={task_id}")
+            capacity_reporter.notify()
             return task_id
 
         except Exception as e:
             logger.exception(f"StartSubtitize 失败: {e}")
             return -2  # 参数无效或其他错误
 
+    def start_subtitize_batch(self, jobs: List[Dict[str, Any]]) -> List[int]:
+        """
+        批量启动字幕化任务
+
+        任务按优先级在 Worker 内部排队；视频内容和语言相同的任务只执行一次，
+        其余任务在其完成后复制字幕文件。
+
+        Args:
+            jobs: 任务列表，每项包含 video_path、raw_subtitle_path，
+                可选 translated_subtitle_path、language、priority
+
+        Returns:
+            与 jobs 一一对应的 task_id，负数为错误代码（同 start_subtitize）
+        """
+        if not isinstance(jobs, list):
+            logger.error(f"StartSubtitizeBatch 参数无效: {type(jobs)}")
+            return []
+
+        logger.info(f"收到 StartSubtitizeBatch 请求: {len(jobs)} 个任务")
+
+        if flask_server.is_draining:
+            logger.warning("Worker 正在关闭，拒绝新任务")
+            return [-4] * len(jobs)
+
+        try:
+            task_ids = task_manager.create_tasks(
+                [job if isinstance(job, dict) else {} for job in jobs]
+            )
+        except Exception as e:
+            logger.exception(f"StartSubtitizeBatch 失败: {e}")
+            return [-2] * len(jobs)
+
+        if any(task_id > 0 for task_id in task_ids):
+            subtitize_executor.start()
+            capacity_reporter.notify()
+
+        accepted = sum(1 for task_id in task_ids if task_id > 0)
+        logger.info(f"批量任务已入队: {accepted}/{len(jobs)}")
+        return task_ids
+
+    def assign_work(self, jobs: Optional[List[Dict[str, Any]]] = None) -> List[int]:
+        """
+        拉取模式下 Master 对 RequestWork 的应答
+
+        Args:
+            jobs: 分配的任务列表，格式同 start_subtitize_batch（为空表示暂无任务）
+
+        Returns:
+            与 jobs 一一对应的 task_id，负数为错误代码
+        """
+        try:
+            if not jobs:
+                logger.debug("Master 暂无可分配的任务")
+                return []
+            logger.info(f"收到 Master 分配的任务: {len(jobs)} 个")
+            return self.start_subtitize_batch(jobs)
+        finally:
+            capacity_reporter.on_work_assigned()
+
     def stop_subtitize(self, task_id: int) -> Dict[str, Any]:
         """
         停止字幕化任务
@@ -3,7 +3,7 @@
 
 import logging
 import threading
-from typing import Callable, Dict, Optional
+from typing import Callable, Dict, List, Optional
 from urllib.parse import urlparse
 
 from signalrcore.hub_connection_builder import HubConnectionBuilder
@@ -34,6 +34,8 @@ class SignalRClientManager:
         self._master_url: Optional[str] = None
         self._is_connected = False
         self._handlers: Dict[str, Callable] = {}
+        # 连接建立时调用的回调（如唤醒出站事件总线重发积压的事件）
+        self._connected_callbacks: List[Callable[[], None]] = []
         self._lock = threading.Lock()
         self._warned_methods = set()  # 记录已经警告过的方法
 
@@ -109,6 +111,7 @@ class SignalRClientManager:
                 self._is_connected = True
 
                 logger.info(f"成功连接到 Master: {master_url}")
+                self._notify_connected()
                 return True
 
             except Exception as e:
@@ -147,26 +150,40 @@ class SignalRClientManager:
 
         logger.info(f"已注册 SignalR 方法处理器: {method_name}")
 
-    def send(self, method_name: str, *args):
+    def add_connected_callback(self, callback: Callable[[], None]):
+        """
+        注册连接建立回调
+
+        Args:
+            callback: 无参回调，在连接成功或自动重连后调用
+        """
+        self._connected_callbacks.append(callback)
+
+    def send(self, method_name: str, *args) -> bool:
         """
         发送消息到 Master
 
         Args:
             method_name: 方法名称
             *args: 参数
+
+        Returns:
+            是否已交给连接发送（未连接或发送异常返回 False）
         """
         if not self._is_connected or not self._connection:
             # 只在首次遇到该方法时警告
             if method_name not in self._warned_methods:
                 logger.warning(f"未连接到 Master，无法发送消息: {method_name}")
                 self._warned_methods.add(method_name)
-            return
+            return False
 
         try:
             self._connection.send(method_name, args)
             logger.debug(f"已发送消息到 Master: {method_name}")
+            return True
         except Exception as e:
             logger.error(f"发送消息失败: {e}", exc_info=True)
+            return False
 
     def invoke(self, method_name: str, *args):
         """
@@ -200,6 +217,14 @@ class SignalRClientManager:
         self._is_connected = True
         # 清空警告记录，允许重新连接后显示新的警告
         self._warned_methods.clear()
+        self._notify_connected()
+
+    def _notify_connected(self):
+        for callback in self._connected_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"连接回调执行失败: {e}", exc_info=True)
 
     def _on_close(self):
         """连接关闭事件"""
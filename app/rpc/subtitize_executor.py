@@ -2,119 +2,415 @@
 """字幕化执行器 - 执行转录和字幕处理的核心逻辑"""
 
 import logging
+import queue
 import threading
+import wave
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 from app.common.config import cfg
 from app.core.asr import transcribe
 from app.core.asr.asr_data import ASRData
-from app.core.entities import SubtitleConfig, TranscribeConfig
+from app.core.asr.faster_whisper_python import preload_model
+from app.core.asr.model_registry import MB, model_registry
+from app.core.asr.pcm_stream import PCMStream
+from app.core.entities import (
+    LLMServiceEnum,
+    SubtitleConfig,
+    TranscribeConfig,
+    TranscribeModelEnum,
+    TranslatorServiceEnum,
+)
+from app.core.llm import llm_pool, llm_response_cache, llm_router, rate_limiters
+from app.core.llm.client import normalize_base_url
+from app.core.llm.router import LLMProvider
+from app.core.llm.usage import usage_scope
 from app.core.optimize.optimize import SubtitleOptimizer
+from app.core.split.segment_stream import SegmentStream
 from app.core.split.split import SubtitleSplitter
 from app.core.translate import BingTranslator, DeepLXTranslator, GoogleTranslator, LLMTranslator
+from app.core.utils.cancel import (
+    TaskCancelledError,
+    current_cancel_token,
+    run_cancellable,
+    submit_with_context,
+    wait_abandoned_runners,
+)
+from app.core.utils.checkpoint import Checkpoint
 from app.core.utils.logger import setup_logger
 from app.core.utils.video_utils import video2audio
 
+from .eta_estimator import (
+    STAGE_ASR,
+    STAGE_OPTIMIZE,
+    STAGE_SPLIT,
+    STAGE_TRANSLATE,
+    eta_estimator,
+)
 from .task_manager import SubtitizeTaskState, task_manager
 
 logger = setup_logger("subtitize_executor")
 
+# 流式模式下同时处理的字幕块数
+STREAM_BLOCK_CONCURRENCY = 3
+# 开始转录前等待已取消任务的转录线程退出的最长时间（秒）
+ABANDONED_TRANSCRIBE_WAIT_SECONDS = 30
+
 
 class SubtitizeExecutor:
-    """字幕化执行器 - 执行转录到字幕优化&翻译的完整流程"""
+    """字幕化执行器 - 执行转录到字幕优化&翻译的完整流程
+
+    按阶段流水线执行：转录阶段和字幕处理（断句/优化/翻译）阶段各自拥有
+    独立的工作线程和输入队列。转录线程从任务管理器的等待队列取任务，
+    完成后把任务投递到字幕处理队列，由字幕处理线程继续执行，
+    因此任务 B 的转录可以与任务 A 的字幕处理同时进行。
+
+    每个阶段在任务的取消作用域（CancelToken）内执行：停止任务时 ffmpeg/whisper
+    子进程被终止、LLM 线程池被关闭，工作线程不等待进行中的请求返回，立即处理下一个任务。
+
+    开启流式模式（RPC.StreamingSubtitle）后，任务在开始转录时就进入字幕处理队列，
+    转录过程中定稿的片段通过 SegmentStream 分块送入断句/优化/翻译，
+    整体耗时接近 max(转录, 字幕处理) 而不是两者之和。
+    """
 
     def __init__(self):
-        self._executor_thread: Optional[threading.Thread] = None
+        # 各阶段已启动的工作线程
+        self._workers: Dict[str, List[threading.Thread]] = {
+            "transcribe": [],
+            "subtitle": [],
+        }
+        self._workers_lock = threading.Lock()
+        # 字幕处理阶段的输入队列，元素为 (task_id, 原始字幕路径或流式片段流)
+        self._subtitle_queue: "queue.Queue[Tuple[int, Union[str, SegmentStream]]]" = (
+            queue.Queue()
+        )
+        # 各阶段正在执行任务的工作线程数
+        self._busy = {"transcribe": 0, "subtitle": 0}
+        self._busy_lock = threading.Lock()
+
+    def start(self):
+        """启动各阶段的工作线程（重复调用无副作用）"""
+        with self._workers_lock:
+            if any(self._workers.values()):
+                return
+
+            # 转录是 CPU/GPU 密集型，字幕处理主要等待 LLM 网络请求，并发数分别配置
+            transcribe_concurrency = cfg.get(cfg.rpc_transcribe_concurrency)
+            subtitle_concurrency = cfg.get(cfg.rpc_subtitle_concurrency)
+
+            for i in range(transcribe_concurrency):
+                self._spawn_worker(
+                    "transcribe",
+                    self._transcribe_worker_loop,
+                    f"transcribe-worker-{i + 1}",
+                )
+            for i in range(subtitle_concurrency):
+                self._spawn_worker(
+                    "subtitle", self._subtitle_worker_loop, f"subtitle-worker-{i + 1}"
+                )
+
+            logger.info(
+                f"字幕化流水线已启动: 转录线程={transcribe_concurrency}, "
+                f"字幕处理线程={subtitle_concurrency}"
+            )
+
+    def preload_models(self):
+        """后台预加载本地转录模型（服务启动时调用），第一个任务不必等待模型加载"""
+        if cfg.get(cfg.transcribe_model) != TranscribeModelEnum.FASTER_WHISPER_PYTHON:
+            return
+        if not cfg.get(cfg.faster_whisper_preload_model):
+            return
+
+        self._apply_model_memory_budget()
+        threading.Thread(
+            target=self._preload_model, name="model-preload", daemon=True
+        ).start()
+
+    @staticmethod
+    def _preload_model():
+        whisper_model = cfg.get(cfg.faster_whisper_model).value
+        try:
+            preload_model(
+                whisper_model,
+                model_dir=cfg.get(cfg.faster_whisper_model_dir) or None,
+                device=cfg.get(cfg.faster_whisper_device),
+            )
+            logger.info(f"转录模型已预加载: {whisper_model}")
+        except Exception as e:
+            logger.error(f"预加载转录模型失败: {e}", exc_info=True)
+
+    @staticmethod
+    def _apply_model_memory_budget():
+        """按配置更新进程内模型注册表的内存预算"""
+        model_registry.set_memory_budget(
+            cfg.get(cfg.faster_whisper_model_memory_budget) * MB
+        )
+
+    def _spawn_worker(self, stage: str, target, name: str):
+        worker = threading.Thread(target=target, name=name, daemon=True)
+        worker.start()
+        self._workers[stage].append(worker)
 
     def execute(self, task_id: int) -> bool:
         """
-        执行字幕化任务
+        确认任务已入队并确保工作线程在运行
 
         Args:
             task_id: 任务ID
 
         Returns:
-            是否成功启动
+            是否成功提交
         """
-        task = task_manager.get_current_task()
-        if task is None or task.task_id != task_id:
+        task = task_manager.get_task(task_id)
+        if task is None:
             logger.error(f"任务不存在: task_id={task_id}")
             return False
 
-        # 在新线程中执行任务
-        self._executor_thread = threading.Thread(
-            target=self._run_task, args=(task_id,), daemon=True
+        self.start()
+        return True
+
+    def get_stage_backlog(self) -> int:
+        """获取等待字幕处理的任务数"""
+        return self._subtitle_queue.qsize()
+
+    def get_slot_usage(self) -> Dict[str, Tuple[int, int]]:
+        """
+        获取各阶段的工作线程占用情况
+
+        Returns:
+            阶段（transcribe / subtitle）-> (忙碌线程数, 线程总数)
+            线程总数为实际运行中的工作线程数，流水线未启动时为 0
+        """
+        with self._workers_lock:
+            totals = {
+                stage: sum(1 for worker in workers if worker.is_alive())
+                for stage, workers in self._workers.items()
+            }
+        with self._busy_lock:
+            return {stage: (self._busy[stage], totals[stage]) for stage in totals}
+
+    def get_throughput(self) -> Dict[str, float]:
+        """当前配置下各阶段的历史吞吐量（转录为音频秒/秒，其余为片段/秒）"""
+        return {
+            stage: round(eta_estimator.get_throughput(stage_key, stage), 3)
+            for stage, stage_key in self._eta_stage_keys().items()
+        }
+
+    def _set_busy(self, stage: str, delta: int):
+        with self._busy_lock:
+            self._busy[stage] += delta
+
+    def _transcribe_worker_loop(self):
+        """转录阶段主循环：从等待队列取任务，转录后投递到字幕处理队列"""
+        while True:
+            task = task_manager.next_task()
+            if task is None:
+                continue
+
+            self._set_busy("transcribe", 1)
+            try:
+                if self._should_stream(task):
+                    # 流式模式：先把任务交给字幕处理阶段，再边转录边写入片段
+                    segment_stream = SegmentStream()
+                    self._subtitle_queue.put((task.task_id, segment_stream))
+                    self._run_transcribe_stage(task.task_id, segment_stream)
+                    continue
+
+                raw_subtitle_path = self._run_transcribe_stage(task.task_id)
+                if raw_subtitle_path:
+                    self._subtitle_queue.put((task.task_id, raw_subtitle_path))
+            finally:
+                self._set_busy("transcribe", -1)
+
+    @staticmethod
+    def _should_stream(task) -> bool:
+        """是否以流式模式执行该任务（已有中间结果时走普通流程直接复用）"""
+        if not cfg.get(cfg.rpc_streaming_subtitle):
+            return False
+        return not (
+            Path(task.raw_subtitle_path).exists()
+            or Path(task.translated_subtitle_path).exists()
         )
-        self._executor_thread.start()
 
-        return True
+    def _subtitle_worker_loop(self):
+        """字幕处理阶段主循环：从字幕处理队列取任务执行至完成"""
+        while True:
+            task_id, source = self._subtitle_queue.get()
+            self._set_busy("subtitle", 1)
+            try:
+                self._run_subtitle_stage(task_id, source)
+            finally:
+                self._set_busy("subtitle", -1)
+                self._subtitle_queue.task_done()
 
-    def _run_task(self, task_id: int):
+    def _run_transcribe_stage(
+        self, task_id: int, segment_stream: Optional[SegmentStream] = None
+    ) -> Optional[str]:
         """
-        在独立线程中运行任务
+        执行转录阶段 (0-50%)
 
         Args:
             task_id: 任务ID
+            segment_stream: 流式模式下接收定稿片段的片段流，结束时负责关闭
+
+        Returns:
+            原始字幕路径，失败或取消返回 None（失败时已标记任务状态）
         """
+        raw_subtitle_path = None
         try:
-            task = task_manager.get_current_task()
-            if task is None or task.task_id != task_id:
+            task = task_manager.get_task(task_id)
+            if task is None:
                 logger.error(f"任务不存在: task_id={task_id}")
-                return
+                return None
+
+            if task_manager.is_stop_requested(task_id):
+                logger.info(f"任务被取消: task_id={task_id}")
+                return None
 
             # 标记任务开始
-            task.started_at = datetime.now()
+            task_manager.mark_started(task_id)
+            eta_tracker = eta_estimator.track(task_id, self._eta_stage_keys())
+            eta_tracker.overlapped = segment_stream is not None
 
-            # 第一阶段：转录 (0-50%)
             logger.info(f"开始转录: task_id={task_id}")
             task_manager.update_progress(
-                0, SubtitizeTaskState.TRANSCRIBING, message="准备开始转录"
+                task_id, 0, SubtitizeTaskState.TRANSCRIBING, message="准备开始转录"
             )
 
-            raw_subtitle_path = self._transcribe(
-                task.video_path, task.raw_subtitle_path, task_id
+            # 已取消任务的转录线程可能仍占用模型/GPU（如 faster-whisper 进程内推理），
+            # 有限时地等待其退出后再开始
+            if not wait_abandoned_runners(
+                ABANDONED_TRANSCRIBE_WAIT_SECONDS, name=self._transcribe.__name__
+            ):
+                logger.warning(
+                    f"已取消任务的转录线程 {ABANDONED_TRANSCRIBE_WAIT_SECONDS}s 内未退出，"
+                    f"继续执行: task_id={task_id}"
+                )
+
+            raw_subtitle_path = run_cancellable(
+                task.cancel_token,
+                self._transcribe,
+                task.video_path,
+                task.raw_subtitle_path,
+                task_id,
+                segment_stream,
             )
 
-            if task_manager.is_stop_requested():
+            if task_manager.is_stop_requested(task_id):
                 logger.info(f"任务被取消: task_id={task_id}")
-                return
+                raw_subtitle_path = None
+                return None
 
             if not raw_subtitle_path:
-                task_manager.mark_failed("转录失败")
-                return
+                task_manager.mark_failed(task_id, "转录失败")
+                return None
 
-            # 第二阶段：字幕处理 (50-100%)
-            logger.info(f"开始字幕处理: task_id={task_id}")
             task_manager.update_progress(
-                5000, SubtitizeTaskState.OPTIMIZING, message="转录完成，开始处理字幕"
-            )
-
-            translated_subtitle_path = self._process_subtitle(
-                raw_subtitle_path,
-                task.video_path,
-                task.translated_subtitle_path,
                 task_id,
+                5000,
+                SubtitizeTaskState.OPTIMIZING,
+                message="转录完成，等待字幕处理",
             )
+            return raw_subtitle_path
 
-            if task_manager.is_stop_requested():
-                logger.info(f"任务被取消: task_id={task_id}")
-                return
+        except TaskCancelledError:
+            logger.info(f"任务被取消: task_id={task_id}")
+            raw_subtitle_path = None
+            return None
 
-            if not translated_subtitle_path:
-                task_manager.mark_failed("字幕处理失败")
-                return
+        except Exception as e:
+            logger.exception(f"转录阶段失败: task_id={task_id}, error={e}")
+            task_manager.mark_failed(task_id, str(e))
+            raw_subtitle_path = None
+            return None
+
+        finally:
+            # 流式模式由字幕处理阶段结束跟踪
+            if not raw_subtitle_path and segment_stream is None:
+                eta_estimator.untrack(task_id)
+            if segment_stream is not None:
+                if raw_subtitle_path:
+                    segment_stream.close()
+                else:
+                    segment_stream.fail("转录未完成")
 
-            # 任务完成
-            task_manager.mark_completed()
+    def _run_subtitle_stage(self, task_id: int, source: Union[str, SegmentStream]):
+        """
+        执行字幕处理阶段 (50-100%) 并标记任务结束
 
-        except Exception as e:
-            logger.exception(f"任务执行失败: task_id={task_id}, error={e}")
-            task_manager.mark_failed(str(e))
+        Args:
+            task_id: 任务ID
+            source: 转录阶段生成的原始字幕路径，或流式模式下的片段流
+        """
+        # 统计本任务所有 LLM 请求的用量（含命中服务商前缀缓存的 token）
+        with usage_scope() as task_usage:
+            try:
+                task = task_manager.get_task(task_id)
+                if task is None:
+                    logger.error(f"任务不存在: task_id={task_id}")
+                    return
+
+                if task_manager.is_stop_requested(task_id):
+                    logger.info(f"任务被取消: task_id={task_id}")
+                    return
+
+                if isinstance(source, SegmentStream):
+                    logger.info(f"开始流式字幕处理: task_id={task_id}")
+                    translated_subtitle_path = run_cancellable(
+                        task.cancel_token,
+                        self._process_subtitle_stream,
+                        source,
+                        task.translated_subtitle_path,
+                        task_id,
+                    )
+                else:
+                    logger.info(f"开始字幕处理: task_id={task_id}")
+                    task_manager.update_progress(
+                        task_id,
+                        5000,
+                        SubtitizeTaskState.OPTIMIZING,
+                        message="转录完成，开始处理字幕",
+                    )
+                    translated_subtitle_path = run_cancellable(
+                        task.cancel_token,
+                        self._process_subtitle,
+                        source,
+                        task.video_path,
+                        task.translated_subtitle_path,
+                        task_id,
+                    )
+
+                if task_manager.is_stop_requested(task_id):
+                    logger.info(f"任务被取消: task_id={task_id}")
+                    return
+
+                if not translated_subtitle_path:
+                    task_manager.mark_failed(task_id, "字幕处理失败")
+                    return
+
+                # 任务完成
+                task_manager.mark_completed(task_id)
+
+            except TaskCancelledError:
+                logger.info(f"任务被取消: task_id={task_id}")
+
+            except Exception as e:
+                logger.exception(f"字幕处理阶段失败: task_id={task_id}, error={e}")
+                task_manager.mark_failed(task_id, str(e))
+
+            finally:
+                eta_estimator.untrack(task_id)
+                if task_usage.calls:
+                    logger.info(f"LLM 用量: task_id={task_id}, {task_usage.summary()}")
 
     def _transcribe(
-        self, video_path: str, output_path: str, task_id: int
+        self,
+        video_path: str,
+        output_path: str,
+        task_id: int,
+        segment_stream: Optional[SegmentStream] = None,
     ) -> Optional[str]:
         """
         执行转录
@@ -123,6 +419,7 @@ class SubtitizeExecutor:
             video_path: 视频文件路径
             output_path: 输出字幕路径
             task_id: 任务ID
+            segment_stream: 流式模式下接收定稿片段的片段流
 
         Returns:
             生成的字幕文件路径，失败返回 None
@@ -135,13 +432,13 @@ class SubtitizeExecutor:
             if output_path_obj.exists():
                 logger.info(f"转录文件已存在，跳过转录: {output_path}")
                 task_manager.update_progress(
-                    5000, SubtitizeTaskState.OPTIMIZING, message="转录文件已存在，跳过转录"
+                    task_id, 5000, SubtitizeTaskState.OPTIMIZING, message="转录文件已存在，跳过转录"
                 )
                 return output_path
 
-            # 获取当前任务
-            task = task_manager.get_current_task()
-            if task is None or task.task_id != task_id:
+            # 获取任务
+            task = task_manager.get_task(task_id)
+            if task is None:
                 raise ValueError(f"任务不存在: task_id={task_id}")
 
             # 检查视频文件是否存在
@@ -159,13 +456,16 @@ class SubtitizeExecutor:
                 ),
                 need_word_time_stamp=True,
                 output_format=cfg.get(cfg.transcribe_output_format),
+                chunk_snap_to_silence=cfg.get(cfg.transcribe_chunk_snap_to_silence),
                 # Whisper Cpp 配置
                 whisper_model=cfg.get(cfg.whisper_model),
+                whisper_cpp_server_mode=cfg.get(cfg.whisper_cpp_server_mode),
                 # Whisper API 配置
                 whisper_api_key=cfg.get(cfg.whisper_api_key),
                 whisper_api_base=cfg.get(cfg.whisper_api_base),
                 whisper_api_model=cfg.get(cfg.whisper_api_model),
                 whisper_api_prompt=cfg.get(cfg.whisper_api_prompt),
+                whisper_api_max_concurrency=cfg.get(cfg.whisper_api_max_concurrency),
                 # Faster Whisper 配置
                 faster_whisper_program=cfg.get(cfg.faster_whisper_program),
                 faster_whisper_model=cfg.get(cfg.faster_whisper_model),
@@ -177,37 +477,60 @@ class SubtitizeExecutor:
                 faster_whisper_ff_mdx_kim2=cfg.get(cfg.faster_whisper_ff_mdx_kim2),
                 faster_whisper_one_word=cfg.get(cfg.faster_whisper_one_word),
                 faster_whisper_prompt=cfg.get(cfg.faster_whisper_prompt),
+                faster_whisper_batch_size=cfg.get(cfg.faster_whisper_batch_size),
             )
 
             logger.info(f"\n{transcribe_config.print_config()}")
+            self._apply_model_memory_budget()
             logger.info(f"faster_whisper_model_dir 配置值: '{transcribe_config.faster_whisper_model_dir}'")
 
-            # 创建临时音频文件
             task_manager.update_progress(
-                500, SubtitizeTaskState.TRANSCRIBING, message="准备音频文件"
+                task_id, 500, SubtitizeTaskState.TRANSCRIBING, message="准备音频文件"
             )
-            temp_audio_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-            temp_audio_path = temp_audio_file.name
-            temp_audio_file.close()
+            audio_stream = None
+            temp_audio_path = None
 
             try:
-                # 转换视频到音频
-                logger.info("开始转换音频")
-                is_success = video2audio(
-                    video_path,
-                    output=temp_audio_path,
-                    audio_track_index=0
-                )
+                if cfg.get(cfg.transcribe_stream_decode):
+                    # ffmpeg 解码输出经管道直接分块，每解码出一块就开始转录
+                    logger.info("开始流式解码音频")
+                    audio_stream = PCMStream(video_path, audio_track_index=0)
+                    audio_stream.open()
+                    audio_input = audio_stream
+                    duration_ms = audio_stream.duration_ms
+                    audio_duration = duration_ms / 1000 if duration_ms else None
+                else:
+                    # 先转换为完整的临时音频文件
+                    temp_audio_file = tempfile.NamedTemporaryFile(
+                        suffix=".wav", delete=False
+                    )
+                    temp_audio_path = temp_audio_file.name
+                    temp_audio_file.close()
+
+                    logger.info("开始转换音频")
+                    is_success = video2audio(
+                        video_path,
+                        output=temp_audio_path,
+                        audio_track_index=0
+                    )
+
+                    if not is_success:
+                        raise RuntimeError("音频转换失败")
 
-                if not is_success:
-                    raise RuntimeError("音频转换失败")
+                    audio_input = temp_audio_path
+                    audio_duration = self._get_wav_duration(temp_audio_path)
 
-                if task_manager.is_stop_requested():
+                if task_manager.is_stop_requested(task_id):
                     return None
 
+                eta_tracker = eta_estimator.get_tracker(task_id)
+                if audio_duration:
+                    eta_tracker.set_audio_duration(audio_duration)
+                eta_tracker.start_stage(STAGE_ASR)
+
                 # 执行转录
                 task_manager.update_progress(
-                    1000, SubtitizeTaskState.TRANSCRIBING, message="开始语音转录"
+                    task_id, 1000, SubtitizeTaskState.TRANSCRIBING, message="开始语音转录"
                 )
                 logger.info("开始语音转录")
 
@@ -215,22 +538,34 @@ class SubtitizeExecutor:
                     """进度回调"""
                     # 转录占 10-50%，所以进度映射到 1000-5000
                     current_progress = int(1000 + (progress / 100.0) * 4000)
+                    eta_tracker.update_stage(STAGE_ASR, progress / 100.0)
                     task_manager.update_progress(
+                        task_id,
                         current_progress,
                         SubtitizeTaskState.TRANSCRIBING,
                         message=message,  # 传递状态消息
+                        eta=eta_tracker.eta(),
                     )
 
+                # 实际送入引擎的音频时长（检查点和缓存复用的部分不计入吞吐量）
+                transcribed_ms: List[int] = []
+
                 # 调用转录函数
                 asr_data = transcribe(
-                    audio_path=temp_audio_path,
+                    audio_path=audio_input,
                     config=transcribe_config,
                     callback=progress_callback,
+                    segment_callback=segment_stream.put if segment_stream else None,
+                    checkpoint=task_manager.get_checkpoint(task_id),
+                    work_callback=transcribed_ms.append,
                 )
 
-                if task_manager.is_stop_requested():
+                if task_manager.is_stop_requested(task_id):
                     return None
 
+                eta_tracker.set_segment_count(len(asr_data.segments))
+                eta_tracker.finish_stage(STAGE_ASR, units=sum(transcribed_ms) / 1000)
+
                 # 保存字幕文件
                 output_path_obj = Path(output_path)
                 output_path_obj.parent.mkdir(parents=True, exist_ok=True)
@@ -245,13 +580,250 @@ class SubtitizeExecutor:
                 return str(output_path_obj)
 
             finally:
-                # 清理临时音频文件
-                Path(temp_audio_path).unlink(missing_ok=True)
+                # 结束解码进程，清理临时音频文件
+                if audio_stream is not None:
+                    audio_stream.close()
+                if temp_audio_path:
+                    Path(temp_audio_path).unlink(missing_ok=True)
+
+        except TaskCancelledError:
+            logger.info(f"转录已取消: task_id={task_id}")
+            return None
 
         except Exception as e:
             logger.exception(f"转录失败: {e}")
             return None
 
+    @staticmethod
+    def _get_wav_duration(audio_path: str) -> Optional[float]:
+        """读取 WAV 文件头获取音频时长（秒），失败返回 None"""
+        try:
+            with wave.open(audio_path, "rb") as wav:
+                return wav.getnframes() / float(wav.getframerate())
+        except Exception as e:
+            logger.warning(f"读取音频时长失败: {e}")
+            return None
+
+    def _eta_stage_keys(self) -> Dict[str, str]:
+        """根据当前配置生成各阶段的吞吐量历史 key（引擎/模型不同则分开统计）"""
+        transcribe_model = cfg.get(cfg.transcribe_model)
+        if transcribe_model == TranscribeModelEnum.WHISPER_CPP:
+            asr_model = cfg.get(cfg.whisper_model).value
+        elif transcribe_model in (
+            TranscribeModelEnum.FASTER_WHISPER,
+            TranscribeModelEnum.FASTER_WHISPER_PYTHON,
+        ):
+            asr_model = (
+                f"{cfg.get(cfg.faster_whisper_model).value}:"
+                f"{cfg.get(cfg.faster_whisper_device)}"
+            )
+            batch_size = cfg.get(cfg.faster_whisper_batch_size)
+            if transcribe_model == TranscribeModelEnum.FASTER_WHISPER_PYTHON and batch_size > 1:
+                # 批量推理吞吐量与逐段解码差异大，单独统计
+                asr_model += f":batch{batch_size}"
+        elif transcribe_model == TranscribeModelEnum.WHISPER_API:
+            asr_model = cfg.get(cfg.whisper_api_model)
+        else:
+            asr_model = ""
+        stage_keys = {STAGE_ASR: f"{STAGE_ASR}:{transcribe_model.name}:{asr_model}"}
+
+        _, _, llm_model = self._get_llm_settings()
+        if cfg.get(cfg.need_split):
+            stage_keys[STAGE_SPLIT] = f"{STAGE_SPLIT}:{llm_model}"
+        if cfg.get(cfg.need_optimize):
+            stage_keys[STAGE_OPTIMIZE] = f"{STAGE_OPTIMIZE}:{llm_model}"
+        if cfg.get(cfg.need_translate):
+            translator_service = cfg.get(cfg.translator_service)
+            translator_model = (
+                llm_model if translator_service == TranslatorServiceEnum.OPENAI else ""
+            )
+            stage_keys[STAGE_TRANSLATE] = (
+                f"{STAGE_TRANSLATE}:{translator_service.name}:{translator_model}"
+            )
+        return stage_keys
+
+    @staticmethod
+    def _get_llm_settings() -> Tuple[str, str, str]:
+        """根据当前 LLM 服务获取 (api_base, api_key, model)"""
+        return SubtitizeExecutor._get_service_settings(cfg.get(cfg.llm_service))
+
+    @staticmethod
+    def _get_service_settings(llm_service: LLMServiceEnum) -> Tuple[str, str, str]:
+        """获取指定 LLM 服务的 (api_base, api_key, model)"""
+        # 选择对应的 API base 和 key
+        if llm_service.value == "Ollama":
+            api_base = cfg.get(cfg.ollama_api_base)
+            api_key = cfg.get(cfg.ollama_api_key)
+            llm_model = cfg.get(cfg.ollama_model)
+        elif llm_service.value == "DeepSeek":
+            api_base = cfg.get(cfg.deepseek_api_base)
+            api_key = cfg.get(cfg.deepseek_api_key)
+            llm_model = cfg.get(cfg.deepseek_model)
+        elif llm_service.value == "SiliconCloud":
+            api_base = cfg.get(cfg.silicon_cloud_api_base)
+            api_key = cfg.get(cfg.silicon_cloud_api_key)
+            llm_model = cfg.get(cfg.silicon_cloud_model)
+        elif llm_service.value == "LM Studio":
+            api_base = cfg.get(cfg.lm_studio_api_base)
+            api_key = cfg.get(cfg.lm_studio_api_key)
+            llm_model = cfg.get(cfg.lm_studio_model)
+        elif llm_service.value == "Gemini":
+            api_base = cfg.get(cfg.gemini_api_base)
+            api_key = cfg.get(cfg.gemini_api_key)
+            llm_model = cfg.get(cfg.gemini_model)
+        elif llm_service.value == "ChatGLM":
+            api_base = cfg.get(cfg.chatglm_api_base)
+            api_key = cfg.get(cfg.chatglm_api_key)
+            llm_model = cfg.get(cfg.chatglm_model)
+        else:  # OpenAI (default)
+            api_base = cfg.get(cfg.openai_api_base)
+            api_key = cfg.get(cfg.openai_api_key)
+            llm_model = cfg.get(cfg.openai_model)
+        return api_base, api_key, llm_model
+
+    @staticmethod
+    def _get_service_rate_limits(llm_service: LLMServiceEnum) -> Tuple[int, int]:
+        """获取指定 LLM 服务配置的 (rpm, tpm) 上限，0 表示不限制"""
+        if llm_service.value == "Ollama":
+            rpm, tpm = cfg.ollama_requests_per_minute, cfg.ollama_tokens_per_minute
+        elif llm_service.value == "DeepSeek":
+            rpm, tpm = cfg.deepseek_requests_per_minute, cfg.deepseek_tokens_per_minute
+        elif llm_service.value == "SiliconCloud":
+            rpm = cfg.silicon_cloud_requests_per_minute
+            tpm = cfg.silicon_cloud_tokens_per_minute
+        elif llm_service.value == "LM Studio":
+            rpm, tpm = cfg.lm_studio_requests_per_minute, cfg.lm_studio_tokens_per_minute
+        elif llm_service.value == "Gemini":
+            rpm, tpm = cfg.gemini_requests_per_minute, cfg.gemini_tokens_per_minute
+        elif llm_service.value == "ChatGLM":
+            rpm, tpm = cfg.chatglm_requests_per_minute, cfg.chatglm_tokens_per_minute
+        else:  # OpenAI (default)
+            rpm, tpm = cfg.openai_requests_per_minute, cfg.openai_tokens_per_minute
+        return cfg.get(rpm), cfg.get(tpm)
+
+    @classmethod
+    def _get_llm_providers(cls) -> List[LLMProvider]:
+        """当前 LLM 服务及配置的备用服务（跳过未填写地址、密钥或模型的服务）"""
+        primary = cfg.get(cfg.llm_service)
+        services = [primary]
+        for name in cfg.get(cfg.llm_fallback_services) or []:
+            try:
+                service = LLMServiceEnum(name)
+            except ValueError:
+                logger.warning(f"未知的备用 LLM 服务: {name}")
+                continue
+            if service not in services:
+                services.append(service)
+
+        providers = []
+        for service in services:
+            api_base, api_key, llm_model = cls._get_service_settings(service)
+            if not (api_base and api_key and llm_model):
+                if service is primary:
+                    return []
+                continue
+            rpm, tpm = cls._get_service_rate_limits(service)
+            providers.append(
+                LLMProvider(
+                    name=service.value,
+                    base_url=normalize_base_url(api_base),
+                    api_key=api_key,
+                    model=llm_model,
+                    rpm=rpm,
+                    tpm=tpm,
+                )
+            )
+        return providers
+
+    def _build_subtitle_config(self) -> SubtitleConfig:
+        """从全局配置创建字幕处理配置，并配置 LLM 路由"""
+        # 根据 LLM 服务选择对应的 API 配置
+        api_base, api_key, llm_model = self._get_llm_settings()
+
+        subtitle_config = SubtitleConfig(
+            base_url=api_base,
+            api_key=api_key,
+            llm_model=llm_model,
+            deeplx_endpoint=cfg.get(cfg.deeplx_endpoint),
+            translator_service=cfg.get(cfg.translator_service),
+            need_translate=cfg.get(cfg.need_translate),
+            need_optimize=cfg.get(cfg.need_optimize),
+            need_reflect=cfg.get(cfg.need_reflect_translate),
+            thread_num=cfg.get(cfg.thread_num),
+            batch_size=cfg.get(cfg.batch_size),
+            subtitle_layout=cfg.get(cfg.subtitle_layout),
+            max_word_count_cjk=cfg.get(cfg.max_word_count_cjk),
+            max_word_count_english=cfg.get(cfg.max_word_count_english),
+            need_split=cfg.get(cfg.need_split),
+            target_language=cfg.get(cfg.target_language),
+            subtitle_style=cfg.get(cfg.subtitle_style_name),
+            custom_prompt_text=cfg.get(cfg.custom_prompt_text),
+        )
+
+        logger.info(f"\n{subtitle_config.print_config()}")
+
+        # 主服务与备用服务交给路由（按延迟与健康状况选择、对冲、故障切换）
+        providers = self._get_llm_providers()
+        llm_router.configure(providers, hedge=cfg.get(cfg.llm_hedge_requests))
+        llm_pool.set_max_concurrency(cfg.get(cfg.llm_max_concurrency))
+        llm_response_cache.set_size_limit(cfg.get(cfg.llm_cache_size_mb) * MB)
+        # 每个服务按各自配置限流；不再使用的服务清除配置的上限
+        rate_limiters.configure_endpoints(
+            {provider.base_url: (provider.rpm, provider.tpm) for provider in providers}
+        )
+
+        return subtitle_config
+
+    @staticmethod
+    def _create_translator(
+        subtitle_config: SubtitleConfig,
+        update_callback: Optional[Callable] = None,
+        checkpoint: Optional[Checkpoint] = None,
+    ):
+        """根据配置创建翻译器"""
+        if subtitle_config.translator_service == subtitle_config.translator_service.OPENAI:
+            return LLMTranslator(
+                thread_num=subtitle_config.thread_num,
+                batch_num=subtitle_config.batch_size,
+                target_language=subtitle_config.target_language,
+                model=subtitle_config.llm_model,
+                custom_prompt=subtitle_config.custom_prompt_text or "",
+                is_reflect=subtitle_config.need_reflect,
+                update_callback=update_callback,
+                checkpoint=checkpoint,
+            )
+        elif subtitle_config.translator_service == subtitle_config.translator_service.BING:
+            return BingTranslator(
+                thread_num=subtitle_config.thread_num,
+                batch_num=10,
+                target_language=subtitle_config.target_language,
+                update_callback=update_callback,
+                checkpoint=checkpoint,
+            )
+        elif subtitle_config.translator_service == subtitle_config.translator_service.GOOGLE:
+            return GoogleTranslator(
+                thread_num=subtitle_config.thread_num,
+                batch_num=5,
+                target_language=subtitle_config.target_language,
+                timeout=20,
+                update_callback=update_callback,
+                checkpoint=checkpoint,
+            )
+        elif subtitle_config.translator_service == subtitle_config.translator_service.DEEPLX:
+            import os
+            if subtitle_config.deeplx_endpoint:
+                os.environ["DEEPLX_ENDPOINT"] = subtitle_config.deeplx_endpoint
+            return DeepLXTranslator(
+                thread_num=subtitle_config.thread_num,
+                batch_num=5,
+                target_language=subtitle_config.target_language,
+                timeout=20,
+                update_callback=update_callback,
+                checkpoint=checkpoint,
+            )
+        else:
+            raise ValueError(f"不支持的翻译服务: {subtitle_config.translator_service}")
+
     def _process_subtitle(
         self,
         subtitle_path: str,
@@ -277,7 +849,7 @@ class SubtitizeExecutor:
             if output_path_obj.exists():
                 logger.info(f"处理后的字幕文件已存在，跳过处理: {output_path}")
                 task_manager.update_progress(
-                    10000, SubtitizeTaskState.COMPLETED, message="字幕文件已存在，跳过处理"
+                    task_id, 10000, SubtitizeTaskState.TRANSLATING, message="字幕文件已存在，跳过处理"
                 )
                 return output_path
 
@@ -286,71 +858,15 @@ class SubtitizeExecutor:
             if not subtitle_path_obj.exists():
                 raise ValueError(f"字幕文件不存在: {subtitle_path}")
 
-            # 创建字幕处理配置（从全局配置读取）
-            # 根据 LLM 服务选择对应的 API 配置
-            llm_service = cfg.get(cfg.llm_service)
-
-            # 选择对应的 API base 和 key
-            if llm_service.value == "Ollama":
-                api_base = cfg.get(cfg.ollama_api_base)
-                api_key = cfg.get(cfg.ollama_api_key)
-                llm_model = cfg.get(cfg.ollama_model)
-            elif llm_service.value == "DeepSeek":
-                api_base = cfg.get(cfg.deepseek_api_base)
-                api_key = cfg.get(cfg.deepseek_api_key)
-                llm_model = cfg.get(cfg.deepseek_model)
-            elif llm_service.value == "SiliconCloud":
-                api_base = cfg.get(cfg.silicon_cloud_api_base)
-                api_key = cfg.get(cfg.silicon_cloud_api_key)
-                llm_model = cfg.get(cfg.silicon_cloud_model)
-            elif llm_service.value == "LM Studio":
-                api_base = cfg.get(cfg.lm_studio_api_base)
-                api_key = cfg.get(cfg.lm_studio_api_key)
-                llm_model = cfg.get(cfg.lm_studio_model)
-            elif llm_service.value == "Gemini":
-                api_base = cfg.get(cfg.gemini_api_base)
-                api_key = cfg.get(cfg.gemini_api_key)
-                llm_model = cfg.get(cfg.gemini_model)
-            elif llm_service.value == "ChatGLM":
-                api_base = cfg.get(cfg.chatglm_api_base)
-                api_key = cfg.get(cfg.chatglm_api_key)
-                llm_model = cfg.get(cfg.chatglm_model)
-            else:  # OpenAI (default)
-                api_base = cfg.get(cfg.openai_api_base)
-                api_key = cfg.get(cfg.openai_api_key)
-                llm_model = cfg.get(cfg.openai_model)
-
-            subtitle_config = SubtitleConfig(
-                base_url=api_base,
-                api_key=api_key,
-                llm_model=llm_model,
-                deeplx_endpoint=cfg.get(cfg.deeplx_endpoint),
-                translator_service=cfg.get(cfg.translator_service),
-                need_translate=cfg.get(cfg.need_translate),
-                need_optimize=cfg.get(cfg.need_optimize),
-                need_reflect=cfg.get(cfg.need_reflect_translate),
-                thread_num=cfg.get(cfg.thread_num),
-                batch_size=cfg.get(cfg.batch_size),
-                subtitle_layout=cfg.get(cfg.subtitle_layout),
-                max_word_count_cjk=cfg.get(cfg.max_word_count_cjk),
-                max_word_count_english=cfg.get(cfg.max_word_count_english),
-                need_split=cfg.get(cfg.need_split),
-                target_language=cfg.get(cfg.target_language),
-                subtitle_style=cfg.get(cfg.subtitle_style_name),
-                custom_prompt_text=cfg.get(cfg.custom_prompt_text),
-            )
-
-            logger.info(f"\n{subtitle_config.print_config()}")
-
-            # 设置环境变量（LLM 客户端需要）
-            import os
-            if subtitle_config.base_url:
-                os.environ["OPENAI_BASE_URL"] = subtitle_config.base_url
-            if subtitle_config.api_key:
-                os.environ["OPENAI_API_KEY"] = subtitle_config.api_key
+            subtitle_config = self._build_subtitle_config()
+            checkpoint = task_manager.get_checkpoint(task_id)
+            # 取消任务时立即关闭各处理器的线程池
+            cancel_token = current_cancel_token()
 
             # 加载字幕数据
             asr_data = ASRData.from_subtitle_file(subtitle_path)
+            eta_tracker = eta_estimator.get_tracker(task_id)
+            eta_tracker.set_segment_count(len(asr_data.segments))
 
             current_progress_base = 5000  # 50%
 
@@ -358,10 +874,13 @@ class SubtitizeExecutor:
             if subtitle_config.need_split:
                 logger.info("开始分割字幕")
                 task_manager.update_progress(
+                    task_id,
                     current_progress_base,
                     SubtitizeTaskState.OPTIMIZING,
                     message="开始分割字幕",
+                    eta=eta_tracker.eta(),
                 )
+                eta_tracker.start_stage(STAGE_SPLIT)
 
                 # 如果不是字词级时间戳，先分割
                 if not asr_data.is_word_timestamp():
@@ -373,20 +892,27 @@ class SubtitizeExecutor:
                     model=subtitle_config.llm_model,
                     max_word_count_cjk=subtitle_config.max_word_count_cjk,
                     max_word_count_english=subtitle_config.max_word_count_english,
+                    checkpoint=checkpoint,
                 )
+                cancel_token.add_callback(splitter.stop)
                 asr_data = splitter.split_subtitle(asr_data)
+                eta_tracker.finish_stage(STAGE_SPLIT)
 
                 current_progress_base = 6000
 
-                if task_manager.is_stop_requested():
+                if task_manager.is_stop_requested(task_id):
                     return None
 
             # 2. 优化字幕 (60-70%)
             if subtitle_config.need_optimize:
                 logger.info("开始优化字幕")
                 task_manager.update_progress(
-                    current_progress_base, SubtitizeTaskState.OPTIMIZING
+                    task_id,
+                    current_progress_base,
+                    SubtitizeTaskState.OPTIMIZING,
+                    eta=eta_tracker.eta(),
                 )
+                eta_tracker.start_stage(STAGE_OPTIMIZE)
 
                 # 记录总字幕数和已处理数
                 total_segments = len(asr_data.segments)
@@ -399,8 +925,12 @@ class SubtitizeExecutor:
                     if total_segments > 0:
                         progress = processed_segments / total_segments
                         current_prog = int(6000 + progress * 1000)  # 6000-7000
+                        eta_tracker.update_stage(STAGE_OPTIMIZE, progress)
                         task_manager.update_progress(
-                            current_prog, SubtitizeTaskState.OPTIMIZING
+                            task_id,
+                            current_prog,
+                            SubtitizeTaskState.OPTIMIZING,
+                            eta=eta_tracker.eta(),
                         )
 
                 optimizer = SubtitleOptimizer(
@@ -409,21 +939,28 @@ class SubtitizeExecutor:
                     model=subtitle_config.llm_model,
                     custom_prompt=subtitle_config.custom_prompt_text or "",
                     update_callback=optimize_progress_callback,
+                    checkpoint=checkpoint,
                 )
+                cancel_token.add_callback(optimizer.stop)
 
                 asr_data = optimizer.optimize_subtitle(asr_data)
+                eta_tracker.finish_stage(STAGE_OPTIMIZE)
 
                 current_progress_base = 7000
 
-                if task_manager.is_stop_requested():
+                if task_manager.is_stop_requested(task_id):
                     return None
 
             # 3. 翻译字幕 (70-100%)
             if subtitle_config.need_translate:
                 logger.info("开始翻译字幕")
                 task_manager.update_progress(
-                    current_progress_base, SubtitizeTaskState.TRANSLATING
+                    task_id,
+                    current_progress_base,
+                    SubtitizeTaskState.TRANSLATING,
+                    eta=eta_tracker.eta(),
                 )
+                eta_tracker.start_stage(STAGE_TRANSLATE)
 
                 # 记录总字幕数和已处理数
                 total_segments = len(asr_data.segments)
@@ -436,53 +973,22 @@ class SubtitizeExecutor:
                     if total_segments > 0:
                         progress = processed_segments / total_segments
                         current_prog = int(7000 + progress * 3000)  # 7000-10000
+                        eta_tracker.update_stage(STAGE_TRANSLATE, progress)
                         task_manager.update_progress(
-                            current_prog, SubtitizeTaskState.TRANSLATING
+                            task_id,
+                            current_prog,
+                            SubtitizeTaskState.TRANSLATING,
+                            eta=eta_tracker.eta(),
                         )
 
-                # 根据配置创建翻译器
-                if subtitle_config.translator_service == subtitle_config.translator_service.OPENAI:
-                    translator = LLMTranslator(
-                        thread_num=subtitle_config.thread_num,
-                        batch_num=subtitle_config.batch_size,
-                        target_language=subtitle_config.target_language,
-                        model=subtitle_config.llm_model,
-                        custom_prompt=subtitle_config.custom_prompt_text or "",
-                        is_reflect=subtitle_config.need_reflect,
-                        update_callback=translate_progress_callback,
-                    )
-                elif subtitle_config.translator_service == subtitle_config.translator_service.BING:
-                    translator = BingTranslator(
-                        thread_num=subtitle_config.thread_num,
-                        batch_num=10,
-                        target_language=subtitle_config.target_language,
-                        update_callback=translate_progress_callback,
-                    )
-                elif subtitle_config.translator_service == subtitle_config.translator_service.GOOGLE:
-                    translator = GoogleTranslator(
-                        thread_num=subtitle_config.thread_num,
-                        batch_num=5,
-                        target_language=subtitle_config.target_language,
-                        timeout=20,
-                        update_callback=translate_progress_callback,
-                    )
-                elif subtitle_config.translator_service == subtitle_config.translator_service.DEEPLX:
-                    import os
-                    if subtitle_config.deeplx_endpoint:
-                        os.environ["DEEPLX_ENDPOINT"] = subtitle_config.deeplx_endpoint
-                    translator = DeepLXTranslator(
-                        thread_num=subtitle_config.thread_num,
-                        batch_num=5,
-                        target_language=subtitle_config.target_language,
-                        timeout=20,
-                        update_callback=translate_progress_callback,
-                    )
-                else:
-                    raise ValueError(f"不支持的翻译服务: {subtitle_config.translator_service}")
-
+                translator = self._create_translator(
+                    subtitle_config, translate_progress_callback, checkpoint
+                )
+                cancel_token.add_callback(translator.stop)
                 asr_data = translator.translate_subtitle(asr_data)
+                eta_tracker.finish_stage(STAGE_TRANSLATE)
 
-                if task_manager.is_stop_requested():
+                if task_manager.is_stop_requested(task_id):
                     return None
 
                 current_progress_base = 10000
@@ -501,10 +1007,170 @@ class SubtitizeExecutor:
             logger.info(f"字幕处理完成: {output_path}")
             return output_path
 
+        except TaskCancelledError:
+            logger.info(f"字幕处理已取消: task_id={task_id}")
+            return None
+
         except Exception as e:
             logger.exception(f"字幕处理失败: {e}")
             return None
 
+    def _process_subtitle_stream(
+        self,
+        segment_stream: SegmentStream,
+        output_path: str,
+        task_id: int,
+    ) -> Optional[str]:
+        """
+        流式处理字幕：逐块对转录中已定稿的片段执行分割、优化和翻译
+
+        转录进行期间进度由转录阶段上报，转录结束后按完成的块数上报 50-100%。
+        任一块处理失败时立即标记任务失败并取消任务作用域，不再等待转录结束。
+
+        Args:
+            segment_stream: 转录阶段写入的片段流
+            output_path: 输出字幕文件路径
+            task_id: 任务ID
+
+        Returns:
+            处理后的字幕文件路径，失败或取消返回 None
+        """
+        splitter = None
+        optimizer = None
+        translator = None
+        block_pool = ThreadPoolExecutor(max_workers=STREAM_BLOCK_CONCURRENCY)
+        cancel_token = current_cancel_token()
+
+        def stop_processors():
+            for processor in (splitter, optimizer, translator):
+                if processor is not None:
+                    processor.stop()
+            block_pool.shutdown(wait=False, cancel_futures=True)
+            # 唤醒等待片段的消费循环，转录阶段后续写入也随之失败
+            if not segment_stream.closed:
+                segment_stream.fail("字幕处理已停止")
+
+        def on_block_done(future: Future):
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is None or isinstance(error, TaskCancelledError):
+                return
+            if cancel_token.cancelled:
+                return
+            logger.error(f"字幕块处理失败，停止任务: task_id={task_id}, error={error}")
+            task_manager.mark_failed(task_id, f"字幕处理失败: {error}")
+            cancel_token.cancel()
+
+        try:
+            subtitle_config = self._build_subtitle_config()
+            checkpoint = task_manager.get_checkpoint(task_id)
+
+            # 同一任务的所有块共享处理器（及其线程池）
+            if subtitle_config.need_split:
+                splitter = SubtitleSplitter(
+                    thread_num=subtitle_config.thread_num,
+                    model=subtitle_config.llm_model,
+                    max_word_count_cjk=subtitle_config.max_word_count_cjk,
+                    max_word_count_english=subtitle_config.max_word_count_english,
+                    checkpoint=checkpoint,
+                )
+            if subtitle_config.need_optimize:
+                optimizer = SubtitleOptimizer(
+                    thread_num=subtitle_config.thread_num,
+                    batch_num=subtitle_config.batch_size,
+                    model=subtitle_config.llm_model,
+                    custom_prompt=subtitle_config.custom_prompt_text or "",
+                    checkpoint=checkpoint,
+                )
+            if subtitle_config.need_translate:
+                translator = self._create_translator(
+                    subtitle_config, checkpoint=checkpoint
+                )
+            cancel_token.add_callback(stop_processors)
+
+            # 字幕处理各阶段与转录同时开始，按完成的块数统一更新
+            eta_tracker = eta_estimator.get_tracker(task_id)
+            subtitle_stages = [
+                stage
+                for stage, processor in (
+                    (STAGE_SPLIT, splitter),
+                    (STAGE_OPTIMIZE, optimizer),
+                    (STAGE_TRANSLATE, translator),
+                )
+                if processor is not None
+            ]
+            for stage in subtitle_stages:
+                eta_tracker.start_stage(stage)
+
+            def process_block(block: List) -> ASRData:
+                cancel_token.raise_if_cancelled()
+                asr_data = ASRData(block)
+                if splitter:
+                    if not asr_data.is_word_timestamp():
+                        asr_data.split_to_word_segments()
+                    asr_data = splitter.split_subtitle(asr_data)
+                if optimizer:
+                    asr_data = optimizer.optimize_subtitle(asr_data)
+                if translator:
+                    asr_data = translator.translate_subtitle(asr_data)
+                return asr_data
+
+            futures = []
+            for block in segment_stream:
+                if task_manager.is_stop_requested(task_id):
+                    return None
+                logger.info(
+                    f"收到字幕块 {len(futures) + 1}: {len(block)} 个片段, task_id={task_id}"
+                )
+                future = submit_with_context(block_pool, process_block, block)
+                future.add_done_callback(on_block_done)
+                futures.append(future)
+
+            # 片段流结束即转录完成，开始按块上报进度
+            segments = []
+            total_blocks = len(futures)
+            for i, future in enumerate(futures, 1):
+                segments.extend(future.result().segments)
+                if task_manager.is_stop_requested(task_id):
+                    return None
+                for stage in subtitle_stages:
+                    eta_tracker.update_stage(stage, i / total_blocks)
+                task_manager.update_progress(
+                    task_id,
+                    int(5000 + i / total_blocks * 5000),
+                    SubtitizeTaskState.TRANSLATING,
+                    message=f"字幕处理 {i}/{total_blocks}",
+                    eta=eta_tracker.eta(),
+                )
+            for stage in subtitle_stages:
+                eta_tracker.finish_stage(stage)
+
+            # 保存最终字幕文件
+            output_path_obj = Path(output_path)
+            output_path_obj.parent.mkdir(parents=True, exist_ok=True)
+
+            ASRData(segments).save(
+                save_path=output_path,
+                ass_style=subtitle_config.subtitle_style or "",
+                layout=subtitle_config.subtitle_layout,
+            )
+
+            logger.info(f"流式字幕处理完成: {output_path}")
+            return output_path
+
+        except TaskCancelledError:
+            logger.info(f"流式字幕处理已取消: task_id={task_id}")
+            return None
+
+        except Exception as e:
+            logger.exception(f"流式字幕处理失败: {e}")
+            return None
+
+        finally:
+            cancel_token.remove_callback(stop_processors)
+            stop_processors()
+
 
 # 全局执行器实例
 subtitize_executor = SubtitizeExecutor()
@@ -0,0 +1,322 @@
+# coding:utf-8
+"""任务日志 - 基于 SQLite 持久化字幕化任务及其阶段检查点
+
+Worker 进程退出后，未完成的任务和已完成的 ASR 分块、断句分组、
+优化批次、翻译批次都保存在磁盘上，重启后从断点继续执行。
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.config import APPDATA_PATH
+from app.core.utils.checkpoint import Checkpoint
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_PATH = APPDATA_PATH / "task_journal.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id INTEGER PRIMARY KEY,
+    video_path TEXT NOT NULL,
+    raw_subtitle_path TEXT NOT NULL,
+    translated_subtitle_path TEXT NOT NULL,
+    language TEXT,
+    state TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    error TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    content_key TEXT,
+    duplicate_of INTEGER
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    task_id INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (task_id, stage, key)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# 旧版本日志中 tasks 表缺少的列（打开时补齐）
+_TASK_COLUMNS_ADDED = {
+    "priority": "INTEGER NOT NULL DEFAULT 0",
+    "content_key": "TEXT",
+    "duplicate_of": "INTEGER",
+}
+
+
+class TaskCheckpoint(Checkpoint):
+    """绑定到单个任务的检查点存储"""
+
+    def __init__(self, journal: "TaskJournal", task_id: int):
+        self._journal = journal
+        self._task_id = task_id
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        return self._journal.get_checkpoint(self._task_id, stage, key)
+
+    def put(self, stage: str, key: str, value: Any) -> None:
+        self._journal.put_checkpoint(self._task_id, stage, key, value)
+
+
+class TaskJournal:
+    """任务日志（单例模式）
+
+    所有写操作都在一个连接上串行执行，WAL 模式保证进程崩溃时已提交的记录不丢失。
+    写入失败只记录日志，不影响任务本身的执行。
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, db_path: Path = JOURNAL_PATH):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self._db_path = Path(db_path)
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """延迟打开数据库连接（调用方需持有 _db_lock）"""
+        if self._conn is None:
+            self._db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self._db_path), check_same_thread=False, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+            for name, definition in _TASK_COLUMNS_ADDED.items():
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE tasks ADD COLUMN {name} {definition}")
+            self._conn = conn
+            logger.info(f"任务日志已打开: {self._db_path}")
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._db_lock:
+            conn = self._connect()
+            cursor = conn.execute(sql, params)
+            return cursor.fetchall()
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ==================== 任务 ====================
+
+    def record_task(
+        self,
+        task_id: int,
+        video_path: str,
+        raw_subtitle_path: str,
+        translated_subtitle_path: str,
+        language: Optional[str],
+        state: str,
+        created_at: datetime,
+        priority: int = 0,
+        content_key: Optional[str] = None,
+        duplicate_of: Optional[int] = None,
+    ):
+        """记录新任务，同时更新最大任务ID"""
+        now = datetime.now().isoformat()
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                conn.execute("BEGIN")
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO tasks (task_id, video_path, raw_subtitle_path, "
+                        "translated_subtitle_path, language, state, created_at, updated_at, "
+                        "priority, content_key, duplicate_of) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            task_id,
+                            video_path,
+                            raw_subtitle_path,
+                            translated_subtitle_path,
+                            language,
+                            state,
+                            created_at.isoformat(),
+                            now,
+                            priority,
+                            content_key,
+                            duplicate_of,
+                        ),
+                    )
+                    conn.execute(
+                        "INSERT INTO meta (name, value) VALUES ('last_task_id', ?) "
+                        "ON CONFLICT(name) DO UPDATE SET value = MAX(CAST(value AS INTEGER), excluded.value)",
+                        (task_id,),
+                    )
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+        except Exception as e:
+            logger.error(f"记录任务失败: task_id={task_id}, error={e}")
+
+    def update_task_state(self, task_id: int, state: str, error: Optional[str] = None):
+        """更新任务状态"""
+        try:
+            self._execute(
+                "UPDATE tasks SET state = ?, error = ?, updated_at = ? WHERE task_id = ?",
+                (state, error, datetime.now().isoformat(), task_id),
+            )
+        except Exception as e:
+            logger.error(f"更新任务状态失败: task_id={task_id}, error={e}")
+
+    def update_duplicate_of(self, task_id: int, duplicate_of: Optional[int]):
+        """更新重复任务等待的主任务（None 表示转为独立执行）"""
+        try:
+            self._execute(
+                "UPDATE tasks SET duplicate_of = ?, updated_at = ? WHERE task_id = ?",
+                (duplicate_of, datetime.now().isoformat(), task_id),
+            )
+        except Exception as e:
+            logger.error(f"更新重复任务记录失败: task_id={task_id}, error={e}")
+
+    def finish_task(self, task_id: int, state: str, error: Optional[str] = None):
+        """任务结束：更新状态并删除其检查点"""
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                conn.execute("BEGIN")
+                try:
+                    conn.execute(
+                        "UPDATE tasks SET state = ?, error = ?, updated_at = ? WHERE task_id = ?",
+                        (state, error, datetime.now().isoformat(), task_id),
+                    )
+                    conn.execute("DELETE FROM checkpoints WHERE task_id = ?", (task_id,))
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+        except Exception as e:
+            logger.error(f"结束任务记录失败: task_id={task_id}, error={e}")
+
+    def load_unfinished_tasks(self, finished_states: List[str]) -> List[Dict[str, Any]]:
+        """
+        读取未结束的任务（按任务ID排序）
+
+        Args:
+            finished_states: 视为已结束的状态值
+
+        Returns:
+            任务字段字典列表
+        """
+        placeholders = ",".join("?" for _ in finished_states)
+        rows = self._execute(
+            "SELECT task_id, video_path, raw_subtitle_path, translated_subtitle_path, "
+            "language, state, created_at, priority, content_key, duplicate_of "
+            f"FROM tasks WHERE state NOT IN ({placeholders}) "
+            "ORDER BY task_id",
+            tuple(finished_states),
+        )
+        return [
+            {
+                "task_id": row[0],
+                "video_path": row[1],
+                "raw_subtitle_path": row[2],
+                "translated_subtitle_path": row[3],
+                "language": row[4],
+                "state": row[5],
+                "created_at": datetime.fromisoformat(row[6]),
+                "priority": row[7],
+                "content_key": row[8],
+                "duplicate_of": row[9],
+            }
+            for row in rows
+        ]
+
+    def get_last_task_id(self) -> int:
+        """获取已分配过的最大任务ID"""
+        rows = self._execute("SELECT value FROM meta WHERE name = 'last_task_id'")
+        return int(rows[0][0]) if rows else 0
+
+    def prune_finished_tasks(self, finished_states: List[str], keep_days: int = 7):
+        """删除超过保留期限的已结束任务记录"""
+        placeholders = ",".join("?" for _ in finished_states)
+        cutoff = datetime.fromtimestamp(
+            datetime.now().timestamp() - keep_days * 86400
+        ).isoformat()
+        try:
+            self._execute(
+                f"DELETE FROM tasks WHERE state IN ({placeholders}) AND updated_at < ?",
+                (*finished_states, cutoff),
+            )
+        except Exception as e:
+            logger.error(f"清理任务记录失败: {e}")
+
+    # ==================== 检查点 ====================
+
+    def checkpoint(self, task_id: int) -> TaskCheckpoint:
+        """获取绑定到指定任务的检查点存储"""
+        return TaskCheckpoint(self, task_id)
+
+    def get_checkpoint(self, task_id: int, stage: str, key: str) -> Optional[Any]:
+        """读取检查点"""
+        try:
+            rows = self._execute(
+                "SELECT value FROM checkpoints WHERE task_id = ? AND stage = ? AND key = ?",
+                (task_id, stage, key),
+            )
+        except Exception as e:
+            logger.error(f"读取检查点失败: task_id={task_id}, stage={stage}, error={e}")
+            return None
+        return json.loads(rows[0][0]) if rows else None
+
+    def put_checkpoint(self, task_id: int, stage: str, key: str, value: Any):
+        """写入检查点"""
+        try:
+            self._execute(
+                "INSERT OR REPLACE INTO checkpoints (task_id, stage, key, value, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    task_id,
+                    stage,
+                    key,
+                    json.dumps(value, ensure_ascii=False),
+                    datetime.now().isoformat(),
+                ),
+            )
+        except Exception as e:
+            logger.error(f"写入检查点失败: task_id={task_id}, stage={stage}, error={e}")
+
+    def count_checkpoints(self, task_id: int) -> Dict[str, int]:
+        """统计指定任务各阶段的检查点数量"""
+        rows = self._execute(
+            "SELECT stage, COUNT(*) FROM checkpoints WHERE task_id = ? GROUP BY stage",
+            (task_id,),
+        )
+        return {row[0]: row[1] for row in rows}
+
+
+# 全局单例实例
+task_journal = TaskJournal()
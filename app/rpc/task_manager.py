@@ -1,16 +1,30 @@
 # coding:utf-8
-"""字幕化任务管理器 - 管理单个字幕化任务的执行"""
+"""字幕化任务管理器 - 管理字幕化任务队列及每个任务的状态"""
 
+import functools
+import hashlib
+import heapq
+import itertools
 import logging
+import os
+import shutil
 import threading
-import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Callable, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.common.config import cfg
+from app.core.utils.cancel import CancelToken
+from app.core.utils.checkpoint import NULL_CHECKPOINT, Checkpoint
+
+from .task_journal import task_journal
 
 logger = logging.getLogger(__name__)
 
+# 内容指纹在文件头、尾各读取的字节数
+FINGERPRINT_SAMPLE_SIZE = 64 * 1024
+
 
 class SubtitizeTaskState(Enum):
     """字幕化任务状态"""
@@ -25,6 +39,14 @@ class SubtitizeTaskState(Enum):
     CANCELLED = "cancelled"  # 取消
 
 
+# 终止状态（任务不再运行）
+FINISHED_STATES = (
+    SubtitizeTaskState.COMPLETED,
+    SubtitizeTaskState.FAILED,
+    SubtitizeTaskState.CANCELLED,
+)
+
+
 @dataclass
 class SubtitizeTask:
     """字幕化任务"""
@@ -34,6 +56,11 @@ class SubtitizeTask:
     raw_subtitle_path: str
     translated_subtitle_path: str
     language: Optional[str] = None  # 转录语言（可选）
+    priority: int = 0  # 优先级，数值越大越先执行
+
+    # 输入去重：与运行中的任务输入相同时，等待其完成后直接复制结果
+    content_key: Optional[str] = field(default=None, repr=False)
+    duplicate_of: Optional[int] = None
 
     # 任务状态
     state: SubtitizeTaskState = SubtitizeTaskState.QUEUED
@@ -49,13 +76,45 @@ class SubtitizeTask:
     # 错误信息
     error: Optional[str] = None
 
+    # 取消作用域（每个任务独立）：停止时终止子进程并关闭 LLM 线程池
+    cancel_token: CancelToken = field(
+        default_factory=CancelToken, repr=False, compare=False
+    )
+
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = datetime.now()
 
+    @property
+    def is_finished(self) -> bool:
+        """任务是否已结束"""
+        return self.state in FINISHED_STATES
+
+    def to_dict(self) -> dict:
+        """转换为状态查询用的字典"""
+        return {
+            "task_id": self.task_id,
+            "state": self.state.value,
+            "progress": self.current_progress,
+            "message": self.current_message,
+            "video_path": self.video_path,
+            "priority": self.priority,
+            "duplicate_of": self.duplicate_of,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "eta": self.eta.isoformat() if self.eta else None,
+        }
+
 
 class SubtitizeTaskManager:
-    """字幕化任务管理器（单例模式）- 每次只运行一个任务"""
+    """字幕化任务管理器（单例模式）
+
+    维护一个有界的优先级等待队列和按 task_id 索引的任务表，
+    执行器的工作线程从队列中取任务执行（优先级高者先执行，同优先级按提交顺序）。
+
+    同一视频文件（未被修改）且转录语言相同的任务只执行一次：后提交的任务标记为 duplicate_of，
+    不进入等待队列，主任务完成后复制其字幕文件并一同完成。
+    """
 
     _instance = None
     _lock = threading.Lock()
@@ -73,10 +132,20 @@ class SubtitizeTaskManager:
             return
 
         self._initialized = True
-        self._current_task: Optional[SubtitizeTask] = None
+        self._tasks: Dict[int, SubtitizeTask] = {}
+        # 等待队列：(-priority, 入队序号, task_id) 小顶堆；_pending_ids 为仍在排队的任务
+        self._pending: List[Tuple[int, int, int]] = []
+        self._pending_ids: Set[int] = set()
+        self._enqueue_seq = itertools.count()
+        # 内容指纹 -> 主任务ID，主任务ID -> 等待其结果的重复任务
+        self._primary_by_key: Dict[str, int] = {}
+        self._duplicates: Dict[int, List[int]] = {}
         self._task_id_counter = 0
         self._task_lock = threading.Lock()
-        self._stop_event = threading.Event()
+        self._task_available = threading.Condition(self._task_lock)
+
+        # 任务日志（持久化任务和检查点）
+        self._journal = task_journal if cfg.get(cfg.rpc_task_journal) else None
 
         # 回调函数
         self._on_progress: Optional[
@@ -111,66 +180,291 @@ class SubtitizeTaskManager:
             raw_subtitle_path: str,
             translated_subtitle_path: str,
             language: Optional[str] = None,
+            priority: int = 0,
     ) -> int:
         """
-        创建新任务
+        创建新任务并加入等待队列
 
         Args:
             video_path: 视频文件路径
             raw_subtitle_path: 原始字幕输出路径
             translated_subtitle_path: 翻译字幕输出路径
             language: 转录语言（可选）
+            priority: 优先级，数值越大越先执行
 
         Returns:
             task_id: 正数表示任务ID，负数表示错误代码
-                -1: 已有任务正在运行
+                -1: 等待队列已满
                 -2: 参数无效
         """
+        # 参数无效或队列已满时不读取文件；指纹在锁外计算
+        with self._task_lock:
+            accepted = self._free_queue_slots_locked() > 0
+        content_key = (
+            compute_content_key(video_path, language)
+            if accepted and _is_valid_job(video_path, raw_subtitle_path)
+            else None
+        )
         with self._task_lock:
-            # 检查是否已有任务正在运行
-            if self._current_task is not None and self._current_task.state not in [
-                SubtitizeTaskState.COMPLETED,
-                SubtitizeTaskState.FAILED,
-                SubtitizeTaskState.CANCELLED,
-            ]:
-                logger.warning(f"已有任务正在运行: task_id={self._current_task.task_id}")
-                return -1  # 已有任务正在运行
-
-            # 验证参数
-            if not video_path or not raw_subtitle_path:
-                logger.error("参数无效: video_path 或 raw_subtitle_path 为空")
-                return -2  # 参数无效
-
-            # 生成新的任务ID
-            self._task_id_counter += 1
-            task_id = self._task_id_counter
-
-            # 创建新任务
-            self._current_task = SubtitizeTask(
-                task_id=task_id,
-                video_path=video_path,
-                raw_subtitle_path=raw_subtitle_path,
-                translated_subtitle_path=translated_subtitle_path,
-                language=language,
+            return self._create_task_locked(
+                video_path,
+                raw_subtitle_path,
+                translated_subtitle_path,
+                language,
+                priority,
+                content_key,
             )
 
-            # 重置停止事件
-            self._stop_event.clear()
+    def create_tasks(self, jobs: List[Dict[str, Any]]) -> List[int]:
+        """
+        批量创建任务（一次加锁，按优先级入队）
+
+        Args:
+            jobs: 任务参数列表，每项包含 video_path、raw_subtitle_path，
+                可选 translated_subtitle_path、language、priority
 
-            logger.info(
-                f"创建新任务: task_id={task_id}, video_path={video_path}, "
-                f"raw_subtitle_path={raw_subtitle_path}, translated_subtitle_path={translated_subtitle_path}"
+        Returns:
+            与 jobs 一一对应的 task_id 或错误代码（同 create_task）
+        """
+        # 指纹计算涉及文件读取，在锁外完成；只为队列放得下的有效任务计算，
+        # 超出名额的任务不读取文件（不参与去重）
+        with self._task_lock:
+            free_slots = self._free_queue_slots_locked()
+        content_keys = []
+        for job in jobs:
+            video_path = job.get("video_path")
+            if free_slots <= 0 or not _is_valid_job(
+                video_path, job.get("raw_subtitle_path")
+            ):
+                content_keys.append(None)
+                continue
+            free_slots -= 1
+            content_keys.append(compute_content_key(video_path, job.get("language")))
+        with self._task_lock:
+            return [
+                self._create_task_locked(
+                    job.get("video_path"),
+                    job.get("raw_subtitle_path"),
+                    job.get("translated_subtitle_path") or "",
+                    job.get("language"),
+                    _parse_priority(job.get("priority")),
+                    content_key,
+                )
+                for job, content_key in zip(jobs, content_keys)
+            ]
+
+    def _create_task_locked(
+            self,
+            video_path: str,
+            raw_subtitle_path: str,
+            translated_subtitle_path: str,
+            language: Optional[str],
+            priority: int,
+            content_key: Optional[str],
+    ) -> int:
+        """创建任务（调用方需持有 _task_lock）"""
+        # 验证参数
+        if not _is_valid_job(video_path, raw_subtitle_path):
+            logger.error("参数无效: video_path 或 raw_subtitle_path 为空")
+            return -2  # 参数无效
+
+        # 相同输入的任务正在排队或运行：不重复执行
+        primary_id = self._primary_by_key.get(content_key) if content_key else None
+        primary = self._tasks.get(primary_id) if primary_id is not None else None
+        is_duplicate = primary is not None and not primary.is_finished
+
+        # 检查等待队列是否已满（重复任务不占用队列）
+        if not is_duplicate and self._free_queue_slots_locked() <= 0:
+            logger.warning(
+                f"等待队列已满: {len(self._pending_ids)}/{cfg.get(cfg.rpc_max_queue_size)}"
+            )
+            return -1  # 队列已满
+
+        # 生成新的任务ID
+        self._task_id_counter += 1
+        task_id = self._task_id_counter
+
+        # 创建新任务
+        task = SubtitizeTask(
+            task_id=task_id,
+            video_path=video_path,
+            raw_subtitle_path=raw_subtitle_path,
+            translated_subtitle_path=translated_subtitle_path,
+            language=language,
+            priority=priority,
+            content_key=content_key,
+            duplicate_of=primary_id if is_duplicate else None,
+        )
+        self._tasks[task_id] = task
+        if self._journal:
+            self._journal.record_task(
+                task_id,
+                video_path,
+                raw_subtitle_path,
+                translated_subtitle_path,
+                language,
+                task.state.value,
+                task.created_at,
+                priority=priority,
+                content_key=content_key,
+                duplicate_of=task.duplicate_of,
             )
 
+        if is_duplicate:
+            self._duplicates.setdefault(primary_id, []).append(task_id)
+            logger.info(
+                f"创建重复任务: task_id={task_id}, 输入与 task_id={primary_id} 相同，"
+                f"将复用其结果"
+            )
             return task_id
 
-    def get_current_task(self) -> Optional[SubtitizeTask]:
-        """获取当前任务"""
-        return self._current_task
+        if content_key:
+            self._primary_by_key[content_key] = task_id
+        self._enqueue_locked(task)
+
+        logger.info(
+            f"创建新任务: task_id={task_id}, video_path={video_path}, "
+            f"raw_subtitle_path={raw_subtitle_path}, translated_subtitle_path={translated_subtitle_path}, "
+            f"priority={priority}, 排队数={len(self._pending_ids)}"
+        )
+
+        return task_id
+
+    def _free_queue_slots_locked(self) -> int:
+        """等待队列剩余名额（调用方需持有 _task_lock）"""
+        return cfg.get(cfg.rpc_max_queue_size) - len(self._pending_ids)
+
+    def _enqueue_locked(self, task: SubtitizeTask):
+        """加入等待队列（调用方需持有 _task_lock）"""
+        heapq.heappush(
+            self._pending, (-task.priority, next(self._enqueue_seq), task.task_id)
+        )
+        self._pending_ids.add(task.task_id)
+        self._task_available.notify()
+
+    def restore_tasks(self) -> int:
+        """
+        从任务日志恢复上次进程退出时未完成的任务（保持原 task_id 重新入队）
+
+        优先级与去重关系一并恢复：等待主任务结果的重复任务不入队；
+        主任务已不在未完成列表中时，重复任务转为独立执行。
+
+        Returns:
+            恢复的任务数
+        """
+        if not self._journal:
+            return 0
+
+        finished_values = [state.value for state in FINISHED_STATES]
+        try:
+            self._journal.prune_finished_tasks(finished_values)
+            last_task_id = self._journal.get_last_task_id()
+            records = self._journal.load_unfinished_tasks(finished_values)
+        except Exception as e:
+            logger.error(f"读取任务日志失败: {e}", exc_info=True)
+            return 0
+
+        restored = 0
+        with self._task_lock:
+            # 新任务ID从历史最大值之后开始，避免与 Master 端已知的ID冲突
+            self._task_id_counter = max(self._task_id_counter, last_task_id)
+
+            restored_tasks = []
+            for record in records:
+                task_id = record["task_id"]
+                if task_id in self._tasks:
+                    continue
+
+                task = SubtitizeTask(
+                    task_id=task_id,
+                    video_path=record["video_path"],
+                    raw_subtitle_path=record["raw_subtitle_path"],
+                    translated_subtitle_path=record["translated_subtitle_path"],
+                    language=record["language"],
+                    created_at=record["created_at"],
+                    priority=record["priority"],
+                    content_key=record["content_key"],
+                    duplicate_of=record["duplicate_of"],
+                )
+                self._tasks[task_id] = task
+                restored_tasks.append(task)
+
+            for task in restored_tasks:
+                primary_id = task.duplicate_of
+                if primary_id is not None:
+                    primary = self._tasks.get(primary_id)
+                    if primary is not None and not primary.is_finished:
+                        self._duplicates.setdefault(primary_id, []).append(task.task_id)
+                        restored += 1
+                        logger.info(
+                            f"恢复重复任务: task_id={task.task_id}, 等待 task_id={primary_id}"
+                        )
+                        continue
+                    task.duplicate_of = None
+                    self._journal.update_duplicate_of(task.task_id, None)
+
+                if task.content_key and task.content_key not in self._primary_by_key:
+                    self._primary_by_key[task.content_key] = task.task_id
+                self._enqueue_locked(task)
+                restored += 1
+
+                logger.info(
+                    f"恢复未完成任务: task_id={task.task_id}, priority={task.priority}, "
+                    f"检查点={self._journal.count_checkpoints(task.task_id)}"
+                )
+
+            if restored:
+                self._task_available.notify_all()
+
+        return restored
+
+    def get_checkpoint(self, task_id: int) -> Checkpoint:
+        """获取指定任务的检查点存储（未启用任务日志时不持久化）"""
+        if not self._journal:
+            return NULL_CHECKPOINT
+        return self._journal.checkpoint(task_id)
+
+    def next_task(self, timeout: Optional[float] = None) -> Optional[SubtitizeTask]:
+        """
+        从等待队列中取出下一个任务（阻塞）
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            下一个待执行的任务，超时返回 None
+        """
+        with self._task_available:
+            while True:
+                while self._pending:
+                    _, _, task_id = heapq.heappop(self._pending)
+                    # 跳过排队期间被取消的任务
+                    if task_id not in self._pending_ids:
+                        continue
+                    self._pending_ids.discard(task_id)
+                    task = self._tasks.get(task_id)
+                    if task is not None and not task.is_finished:
+                        return task
+
+                if not self._task_available.wait(timeout=timeout):
+                    return None
+
+    def get_task(self, task_id: int) -> Optional[SubtitizeTask]:
+        """获取指定任务"""
+        return self._tasks.get(task_id)
+
+    def get_tasks(self) -> List[SubtitizeTask]:
+        """获取所有未清除的任务（按创建顺序）"""
+        with self._task_lock:
+            return list(self._tasks.values())
+
+    def get_queue_length(self) -> int:
+        """获取等待队列长度"""
+        return len(self._pending_ids)
 
     def stop_task(self, task_id: int) -> bool:
         """
-        停止指定任务
+        停止指定任务（排队中或运行中）
 
         Args:
             task_id: 任务ID
@@ -179,50 +473,85 @@ class SubtitizeTaskManager:
             是否成功停止
         """
         with self._task_lock:
-            if self._current_task is None:
-                logger.warning(f"没有任务正在运行")
+            task = self._tasks.get(task_id)
+            if task is None:
+                logger.warning(f"任务不存在: task_id={task_id}")
                 return False
 
-            if self._current_task.task_id != task_id:
-                logger.warning(
-                    f"任务ID不匹配: 当前任务ID={self._current_task.task_id}, 请求停止ID={task_id}"
-                )
+            if task.is_finished:
+                logger.warning(f"任务已结束: state={task.state.value}")
                 return False
 
-            if self._current_task.state in [
-                SubtitizeTaskState.COMPLETED,
-                SubtitizeTaskState.FAILED,
-                SubtitizeTaskState.CANCELLED,
-            ]:
-                logger.warning(f"任务已结束: state={self._current_task.state.value}")
-                return False
+            # 更新任务状态
+            task.state = SubtitizeTaskState.CANCELLED
+            task.completed_at = datetime.now()
 
-            # 设置停止事件
-            self._stop_event.set()
+            self._pending_ids.discard(task_id)
+            # 重复任务被取消时不再等待主任务结果
+            if task.duplicate_of is not None:
+                waiting = self._duplicates.get(task.duplicate_of, [])
+                if task_id in waiting:
+                    waiting.remove(task_id)
 
-            # 更新任务状态
-            self._current_task.state = SubtitizeTaskState.CANCELLED
-            self._current_task.completed_at = datetime.now()
+        # 在锁外取消：终止 ffmpeg/whisper 子进程，丢弃排队中的 LLM 批次
+        task.cancel_token.cancel()
 
-            logger.info(f"任务已停止: task_id={task_id}")
+        if self._journal:
+            self._journal.finish_task(task_id, task.state.value)
 
-            # 触发失败回调（取消也算失败）
-            if self._on_faulted:
-                try:
-                    self._on_faulted(
-                        task_id, self._current_task.video_path, "任务已取消"
-                    )
-                except Exception as e:
-                    logger.error(f"调用 on_faulted 回调失败: {e}", exc_info=True)
+        logger.info(f"任务已停止: task_id={task_id}")
+
+        # 触发失败回调（取消也算失败）
+        if self._on_faulted:
+            try:
+                self._on_faulted(task_id, task.video_path, "任务已取消")
+            except Exception as e:
+                logger.error(f"调用 on_faulted 回调失败: {e}", exc_info=True)
+
+        self._resolve_duplicates(task)
+        return True
+
+    def discard_task(self, task_id: int):
+        """
+        撤销刚创建、尚未把 task_id 返回给 Master 的任务
+
+        与 stop_task 不同，不触发 on_faulted 回调（Master 不知道这个任务），
+        任务直接从管理器中移除。
+        """
+        with self._task_lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.is_finished:
+                return
 
-            return True
+            task.state = SubtitizeTaskState.CANCELLED
+            task.completed_at = datetime.now()
+
+            self._pending_ids.discard(task_id)
+            if task.duplicate_of is not None:
+                waiting = self._duplicates.get(task.duplicate_of, [])
+                if task_id in waiting:
+                    waiting.remove(task_id)
+
+        task.cancel_token.cancel()
+
+        if self._journal:
+            self._journal.finish_task(task_id, task.state.value)
+
+        logger.info(f"任务已撤销: task_id={task_id}")
+
+        # 期间提交的相同输入任务改由其中第一个执行
+        self._resolve_duplicates(task)
+        with self._task_lock:
+            self._tasks.pop(task_id, None)
 
-    def is_stop_requested(self) -> bool:
-        """检查是否请求停止"""
-        return self._stop_event.is_set()
+    def is_stop_requested(self, task_id: int) -> bool:
+        """检查指定任务是否请求停止"""
+        task = self._tasks.get(task_id)
+        return task is None or task.cancel_token.cancelled
 
     def update_progress(
             self,
+            task_id: int,
             progress: int,
             state: SubtitizeTaskState,
             message: str = "",
@@ -232,18 +561,27 @@ class SubtitizeTaskManager:
         更新任务进度
 
         Args:
+            task_id: 任务ID
             progress: 进度 (0-10000)
             state: 当前状态
             message: 状态消息
-            eta: 预计完成时间
+            eta: 预计完成时间（None 时保留上一次的估计）
         """
-        if self._current_task is None:
-            return
+        # 与 stop_task / mark_* 在同一把锁内检查并修改状态，避免覆盖终止状态
+        with self._task_lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.is_finished:
+                return
+
+            task.current_progress = progress
+            state_changed = task.state != state
+            task.state = state
+            task.current_message = message
+            if eta is not None:
+                task.eta = eta
 
-        self._current_task.current_progress = progress
-        self._current_task.state = state
-        self._current_task.current_message = message
-        self._current_task.eta = eta
+        if state_changed and self._journal:
+            self._journal.update_task_state(task_id, state.value)
 
         # 触发进度回调
         if self._on_progress:
@@ -254,69 +592,203 @@ class SubtitizeTaskManager:
                 else:
                     display_state = state.value
 
-                self._on_progress(
-                    self._current_task.task_id, progress, display_state, eta)
+                self._on_progress(task_id, progress, display_state, task.eta)
             except Exception as e:
                 logger.error(f"调用 on_progress 回调失败: {e}", exc_info=True)
 
-    def mark_completed(self):
+    def mark_started(self, task_id: int):
+        """标记任务开始执行"""
+        task = self._tasks.get(task_id)
+        if task is not None:
+            task.started_at = datetime.now()
+
+    def mark_completed(self, task_id: int):
         """标记任务完成"""
-        if self._current_task is None:
-            return
+        # 检查与设置终止状态在锁内完成：与 stop_task 竞争时只有一方触发回调
+        with self._task_lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.is_finished:
+                return
 
-        self._current_task.state = SubtitizeTaskState.COMPLETED
-        self._current_task.current_progress = 10000
-        self._current_task.completed_at = datetime.now()
+            task.state = SubtitizeTaskState.COMPLETED
+            task.current_progress = 10000
+            task.completed_at = datetime.now()
 
-        logger.info(f"任务完成: task_id={self._current_task.task_id}")
+        if self._journal:
+            self._journal.finish_task(task_id, task.state.value)
+
+        logger.info(f"任务完成: task_id={task_id}")
 
         # 触发完成回调
         if self._on_completed:
             try:
                 self._on_completed(
-                    self._current_task.task_id,
-                    self._current_task.video_path,
-                    self._current_task.raw_subtitle_path,
-                    self._current_task.translated_subtitle_path,
+                    task_id,
+                    task.video_path,
+                    task.raw_subtitle_path,
+                    task.translated_subtitle_path,
                 )
             except Exception as e:
                 logger.error(f"调用 on_completed 回调失败: {e}", exc_info=True)
 
-    def mark_failed(self, error: str):
+        self._resolve_duplicates(task)
+
+    def mark_failed(self, task_id: int, error: str):
         """
         标记任务失败
 
         Args:
+            task_id: 任务ID
             error: 错误信息
         """
-        if self._current_task is None:
-            return
+        with self._task_lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.is_finished:
+                return
+
+            task.state = SubtitizeTaskState.FAILED
+            task.error = error
+            task.completed_at = datetime.now()
 
-        self._current_task.state = SubtitizeTaskState.FAILED
-        self._current_task.error = error
-        self._current_task.completed_at = datetime.now()
+        if self._journal:
+            self._journal.finish_task(task_id, task.state.value, error)
 
-        logger.error(f"任务失败: task_id={self._current_task.task_id}, error={error}")
+        logger.error(f"任务失败: task_id={task_id}, error={error}")
 
         # 触发失败回调
         if self._on_faulted:
             try:
-                self._on_faulted(
-                    self._current_task.task_id, self._current_task.video_path, error
-                )
+                self._on_faulted(task_id, task.video_path, error)
             except Exception as e:
                 logger.error(f"调用 on_faulted 回调失败: {e}", exc_info=True)
 
-    def clear_task(self):
-        """清除当前任务（在任务完成或失败后调用）"""
+        self._resolve_duplicates(task)
+
+    def _resolve_duplicates(self, task: SubtitizeTask):
+        """
+        主任务结束后处理等待其结果的重复任务
+
+        - 完成：复制字幕文件到重复任务的输出路径并标记完成
+        - 失败：重复任务以相同原因失败
+        - 取消：第一个重复任务成为新的主任务并入队，其余继续等待它
+        """
+        with self._task_lock:
+            if task.content_key and self._primary_by_key.get(task.content_key) == task.task_id:
+                del self._primary_by_key[task.content_key]
+            duplicate_ids = self._duplicates.pop(task.task_id, [])
+            duplicates = [
+                self._tasks[dup_id]
+                for dup_id in duplicate_ids
+                if dup_id in self._tasks and not self._tasks[dup_id].is_finished
+            ]
+            if not duplicates:
+                return
+
+            if task.state == SubtitizeTaskState.CANCELLED:
+                new_primary, waiting = duplicates[0], duplicates[1:]
+                new_primary.duplicate_of = None
+                if new_primary.content_key:
+                    self._primary_by_key[new_primary.content_key] = new_primary.task_id
+                for dup in waiting:
+                    dup.duplicate_of = new_primary.task_id
+                if self._journal:
+                    self._journal.update_duplicate_of(new_primary.task_id, None)
+                    for dup in waiting:
+                        self._journal.update_duplicate_of(dup.task_id, new_primary.task_id)
+                if waiting:
+                    self._duplicates[new_primary.task_id] = [dup.task_id for dup in waiting]
+                self._enqueue_locked(new_primary)
+                logger.info(
+                    f"主任务已取消，重复任务转为执行: task_id={new_primary.task_id}"
+                )
+                return
+
+        for dup in duplicates:
+            if task.state == SubtitizeTaskState.COMPLETED:
+                try:
+                    _copy_output(task.raw_subtitle_path, dup.raw_subtitle_path)
+                    _copy_output(
+                        task.translated_subtitle_path, dup.translated_subtitle_path
+                    )
+                except OSError as e:
+                    self.mark_failed(dup.task_id, f"复制字幕文件失败: {e}")
+                    continue
+                logger.info(
+                    f"重复任务复用结果完成: task_id={dup.task_id}, 来源 task_id={task.task_id}"
+                )
+                self.mark_completed(dup.task_id)
+            else:
+                self.mark_failed(
+                    dup.task_id, f"相同输入的任务 {task.task_id} 失败: {task.error}"
+                )
+
+    def clear_task(self, task_id: int):
+        """清除指定任务（在任务完成或失败后调用）"""
         with self._task_lock:
-            if self._current_task and self._current_task.state in [
-                SubtitizeTaskState.COMPLETED,
-                SubtitizeTaskState.FAILED,
-                SubtitizeTaskState.CANCELLED,
-            ]:
-                logger.info(f"清除任务: task_id={self._current_task.task_id}")
-                self._current_task = None
+            task = self._tasks.get(task_id)
+            if task is not None and task.is_finished:
+                logger.info(f"清除任务: task_id={task_id}")
+                del self._tasks[task_id]
+
+
+def compute_content_key(video_path: Optional[str], language: Optional[str]) -> Optional[str]:
+    """
+    计算任务输入的内容指纹（文件标识 + 头/尾采样的 BLAKE2b + 语言）
+
+    只读取文件元数据和头尾各 FINGERPRINT_SAMPLE_SIZE 字节，不在 RPC 线程上读取整个视频。
+    (设备, inode, 大小, 修改时间) 相同即同一文件的同一版本；头尾采样防止文件被替换后
+    inode 复用且修改时间相同时误判。内容相同的不同副本不视为重复。
+
+    Returns:
+        指纹字符串，文件不可读时返回 None（不参与去重）
+    """
+    if not video_path:
+        return None
+    try:
+        stat = os.stat(video_path)
+        digest = _sample_digest(
+            os.path.abspath(video_path),
+            stat.st_dev,
+            stat.st_ino,
+            stat.st_size,
+            stat.st_mtime_ns,
+        )
+    except OSError:
+        return None
+    return f"{digest}:{language or ''}"
+
+
+@functools.lru_cache(maxsize=1024)
+def _sample_digest(path: str, dev: int, ino: int, size: int, mtime_ns: int) -> str:
+    """文件标识与头尾采样的摘要（按路径和文件版本缓存，同一文件重复提交不再读取）"""
+    digest = hashlib.blake2b(f"{dev}:{ino}:{size}:{mtime_ns}".encode(), digest_size=32)
+    with open(path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_SAMPLE_SIZE))
+        if size > FINGERPRINT_SAMPLE_SIZE:
+            f.seek(max(FINGERPRINT_SAMPLE_SIZE, size - FINGERPRINT_SAMPLE_SIZE))
+            digest.update(f.read(FINGERPRINT_SAMPLE_SIZE))
+    return digest.hexdigest()
+
+
+def _is_valid_job(video_path: Optional[str], raw_subtitle_path: Optional[str]) -> bool:
+    return bool(video_path and raw_subtitle_path)
+
+
+def _parse_priority(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _copy_output(source: str, target: str):
+    """复制字幕文件（源不存在或目标相同时跳过）"""
+    if not source or not target or not os.path.exists(source):
+        return
+    if os.path.exists(target) and os.path.samefile(source, target):
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    shutil.copyfile(source, target)
 
 
 # 全局单例实例
@@ -5,6 +5,7 @@ VideoCaptioner RPC Server - 纯后端服务
 无 UI 版本，仅提供 RPC 接口
 """
 
+import argparse
 import logging
 import os
 import signal
@@ -53,8 +54,22 @@ def signal_handler(signum, frame):
     shutdown_event.set()
 
 
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="VideoCaptioner RPC 服务器")
+    parser.add_argument(
+        "--server",
+        choices=["waitress", "werkzeug"],
+        default=None,
+        help="HTTP 服务器实现：waitress（生产）或 werkzeug（开发），默认读取 RPC.ServerBackend",
+    )
+    return parser.parse_args()
+
+
 def main():
     """主函数"""
+    args = parse_args()
+
     logger.info("=" * 60)
     logger.info("VideoCaptioner RPC 服务器 (无 UI 版本)")
     logger.info("=" * 60)
@@ -75,13 +90,15 @@ def main():
     logger.info(f"  - GET  /set-master?url=           设置 Master URL")
     logger.info(f"  - GET  /disconnect-master         断开 Master 连接")
     logger.info(f"  - POST /api/rpc/start-subtitize   启动字幕化任务")
+    logger.info(f"  - POST /api/rpc/start-subtitize-batch  批量启动字幕化任务")
     logger.info(f"  - POST /api/rpc/stop-subtitize    停止字幕化任务")
     logger.info(f"  - GET  /api/rpc/get-status        获取任务状态")
+    logger.info(f"  - GET  /api/rpc/get-capacity      获取 Worker 容量")
     logger.info("=" * 60)
 
     try:
         # 启动 RPC 服务器
-        start_rpc_server(host=rpc_host, port=rpc_port)
+        start_rpc_server(host=rpc_host, port=rpc_port, backend=args.server)
         logger.info("RPC 服务器已启动，按 Ctrl+C 退出")
 
         # 保持主线程运行（跨平台方式）
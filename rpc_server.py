@@ -2,6 +2,7 @@
 # coding:utf-8
 """RPC 服务器独立启动脚本"""
 
+import argparse
 import logging
 import signal
 import sys
@@ -34,8 +35,22 @@ def signal_handler(signum, frame):
     shutdown_event.set()
 
 
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="VideoCaptioner RPC 服务器")
+    parser.add_argument(
+        "--server",
+        choices=["waitress", "werkzeug"],
+        default=None,
+        help="HTTP 服务器实现：waitress（生产）或 werkzeug（开发），默认读取 RPC.ServerBackend",
+    )
+    return parser.parse_args()
+
+
 def main():
     """主函数"""
+    args = parse_args()
+
     # 注册信号处理器
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
@@ -55,12 +70,14 @@ def main():
     logger.info(f"  - GET  /set-master?url=           设置 Master URL")
     logger.info(f"  - GET  /disconnect-master         断开 Master 连接")
     logger.info(f"  - POST /api/rpc/start-subtitize   启动字幕化任务")
+    logger.info(f"  - POST /api/rpc/start-subtitize-batch  批量启动字幕化任务")
     logger.info(f"  - POST /api/rpc/stop-subtitize    停止字幕化任务")
     logger.info(f"  - GET  /api/rpc/get-status        获取任务状态")
+    logger.info(f"  - GET  /api/rpc/get-capacity      获取 Worker 容量")
     logger.info("=" * 60)
 
     try:
-        start_rpc_server(host=host, port=port)
+        start_rpc_server(host=host, port=port, backend=args.server)
         logger.info("RPC 服务器已启动，按 Ctrl+C 退出")
 
         # 保持主线程运行（跨平台方式）
@@ -361,14 +361,21 @@ def mock_llm_client(monkeypatch):
 
         return mock_response
 
-    # Patch the LLM client
+    async def mock_acreate(**kwargs):
+        raw_response = MagicMock()
+        raw_response.headers = {}
+        raw_response.parse.return_value = mock_create(**kwargs)
+        return raw_response
+
+    # Patch the LLM client (call_llm runs requests on the async client)
     mock_client = MagicMock()
-    mock_client.chat.completions.create = mock_create
+    mock_client.base_url = "https://mock.llm/v1"
+    mock_client.chat.completions.with_raw_response.create = mock_acreate
 
     def mock_get_client():
         return mock_client
 
-    monkeypatch.setattr("app.core.llm.client.get_llm_client", mock_get_client)
+    monkeypatch.setattr("app.core.llm.client.get_async_llm_client", mock_get_client)
 
     # Mock check_llm_connection to prevent real API calls
     def mock_check_llm_connection(base_url, api_key, model):
@@ -0,0 +1,226 @@
+"""在线 ASR 接口自适应并发测试"""
+
+import threading
+import time
+import wave
+from typing import Callable, List, Optional
+
+import numpy as np
+import pytest
+import requests
+
+from app.core.asr import adaptive_concurrency
+from app.core.asr.adaptive_concurrency import (
+    AdaptiveConcurrency,
+    concurrency_registry,
+    is_throttle_error,
+)
+from app.core.asr.asr_data import ASRDataSeg
+from app.core.asr.base import BaseASR
+from app.core.asr.chunked_asr import ChunkedASR
+
+SAMPLE_RATE = 16000
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(adaptive_concurrency, "THROTTLE_RETRY_DELAY", 0)
+    concurrency_registry.clear()
+    yield concurrency_registry
+    concurrency_registry.clear()
+
+
+def run_batch(limiter: AdaptiveConcurrency, latency: float):
+    """用满当前上限后逐个完成"""
+    slots = int(limiter.limit)
+    for _ in range(slots):
+        limiter.acquire()
+    for _ in range(slots):
+        limiter.release(latency_per_unit=latency)
+
+
+class TestAdaptiveConcurrency:
+    def test_increases_while_latency_flat(self):
+        limiter = AdaptiveConcurrency("api", max_limit=16, initial_limit=3)
+        run_batch(limiter, 1.0)
+        assert limiter.limit == 4
+
+        for _ in range(20):
+            run_batch(limiter, 1.0)
+        assert limiter.limit == 16
+
+    def test_holds_when_latency_rises(self):
+        limiter = AdaptiveConcurrency("api", max_limit=16, initial_limit=3)
+        run_batch(limiter, 1.0)
+        run_batch(limiter, 2.0)
+        run_batch(limiter, 2.0)
+
+        assert limiter.limit == 4
+
+    def test_does_not_increase_when_not_saturated(self):
+        limiter = AdaptiveConcurrency("api", max_limit=16, initial_limit=3)
+        limiter.acquire()
+        limiter.release(latency_per_unit=1.0)
+
+        assert limiter.limit == 3
+
+    def test_halves_on_throttle(self):
+        limiter = AdaptiveConcurrency("api", max_limit=16, initial_limit=8)
+        limiter.acquire()
+        limiter.release(throttled=True)
+        assert limiter.limit == 4
+
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release(throttled=True)
+        assert limiter.limit == 1
+
+    def test_acquire_blocks_at_limit(self):
+        limiter = AdaptiveConcurrency("api", max_limit=2, initial_limit=2)
+        limiter.acquire()
+        limiter.acquire()
+        acquired = threading.Event()
+
+        def worker():
+            limiter.acquire()
+            acquired.set()
+
+        threading.Thread(target=worker, daemon=True).start()
+        assert not acquired.wait(0.2)
+        limiter.release(latency_per_unit=1.0)
+        assert acquired.wait(1)
+
+    def test_registry_keeps_limit_across_tasks(self, registry):
+        first = registry.get("https://api.example.com", 16, 3)
+        run_batch(first, 1.0)
+
+        second = registry.get("https://api.example.com", 16, 3)
+        assert second is first
+        assert second.limit == 4
+
+        registry.get("https://api.example.com", 2, 3)
+        assert first.limit == 2
+        assert registry.limits() == {"https://api.example.com": 2}
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class TestIsThrottleError:
+    def test_http_429(self):
+        response = requests.Response()
+        response.status_code = 429
+        assert is_throttle_error(requests.HTTPError(response=response))
+
+    def test_timeout_and_rate_limit_types(self):
+        assert is_throttle_error(requests.ReadTimeout())
+        assert is_throttle_error(TimeoutError())
+        assert is_throttle_error(RateLimitError("slow down"))
+
+    def test_wrapped_error(self):
+        try:
+            try:
+                raise requests.ConnectTimeout()
+            except requests.RequestException as e:
+                raise RuntimeError("upload failed") from e
+        except RuntimeError as e:
+            assert is_throttle_error(e)
+
+    def test_other_errors(self):
+        response = requests.Response()
+        response.status_code = 401
+        assert not is_throttle_error(requests.HTTPError(response=response))
+        assert not is_throttle_error(ValueError("bad audio"))
+
+
+class ThrottledMockASR(BaseASR):
+    """前 throttle_count 次请求返回 429 的在线引擎"""
+
+    NEEDS_COMPRESSED_AUDIO = False
+    throttle_count = 0
+    calls = 0
+    max_in_flight = 0
+    in_flight = 0
+    lock = threading.Lock()
+
+    def _run(self, callback: Optional[Callable[[int, str], None]] = None, **kwargs):
+        cls = ThrottledMockASR
+        with cls.lock:
+            cls.calls += 1
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+            throttled = cls.calls <= cls.throttle_count
+        try:
+            time.sleep(0.05)
+            if throttled:
+                response = requests.Response()
+                response.status_code = 429
+                raise requests.HTTPError("429 Too Many Requests", response=response)
+            return 1
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def _make_segments(self, resp_data: int) -> List[ASRDataSeg]:
+        return [ASRDataSeg(text="s", start_time=0, end_time=800)]
+
+
+@pytest.fixture
+def throttled_asr():
+    ThrottledMockASR.throttle_count = 0
+    ThrottledMockASR.calls = 0
+    ThrottledMockASR.max_in_flight = 0
+    ThrottledMockASR.in_flight = 0
+    return ThrottledMockASR
+
+
+def write_wav(path, seconds: int) -> str:
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(np.zeros(seconds * SAMPLE_RATE, dtype="<i2").tobytes())
+    return str(path)
+
+
+class TestChunkedASRConcurrency:
+    def test_throttled_chunk_is_retried(self, registry, throttled_asr, tmp_path):
+        throttled_asr.throttle_count = 1
+        asr = ChunkedASR(
+            throttled_asr,
+            write_wav(tmp_path / "audio.wav", 8),
+            chunk_length=2,
+            chunk_overlap=0,
+            chunk_concurrency=4,
+            endpoint="api",
+            max_concurrency=8,
+        )
+        result = asr.run()
+
+        assert len(result.segments) == 4
+        assert throttled_asr.calls == 5
+
+    def test_endpoint_cap_shared_between_tasks(self, registry, throttled_asr, tmp_path):
+        """两个任务同时使用同一接口，总并发不超过接口上限"""
+        audio_path = write_wav(tmp_path / "audio.wav", 8)
+
+        def run_task():
+            ChunkedASR(
+                throttled_asr,
+                audio_path,
+                chunk_length=1,
+                chunk_overlap=0,
+                chunk_concurrency=2,
+                endpoint="public",
+                max_concurrency=2,
+            ).run()
+
+        threads = [threading.Thread(target=run_task) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert throttled_asr.calls == 16
+        assert throttled_asr.max_in_flight <= 2
@@ -0,0 +1,113 @@
+"""分块边界规划测试
+
+使用合成的 PCM WAV（正弦波 + 静音段），不依赖 ffmpeg。
+"""
+
+import wave
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+
+from app.core.asr.audio_source import AudioSource
+from app.core.asr.boundary_planner import ChunkPlan, find_silence, plan_chunks
+
+SAMPLE_RATE = 16000
+
+
+def write_wav(path, samples: np.ndarray, sample_width: int = 2) -> str:
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(sample_width)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(samples.tobytes())
+    return str(path)
+
+
+def speech_with_gaps(
+    duration_ms: int, gaps: List[Tuple[int, int]], noise: float = 30.0
+) -> np.ndarray:
+    """440Hz 正弦波模拟讲话，gaps 内为低电平噪声（模拟静音）"""
+    t = np.arange(duration_ms * SAMPLE_RATE // 1000) / SAMPLE_RATE
+    samples = 8000 * np.sin(2 * np.pi * 440 * t)
+    rng = np.random.default_rng(0)
+    for start_ms, end_ms in gaps:
+        a, b = start_ms * SAMPLE_RATE // 1000, end_ms * SAMPLE_RATE // 1000
+        samples[a:b] = rng.normal(0, noise, b - a)
+    return samples.astype("<i2")
+
+
+class TestFindSilence:
+    def test_cut_inside_nearest_silence(self, tmp_path):
+        """多个静音段时取离窗口末尾最近的一段，切分点在静音段内"""
+        samples = speech_with_gaps(60000, [(20000, 21000), (50000, 51000)])
+        with AudioSource(write_wav(tmp_path / "a.wav", samples)) as source:
+            cut = find_silence(source, 30000, 60000)
+        assert 50000 <= cut <= 51000
+
+    def test_short_pause_is_ignored(self, tmp_path):
+        """短于最小静音时长的停顿不作为切分点"""
+        samples = speech_with_gaps(60000, [(50000, 50100)])
+        with AudioSource(write_wav(tmp_path / "a.wav", samples)) as source:
+            assert find_silence(source, 30000, 60000) is None
+
+    def test_continuous_speech_returns_none(self, tmp_path):
+        samples = speech_with_gaps(60000, [])
+        with AudioSource(write_wav(tmp_path / "a.wav", samples)) as source:
+            assert find_silence(source, 30000, 60000) is None
+
+
+class TestPlanChunks:
+    def test_boundaries_snap_to_silence(self, tmp_path):
+        """切在静音处的块之间没有重叠，且不超过最大分块长度"""
+        samples = speech_with_gaps(250000, [(85000, 86000), (170000, 171000)])
+        with AudioSource(write_wav(tmp_path / "a.wav", samples)) as source:
+            plans = plan_chunks(source, 100000, 10000)
+
+        assert len(plans) == 3
+        assert plans[0].start_ms == 0 and plans[0].overlap_ms == 0
+        assert 85000 <= plans[0].end_ms <= 86000
+        assert 170000 <= plans[1].end_ms <= 171000
+        assert plans[-1].end_ms == 250000
+        for prev, plan in zip(plans, plans[1:]):
+            assert plan.start_ms == prev.end_ms
+            assert plan.overlap_ms == 0
+        assert all(p.end_ms - p.start_ms <= 100000 for p in plans)
+
+    def test_fallback_to_fixed_overlap(self, tmp_path):
+        """找不到静音时退回固定切分点 + 重叠"""
+        samples = speech_with_gaps(250000, [])
+        with AudioSource(write_wav(tmp_path / "a.wav", samples)) as source:
+            plans = plan_chunks(source, 100000, 10000)
+
+        assert plans == [
+            ChunkPlan(0, 100000, 0),
+            ChunkPlan(90000, 190000, 10000),
+            ChunkPlan(180000, 250000, 10000),
+        ]
+
+    def test_silent_audio_cuts_at_target(self, tmp_path):
+        """整段静音时直接切在目标位置"""
+        samples = np.zeros(250 * SAMPLE_RATE, dtype="<i2")
+        with AudioSource(write_wav(tmp_path / "a.wav", samples)) as source:
+            plans = plan_chunks(source, 100000, 10000)
+
+        assert [(p.start_ms, p.end_ms, p.overlap_ms) for p in plans] == [
+            (0, 100000, 0),
+            (100000, 200000, 0),
+            (200000, 250000, 0),
+        ]
+
+    def test_short_audio_single_chunk(self, tmp_path):
+        samples = speech_with_gaps(30000, [])
+        with AudioSource(write_wav(tmp_path / "a.wav", samples)) as source:
+            assert plan_chunks(source, 100000, 10000) == [ChunkPlan(0, 30000, 0)]
+
+    @pytest.mark.parametrize("audio", [b"ID3\x03not a wav", None])
+    def test_unsupported_input_returns_none(self, tmp_path, audio):
+        """非 16 位 PCM WAV 不做规划"""
+        if audio is None:
+            samples = np.zeros(SAMPLE_RATE, dtype="u1")
+            audio = Path(write_wav(tmp_path / "a.wav", samples, 1)).read_bytes()
+        assert plan_chunks(AudioSource(audio), 100000, 10000) is None
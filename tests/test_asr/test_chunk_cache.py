@@ -0,0 +1,226 @@
+"""内容寻址分块缓存测试"""
+
+import wave
+from typing import Callable, List, Optional
+
+import numpy as np
+import pytest
+from diskcache import Cache
+
+from app.core.asr import chunked_asr
+from app.core.asr.asr_data import ASRData, ASRDataSeg
+from app.core.asr.audio_source import AudioSource
+from app.core.asr.base import BaseASR
+from app.core.asr.chunk_cache import ChunkCache, split_pieces
+from app.core.asr.chunked_asr import ChunkedASR
+from app.core.asr.pcm_wav import parse_pcm_wav
+
+SAMPLE_RATE = 16000
+
+
+def speech_with_pauses(duration_ms: int, period_ms: int = 5000, pause_ms: int = 1000):
+    """每 period_ms 毫秒结尾有 pause_ms 毫秒静音的正弦波，每段音高不同"""
+    t = np.arange(duration_ms * SAMPLE_RATE // 1000) / SAMPLE_RATE
+    freq = 300 + 40 * (t * 1000 // period_ms)
+    samples = 8000 * np.sin(2 * np.pi * freq * t)
+    for end_ms in range(period_ms, duration_ms, period_ms):
+        samples[(end_ms - pause_ms) * 16 : end_ms * 16] = 0
+    return samples.astype("<i2").tobytes()
+
+
+def write_wav(path, pcm: bytes) -> str:
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm)
+    return str(path)
+
+
+@pytest.fixture
+def source(tmp_path):
+    with AudioSource(write_wav(tmp_path / "audio.wav", speech_with_pauses(60000))) as s:
+        yield s
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    cache = Cache(str(tmp_path / "cache"))
+    yield cache
+    cache.close()
+
+
+def fake_transcribe(calls: List):
+    """每秒输出一个片段（时间相对范围起点），记录转录的范围"""
+
+    def transcribe_range(start_ms: int, end_ms: int) -> ASRData:
+        calls.append((start_ms, end_ms))
+        return ASRData(
+            [
+                ASRDataSeg(f"{ms}", ms - start_ms, ms - start_ms + 500)
+                for ms in range(start_ms - start_ms % 1000, end_ms, 1000)
+                if ms >= start_ms
+            ]
+        )
+
+    return transcribe_range
+
+
+class TestSplitPieces:
+    def test_cuts_in_middle_of_pauses(self, source):
+        pieces = split_pieces(source, 0, 20000)
+        assert pieces == [(0, 4500), (4500, 9500), (9500, 14500), (14500, 20000)]
+
+    def test_cuts_independent_of_range_start(self, source):
+        """不同起点的范围内部切分点相同"""
+        cuts_a = {start for start, _ in split_pieces(source, 0, 60000)[1:]}
+        cuts_b = {start for start, _ in split_pieces(source, 12340, 60000)[1:]}
+        assert cuts_b <= cuts_a
+        assert len(cuts_b) == len([c for c in cuts_a if c > 12340])
+
+    def test_no_pause_single_piece(self, tmp_path):
+        t = np.arange(10 * SAMPLE_RATE) / SAMPLE_RATE
+        pcm = (8000 * np.sin(2 * np.pi * 440 * t)).astype("<i2").tobytes()
+        with AudioSource(write_wav(tmp_path / "tone.wav", pcm)) as tone:
+            assert split_pieces(tone, 0, 10000) == [(0, 10000)]
+
+
+class TestChunkCache:
+    def test_same_range_fully_cached(self, source, disk_cache):
+        cache = ChunkCache(disk_cache, "engine")
+        calls = []
+        first = cache.transcribe(source, 0, 30000, fake_transcribe(calls))
+        calls.clear()
+        second = cache.transcribe(source, 0, 30000, fake_transcribe(calls))
+
+        assert calls == []
+        assert [(s.text, s.start_time, s.end_time) for s in second.segments] == [
+            (s.text, s.start_time, s.end_time) for s in first.segments
+        ]
+
+    def test_different_chunking_reuses_interior_pieces(self, source, disk_cache):
+        cache = ChunkCache(disk_cache, "engine")
+        calls = []
+        cache.transcribe(source, 0, 30000, fake_transcribe(calls))
+        cache.transcribe(source, 30000, 60000, fake_transcribe(calls))
+
+        calls.clear()
+        result = cache.transcribe(source, 10000, 50000, fake_transcribe(calls))
+
+        # 只有新块的首尾片段与跨越原分块边界的片段需要重新转录
+        assert calls == [(10000, 14500), (24500, 34500), (44500, 50000)]
+        expected = range(10000, 50000, 1000)
+        assert [seg.text for seg in result.segments] == [str(ms) for ms in expected]
+        assert [seg.start_time for seg in result.segments] == [
+            ms - 10000 for ms in expected
+        ]
+
+    def test_engine_params_isolated(self, source, disk_cache):
+        calls = []
+        ChunkCache(disk_cache, "engine-a").transcribe(
+            source, 0, 20000, fake_transcribe(calls)
+        )
+        calls.clear()
+        ChunkCache(disk_cache, "engine-b").transcribe(
+            source, 0, 20000, fake_transcribe(calls)
+        )
+        assert calls == [(0, 20000)]
+
+    def test_segment_spanning_cut_not_cached(self, source, disk_cache):
+        """跨越切分点的字幕保留在结果中，但两侧片段都不缓存"""
+        cache = ChunkCache(disk_cache, "engine")
+        calls = []
+
+        def transcribe_range(start_ms: int, end_ms: int) -> ASRData:
+            calls.append((start_ms, end_ms))
+            segments = fake_transcribe([])(start_ms, end_ms).segments
+            if start_ms < 4500 < end_ms:
+                segments = [
+                    s for s in segments if not 4000 <= s.start_time + start_ms < 5000
+                ]
+                segments.append(
+                    ASRDataSeg("spanning", 4000 - start_ms, 5000 - start_ms)
+                )
+                segments.sort(key=lambda s: s.start_time)
+            return ASRData(segments)
+
+        first = cache.transcribe(source, 0, 20000, transcribe_range)
+        assert ("spanning", 4000, 5000) in [
+            (s.text, s.start_time, s.end_time) for s in first.segments
+        ]
+
+        calls.clear()
+        second = cache.transcribe(source, 0, 20000, transcribe_range)
+        assert calls == [(0, 9500)]
+        assert [(s.text, s.start_time, s.end_time) for s in second.segments] == [
+            (s.text, s.start_time, s.end_time) for s in first.segments
+        ]
+
+
+class SecondsMockASR(BaseASR):
+    """每秒输出一个片段的本地引擎，记录转录的音频时长"""
+
+    NEEDS_COMPRESSED_AUDIO = False
+    transcribed_ms = 0
+
+    def __init__(self, audio_input, use_cache: bool = False):
+        super().__init__(audio_input, use_cache)
+
+    def _run(self, callback: Optional[Callable[[int, str], None]] = None, **kwargs):
+        info = parse_pcm_wav(self.file_binary)
+        duration_ms = info.data_size // info.block_align * 1000 // SAMPLE_RATE
+        SecondsMockASR.transcribed_ms += duration_ms
+        return duration_ms
+
+    def _make_segments(self, resp_data: int) -> List[ASRDataSeg]:
+        return [
+            ASRDataSeg("s", ms, ms + 500) for ms in range(0, resp_data, 1000)
+        ]
+
+
+def test_rerun_with_different_chunk_length(tmp_path, disk_cache, monkeypatch):
+    """换分块长度重新转录时只转录缓存未覆盖的片段"""
+    monkeypatch.setattr(chunked_asr, "get_asr_chunk_cache", lambda: disk_cache)
+    monkeypatch.setattr(chunked_asr, "is_cache_enabled", lambda: True)
+    audio_path = write_wav(tmp_path / "audio.wav", speech_with_pauses(60000))
+
+    def run(chunk_length: int):
+        SecondsMockASR.transcribed_ms = 0
+        ChunkedASR(
+            SecondsMockASR,
+            audio_path,
+            asr_kwargs={"use_cache": True},
+            chunk_length=chunk_length,
+            chunk_overlap=0,
+            chunk_concurrency=1,
+        ).run()
+        return SecondsMockASR.transcribed_ms
+
+    assert run(20) == 60000
+    assert run(20) == 0
+    assert 0 < run(30) < 60000
+
+
+def test_work_callback_reports_only_transcribed_audio(tmp_path, disk_cache, monkeypatch):
+    """缓存复用的片段不报告为实际转录量"""
+    monkeypatch.setattr(chunked_asr, "get_asr_chunk_cache", lambda: disk_cache)
+    monkeypatch.setattr(chunked_asr, "is_cache_enabled", lambda: True)
+    audio_path = write_wav(tmp_path / "audio.wav", speech_with_pauses(60000))
+
+    def run(chunk_length: int):
+        SecondsMockASR.transcribed_ms = 0
+        reported = []
+        ChunkedASR(
+            SecondsMockASR,
+            audio_path,
+            asr_kwargs={"use_cache": True},
+            chunk_length=chunk_length,
+            chunk_overlap=0,
+            chunk_concurrency=1,
+        ).run(work_callback=reported.append)
+        return sum(reported), SecondsMockASR.transcribed_ms
+
+    assert run(20) == (60000, 60000)
+    assert run(20) == (0, 0)
+    reported, transcribed = run(30)
+    assert reported == transcribed > 0
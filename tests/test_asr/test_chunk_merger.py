@@ -7,10 +7,14 @@
 4. 直接验证合并后的完整文本（快照验证）
 """
 
+import difflib
+import random
+import time
+
 import pytest
 
 from app.core.asr.asr_data import ASRData, ASRDataSeg
-from app.core.asr.chunk_merger import ChunkMerger
+from app.core.asr.chunk_merger import ChunkMerger, StreamingChunkMerger
 
 
 def create_sentence_segments(sentences, start_time=0):
@@ -800,3 +804,278 @@ class TestStrictMode:
         # 验证无重复
         assert actual.count("S5") == 1
         assert actual.count("S6") == 1
+
+
+# ============================================================================
+# 增量合并 - 流式输出定稿片段
+# ============================================================================
+
+
+def create_overlapping_word_chunks(num_words, chunk_length, overlap):
+    """按真实音频分块方式生成带重叠的词级 chunk（每个词 1 秒）"""
+    words = [f"w{i}" for i in range(num_words)]
+    total_ms = num_words * 1000
+    chunks, offsets = [], []
+    start = 0
+    while start < total_ms:
+        end = min(start + chunk_length, total_ms)
+        segments = [
+            ASRDataSeg(text=word, start_time=i * 1000 - start, end_time=i * 1000 + 800 - start)
+            for i, word in enumerate(words)
+            if start <= i * 1000 and i * 1000 + 800 <= end
+        ]
+        chunks.append(ASRData(segments))
+        offsets.append(start)
+        if end >= total_ms:
+            break
+        start += chunk_length - overlap
+    return chunks, offsets
+
+
+class TestStreamingChunkMerger:
+    """StreamingChunkMerger 增量合并"""
+
+    @pytest.fixture
+    def chunks_and_offsets(self):
+        return create_overlapping_word_chunks(300, chunk_length=100000, overlap=10000)
+
+    @staticmethod
+    def _texts(segments):
+        return [seg.text for seg in segments]
+
+    def test_in_order_matches_batch_merge(self, chunks_and_offsets):
+        """按顺序加入：结果与 merge_chunks 一致"""
+        chunks, offsets = chunks_and_offsets
+        expected = ChunkMerger().merge_chunks(chunks, offsets, overlap_duration=10000)
+
+        streaming = StreamingChunkMerger(offsets, overlap_duration=10000)
+        emitted = []
+        for idx, chunk in enumerate(chunks):
+            emitted.extend(streaming.add_chunk(idx, chunk))
+        emitted.extend(streaming.finish())
+
+        assert self._texts(emitted) == self._texts(expected.segments)
+        assert self._texts(streaming.get_result().segments) == self._texts(
+            expected.segments
+        )
+        assert self._texts(emitted) == [f"w{i}" for i in range(300)]
+
+    def test_first_chunk_emits_stable_prefix(self, chunks_and_offsets):
+        """第一个 chunk 到达后即可输出重叠区之前的片段"""
+        chunks, offsets = chunks_and_offsets
+        streaming = StreamingChunkMerger(offsets, overlap_duration=10000)
+
+        first = streaming.add_chunk(0, chunks[0])
+
+        assert first
+        assert all(seg.end_time <= offsets[1] for seg in first)
+        assert self._texts(first) == [f"w{i}" for i in range(len(first))]
+
+    def test_out_of_order_chunks_are_buffered(self, chunks_and_offsets):
+        """乱序到达：未轮到的 chunk 被缓存，输出顺序不变"""
+        chunks, offsets = chunks_and_offsets
+        streaming = StreamingChunkMerger(offsets, overlap_duration=10000)
+
+        emitted = []
+        for idx in reversed(range(1, len(chunks))):
+            assert streaming.add_chunk(idx, chunks[idx]) == []
+        emitted.extend(streaming.add_chunk(0, chunks[0]))
+
+        assert streaming.is_complete
+        assert self._texts(emitted) == [f"w{i}" for i in range(300)]
+
+    def test_finish_before_all_chunks_raises(self, chunks_and_offsets):
+        chunks, offsets = chunks_and_offsets
+        streaming = StreamingChunkMerger(offsets, overlap_duration=10000)
+        streaming.add_chunk(0, chunks[0])
+
+        with pytest.raises(ValueError):
+            streaming.finish()
+
+    def test_zero_overlap_boundaries_concatenate(self):
+        """切在静音处（重叠为 0）的边界直接拼接，其余边界仍按重叠合并"""
+        chunks, offsets = create_overlapping_word_chunks(
+            200, chunk_length=100000, overlap=10000
+        )
+        # 第二块改为从第一块末尾开始（无重叠）
+        chunks[1] = ASRData(
+            [seg for seg in chunks[1].segments if seg.start_time >= 10000]
+        )
+        for seg in chunks[1].segments:
+            seg.start_time -= 10000
+            seg.end_time -= 10000
+        offsets[1] += 10000
+        boundary_overlaps = [0, 10000][: len(chunks) - 1]
+
+        batch = ChunkMerger().merge_chunks(
+            chunks, offsets, overlap_duration=10000, boundary_overlaps=boundary_overlaps
+        )
+        streaming = StreamingChunkMerger(
+            offsets, overlap_duration=10000, boundary_overlaps=boundary_overlaps
+        )
+        emitted = []
+        for idx, chunk in enumerate(chunks):
+            emitted.extend(streaming.add_chunk(idx, chunk))
+        emitted.extend(streaming.finish())
+
+        expected = [f"w{i}" for i in range(200)]
+        assert self._texts(batch.segments) == expected
+        assert self._texts(emitted) == expected
+
+    def test_offsets_appended_incrementally(self, chunks_and_offsets):
+        """边界逐个追加：结果与预先给出全部边界一致，未关闭前不能结束"""
+        chunks, offsets = chunks_and_offsets
+        streaming = StreamingChunkMerger(overlap_duration=10000)
+
+        emitted = []
+        for idx, (chunk, offset) in enumerate(zip(chunks, offsets)):
+            streaming.append_offset(offset)
+            emitted.extend(streaming.add_chunk(idx, chunk))
+
+        with pytest.raises(ValueError):
+            streaming.finish()
+        streaming.close_offsets()
+        emitted.extend(streaming.finish())
+
+        assert self._texts(emitted) == [f"w{i}" for i in range(300)]
+        with pytest.raises(ValueError):
+            streaming.append_offset(offsets[-1] + 90000)
+
+
+# ============================================================================
+# 对齐算法（与逐位置滑动窗口等价）
+# ============================================================================
+
+
+def sliding_window_alignment(merger, left, right):
+    """逐位置比较切片的原始滑动窗口算法，作为对照"""
+    left_len, right_len = len(left), len(right)
+    best_score, best_result = 0.0, None
+    for i in range(1, left_len + right_len + 1):
+        left_start = max(0, left_len - i)
+        left_end = min(left_len, left_len + right_len - i)
+        right_start = max(0, i - left_len)
+        right_end = min(right_len, i)
+        pairs = zip(left[left_start:left_end], right[right_start:right_end])
+        if merger._is_word_level:
+            matches = sum(1 for l, r in pairs if l.text == r.text)
+        else:
+            matches = sum(
+                1
+                for l, r in pairs
+                if difflib.SequenceMatcher(None, l.text, r.text).ratio()
+                > merger.fuzzy_threshold
+            )
+        score = matches / float(i) + float(i) / 10000.0
+        if matches >= merger.min_match_count and score > best_score:
+            best_score = score
+            best_result = (left_start, left_end, right_start, right_end, matches)
+    return best_result
+
+
+def random_words(rng, vocabulary, count, start_time=0):
+    return create_word_level_segments(
+        " ".join(rng.choice(vocabulary) for _ in range(count)),
+        start_time=start_time,
+        is_chinese=False,
+    )
+
+
+class TestAlignment:
+    """哈希匹配 + 按对角线计数的对齐结果与滑动窗口一致"""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_word_level_same_as_sliding_window(self, seed):
+        rng = random.Random(seed)
+        vocabulary = [f"w{i}" for i in range(rng.choice([3, 10, 50]))]
+        merger = ChunkMerger(min_match_count=rng.choice([1, 2, 5]))
+        merger._is_word_level = True
+
+        left = random_words(rng, vocabulary, rng.randint(0, 120))
+        right = random_words(rng, vocabulary, rng.randint(0, 120))
+
+        assert merger._find_best_alignment(left, right) == sliding_window_alignment(
+            merger, left, right
+        )
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_sentence_level_same_as_sliding_window(self, seed):
+        rng = random.Random(seed)
+        sentences = ["今天天气很好", "我们去公园散步", "公园里有很多人", "天气很好啊", "好"]
+        merger = ChunkMerger(fuzzy_threshold=rng.choice([0.5, 0.7]))
+        merger._is_word_level = False
+
+        def noisy(text):
+            # 模拟识别错误：随机替换一个字
+            if rng.random() < 0.3:
+                pos = rng.randrange(len(text))
+                return text[:pos] + "嗯" + text[pos + 1 :]
+            return text
+
+        left = create_sentence_segments(
+            [noisy(rng.choice(sentences)) for _ in range(rng.randint(0, 30))]
+        )
+        right = create_sentence_segments(
+            [noisy(rng.choice(sentences)) for _ in range(rng.randint(0, 30))]
+        )
+
+        assert merger._find_best_alignment(left, right) == sliding_window_alignment(
+            merger, left, right
+        )
+
+    def test_time_window_ignores_distant_repeats(self):
+        """时间相距很远的相同文本不参与匹配"""
+        left = create_word_level_segments("see you", start_time=0, is_chinese=False)
+        right = create_word_level_segments("see you", start_time=20000, is_chinese=False)
+
+        unrestricted = ChunkMerger()
+        unrestricted._is_word_level = True
+        windowed = ChunkMerger(time_window=3000)
+        windowed._is_word_level = True
+
+        assert unrestricted._find_best_alignment(left, right) is not None
+        assert windowed._find_best_alignment(left, right) is None
+
+
+@pytest.mark.slow
+def test_alignment_benchmark():
+    """单对 chunk 合并耗时：10 秒重叠约 600 个词"""
+    rng = random.Random(0)
+    vocabulary = [f"word{i}" for i in range(300)]
+    words = random_words(rng, vocabulary, 1200)
+    # 两个 chunk 在 600 个词的重叠区域内容相同，时间戳略有偏差
+    left = words[:900]
+    right = [
+        ASRDataSeg(seg.text, seg.start_time + 40, seg.end_time + 40)
+        for seg in words[300:]
+    ]
+    overlap_duration = right[599].end_time - right[0].start_time
+
+    merger = ChunkMerger(time_window=3000)
+    merger._is_word_level = True
+    left_overlap = merger._extract_overlap_segments(left, True, overlap_duration)
+    right_overlap = merger._extract_overlap_segments(right, False, overlap_duration)
+
+    def timed(func, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = func()
+        return result, (time.perf_counter() - start) / repeat * 1000
+
+    expected, sliding_ms = timed(
+        lambda: sliding_window_alignment(merger, left_overlap, right_overlap), 3
+    )
+    actual, hashed_ms = timed(
+        lambda: merger._find_best_alignment(left_overlap, right_overlap), 20
+    )
+    _, merge_ms = timed(
+        lambda: merger._merge_two_sequences(left, right, overlap_duration), 20
+    )
+
+    print(
+        f"\n重叠 {len(left_overlap)}/{len(right_overlap)} 词: "
+        f"滑动窗口 {sliding_ms:.1f}ms, 哈希对齐 {hashed_ms:.2f}ms, "
+        f"合并一对 chunk {merge_ms:.2f}ms"
+    )
+    assert actual == expected
+    assert hashed_ms < sliding_ms
@@ -13,17 +13,21 @@
 - 避免共享状态，支持真正的并发
 """
 
+import hashlib
 import io
 import tempfile
+import wave
 from pathlib import Path
 from typing import Callable, List, Optional
 
+import numpy as np
 import pytest
 from pydub import AudioSegment
 
 from app.core.asr.asr_data import ASRData, ASRDataSeg
 from app.core.asr.base import BaseASR
 from app.core.asr.chunked_asr import ChunkedASR
+from app.core.asr.pcm_wav import PCMWavInfo, parse_pcm_wav, pcm_to_float32, wav_header
 
 # ============================================================================
 # Mock ASR 辅助类
@@ -460,6 +464,76 @@ class TestProgressCallback:
             Path(audio_input).unlink()
 
 
+# ============================================================================
+# 测试 PCM 直接切分
+# ============================================================================
+
+
+class LocalMockASR(MockASR):
+    """模拟本地引擎：分块输入为 WAV PCM"""
+
+    NEEDS_COMPRESSED_AUDIO = False
+
+
+def create_test_wav_file(duration_sec: int, sample_rate: int = 16000) -> str:
+    """创建 16 位单声道 PCM WAV，采样值为递增序列（便于校验切分位置）"""
+    samples = (np.arange(duration_sec * sample_rate) % 30000).astype("<i2")
+    temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+    temp_path = temp_file.name
+    temp_file.close()
+    with wave.open(temp_path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return temp_path
+
+
+class TestPCMSplitting:
+    """测试本地引擎的 PCM 切分"""
+
+    def test_local_engine_gets_wav_chunks(self):
+        """本地引擎的分块为 WAV，采样与原始音频对应范围一致"""
+        audio_input = create_test_wav_file(100)
+        try:
+            chunked = ChunkedASR(
+                asr_class=LocalMockASR,
+                audio_path=audio_input,
+                chunk_length=40,
+                chunk_overlap=5,
+            )
+
+            chunks = chunked._split_audio()
+
+            assert [offset for _, offset in chunks] == [0, 35000, 70000]
+            for chunk, offset_ms in chunks:
+                chunk_bytes = chunk.read()
+                assert chunk_bytes[:4] == b"RIFF"
+                assert chunk.sha1_hex() == hashlib.sha1(chunk_bytes).hexdigest()
+                samples = pcm_to_float32(chunk_bytes)
+                first = offset_ms * 16
+                expected = (
+                    np.arange(first, first + len(samples)) % 30000
+                ).astype(np.float32) / 32768.0
+                np.testing.assert_array_equal(samples, expected)
+
+            # 最后一块只有 30 秒
+            with wave.open(io.BytesIO(chunks[-1][0].read())) as wav:
+                assert wav.getnframes() == 30 * 16000
+        finally:
+            Path(audio_input).unlink()
+
+    def test_wav_header_roundtrip(self):
+        """生成的 WAV 头可以被解析"""
+        info = PCMWavInfo(1, 16000, 2, 16, 44, 0)
+        data = b"\x01\x00" * 100
+        buffer = wav_header(info, len(data)) + data
+
+        parsed = parse_pcm_wav(buffer)
+
+        assert parsed == PCMWavInfo(1, 16000, 2, 16, 44, 200)
+
+
 # ============================================================================
 # 集成测试
 # ============================================================================
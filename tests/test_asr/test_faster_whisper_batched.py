@@ -0,0 +1,92 @@
+"""FasterWhisperPythonASR 批量推理测试
+
+基准测试需要本地可用的 faster-whisper 模型（默认 tiny，首次运行会下载），
+模型不可用时跳过：
+
+    pytest tests/test_asr/test_faster_whisper_batched.py -m integration -s
+
+环境变量：
+    FASTER_WHISPER_MODEL: 模型名称，默认 tiny
+    FASTER_WHISPER_MODEL_DIR: 本地模型目录（可选）
+"""
+
+import os
+import time
+
+import pytest
+from faster_whisper import decode_audio
+
+from app.core.asr.faster_whisper_python import FasterWhisperPythonASR, acquire_model
+
+# 基准测试使用的批大小
+BENCH_BATCH_SIZE = 8
+
+
+def make_asr(audio_input, **kwargs) -> FasterWhisperPythonASR:
+    return FasterWhisperPythonASR(
+        audio_input, whisper_model="tiny", device="cpu", **kwargs
+    )
+
+
+class TestBatchedConfig:
+    def test_sequential_cache_key_unchanged(self):
+        """逐段解码的缓存 key 与引入批量推理前一致"""
+        default = make_asr(b"audio")
+        explicit = make_asr(b"audio", batch_size=1)
+
+        assert default.batch_size == 1
+        assert default._get_key() == explicit._get_key()
+
+    def test_batched_results_cached_separately(self):
+        sequential = make_asr(b"audio")
+        batched = make_asr(b"audio", batch_size=BENCH_BATCH_SIZE)
+
+        assert batched._get_key() != sequential._get_key()
+
+    def test_batched_requires_vad(self):
+        """未启用 VAD 时回退为逐段解码"""
+        asr = make_asr(b"audio", batch_size=BENCH_BATCH_SIZE, vad_filter=False)
+
+        assert asr.batch_size == 1
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestBatchedBenchmark:
+    def test_batched_throughput(self, test_audio_path_zh):
+        """对比逐段解码与批量推理的吞吐量（音频秒/秒）"""
+        whisper_model = os.getenv("FASTER_WHISPER_MODEL", "tiny")
+        model_dir = os.getenv("FASTER_WHISPER_MODEL_DIR") or None
+        try:
+            with acquire_model(whisper_model, model_dir, "cpu"):
+                pass
+        except Exception as e:
+            pytest.skip(f"faster-whisper model unavailable: {e}")
+
+        def callback(progress, message):
+            pass
+
+        sample_rate = 16000
+        audio_seconds = len(decode_audio(str(test_audio_path_zh))) / sample_rate
+
+        results = {}
+        for batch_size in (1, BENCH_BATCH_SIZE):
+            asr = FasterWhisperPythonASR(
+                str(test_audio_path_zh),
+                whisper_model=whisper_model,
+                model_dir=model_dir,
+                device="cpu",
+                batch_size=batch_size,
+            )
+            with acquire_model(whisper_model, model_dir, "cpu") as model:
+                start = time.monotonic()
+                segments = asr._transcribe_segments(model, callback)
+                elapsed = time.monotonic() - start
+
+            assert segments, f"batch_size={batch_size} produced no segments"
+            results[batch_size] = audio_seconds / elapsed
+
+        print()
+        for batch_size, throughput in results.items():
+            print(f"batch_size={batch_size}: {throughput:.2f} audio-sec/sec")
+        print(f"speedup: {results[BENCH_BATCH_SIZE] / results[1]:.2f}x")
@@ -0,0 +1,123 @@
+"""进程内模型注册表测试"""
+
+import threading
+import time
+
+import pytest
+
+from app.core.asr.model_registry import MB, model_registry
+
+
+@pytest.fixture
+def registry():
+    model_registry.set_memory_budget(0)
+    model_registry.clear()
+    yield model_registry
+    model_registry.set_memory_budget(0)
+    model_registry.clear()
+
+
+class CountingLoader:
+    """记录加载次数的模型加载函数"""
+
+    def __init__(self, name: str, delay: float = 0):
+        self.name = name
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return object()
+
+
+def loaded_keys(registry):
+    return [item["key"] for item in registry.loaded_models()]
+
+
+class TestModelRegistry:
+    def test_model_is_loaded_once_and_reused(self, registry):
+        loader = CountingLoader("a")
+        with registry.acquire("a", loader, 100 * MB) as first:
+            pass
+        with registry.acquire("a", loader, 100 * MB) as second:
+            pass
+
+        assert loader.calls == 1
+        assert first is second
+
+    def test_concurrent_acquire_shares_one_load(self, registry):
+        """并发获取同一模型时只加载一次，所有线程拿到同一实例"""
+        loader = CountingLoader("a", delay=0.2)
+        models = []
+
+        def worker():
+            with registry.acquire("a", loader, 100 * MB) as model:
+                models.append(model)
+                time.sleep(0.05)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert loader.calls == 1
+        assert len(models) == 4
+        assert all(model is models[0] for model in models)
+        assert registry.loaded_models()[0]["refs"] == 0
+
+    def test_lru_eviction_under_budget(self, registry):
+        """超出预算时卸载最久未使用的空闲模型"""
+        registry.set_memory_budget(250 * MB)
+        loaders = {name: CountingLoader(name) for name in "abc"}
+
+        for name in "ab":
+            registry.preload(name, loaders[name], 100 * MB)
+        with registry.acquire("a", loaders["a"], 100 * MB):
+            pass
+        registry.preload("c", loaders["c"], 100 * MB)
+
+        assert loaded_keys(registry) == ["a", "c"]
+        assert loaders["a"].calls == 1
+
+    def test_models_in_use_are_not_evicted(self, registry):
+        registry.set_memory_budget(150 * MB)
+        loaders = {name: CountingLoader(name) for name in "ab"}
+
+        with registry.acquire("a", loaders["a"], 100 * MB) as model_a:
+            registry.preload("b", loaders["b"], 100 * MB)
+            # a 正在使用，超出预算时也不能卸载
+            assert "a" in loaded_keys(registry)
+            with registry.acquire("a", loaders["a"], 100 * MB) as again:
+                assert again is model_a
+
+        # 释放后 b 是最久未使用的空闲模型，被卸载
+        assert loaded_keys(registry) == ["a"]
+        assert loaders["a"].calls == 1
+
+    def test_most_recent_model_kept_when_larger_than_budget(self, registry):
+        """单个模型超出预算时仍保留，避免每次使用都重新加载"""
+        registry.set_memory_budget(50 * MB)
+        loader = CountingLoader("a")
+
+        for _ in range(3):
+            with registry.acquire("a", loader, 100 * MB):
+                pass
+
+        assert loader.calls == 1
+        assert loaded_keys(registry) == ["a"]
+
+    def test_failed_load_is_not_cached(self, registry):
+        def failing_loader():
+            raise OSError("model not found")
+
+        with pytest.raises(OSError):
+            with registry.acquire("a", failing_loader, 100 * MB):
+                pass
+
+        assert loaded_keys(registry) == []
+        loader = CountingLoader("a")
+        with registry.acquire("a", loader, 100 * MB):
+            pass
+        assert loader.calls == 1
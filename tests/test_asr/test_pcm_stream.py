@@ -0,0 +1,162 @@
+"""PCM 管道流分块测试
+
+以内存数据代替 ffmpeg 输出，不依赖 ffmpeg。
+"""
+
+import io
+import wave
+from typing import Callable, List, Optional
+
+import numpy as np
+import pytest
+
+from app.core.asr.asr_data import ASRDataSeg
+from app.core.asr.base import BaseASR
+from app.core.asr.chunked_asr import ChunkedASR
+from app.core.asr.pcm_stream import PCMStream, split_pcm_stream
+from app.core.asr.pcm_wav import parse_pcm_wav
+
+SAMPLE_RATE = 16000
+
+
+def speech_with_gaps(duration_ms: int, gaps) -> bytes:
+    """440Hz 正弦波模拟讲话，gaps 内为静音"""
+    t = np.arange(duration_ms * SAMPLE_RATE // 1000) / SAMPLE_RATE
+    samples = 8000 * np.sin(2 * np.pi * 440 * t)
+    for start_ms, end_ms in gaps:
+        samples[start_ms * 16 : end_ms * 16] = 0
+    return samples.astype("<i2").tobytes()
+
+
+def write_wav(path, pcm: bytes) -> str:
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm)
+    return str(path)
+
+
+class BytesPCMStream(PCMStream):
+    """以内存数据代替 ffmpeg 输出的 PCM 流"""
+
+    def __init__(self, pcm: bytes):
+        super().__init__("memory")
+        self.total_bytes = len(pcm)
+        self.reader = io.BytesIO(pcm)
+        self.closed = False
+
+    @property
+    def duration_ms(self) -> Optional[int]:
+        return self.total_bytes // 32
+
+    def read(self, size: int) -> bytes:
+        return self.reader.read(size)
+
+    def close(self):
+        self.closed = True
+
+
+class WavMockASR(BaseASR):
+    """按 WAV 时长每秒输出一个片段的本地引擎，记录开始转录时流的读取位置"""
+
+    NEEDS_COMPRESSED_AUDIO = False
+    stream: Optional[BytesPCMStream] = None
+    read_positions: List[int] = []
+
+    def _run(self, callback: Optional[Callable[[int, str], None]] = None, **kwargs):
+        if WavMockASR.stream is not None:
+            WavMockASR.read_positions.append(WavMockASR.stream.reader.tell())
+        info = parse_pcm_wav(self.file_binary)
+        return info.data_size // info.block_align // SAMPLE_RATE
+
+    def _make_segments(self, resp_data: int) -> List[ASRDataSeg]:
+        return [
+            ASRDataSeg(text=f"s{i}", start_time=i * 1000, end_time=i * 1000 + 800)
+            for i in range(resp_data)
+        ]
+
+
+@pytest.fixture
+def wav_mock():
+    WavMockASR.stream = None
+    WavMockASR.read_positions = []
+    yield WavMockASR
+    WavMockASR.stream = None
+
+
+class TestSplitPCMStream:
+    """边读取边切分的结果与文件分块一致"""
+
+    @pytest.mark.parametrize("snap_to_silence", [False, True])
+    @pytest.mark.parametrize("duration_ms", [100000, 80000, 80001, 30000])
+    def test_matches_file_chunks(self, tmp_path, duration_ms, snap_to_silence):
+        pcm = speech_with_gaps(duration_ms, [(33000, 34000)])
+        audio_path = write_wav(tmp_path / "a.wav", pcm)
+        chunked = ChunkedASR(
+            asr_class=WavMockASR,
+            audio_path=audio_path,
+            chunk_length=40,
+            chunk_overlap=5,
+            snap_to_silence=snap_to_silence,
+        )
+        try:
+            expected = [(chunk.read(), offset) for chunk, offset in chunked._split_audio()]
+        finally:
+            chunked.source.close()
+
+        actual = list(
+            split_pcm_stream(io.BytesIO(pcm).read, 40000, 5000, snap_to_silence)
+        )
+
+        assert [(wav, plan.start_ms) for wav, plan in actual] == expected
+        assert [plan.overlap_ms for _, plan in actual[1:]] == chunked.boundary_overlaps
+
+    def test_reads_at_most_one_chunk_ahead(self):
+        """每次只读取切出下一块所需的数据"""
+        pcm = speech_with_gaps(100000, [])
+        reader = io.BytesIO(pcm)
+        chunks = split_pcm_stream(reader.read, 40000, 5000)
+
+        next(chunks)
+
+        assert reader.tell() == (40000 + 1) * 32
+
+
+class TestStreamingChunkedASR:
+    def test_stream_result_matches_file(self, tmp_path, wav_mock):
+        """流式转录结果与先解码为 WAV 文件再转录一致"""
+        pcm = speech_with_gaps(150000, [(70000, 71000)])
+        kwargs = dict(asr_class=wav_mock, chunk_length=40, chunk_overlap=5)
+
+        expected = ChunkedASR(
+            audio_path=write_wav(tmp_path / "a.wav", pcm), **kwargs
+        ).run()
+
+        stream = BytesPCMStream(pcm)
+        emitted = []
+        result = ChunkedASR(audio_path=stream, **kwargs).run(
+            segment_callback=emitted.extend
+        )
+
+        texts = [(seg.text, seg.start_time) for seg in expected.segments]
+        assert [(seg.text, seg.start_time) for seg in result.segments] == texts
+        assert [(seg.text, seg.start_time) for seg in emitted] == texts
+        assert stream.closed
+
+    def test_first_chunk_starts_before_decode_finishes(self, wav_mock):
+        """第一块在整段音频读完之前开始转录"""
+        pcm = speech_with_gaps(300000, [])
+        stream = BytesPCMStream(pcm)
+        wav_mock.stream = stream
+
+        ChunkedASR(
+            asr_class=wav_mock,
+            audio_path=stream,
+            chunk_length=40,
+            chunk_overlap=5,
+            chunk_concurrency=1,
+        ).run()
+
+        assert len(wav_mock.read_positions) == 9
+        assert wav_mock.read_positions[0] < len(pcm) // 2
@@ -0,0 +1,128 @@
+"""whisper.cpp 常驻服务测试
+
+使用模拟的 whisper-server（Python 脚本，提供 /health 与 /inference 接口），
+不需要真实的 whisper.cpp 与 ggml 模型。
+"""
+
+import os
+import stat
+import sys
+import threading
+import time
+
+import pytest
+
+from app.core.asr.whisper_cpp_server import WhisperCppServer
+from app.core.utils.cancel import CancelToken, TaskCancelledError, cancel_scope
+
+FAKE_SERVER = '''
+import argparse
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-m")
+parser.add_argument("--host")
+parser.add_argument("--port", type=int)
+parser.add_argument("--no-gpu", action="store_true")
+args = parser.parse_args()
+
+# 模拟模型加载耗时
+time.sleep(0.3)
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200 if self.path == "/health" else 404)
+        self.end_headers()
+        self.wfile.write(b'{"status": "ok"}')
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if b"slow" in body:
+            time.sleep(30)
+        srt = "1\\n00:00:00,000 --> 00:00:01,000\\npid %d\\n" % os.getpid()
+        data = srt.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+ThreadingHTTPServer((args.host, args.port), Handler).serve_forever()
+'''
+
+
+@pytest.fixture
+def server(tmp_path):
+    script = tmp_path / "whisper-server"
+    script.write_text(f"#!{sys.executable}\n{FAKE_SERVER}", encoding="utf-8")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+
+    server = WhisperCppServer(str(script), str(tmp_path / "ggml-tiny.bin"))
+    yield server
+    server.stop()
+
+
+@pytest.mark.skipif(os.name == "nt", reason="fake server uses a shebang script")
+class TestWhisperCppServer:
+    def test_started_once_for_many_requests(self, server):
+        first = server.transcribe(b"audio-1", language="en")
+        second = server.transcribe(b"audio-2", language="en")
+
+        assert f"pid {server.pid}" in first
+        assert first == second
+        assert server.starts == 1
+        assert server.health()
+
+    def test_restarted_after_crash(self, server):
+        server.transcribe(b"audio")
+        old_pid = server.pid
+
+        server._process.kill()
+        server._process.wait()
+        assert not server.health()
+
+        result = server.transcribe(b"audio")
+        assert server.starts == 2
+        assert server.pid != old_pid
+        assert f"pid {server.pid}" in result
+
+    def test_start_failure_raises(self, tmp_path):
+        script = tmp_path / "whisper-server"
+        script.write_text(f"#!{sys.executable}\nimport sys\nsys.exit(3)\n")
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+        server = WhisperCppServer(str(script), "model.bin")
+
+        with pytest.raises(RuntimeError, match="返回码 3"):
+            server.transcribe(b"audio")
+
+    def test_cancel_aborts_running_request(self, server):
+        server.ensure_running()
+        token = CancelToken()
+        outcome = {}
+
+        def worker():
+            with cancel_scope(token):
+                try:
+                    server.transcribe(b"slow")
+                except BaseException as e:
+                    outcome["error"] = e
+
+        thread = threading.Thread(target=worker)
+        started = time.monotonic()
+        thread.start()
+        time.sleep(0.5)
+        token.cancel()
+        thread.join(timeout=10)
+
+        assert isinstance(outcome.get("error"), TaskCancelledError)
+        assert time.monotonic() - started < 10
+        # 下一次请求重新启动服务
+        assert "pid" in server.transcribe(b"audio")
+        assert server.starts == 2
@@ -0,0 +1,140 @@
+"""LLM 客户端测试的模拟 OpenAI 兼容服务（/v1/chat/completions），不需要真实 API"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+import pytest
+from openinference.instrumentation.openai import OpenAIInstrumentor
+
+from app.core.llm import client as llm_client
+from app.core.llm.client import DEFAULT_MAX_CONCURRENCY, llm_pool
+from app.core.llm.rate_limiter import rate_limiters
+from tests.conftest import tracer_provider
+
+
+class FakeOpenAIServer:
+    """记录同时进行的请求数的模拟服务
+
+    headers 会附加到每个成功响应上；rate_limited 大于 0 时，
+    接下来的相应数量的请求返回 429（带 retry-after）；
+    cached_tokens 作为命中前缀缓存的提示词 token 数返回。
+    """
+
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay
+        self.headers: Dict[str, str] = {}
+        self.rate_limited = 0
+        self.retry_after = "0.2"
+        self.cached_tokens = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self.request_times = []
+        self.lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server.lock:
+                    server.requests += 1
+                    server.request_times.append(time.monotonic())
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    throttled = server.rate_limited > 0
+                    if throttled:
+                        server.rate_limited -= 1
+                try:
+                    prompt = body["messages"][-1]["content"]
+                    if not throttled:
+                        time.sleep(30 if prompt == "slow" else server.delay)
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+                if throttled:
+                    self._reply(
+                        429,
+                        {"error": {"message": "Rate limit reached", "type": "requests"}},
+                        {"retry-after": server.retry_after},
+                    )
+                    return
+
+                self._reply(
+                    200,
+                    {
+                        "id": "chatcmpl-test",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": body["model"],
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {
+                                    "role": "assistant",
+                                    "content": f"{body['model']}: {prompt}",
+                                },
+                                "finish_reason": "stop",
+                            }
+                        ],
+                        "usage": {
+                            "prompt_tokens": 10,
+                            "completion_tokens": 5,
+                            "total_tokens": 15,
+                            "prompt_tokens_details": {
+                                "cached_tokens": server.cached_tokens
+                            },
+                        },
+                    },
+                    server.headers,
+                )
+
+            def _reply(self, status: int, payload: dict, headers: Dict[str, str]):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}/v1"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture(scope="package", autouse=True)
+def without_tracing():
+    """根 conftest 注册的 OTel 追踪逐个同步导出 span，会拖慢大量请求"""
+    instrumentor = OpenAIInstrumentor()
+    instrumentor.uninstrument()
+    yield
+    instrumentor.instrument(tracer_provider=tracer_provider)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fake = FakeOpenAIServer()
+    monkeypatch.setenv("OPENAI_BASE_URL", fake.base_url)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(llm_client, "CANCEL_POLL_INTERVAL", 0.05)
+    yield fake
+    llm_pool.shutdown()
+    llm_pool.set_max_concurrency(DEFAULT_MAX_CONCURRENCY)
+    rate_limiters.clear()
+    fake.close()
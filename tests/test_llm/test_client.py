@@ -0,0 +1,104 @@
+"""异步 LLM 请求池测试（使用 conftest 中的模拟 OpenAI 兼容服务）"""
+
+import asyncio
+import os
+import threading
+import time
+
+from app.core.llm.client import acall_llm, call_llm, llm_pool
+from app.core.utils.cancel import CancelToken, TaskCancelledError, cancel_scope
+
+
+def user_message(text: str):
+    return [{"role": "user", "content": text}]
+
+
+def test_sync_facade_returns_response(server):
+    response = call_llm(user_message("hello"), model="gpt-test")
+    assert response.choices[0].message.content == "gpt-test: hello"
+
+
+def test_concurrency_bounded_per_model(server):
+    """多个线程同时调用时，同一模型的并发请求数不超过上限"""
+    llm_pool.set_max_concurrency(4)
+    errors = []
+
+    def worker(i: int):
+        try:
+            call_llm(user_message(f"q{i}"), model="gpt-test")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert server.requests == 20
+    assert server.max_in_flight <= 4
+
+
+def test_models_have_separate_limits(server):
+    llm_pool.set_max_concurrency(1)
+
+    async def both():
+        return await asyncio.gather(
+            acall_llm(user_message("a"), model="model-a"),
+            acall_llm(user_message("b"), model="model-b"),
+        )
+
+    results = llm_pool.run(both())
+    assert [r.choices[0].message.content for r in results] == [
+        "model-a: a",
+        "model-b: b",
+    ]
+    assert server.max_in_flight == 2
+
+
+def test_many_requests_in_flight_without_threads(server):
+    """上百个请求同时等待响应，只占用事件循环一个线程"""
+    llm_pool.set_max_concurrency(100)
+    server.delay = 1.0
+
+    def client_threads():
+        # 排除模拟服务处理请求的线程
+        return [t for t in threading.enumerate() if "process_request" not in t.name]
+
+    threads_before = len(client_threads())
+
+    async def many():
+        return await asyncio.gather(
+            *(acall_llm(user_message(f"q{i}"), model="gpt-test") for i in range(100))
+        )
+
+    results = llm_pool.run(many())
+
+    assert len(results) == 100
+    assert server.max_in_flight > 50
+    # 客户端新增的只有事件循环线程和它做 DNS 解析的默认线程池（大小固定，与请求数无关）
+    default_executor_size = min(32, (os.cpu_count() or 1) + 4)
+    assert len(client_threads()) - threads_before <= 1 + default_executor_size
+
+
+def test_cancel_aborts_waiting_call(server):
+    token = CancelToken()
+    outcome = {}
+
+    def worker():
+        with cancel_scope(token):
+            try:
+                call_llm(user_message("slow"), model="gpt-test")
+            except BaseException as e:
+                outcome["error"] = e
+
+    thread = threading.Thread(target=worker)
+    started = time.monotonic()
+    thread.start()
+    time.sleep(0.3)
+    token.cancel()
+    thread.join(timeout=5)
+
+    assert isinstance(outcome.get("error"), TaskCancelledError)
+    assert time.monotonic() - started < 5
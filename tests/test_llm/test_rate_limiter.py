@@ -0,0 +1,153 @@
+"""LLM 主动限流（RPM / TPM 令牌桶）测试"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.llm.client import call_llm, normalize_base_url
+from app.core.llm.rate_limiter import (
+    RateLimiter,
+    RateLimiterRegistry,
+    TokenBucket,
+    estimate_tokens,
+    parse_reset_duration,
+    rate_limiters,
+)
+
+
+def timed_acquire(limiter: RateLimiter, tokens: int) -> float:
+    start = time.monotonic()
+    asyncio.run(limiter.acquire(tokens))
+    return time.monotonic() - start
+
+
+class TestEstimateTokens:
+    def test_ascii_and_cjk(self):
+        ascii_only = estimate_tokens([{"role": "user", "content": "a" * 400}])
+        cjk_only = estimate_tokens([{"role": "user", "content": "字" * 100}])
+        assert ascii_only == cjk_only == 3 + 4 + 100
+
+    def test_reserves_max_tokens(self):
+        messages = [{"role": "system", "content": "hi"}, {"role": "user", "content": ""}]
+        assert estimate_tokens(messages, max_tokens=500) == 3 + 4 + 1 + 4 + 500
+
+
+@pytest.mark.parametrize(
+    "value, seconds",
+    [("1s", 1.0), ("6m0s", 360.0), ("20ms", 0.02), ("1h2m3.5s", 3723.5), ("0.5", 0.5)],
+)
+def test_parse_reset_duration(value, seconds):
+    assert parse_reset_duration(value) == pytest.approx(seconds)
+
+
+class TestTokenBucket:
+    def test_waits_for_refill_when_empty(self):
+        bucket = TokenBucket(60)
+        assert bucket.wait_time(60) == 0
+        bucket.take(60)
+        # 每秒补充 1 个
+        assert bucket.wait_time(1) == pytest.approx(1.0, abs=0.05)
+        assert bucket.wait_time(3) == pytest.approx(3.0, abs=0.05)
+
+    def test_request_larger_than_capacity_waits_for_full_bucket(self):
+        bucket = TokenBucket(600)
+        bucket.take(300)
+        assert bucket.wait_time(10000) == pytest.approx(30.0, abs=0.1)
+
+    def test_disabled_never_waits(self):
+        bucket = TokenBucket(0)
+        bucket.take(10**9)
+        assert bucket.wait_time(10**9) == 0
+
+
+class TestRateLimiter:
+    def test_rpm_paces_requests(self):
+        limiter = RateLimiter("api", rpm=600)
+        limiter.requests.take(600)
+        # 每 0.1 秒补充一个请求额度
+        assert timed_acquire(limiter, 1) == pytest.approx(0.1, abs=0.05)
+
+    def test_tpm_paces_large_prompts(self):
+        limiter = RateLimiter("api", tpm=60000)
+        assert timed_acquire(limiter, 59800) < 0.05
+        # 剩余 200，还差 300 个 token，每秒补充 1000 个
+        assert timed_acquire(limiter, 500) == pytest.approx(0.3, abs=0.05)
+
+    def test_actual_usage_refunds_estimate(self):
+        limiter = RateLimiter("api", tpm=6000)
+        asyncio.run(limiter.acquire(6000))
+        limiter.record_usage(6000, 1000)
+        assert timed_acquire(limiter, 4000) < 0.05
+
+    def test_learns_limits_from_headers(self):
+        limiter = RateLimiter("api")
+        limiter.update_from_headers(
+            {
+                "x-ratelimit-limit-requests": "500",
+                "x-ratelimit-remaining-requests": "499",
+                "x-ratelimit-limit-tokens": "30000",
+                "x-ratelimit-remaining-tokens": "100",
+                "x-ratelimit-reset-tokens": "59.8s",
+            }
+        )
+        assert limiter.requests.capacity == 500
+        assert limiter.tokens.capacity == 30000
+        assert limiter.tokens.level == pytest.approx(100, abs=5)
+
+    def test_configured_limit_not_overridden(self):
+        limiter = RateLimiter("api", rpm=60)
+        limiter.update_from_headers({"x-ratelimit-limit-requests": "5000"})
+        assert limiter.requests.capacity == 60
+
+    def test_exhausted_quota_pauses_until_reset(self):
+        limiter = RateLimiter("api")
+        limiter.update_from_headers(
+            {
+                "x-ratelimit-limit-requests": "100",
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": "300ms",
+            }
+        )
+        assert timed_acquire(limiter, 1) >= 0.25
+
+    def test_429_pauses_for_retry_after(self):
+        limiter = RateLimiter("api")
+        limiter.on_rate_limited({"retry-after": "0.3"})
+        assert timed_acquire(limiter, 1) >= 0.25
+
+
+def test_configure_endpoints_clears_stale_limits(monkeypatch):
+    monkeypatch.setattr(RateLimiterRegistry, "_instance", None)
+    registry = RateLimiterRegistry()
+    registry.configure_endpoints({"primary": (60, 1000), "backup": (30, 0)})
+    assert registry.get("backup").requests.capacity == 30
+
+    # 切换主服务后旧接口改由响应头学习
+    registry.configure_endpoints({"backup": (30, 0)})
+    old = registry.get("primary")
+    assert (old.requests.capacity, old.tokens.capacity) == (0, 0)
+    old.update_from_headers({"x-ratelimit-limit-requests": "500"})
+    assert old.requests.capacity == 500
+
+
+class TestCallLLMRateLimiting:
+    def test_headers_tune_shared_limiter(self, server):
+        server.headers = {
+            "x-ratelimit-limit-requests": "100",
+            "x-ratelimit-remaining-requests": "99",
+        }
+        call_llm([{"role": "user", "content": "hi"}], model="gpt-test")
+
+        limiter = rate_limiters.get(normalize_base_url(server.base_url))
+        assert limiter.requests.capacity == 100
+
+    def test_429_retried_after_retry_after(self, server):
+        server.rate_limited = 1
+        server.retry_after = "0.5"
+
+        response = call_llm([{"role": "user", "content": "hi"}], model="gpt-test")
+
+        assert response.choices[0].message.content == "gpt-test: hi"
+        assert server.requests == 2
+        assert server.request_times[1] - server.request_times[0] >= 0.5
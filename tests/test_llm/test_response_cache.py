@@ -0,0 +1,99 @@
+"""LLM 响应缓存（规范化请求哈希 + LRU 磁盘预算）测试"""
+
+import pytest
+from diskcache import Cache
+
+from app.core.llm import client as llm_client
+from app.core.llm.client import call_llm
+from app.core.llm.response_cache import LLMResponseCache, request_key
+
+MESSAGES = [
+    {"role": "system", "content": "你是翻译助手"},
+    {"role": "user", "content": "hello"},
+]
+
+
+@pytest.fixture
+def response_cache(tmp_path, monkeypatch):
+    cache = Cache(str(tmp_path / "llm"), eviction_policy="least-recently-used")
+    response_cache = LLMResponseCache(cache)
+    monkeypatch.setattr(llm_client, "llm_response_cache", response_cache)
+    monkeypatch.setattr(llm_client, "is_cache_enabled", lambda: True)
+    yield response_cache
+    cache.close()
+
+
+class TestRequestKey:
+    def test_canonical_form(self):
+        reordered = [{"content": m["content"], "role": m["role"]} for m in MESSAGES]
+        assert request_key("api", "gpt", MESSAGES, 1) == request_key(
+            "api", "gpt", reordered, 1.0
+        )
+        assert request_key(
+            "api", "gpt", MESSAGES, 0.7, max_tokens=100, top_p=0.9
+        ) == request_key("api", "gpt", MESSAGES, 0.7, top_p=0.9, max_tokens=100)
+
+    def test_ignores_transport_params(self):
+        assert request_key("api", "gpt", MESSAGES, 1) == request_key(
+            "api", "gpt", MESSAGES, 1, timeout=30, extra_headers={"x-trace": "1"}
+        )
+
+    @pytest.mark.parametrize(
+        "changed",
+        [
+            ("other-api", "gpt", MESSAGES, 1),
+            ("api", "gpt-mini", MESSAGES, 1),
+            ("api", "gpt", MESSAGES[1:], 1),
+            ("api", "gpt", MESSAGES, 0.5),
+        ],
+    )
+    def test_differs_by_request(self, changed):
+        assert request_key(*changed) != request_key("api", "gpt", MESSAGES, 1)
+
+
+class TestLLMResponseCache:
+    def test_metrics_count_hits_and_misses(self, response_cache):
+        assert response_cache.get("a") is None
+        response_cache.set("a", "译文")
+        assert response_cache.get("a") == "译文"
+
+        metrics = response_cache.metrics()
+        assert (metrics["hits"], metrics["misses"], metrics["entries"]) == (1, 1, 1)
+        assert metrics["hit_rate"] == 0.5
+
+    def test_evicts_least_recently_used(self, response_cache):
+        value = "x" * 40 * 1024
+        for i in range(30):
+            response_cache.set(f"old-{i}", value)
+        response_cache.get("old-0")
+
+        response_cache.set_size_limit(600 * 1024)
+        assert "old-0" in response_cache.cache
+        assert "old-1" not in response_cache.cache
+
+        for i in range(10):
+            response_cache.set(f"new-{i}", value)
+        assert response_cache.cache.volume() <= 600 * 1024 + len(value)
+        assert "new-9" in response_cache.cache
+
+
+class TestCallLLMCache:
+    def test_repeated_request_served_from_cache(self, server, response_cache):
+        first = call_llm(MESSAGES, model="gpt-test", temperature=1)
+        second = call_llm(
+            [{"content": m["content"], "role": m["role"]} for m in MESSAGES],
+            model="gpt-test",
+            temperature=1.0,
+            timeout=60,
+        )
+
+        assert server.requests == 1
+        assert second.choices[0].message.content == first.choices[0].message.content
+        assert response_cache.metrics()["hits"] == 1
+
+    def test_different_model_not_shared(self, server, response_cache):
+        call_llm(MESSAGES, model="gpt-a")
+        response = call_llm(MESSAGES, model="gpt-b")
+
+        assert server.requests == 2
+        assert response.choices[0].message.content == "gpt-b: hello"
@@ -0,0 +1,168 @@
+"""多服务商路由测试：按延迟与健康状况选择、对冲慢请求、故障切换"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.llm.client import call_llm, normalize_base_url
+from app.core.llm.router import (
+    FAILURE_THRESHOLD,
+    MIN_HEDGE_SAMPLES,
+    LLMProvider,
+    ProviderHealth,
+    llm_router,
+)
+from tests.test_llm.conftest import FakeOpenAIServer
+
+PRIMARY = LLMProvider("OpenAI", "http://primary/v1", "key", "gpt-test")
+BACKUP = LLMProvider("DeepSeek", "http://backup/v1", "key", "deepseek-chat")
+
+
+@pytest.fixture
+def router():
+    llm_router.configure([PRIMARY, BACKUP])
+    yield llm_router
+    llm_router.clear()
+
+
+def fake_send(delays, errors=(), calls=None):
+    """按服务商名称模拟延迟与失败的 send，返回服务商名称"""
+
+    async def send(provider, on_sent):
+        if calls is not None:
+            calls.append(provider.name)
+        on_sent()
+        await asyncio.sleep(delays.get(provider.name, 0))
+        if provider.name in errors:
+            raise ConnectionError(f"{provider.name} down")
+        return provider.name
+
+    return send
+
+
+def warm_up(router, delays, count=MIN_HEDGE_SAMPLES):
+    """让主服务积累足够的延迟样本"""
+
+    async def run():
+        for _ in range(count):
+            await router.request(fake_send(delays))
+
+    asyncio.run(run())
+
+
+def test_health_percentile():
+    health = ProviderHealth()
+    for latency in range(1, 101):
+        health.record_success(latency / 100)
+    assert health.percentile(0.5) == 0.5
+    assert health.percentile(0.95) == 0.95
+    assert ProviderHealth().percentile(0.95) is None
+
+
+def test_health_cooldown_after_consecutive_failures():
+    health = ProviderHealth()
+    for _ in range(FAILURE_THRESHOLD - 1):
+        health.record_failure()
+    assert health.available()
+    health.record_failure()
+    assert not health.available()
+    health.record_success(0.1)
+    assert health.available()
+
+
+class TestRouting:
+    def test_only_primary_model_routed(self, router):
+        assert router.routes("gpt-test")
+        assert not router.routes("other-model")
+
+    def test_untried_providers_keep_configured_order(self, router):
+        assert router.ordered() == [PRIMARY, BACKUP]
+
+    def test_prefers_lower_latency(self, router):
+        async def run():
+            # 两个服务商各积累一个延迟样本：备用服务 0.1s，主服务约 0s
+            await router.request(fake_send({"DeepSeek": 0.1}, errors={"OpenAI"}))
+            assert router.ordered() == [BACKUP, PRIMARY]
+            await router.request(fake_send({}, errors={"DeepSeek"}))
+
+        asyncio.run(run())
+        assert router.ordered() == [PRIMARY, BACKUP]
+
+    def test_failed_provider_routed_after_working_one(self, router):
+        asyncio.run(router.request(fake_send({}, errors={"OpenAI"})))
+        assert router.ordered() == [BACKUP, PRIMARY]
+        assert router.status()[0]["consecutive_failures"] == 1
+
+
+class TestFailover:
+    def test_switches_on_error(self, router):
+        calls = []
+        result = asyncio.run(
+            router.request(fake_send({}, errors={"OpenAI"}, calls=calls))
+        )
+        assert result == "DeepSeek"
+        assert calls == ["OpenAI", "DeepSeek"]
+
+    def test_all_failing_raises_last_error(self, router):
+        with pytest.raises(ConnectionError, match="DeepSeek down"):
+            asyncio.run(router.request(fake_send({}, errors={"OpenAI", "DeepSeek"})))
+
+
+class TestHedging:
+    def test_no_hedge_without_samples(self, router):
+        calls = []
+        result = asyncio.run(router.request(fake_send({"OpenAI": 1.2}, calls=calls)))
+        assert result == "OpenAI"
+        assert calls == ["OpenAI"]
+
+    def test_slow_request_hedged_to_backup(self, router):
+        warm_up(router, {"OpenAI": 0.01})
+        calls = []
+
+        start = time.monotonic()
+        result = asyncio.run(router.request(fake_send({"OpenAI": 5}, calls=calls)))
+
+        assert result == "DeepSeek"
+        assert calls == ["OpenAI", "DeepSeek"]
+        # 对冲延迟为 p95 与下限 1 秒中的较大者
+        assert 1.0 <= time.monotonic() - start < 2.0
+
+    def test_hedge_disabled(self, router):
+        router.configure([PRIMARY, BACKUP], hedge=False)
+        warm_up(router, {"OpenAI": 0.01})
+        calls = []
+        asyncio.run(router.request(fake_send({"OpenAI": 1.2}, calls=calls)))
+        assert calls == ["OpenAI"]
+
+    def test_hedge_timer_starts_when_sent(self, router):
+        """在并发或限流队列中等待的时间不计入对冲延迟"""
+        warm_up(router, {"OpenAI": 0.01})
+        calls = []
+
+        async def queued_send(provider, on_sent):
+            calls.append(provider.name)
+            await asyncio.sleep(1.5)
+            on_sent()
+            return provider.name
+
+        assert asyncio.run(router.request(queued_send)) == "OpenAI"
+        assert calls == ["OpenAI"]
+
+
+def test_call_llm_fails_over_to_backup_provider(server):
+    down = FakeOpenAIServer()
+    down.close()
+    llm_router.configure(
+        [
+            LLMProvider("OpenAI", normalize_base_url(down.base_url), "key", "gpt-test"),
+            LLMProvider("DeepSeek", normalize_base_url(server.base_url), "key", "ds"),
+        ]
+    )
+    try:
+        response = call_llm([{"role": "user", "content": "hi"}], model="gpt-test")
+    finally:
+        llm_router.clear()
+
+    assert response.choices[0].message.content == "ds: hi"
+    assert server.requests == 1
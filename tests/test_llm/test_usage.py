@@ -0,0 +1,65 @@
+"""LLM token 用量统计测试"""
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from app.core.llm.client import call_llm
+from app.core.llm.usage import CallUsage, UsageStats, llm_usage, parse_usage, usage_scope
+from app.core.utils.cancel import submit_with_context
+
+
+def response_with(**usage):
+    return SimpleNamespace(usage=SimpleNamespace(**usage))
+
+
+class TestParseUsage:
+    def test_openai_cached_tokens(self):
+        response = response_with(
+            prompt_tokens=2000,
+            completion_tokens=100,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1536),
+        )
+        assert parse_usage(response) == CallUsage(2000, 1536, 100)
+
+    def test_deepseek_cache_hit_tokens(self):
+        response = response_with(
+            prompt_tokens=2000, completion_tokens=100, prompt_cache_hit_tokens=1024
+        )
+        assert parse_usage(response) == CallUsage(2000, 1024, 100)
+
+    def test_missing_usage(self):
+        assert parse_usage(SimpleNamespace(usage=None)) is None
+        assert parse_usage(response_with(prompt_tokens=10)) == CallUsage(10, 0, 0)
+
+
+def test_snapshot_splits_cached_and_uncached():
+    stats = UsageStats()
+    stats.add(CallUsage(1000, 0, 50))
+    stats.add(CallUsage(1000, 800, 50))
+
+    snapshot = stats.snapshot()
+    assert snapshot["calls"] == 2
+    assert (snapshot["cached_tokens"], snapshot["uncached_tokens"]) == (800, 1200)
+    assert snapshot["cache_hit_rate"] == 0.4
+
+
+def test_call_llm_accounts_task_usage(server):
+    server.cached_tokens = 8
+    messages = [{"role": "user", "content": "hi"}]
+    before = llm_usage.snapshot()["calls"]
+
+    with usage_scope() as task_usage, ThreadPoolExecutor(2) as pool:
+        call_llm(messages, model="gpt-test")
+        # 处理器线程池中的请求通过 submit_with_context 计入同一任务
+        submit_with_context(pool, call_llm, messages, model="gpt-other").result()
+    call_llm(messages, model="gpt-outside")
+
+    assert task_usage.snapshot() == {
+        "calls": 2,
+        "prompt_tokens": 20,
+        "cached_tokens": 16,
+        "uncached_tokens": 4,
+        "completion_tokens": 10,
+        "cache_hit_rate": 0.8,
+    }
+    assert llm_usage.snapshot()["calls"] == before + 3
@@ -6,12 +6,18 @@ Requires environment variables:
     OPENAI_MODEL: Model name (optional, defaults to gpt-4o-mini)
 """
 
+import asyncio
 import os
+import threading
 from typing import Callable
 
+import json_repair
 import pytest
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
 
 from app.core.asr.asr_data import ASRData, ASRDataSeg
+from app.core.optimize import optimize as optimize_module
 from app.core.optimize.optimize import SubtitleOptimizer
 
 
@@ -112,3 +118,67 @@ class TestSubtitleOptimizer:
         result = optimizer.optimize_subtitle(asr_data)
 
         assert len(result.segments) == 0
+
+
+class TestParallelOptimize:
+    """Batches fan out as coroutines on the shared LLM event loop."""
+
+    def test_batches_run_concurrently_without_threads(self, monkeypatch):
+        in_flight = 0
+        peak = 0
+        threads = set()
+
+        async def fake_llm(messages, model, temperature=1, **kwargs):
+            nonlocal in_flight, peak
+            threads.add(threading.current_thread().name)
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            content = messages[-1]["content"]
+            subtitles = content.split("<input_subtitle>")[1].split("</")[0]
+            chunk = json_repair.loads(subtitles)
+            return ChatCompletion(
+                id="fake",
+                object="chat.completion",
+                created=0,
+                model=model,
+                choices=[
+                    Choice(
+                        index=0,
+                        finish_reason="stop",
+                        message=ChatCompletionMessage(
+                            role="assistant", content=str(chunk)
+                        ),
+                    )
+                ],
+            )
+
+        monkeypatch.setattr(optimize_module, "acall_llm_cached", fake_llm)
+        optimizer = SubtitleOptimizer(
+            thread_num=3, batch_num=2, model="fake", custom_prompt=""
+        )
+        segments = [
+            ASRDataSeg(text=f"第{i}句字幕", start_time=i * 1000, end_time=i * 1000 + 900)
+            for i in range(16)
+        ]
+
+        result = optimizer.optimize_subtitle(ASRData(segments))
+
+        assert [seg.text for seg in result.segments] == [seg.text for seg in segments]
+        assert peak == 3
+        assert threads == {"llm-event-loop"}
+
+    def test_stopped_optimizer_keeps_original_text(self, monkeypatch):
+        async def fake_llm(*args, **kwargs):
+            raise AssertionError("停止后不应再请求")
+
+        monkeypatch.setattr(optimize_module, "acall_llm_cached", fake_llm)
+        optimizer = SubtitleOptimizer(
+            thread_num=2, batch_num=1, model="fake", custom_prompt=""
+        )
+        optimizer.stop()
+
+        result = optimizer._parallel_optimize([{"1": "你好"}, {"2": "世界"}])
+
+        assert result == {"1": "你好", "2": "世界"}
@@ -0,0 +1,34 @@
+"""提示词布局测试：同一任务的提示词逐字节相同，自定义提示词统一在末尾"""
+
+import pytest
+
+from app.core.prompts import get_prompt, list_prompts
+
+
+@pytest.mark.parametrize("prompt_path", list_prompts())
+def test_no_custom_prompt_placeholder(prompt_path):
+    """自定义提示词不再插入模板中间"""
+    assert "custom_prompt" not in get_prompt(prompt_path)
+
+
+def test_custom_prompt_appended_last():
+    prompt = get_prompt(
+        "translate/standard", target_language="简体中文", custom_prompt=" 术语: LLM\n"
+    )
+    base = get_prompt("translate/standard", target_language="简体中文")
+
+    assert prompt.startswith(base.rstrip())
+    assert prompt.endswith("<reference>\n术语: LLM\n</reference>")
+
+
+def test_empty_custom_prompt_adds_nothing():
+    assert get_prompt("optimize/subtitle", custom_prompt="  ") == get_prompt(
+        "optimize/subtitle"
+    )
+
+
+def test_same_task_same_prefix():
+    kwargs = dict(target_language="日本語", custom_prompt="保持术语")
+    assert get_prompt("translate/reflect", **kwargs) == get_prompt(
+        "translate/reflect", **kwargs
+    )
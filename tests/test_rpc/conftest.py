@@ -0,0 +1,26 @@
+"""RPC 模块测试的公共夹具"""
+
+import pytest
+
+from app.common.config import cfg
+from app.rpc.task_manager import SubtitizeTaskManager
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """独立的任务管理器实例（不启用任务日志）"""
+    monkeypatch.setattr(cfg.rpc_task_journal, "_value", False)
+    monkeypatch.setattr(SubtitizeTaskManager, "_instance", None)
+    return SubtitizeTaskManager()
+
+
+@pytest.fixture
+def video(tmp_path):
+    """生成指定内容的视频文件，返回路径"""
+
+    def make(name: str, content: bytes = b"video") -> str:
+        path = tmp_path / name
+        path.write_bytes(content)
+        return str(path)
+
+    return make
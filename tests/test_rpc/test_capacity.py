@@ -0,0 +1,175 @@
+"""Worker 容量上报（容量负载、拉取模式）测试"""
+
+import importlib
+import threading
+import time
+
+import pytest
+
+from app.common.config import cfg
+from app.rpc.capacity import CapacityReporter
+from app.rpc.subtitize_executor import SubtitizeExecutor
+
+# app.rpc 导出的同名对象是全局实例，这里需要模块本身
+capacity_module = importlib.import_module("app.rpc.capacity")
+executor_module = importlib.import_module("app.rpc.subtitize_executor")
+
+
+class FakeSignalR:
+    """记录发送的消息，send 返回 accept"""
+
+    def __init__(self):
+        self.is_connected = True
+        self.accept = True
+        self.sent = []
+
+    def send(self, method_name, *args) -> bool:
+        self.sent.append((method_name, *args))
+        return self.accept
+
+
+@pytest.fixture
+def executor(manager, monkeypatch):
+    """转录阶段阻塞在 gate 上的执行器"""
+    monkeypatch.setattr(executor_module, "task_manager", manager)
+    monkeypatch.setattr(cfg.rpc_streaming_subtitle, "_value", False)
+    executor = SubtitizeExecutor()
+    executor.gate = threading.Event()
+
+    def transcribe(video_path, output_path, task_id, segment_stream=None):
+        executor.gate.wait(5)
+        return output_path
+
+    monkeypatch.setattr(executor, "_transcribe", transcribe)
+    monkeypatch.setattr(
+        executor, "_process_subtitle", lambda source, video, output, task_id: output
+    )
+    yield executor
+    executor.gate.set()
+
+
+@pytest.fixture
+def signalr():
+    return FakeSignalR()
+
+
+@pytest.fixture
+def reporter(manager, executor, signalr, monkeypatch):
+    monkeypatch.setattr(capacity_module, "task_manager", manager)
+    monkeypatch.setattr(capacity_module, "subtitize_executor", executor)
+    monkeypatch.setattr(capacity_module, "signalr_client", signalr)
+    monkeypatch.setattr(cfg.rpc_pull_mode, "_value", False)
+    monkeypatch.setattr(CapacityReporter, "_instance", None)
+    return CapacityReporter()
+
+
+def wait_until(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "等待超时"
+        time.sleep(0.01)
+
+
+class TestCapacity:
+    def test_slots_follow_started_workers(self, reporter, executor, monkeypatch):
+        monkeypatch.setattr(cfg.rpc_transcribe_concurrency, "_value", 2)
+        monkeypatch.setattr(cfg.rpc_subtitle_concurrency, "_value", 1)
+
+        # 工作线程未启动时没有可用容量
+        capacity = reporter.get_capacity()
+        assert (capacity["asr_slots"], capacity["asr_slots_free"]) == (0, 0)
+        assert (capacity["llm_slots"], capacity["llm_slots_free"]) == (0, 0)
+
+        executor.start()
+        # 启动后修改配置不影响已运行的线程数
+        monkeypatch.setattr(cfg.rpc_transcribe_concurrency, "_value", 8)
+        capacity = reporter.get_capacity()
+        assert (capacity["asr_slots"], capacity["asr_slots_free"]) == (2, 2)
+        assert (capacity["llm_slots"], capacity["llm_slots_free"]) == (1, 1)
+        assert capacity["queue_length"] == 0
+        assert capacity["pull_mode"] is False
+
+    def test_busy_and_queued_tasks_use_slots(
+        self, reporter, executor, manager, video, monkeypatch
+    ):
+        monkeypatch.setattr(cfg.rpc_transcribe_concurrency, "_value", 2)
+        monkeypatch.setattr(cfg.rpc_subtitle_concurrency, "_value", 1)
+        executor.start()
+
+        for i in range(3):
+            manager.create_task(
+                video(f"{i}.mp4", str(i).encode()), f"{i}.srt", f"{i}.zh.srt"
+            )
+        wait_until(lambda: executor.get_slot_usage()["transcribe"] == (2, 2))
+
+        capacity = reporter.get_capacity()
+        assert capacity["queue_length"] == 1
+        assert capacity["asr_slots_free"] == 0
+        assert capacity["llm_slots_free"] == 1
+
+        executor.gate.set()
+        wait_until(lambda: reporter.get_capacity()["asr_slots_free"] == 2)
+
+
+class TestPullMode:
+    @pytest.fixture
+    def capacity(self, reporter, executor, monkeypatch):
+        monkeypatch.setattr(cfg.rpc_pull_mode, "_value", True)
+        monkeypatch.setattr(cfg.rpc_transcribe_concurrency, "_value", 2)
+        executor.start()
+        return reporter.get_capacity()
+
+    def test_requests_free_slots_once(self, reporter, signalr, capacity):
+        reporter._maybe_request_work(capacity)
+        reporter._maybe_request_work(capacity)
+
+        assert signalr.sent == [("RequestWork", {"slots": 2, "capacity": capacity})]
+
+        # 收到 AssignWork 应答后可以再次请求
+        reporter.on_work_assigned()
+        reporter._maybe_request_work(capacity)
+        assert len(signalr.sent) == 2
+
+    def test_unanswered_request_repeats_after_timeout(
+        self, reporter, signalr, capacity, monkeypatch
+    ):
+        monkeypatch.setattr(cfg.rpc_capacity_interval, "_value", 1)
+        reporter._maybe_request_work(capacity)
+        reporter._work_requested_at -= capacity_module.REQUEST_WORK_TIMEOUT_INTERVALS
+
+        reporter._maybe_request_work(capacity)
+        assert len(signalr.sent) == 2
+
+    def test_failed_send_is_retried(self, reporter, signalr, capacity):
+        signalr.accept = False
+        reporter._maybe_request_work(capacity)
+        signalr.accept = True
+        reporter._maybe_request_work(capacity)
+
+        assert len(signalr.sent) == 2
+
+    @pytest.mark.parametrize(
+        "override",
+        [{"pull_mode": False}, {"accepting": False}, {"asr_slots_free": 0}],
+    )
+    def test_no_request_without_free_capacity(
+        self, reporter, signalr, capacity, override
+    ):
+        reporter._maybe_request_work({**capacity, **override})
+        assert signalr.sent == []
+
+    def test_report_loop_sends_capacity_and_requests_work(
+        self, reporter, signalr, capacity
+    ):
+        reporter.start()
+        try:
+            reporter.notify()
+            wait_until(lambda: len(signalr.sent) >= 2)
+        finally:
+            reporter.stop()
+
+        (method, capacity), (request, payload) = signalr.sent[:2]
+        assert method == "WorkerCapacity"
+        assert capacity["asr_slots_free"] == 2
+        assert request == "RequestWork"
+        assert payload["slots"] == 2
@@ -0,0 +1,125 @@
+"""ETA 估算（历史吞吐量 + 任务跟踪）测试"""
+
+import importlib
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from diskcache import Cache
+
+from app.rpc.eta_estimator import (
+    DEFAULT_THROUGHPUT,
+    STAGE_ASR,
+    STAGE_TRANSLATE,
+    ETAEstimator,
+)
+
+eta_module = importlib.import_module("app.rpc.eta_estimator")
+
+STAGE_KEYS = {STAGE_ASR: "asr:test", STAGE_TRANSLATE: "translate:test"}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动推进的单调时钟"""
+    now = SimpleNamespace(value=1000.0)
+    fake_time = SimpleNamespace(monotonic=lambda: now.value)
+    monkeypatch.setattr(eta_module, "time", fake_time)
+    return now
+
+
+@pytest.fixture
+def estimator(tmp_path, monkeypatch):
+    monkeypatch.setattr(ETAEstimator, "_instance", None)
+    estimator = ETAEstimator()
+    history = Cache(str(tmp_path / "eta_history"))
+    estimator._history = history
+    yield estimator
+    history.close()
+
+
+def seconds_left(eta: datetime) -> float:
+    return (eta - datetime.now()).total_seconds()
+
+
+class TestTaskETATracker:
+    def test_records_stage_throughput(self, estimator, clock):
+        tracker = estimator.track(1, STAGE_KEYS)
+        tracker.set_audio_duration(100)
+        tracker.start_stage(STAGE_ASR)
+        clock.value += 10
+        tracker.finish_stage(STAGE_ASR)
+
+        assert estimator.get_throughput("asr:test", STAGE_ASR) == 10.0
+
+    def test_records_only_work_done(self, estimator, clock):
+        """部分块来自检查点或缓存时只按实际转录的音频计算"""
+        tracker = estimator.track(1, STAGE_KEYS)
+        tracker.set_audio_duration(100)
+        tracker.start_stage(STAGE_ASR)
+        clock.value += 10
+        tracker.finish_stage(STAGE_ASR, units=30)
+
+        assert estimator.get_throughput("asr:test", STAGE_ASR) == 3.0
+
+    def test_reused_stage_not_recorded(self, estimator, clock):
+        """全部来自检查点或缓存时不计入历史"""
+        tracker = estimator.track(1, STAGE_KEYS)
+        tracker.set_audio_duration(3600)
+        tracker.start_stage(STAGE_ASR)
+        clock.value += 2
+        tracker.finish_stage(STAGE_ASR, units=0)
+
+        assert (
+            estimator.get_throughput("asr:test", STAGE_ASR)
+            == DEFAULT_THROUGHPUT[STAGE_ASR]
+        )
+
+    def test_overlapped_subtitle_stage_not_recorded(self, estimator, clock):
+        tracker = estimator.track(1, STAGE_KEYS)
+        tracker.overlapped = True
+        tracker.set_segment_count(30)
+        tracker.start_stage(STAGE_TRANSLATE)
+        clock.value += 60
+        tracker.finish_stage(STAGE_TRANSLATE)
+
+        assert (
+            estimator.get_throughput("translate:test", STAGE_TRANSLATE)
+            == DEFAULT_THROUGHPUT[STAGE_TRANSLATE]
+        )
+
+    def test_ewma_of_runs(self, estimator, clock):
+        for units in (100, 200):
+            tracker = estimator.track(1, STAGE_KEYS)
+            tracker.start_stage(STAGE_ASR)
+            clock.value += 10
+            tracker.finish_stage(STAGE_ASR, units=units)
+
+        alpha = eta_module.EWMA_ALPHA
+        rate = estimator.get_throughput("asr:test", STAGE_ASR)
+        assert rate == pytest.approx(alpha * 20 + (1 - alpha) * 10)
+
+    def test_eta_sums_stages_unless_overlapped(self, estimator, clock):
+        tracker = estimator.track(1, STAGE_KEYS)
+        assert tracker.eta() is None
+
+        # 转录 100s / 5 = 20s，翻译 30 片段 / 3 = 10s
+        tracker.set_audio_duration(100)
+        tracker.set_segment_count(30)
+        assert seconds_left(tracker.eta()) == pytest.approx(30, abs=1)
+
+        tracker.overlapped = True
+        assert seconds_left(tracker.eta()) == pytest.approx(20, abs=1)
+
+    def test_eta_uses_observed_speed(self, estimator, clock):
+        tracker = estimator.track(1, {STAGE_ASR: "asr:test"})
+        tracker.set_audio_duration(100)
+        tracker.start_stage(STAGE_ASR)
+        clock.value += 40
+        tracker.update_stage(STAGE_ASR, 0.5)
+
+        # 观察速度剩余 40s，历史速度剩余 10s，按完成比例各占一半
+        assert seconds_left(tracker.eta()) == pytest.approx(25, abs=1)
+
+    def test_untracked_task_has_no_eta(self, estimator):
+        assert estimator.get_tracker(42).eta() is None
@@ -0,0 +1,210 @@
+"""出站事件总线（终止事件重试、进度合并）测试"""
+
+import importlib
+import threading
+import time
+
+import pytest
+
+from app.common.config import cfg
+from app.rpc.event_bus import OutboundEventBus
+
+# app.rpc 导出的 event_bus 是全局实例，这里需要模块本身
+event_bus_module = importlib.import_module("app.rpc.event_bus")
+
+
+class FakeSender:
+    """记录发送的消息，前 fail_times 次返回失败；gate 未打开时阻塞在发送中"""
+
+    def __init__(self, fail_times: int = 0):
+        self.fail_times = fail_times
+        self.connected = True
+        self.attempts = []
+        self.delivered = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, method_name, payload) -> bool:
+        self.entered.set()
+        self.gate.wait(5)
+        with self._lock:
+            self.attempts.append((method_name, payload))
+            if len(self.attempts) <= self.fail_times:
+                return False
+            self.delivered.append((method_name, payload))
+            return True
+
+
+def wait_until(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "等待超时"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def make_bus(monkeypatch):
+    monkeypatch.setattr(event_bus_module, "RETRY_INITIAL_DELAY", 0.01)
+    monkeypatch.setattr(event_bus_module, "RETRY_MAX_DELAY", 0.05)
+    monkeypatch.setattr(cfg.rpc_progress_max_rate, "_value", 50)
+    monkeypatch.setattr(cfg.rpc_progress_batch, "_value", False)
+    buses = []
+
+    def make(sender: FakeSender) -> OutboundEventBus:
+        monkeypatch.setattr(OutboundEventBus, "_instance", None)
+        bus = OutboundEventBus(
+            send=sender, is_connected=lambda: getattr(sender, "connected", True)
+        )
+        buses.append(bus)
+        return bus
+
+    yield make
+    for bus in buses:
+        bus.stop(timeout=1)
+
+
+class TestTerminalEvents:
+    def test_delivered_in_order_after_retries(self, make_bus):
+        sender = FakeSender(fail_times=3)
+        bus = make_bus(sender)
+        for task_id in (1, 2, 3):
+            bus.publish_terminal("SubtitizeCompleted", task_id, {"task_id": task_id})
+
+        wait_until(lambda: len(sender.delivered) == 3)
+
+        assert [payload["task_id"] for _, payload in sender.delivered] == [1, 2, 3]
+        # 失败期间只重试队首事件，不会越过它发送后面的事件
+        assert [payload["task_id"] for _, payload in sender.attempts[:4]] == [1] * 4
+        assert bus.get_pending_count() == {"progress": 0, "terminal": 0}
+
+    def test_sender_exception_is_retried(self, make_bus):
+        calls = []
+
+        def flaky(method_name, payload):
+            calls.append(payload)
+            if len(calls) == 1:
+                raise ConnectionError("未连接")
+            return True
+
+        bus = make_bus(flaky)
+        bus.publish_terminal("SubtitizeFaulted", 1, {"task_id": 1})
+
+        wait_until(lambda: len(calls) == 2)
+        wait_until(lambda: bus.get_pending_count()["terminal"] == 0)
+
+    def test_stop_flushes_remaining_terminal_events(self, make_bus):
+        sender = FakeSender(fail_times=1)
+        bus = make_bus(sender)
+        bus.publish_terminal("SubtitizeCompleted", 1, {"task_id": 1})
+        bus.stop(timeout=2)
+
+        assert sender.delivered == [("SubtitizeCompleted", {"task_id": 1})]
+
+    def test_held_while_disconnected_and_sent_on_connect(self, make_bus):
+        sender = FakeSender()
+        sender.connected = False
+        bus = make_bus(sender)
+        bus.publish_terminal("SubtitizeCompleted", 1, {"task_id": 1})
+
+        time.sleep(0.1)
+        assert sender.attempts == []
+
+        sender.connected = True
+        bus.on_connected()
+        wait_until(lambda: len(sender.delivered) == 1)
+
+    def test_stop_does_not_wait_while_disconnected(self, make_bus):
+        sender = FakeSender()
+        sender.connected = False
+        bus = make_bus(sender)
+        bus.publish_terminal("SubtitizeCompleted", 1, {"task_id": 1})
+
+        start = time.monotonic()
+        bus.stop(timeout=2)
+        assert time.monotonic() - start < 1
+        assert sender.attempts == []
+
+    def test_dropped_after_max_attempts(self, make_bus, monkeypatch):
+        monkeypatch.setattr(event_bus_module, "TERMINAL_MAX_ATTEMPTS", 3)
+        sender = FakeSender(fail_times=3)
+        bus = make_bus(sender)
+        bus.publish_terminal("SubtitizeFaulted", 1, {"task_id": 1})
+        bus.publish_terminal("SubtitizeCompleted", 2, {"task_id": 2})
+
+        wait_until(lambda: len(sender.delivered) == 1)
+        assert [payload["task_id"] for _, payload in sender.attempts] == [1, 1, 1, 2]
+        assert bus.get_pending_count()["terminal"] == 0
+
+    def test_queue_limit_drops_oldest(self, make_bus, monkeypatch):
+        monkeypatch.setattr(event_bus_module, "TERMINAL_QUEUE_LIMIT", 2)
+        sender = FakeSender()
+        sender.connected = False
+        bus = make_bus(sender)
+        for task_id in (1, 2, 3):
+            bus.publish_terminal("SubtitizeCompleted", task_id, {"task_id": task_id})
+        assert bus.get_pending_count()["terminal"] == 2
+
+        sender.connected = True
+        bus.on_connected()
+        wait_until(lambda: len(sender.delivered) == 2)
+        assert [payload["task_id"] for _, payload in sender.delivered] == [2, 3]
+
+
+class TestProgressEvents:
+    def test_coalesced_to_latest_per_task(self, make_bus):
+        sender = FakeSender()
+        sender.gate.clear()
+        bus = make_bus(sender)
+
+        # 发送线程阻塞在第一条进度上时继续产生进度
+        bus.publish_progress(1, {"task_id": 1, "progress": 0})
+        assert sender.entered.wait(5)
+        for progress in (10, 20, 30):
+            bus.publish_progress(1, {"task_id": 1, "progress": progress})
+        bus.publish_progress(2, {"task_id": 2, "progress": 5})
+        sender.gate.set()
+
+        wait_until(lambda: len(sender.delivered) == 3)
+        assert [payload for _, payload in sender.delivered] == [
+            {"task_id": 1, "progress": 0},
+            {"task_id": 1, "progress": 30},
+            {"task_id": 2, "progress": 5},
+        ]
+
+    def test_batch_sends_one_message(self, make_bus, monkeypatch):
+        monkeypatch.setattr(cfg.rpc_progress_batch, "_value", True)
+        sender = FakeSender()
+        sender.gate.clear()
+        bus = make_bus(sender)
+
+        bus.publish_progress(1, {"task_id": 1, "progress": 0})
+        assert sender.entered.wait(5)
+        bus.publish_progress(1, {"task_id": 1, "progress": 50})
+        bus.publish_progress(2, {"task_id": 2, "progress": 60})
+        sender.gate.set()
+
+        wait_until(lambda: len(sender.delivered) == 2)
+        assert sender.delivered[1] == (
+            "SubtitizeProgressBatch",
+            [{"task_id": 1, "progress": 50}, {"task_id": 2, "progress": 60}],
+        )
+
+    def test_terminal_event_drops_pending_progress(self, make_bus):
+        sender = FakeSender()
+        sender.gate.clear()
+        bus = make_bus(sender)
+
+        bus.publish_progress(2, {"task_id": 2, "progress": 0})
+        assert sender.entered.wait(5)
+        bus.publish_progress(1, {"task_id": 1, "progress": 90})
+        bus.publish_terminal("SubtitizeCompleted", 1, {"task_id": 1})
+        sender.gate.set()
+
+        wait_until(lambda: len(sender.delivered) == 2)
+        time.sleep(0.1)
+        assert sender.delivered == [
+            ("SubtitizeProgress", {"task_id": 2, "progress": 0}),
+            ("SubtitizeCompleted", {"task_id": 1}),
+        ]
@@ -0,0 +1,229 @@
+"""字幕化执行器（阶段流水线、流式字幕处理）测试"""
+
+import importlib
+import threading
+import time
+
+import pytest
+
+from app.common.config import cfg
+from app.core.asr.asr_data import ASRData, ASRDataSeg
+from app.core.entities import LLMServiceEnum, SubtitleConfig
+from app.core.split.segment_stream import SegmentStream
+from app.core.utils.cancel import TaskCancelledError, run_cancellable
+from app.rpc.subtitize_executor import SubtitizeExecutor
+from app.rpc.task_manager import SubtitizeTaskState
+
+# app.rpc 导出的同名对象是全局实例，这里需要模块本身
+executor_module = importlib.import_module("app.rpc.subtitize_executor")
+
+
+class FakeSplitter:
+    """按调用次数决定是否失败的断句器"""
+
+    fail_on_call = None
+
+    def __init__(self, **kwargs):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def split_subtitle(self, asr_data: ASRData) -> ASRData:
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call == self.fail_on_call:
+            raise ValueError("断句失败")
+        return asr_data
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def executor(manager, monkeypatch):
+    monkeypatch.setattr(executor_module, "task_manager", manager)
+    monkeypatch.setattr(executor_module, "SubtitleSplitter", FakeSplitter)
+    monkeypatch.setattr(
+        SubtitizeExecutor,
+        "_build_subtitle_config",
+        lambda self: SubtitleConfig(need_split=True),
+    )
+    return SubtitizeExecutor()
+
+
+def start_task(manager, video) -> int:
+    task_id = manager.create_task(video("a.mp4"), "a.srt", "a.zh.srt")
+    manager.next_task(timeout=0)
+    manager.mark_started(task_id)
+    return task_id
+
+
+def segments(start: int, count: int):
+    return [
+        ASRDataSeg(f"word{i}", i * 1000, i * 1000 + 500)
+        for i in range(start, start + count)
+    ]
+
+
+def run_stream(executor, task, stream, output_path):
+    """与字幕处理阶段一样在任务的取消作用域内执行，返回 (结果, 异常)"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["value"] = run_cancellable(
+                task.cancel_token,
+                executor._process_subtitle_stream,
+                stream,
+                output_path,
+                task.task_id,
+            )
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+class TestProcessSubtitleStream:
+    def test_block_failure_stops_task_before_stream_ends(
+        self, executor, manager, video, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr(FakeSplitter, "fail_on_call", 1)
+        task_id = start_task(manager, video)
+        task = manager.get_task(task_id)
+        stream = SegmentStream(block_word_count=1, search_range=1)
+
+        thread, outcome = run_stream(executor, task, stream, str(tmp_path / "out.srt"))
+        # 转录仍在进行（片段流未关闭）
+        stream.put(segments(0, 3))
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert isinstance(outcome.get("error"), TaskCancelledError)
+        assert task.cancel_token.cancelled
+        assert task.state == SubtitizeTaskState.FAILED
+        assert "断句失败" in task.error
+        with pytest.raises(RuntimeError):
+            stream.put(segments(3, 1))
+
+    def test_all_blocks_saved_in_order(self, executor, manager, video, tmp_path):
+        task_id = start_task(manager, video)
+        task = manager.get_task(task_id)
+        stream = SegmentStream(block_word_count=1, search_range=1)
+        output_path = tmp_path / "out.srt"
+
+        thread, outcome = run_stream(executor, task, stream, str(output_path))
+        stream.put(segments(0, 3))
+        stream.put(segments(3, 3))
+        stream.close()
+        thread.join(timeout=5)
+
+        assert outcome == {"value": str(output_path)}
+        assert not task.cancel_token.cancelled
+        saved = ASRData.from_subtitle_file(str(output_path))
+        assert [seg.text for seg in saved.segments] == [f"word{i}" for i in range(6)]
+
+
+class StageRecorder:
+    """记录各阶段的执行区间与最大并发数"""
+
+    def __init__(self):
+        self.spans = {}
+        self.max_active = {"transcribe": 0, "subtitle": 0}
+        self._active = {"transcribe": 0, "subtitle": 0}
+        self._lock = threading.Lock()
+
+    def run(self, stage: str, task_id: int, seconds: float):
+        with self._lock:
+            self._active[stage] += 1
+            self.max_active[stage] = max(self.max_active[stage], self._active[stage])
+            start = time.monotonic()
+        time.sleep(seconds)
+        with self._lock:
+            self._active[stage] -= 1
+            self.spans[(stage, task_id)] = (start, time.monotonic())
+
+
+class TestPipeline:
+    @pytest.fixture
+    def recorder(self, executor, monkeypatch):
+        recorder = StageRecorder()
+        monkeypatch.setattr(cfg.rpc_streaming_subtitle, "_value", False)
+
+        def transcribe(video_path, output_path, task_id, segment_stream=None):
+            recorder.run("transcribe", task_id, 0.2)
+            return output_path
+
+        def process_subtitle(source, video_path, output_path, task_id):
+            recorder.run("subtitle", task_id, 0.4)
+            return output_path
+
+        monkeypatch.setattr(executor, "_transcribe", transcribe)
+        monkeypatch.setattr(executor, "_process_subtitle", process_subtitle)
+        return recorder
+
+    def run_tasks(self, executor, manager, video, count: int):
+        task_ids = [
+            manager.create_task(
+                video(f"{i}.mp4", str(i).encode()), f"{i}.srt", f"{i}.zh.srt"
+            )
+            for i in range(count)
+        ]
+        executor.execute(task_ids[0])
+        deadline = time.monotonic() + 10
+        while not all(manager.get_task(i).is_finished for i in task_ids):
+            assert time.monotonic() < deadline, "等待任务完成超时"
+            time.sleep(0.01)
+        assert all(
+            manager.get_task(i).state == SubtitizeTaskState.COMPLETED for i in task_ids
+        )
+        return task_ids
+
+    def test_next_transcribe_overlaps_subtitle_stage(
+        self, executor, manager, video, recorder, monkeypatch
+    ):
+        monkeypatch.setattr(cfg.rpc_transcribe_concurrency, "_value", 1)
+        monkeypatch.setattr(cfg.rpc_subtitle_concurrency, "_value", 1)
+        a, b = self.run_tasks(executor, manager, video, 2)
+
+        a_transcribe = recorder.spans[("transcribe", a)]
+        a_subtitle = recorder.spans[("subtitle", a)]
+        b_transcribe = recorder.spans[("transcribe", b)]
+        # B 在 A 转录完成后开始转录，并与 A 的字幕处理同时进行
+        assert b_transcribe[0] >= a_transcribe[1]
+        assert b_transcribe[0] < a_subtitle[1]
+        assert recorder.max_active == {"transcribe": 1, "subtitle": 1}
+
+    def test_stage_concurrency_limits(
+        self, executor, manager, video, recorder, monkeypatch
+    ):
+        monkeypatch.setattr(cfg.rpc_transcribe_concurrency, "_value", 2)
+        monkeypatch.setattr(cfg.rpc_subtitle_concurrency, "_value", 1)
+        self.run_tasks(executor, manager, video, 4)
+
+        assert recorder.max_active == {"transcribe": 2, "subtitle": 1}
+        # 工作线程在任务标记完成后才释放
+        deadline = time.monotonic() + 5
+        while executor.get_slot_usage() != {"transcribe": (0, 2), "subtitle": (0, 1)}:
+            assert time.monotonic() < deadline, "等待工作线程空闲超时"
+            time.sleep(0.01)
+
+
+class TestLLMProviders:
+    def test_each_provider_has_its_own_rate_limits(self, monkeypatch):
+        monkeypatch.setattr(cfg.llm_service, "_value", LLMServiceEnum.OPENAI)
+        monkeypatch.setattr(cfg.llm_fallback_services, "_value", ["DeepSeek"])
+        monkeypatch.setattr(cfg.openai_api_key, "_value", "key")
+        monkeypatch.setattr(cfg.openai_requests_per_minute, "_value", 500)
+        monkeypatch.setattr(cfg.openai_tokens_per_minute, "_value", 200000)
+        monkeypatch.setattr(cfg.deepseek_api_key, "_value", "key")
+        monkeypatch.setattr(cfg.deepseek_requests_per_minute, "_value", 60)
+
+        providers = SubtitizeExecutor._get_llm_providers()
+
+        assert [(p.name, p.rpm, p.tpm) for p in providers] == [
+            ("OpenAI", 500, 200000),
+            ("DeepSeek", 60, 0),
+        ]
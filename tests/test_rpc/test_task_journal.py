@@ -0,0 +1,156 @@
+"""任务日志（SQLite）记录 → 恢复 → 检查点测试"""
+
+import importlib
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from app.common.config import cfg
+from app.rpc.task_journal import TaskJournal
+from app.rpc.task_manager import SubtitizeTaskManager, SubtitizeTaskState
+
+# app.rpc 导出的 task_manager 是全局实例，这里需要模块本身
+task_manager_module = importlib.import_module("app.rpc.task_manager")
+
+
+def open_journal(monkeypatch, db_path) -> TaskJournal:
+    """打开指定路径的任务日志（模拟进程重启后的新实例）"""
+    monkeypatch.setattr(TaskJournal, "_instance", None)
+    journal = TaskJournal(db_path)
+    monkeypatch.setattr(task_manager_module, "task_journal", journal)
+    return journal
+
+
+def new_manager(monkeypatch) -> SubtitizeTaskManager:
+    monkeypatch.setattr(SubtitizeTaskManager, "_instance", None)
+    return SubtitizeTaskManager()
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(cfg.rpc_task_journal, "_value", True)
+    path = tmp_path / "journal.db"
+    yield path
+    if TaskJournal._instance is not None:
+        TaskJournal._instance.close()
+
+
+class TestTaskJournal:
+    def test_record_and_load_round_trip(self, monkeypatch, db_path):
+        journal = open_journal(monkeypatch, db_path)
+        created_at = datetime(2024, 1, 1, 12, 0, 0)
+        journal.record_task(
+            7,
+            "a.mp4",
+            "a.srt",
+            "a.zh.srt",
+            "en",
+            "queued",
+            created_at,
+            priority=3,
+            content_key="abc:en",
+            duplicate_of=5,
+        )
+        journal.checkpoint(7).put("asr", "chunk-0", {"text": "hello"})
+        journal.close()
+
+        journal = open_journal(monkeypatch, db_path)
+        (record,) = journal.load_unfinished_tasks(["completed", "failed", "cancelled"])
+        assert record == {
+            "task_id": 7,
+            "video_path": "a.mp4",
+            "raw_subtitle_path": "a.srt",
+            "translated_subtitle_path": "a.zh.srt",
+            "language": "en",
+            "state": "queued",
+            "created_at": created_at,
+            "priority": 3,
+            "content_key": "abc:en",
+            "duplicate_of": 5,
+        }
+        assert journal.get_last_task_id() == 7
+        assert journal.checkpoint(7).get("asr", "chunk-0") == {"text": "hello"}
+        assert journal.count_checkpoints(7) == {"asr": 1}
+
+    def test_finished_tasks_not_loaded(self, monkeypatch, db_path):
+        journal = open_journal(monkeypatch, db_path)
+        journal.record_task(1, "a.mp4", "a.srt", "", None, "queued", datetime.now())
+        journal.finish_task(1, "completed")
+
+        assert journal.load_unfinished_tasks(["completed"]) == []
+
+    def test_adds_columns_to_old_database(self, monkeypatch, db_path):
+        conn = sqlite3.connect(str(db_path))
+        conn.execute(
+            "CREATE TABLE tasks (task_id INTEGER PRIMARY KEY, video_path TEXT NOT NULL, "
+            "raw_subtitle_path TEXT NOT NULL, translated_subtitle_path TEXT NOT NULL, "
+            "language TEXT, state TEXT NOT NULL, created_at TEXT NOT NULL, "
+            "updated_at TEXT NOT NULL, error TEXT)"
+        )
+        now = datetime.now().isoformat()
+        conn.execute(
+            "INSERT INTO tasks VALUES (1, 'a.mp4', 'a.srt', '', NULL, 'queued', ?, ?, NULL)",
+            (now, now),
+        )
+        conn.commit()
+        conn.close()
+
+        journal = open_journal(monkeypatch, db_path)
+        (record,) = journal.load_unfinished_tasks(["completed"])
+        assert (record["priority"], record["content_key"], record["duplicate_of"]) == (
+            0,
+            None,
+            None,
+        )
+
+
+class TestRestoreTasks:
+    def test_restores_priority_and_duplicates(self, monkeypatch, db_path, video):
+        open_journal(monkeypatch, db_path)
+        manager = new_manager(monkeypatch)
+        low = manager.create_task(video("low.mp4", b"low"), "low.srt", "", priority=1)
+        path = video("a.mp4")
+        primary = manager.create_task(path, "a.srt", "", priority=5)
+        duplicate = manager.create_task(path, "b.srt", "")
+        manager.get_checkpoint(primary).put("asr", "chunk-0", ["segment"])
+        assert manager.get_task(duplicate).duplicate_of == primary
+
+        # 模拟进程重启
+        open_journal(monkeypatch, db_path)
+        manager = new_manager(monkeypatch)
+        assert manager.restore_tasks() == 3
+
+        assert manager.get_task(primary).priority == 5
+        assert manager.get_task(duplicate).duplicate_of == primary
+        assert manager.get_queue_length() == 2
+        assert manager.next_task(timeout=0).task_id == primary
+        assert manager.next_task(timeout=0).task_id == low
+        assert manager.get_checkpoint(primary).get("asr", "chunk-0") == ["segment"]
+
+        # 恢复后相同输入的新任务仍复用主任务
+        again = manager.create_task(path, "c.srt", "")
+        assert manager.get_task(again).duplicate_of == primary
+
+        manager.mark_completed(primary)
+        assert manager.get_task(duplicate).state == SubtitizeTaskState.COMPLETED
+
+    def test_duplicate_of_finished_primary_runs_alone(
+        self, monkeypatch, db_path, video
+    ):
+        open_journal(monkeypatch, db_path)
+        manager = new_manager(monkeypatch)
+        path = video("a.mp4")
+        primary = manager.create_task(path, "a.srt", "")
+        duplicate = manager.create_task(path, "b.srt", "")
+        # 主任务结束后、重复任务处理前进程退出
+        manager._journal.finish_task(primary, SubtitizeTaskState.COMPLETED.value)
+
+        journal = open_journal(monkeypatch, db_path)
+        manager = new_manager(monkeypatch)
+        assert manager.restore_tasks() == 1
+
+        assert manager.get_task(duplicate).duplicate_of is None
+        assert manager.next_task(timeout=0).task_id == duplicate
+        (record,) = journal.load_unfinished_tasks(["completed"])
+        assert record["duplicate_of"] is None
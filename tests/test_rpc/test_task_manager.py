@@ -0,0 +1,242 @@
+"""任务管理器测试：优先级队列、取消与输入去重"""
+
+import importlib
+import os
+import threading
+
+from app.common.config import cfg
+from app.rpc.task_manager import (
+    FINGERPRINT_SAMPLE_SIZE,
+    SubtitizeTaskState,
+    compute_content_key,
+)
+
+task_manager_module = importlib.import_module("app.rpc.task_manager")
+
+
+class TestContentKey:
+    def test_same_file_same_key(self, video):
+        path = video("a.mp4")
+        assert compute_content_key(path, "en") == compute_content_key(path, "en")
+
+    def test_copy_not_deduplicated(self, video):
+        assert compute_content_key(video("a.mp4"), "en") != compute_content_key(
+            video("b.mp4"), "en"
+        )
+
+    def test_language_part_of_key(self, video):
+        path = video("a.mp4")
+        assert compute_content_key(path, "en") != compute_content_key(path, "ja")
+
+    def test_modified_file_changes_key(self, video):
+        path = video("a.mp4", b"a" * 3 * FINGERPRINT_SAMPLE_SIZE)
+        before = compute_content_key(path, None)
+        stat = os.stat(path)
+        with open(path, "r+b") as f:
+            f.write(b"b")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert compute_content_key(path, None) != before
+
+    def test_reads_only_head_and_tail(self, video, monkeypatch):
+        path = video("a.mp4", b"v" * 10 * FINGERPRINT_SAMPLE_SIZE)
+        reads = []
+        real_open = open
+
+        class RecordingFile:
+            def __init__(self, f):
+                self._f = f
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self._f.close()
+
+            def seek(self, offset):
+                return self._f.seek(offset)
+
+            def read(self, size):
+                data = self._f.read(size)
+                reads.append(len(data))
+                return data
+
+        monkeypatch.setattr(
+            task_manager_module,
+            "open",
+            lambda *args: RecordingFile(real_open(*args)),
+            raising=False,
+        )
+        compute_content_key(path, "en")
+        # 同一文件再次提交不再读取
+        compute_content_key(path, "ja")
+        assert reads == [FINGERPRINT_SAMPLE_SIZE, FINGERPRINT_SAMPLE_SIZE]
+
+    def test_unreadable_file_not_deduplicated(self, tmp_path):
+        assert compute_content_key(str(tmp_path / "missing.mp4"), None) is None
+        assert compute_content_key("", None) is None
+
+
+def test_duplicate_input_waits_for_primary(manager, video):
+    path = video("a.mp4")
+    primary = manager.create_task(path, "a.srt", "")
+    duplicate = manager.create_task(path, "b.srt", "")
+    other = manager.create_task(video("c.mp4", b"other"), "c.srt", "")
+
+    assert manager.get_task(duplicate).duplicate_of == primary
+    assert manager.get_task(other).duplicate_of is None
+    assert manager.get_queue_length() == 2
+
+
+def test_rejected_jobs_not_read(manager, video, monkeypatch):
+    monkeypatch.setattr(cfg.rpc_max_queue_size, "_value", 1)
+    read = []
+    monkeypatch.setattr(
+        task_manager_module,
+        "compute_content_key",
+        lambda path, language: read.append(path) or f"{path}:{language}",
+    )
+    a, b = video("a.mp4", b"a"), video("b.mp4", b"b")
+
+    task_ids = manager.create_tasks(
+        [
+            {"video_path": a, "raw_subtitle_path": ""},
+            {"video_path": a, "raw_subtitle_path": "a.srt"},
+            {"video_path": b, "raw_subtitle_path": "b.srt"},
+        ]
+    )
+    assert task_ids[0] == -2 and task_ids[1] > 0 and task_ids[2] == -1
+    assert manager.create_task(b, "b.srt", "") == -1
+    assert read == [a]
+
+
+def create(manager, video, name: str, priority: int = 0) -> int:
+    """以文件名作为内容创建任务（内容不同，不会被去重）"""
+    return manager.create_task(
+        video(f"{name}.mp4", name.encode()), f"{name}.srt", "", priority=priority
+    )
+
+
+class TestPriorityQueue:
+    def test_higher_priority_first_then_fifo(self, manager, video):
+        low = create(manager, video, "low", priority=0)
+        high = create(manager, video, "high", priority=5)
+        low2 = create(manager, video, "low2", priority=0)
+        mid = create(manager, video, "mid", priority=1)
+
+        order = [manager.next_task(timeout=0).task_id for _ in range(4)]
+        assert order == [high, mid, low, low2]
+        assert manager.next_task(timeout=0) is None
+
+    def test_rejects_when_queue_full(self, manager, video, monkeypatch):
+        monkeypatch.setattr(cfg.rpc_max_queue_size, "_value", 2)
+        assert create(manager, video, "a") > 0
+        assert create(manager, video, "b") > 0
+        assert create(manager, video, "c") == -1
+
+        # 取出一个任务后腾出位置
+        manager.next_task(timeout=0)
+        assert create(manager, video, "d") > 0
+
+    def test_invalid_arguments(self, manager):
+        assert manager.create_task("", "a.srt", "") == -2
+        assert manager.create_task("a.mp4", "", "") == -2
+
+    def test_next_task_skips_cancelled(self, manager, video):
+        first = create(manager, video, "first", priority=1)
+        second = create(manager, video, "second")
+        assert manager.stop_task(first)
+
+        assert manager.next_task(timeout=0).task_id == second
+        assert manager.next_task(timeout=0) is None
+
+    def test_next_task_wakes_on_create(self, manager, video):
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(manager.next_task(5)))
+        waiter.start()
+        task_id = create(manager, video, "late")
+        waiter.join(timeout=5)
+        assert result and result[0].task_id == task_id
+
+
+class TestStopTask:
+    def test_stop_queued_task(self, manager, video):
+        faulted = []
+        manager.set_callbacks(None, None, lambda *args: faulted.append(args))
+        task_id = create(manager, video, "queued")
+
+        assert manager.stop_task(task_id)
+        task = manager.get_task(task_id)
+        assert task.state == SubtitizeTaskState.CANCELLED
+        assert task.cancel_token.cancelled
+        assert manager.get_queue_length() == 0
+        assert [args[0] for args in faulted] == [task_id]
+
+    def test_stop_running_task(self, manager, video):
+        task_id = create(manager, video, "running")
+        task = manager.next_task(timeout=0)
+        manager.update_progress(task_id, 100, SubtitizeTaskState.TRANSCRIBING)
+
+        assert manager.stop_task(task_id)
+        assert task.cancel_token.cancelled
+        assert manager.is_stop_requested(task_id)
+        # 运行中的后续进度与完成不再改变状态
+        manager.update_progress(task_id, 200, SubtitizeTaskState.OPTIMIZING)
+        manager.mark_completed(task_id)
+        assert task.state == SubtitizeTaskState.CANCELLED
+
+    def test_stop_finished_or_unknown_task(self, manager, video):
+        task_id = create(manager, video, "done")
+        manager.mark_completed(task_id)
+        assert not manager.stop_task(task_id)
+        assert not manager.stop_task(9999)
+
+    def test_discard_task_without_callback(self, manager, video):
+        faulted = []
+        manager.set_callbacks(None, None, lambda *args: faulted.append(args))
+        task_id = create(manager, video, "discarded")
+        task = manager.get_task(task_id)
+
+        manager.discard_task(task_id)
+
+        assert manager.get_task(task_id) is None
+        assert task.cancel_token.cancelled
+        assert manager.get_queue_length() == 0
+        assert manager.next_task(timeout=0) is None
+        assert faulted == []
+
+    def test_discard_primary_promotes_duplicate(self, manager, video):
+        path = video("shared.mp4")
+        primary = manager.create_task(path, "a.srt", "")
+        duplicate = manager.create_task(path, "b.srt", "")
+
+        manager.discard_task(primary)
+
+        assert manager.get_task(duplicate).duplicate_of is None
+        assert manager.next_task(timeout=0).task_id == duplicate
+
+    def test_stop_racing_completion_fires_one_callback(self, manager, video):
+        for i in range(50):
+            events = []
+            manager.set_callbacks(
+                None,
+                lambda *args: events.append("completed"),
+                lambda *args: events.append("faulted"),
+            )
+            task_id = create(manager, video, f"race{i}")
+            manager.next_task(timeout=0)
+            barrier = threading.Barrier(2)
+
+            def stop():
+                barrier.wait()
+                manager.stop_task(task_id)
+
+            def complete():
+                barrier.wait()
+                manager.mark_completed(task_id)
+
+            threads = [threading.Thread(target=stop), threading.Thread(target=complete)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(events) == 1
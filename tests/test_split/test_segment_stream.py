@@ -0,0 +1,98 @@
+"""SegmentStream 测试
+
+验证转录片段按块输出、切分点选在最大时间间隔处、以及多线程生产消费。
+"""
+
+import threading
+
+import pytest
+
+from app.core.asr.asr_data import ASRDataSeg
+from app.core.split.segment_stream import SegmentStream
+
+
+def create_words(count, start_index=0, pause_after=None):
+    """生成英文词级片段（每词 500ms，间隔 100ms），pause_after 处插入 2 秒停顿"""
+    segments = []
+    current = start_index * 600
+    for i in range(start_index, start_index + count):
+        segments.append(
+            ASRDataSeg(text=f"word{i} ", start_time=current, end_time=current + 500)
+        )
+        current += 600
+        if pause_after is not None and i == pause_after:
+            current += 2000
+    return segments
+
+
+class TestSegmentStream:
+    def test_small_input_yields_single_block_after_close(self):
+        stream = SegmentStream(block_word_count=50, search_range=5)
+        stream.put(create_words(20))
+        stream.close()
+
+        blocks = list(stream)
+
+        assert len(blocks) == 1
+        assert len(blocks[0]) == 20
+
+    def test_block_cut_at_largest_gap(self):
+        """切分点选在目标位置附近的最大停顿处"""
+        stream = SegmentStream(block_word_count=50, search_range=5)
+        stream.put(create_words(120, pause_after=52))
+        stream.close()
+
+        blocks = list(stream)
+
+        assert len(blocks[0]) == 53
+        assert blocks[0][-1].text == "word52 "
+        assert sum(len(block) for block in blocks) == 120
+
+    def test_waits_for_search_window_before_cutting(self):
+        """未关闭时，窗口内片段不足不会提前切分"""
+        stream = SegmentStream(block_word_count=50, search_range=5)
+        stream.put(create_words(53))
+
+        with pytest.raises(TimeoutError):
+            stream.next_block(timeout=0.05)
+
+        stream.put(create_words(10, start_index=53))
+        assert stream.next_block(timeout=0.05)
+
+    def test_put_copies_segments(self):
+        """下游修改片段不影响生产者持有的对象"""
+        original = create_words(3)
+        stream = SegmentStream(block_word_count=50)
+        stream.put(original)
+        stream.close()
+
+        block = stream.next_block()
+        block[0].text = "changed"
+
+        assert original[0].text == "word0 "
+
+    def test_fail_raises_in_consumer(self):
+        stream = SegmentStream()
+        stream.put(create_words(5))
+        stream.fail("转录失败")
+
+        with pytest.raises(RuntimeError, match="转录失败"):
+            stream.next_block()
+
+    def test_concurrent_producer_consumer(self):
+        stream = SegmentStream(block_word_count=30, search_range=5)
+        received = []
+
+        def consume():
+            for block in stream:
+                received.extend(block)
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for i in range(0, 200, 20):
+            stream.put(create_words(20, start_index=i))
+        stream.close()
+        consumer.join(timeout=5)
+
+        assert not consumer.is_alive()
+        assert [seg.text for seg in received] == [f"word{i} " for i in range(200)]
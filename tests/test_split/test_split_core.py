@@ -10,6 +10,7 @@ from app.core.split.split import (
     SubtitleSplitter,
     preprocess_segments,
 )
+from app.core.utils.checkpoint import Checkpoint
 
 
 class TestPreprocessSegments:
@@ -525,3 +526,56 @@ class TestEdgeCases:
         splitter = SubtitleSplitter(thread_num=1000, model="gpt-4o-mini")
         assert splitter.thread_num == 1000
         assert splitter.executor is not None
+
+
+class DictCheckpoint(Checkpoint):
+    """内存检查点，用于测试"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, stage, key):
+        return self.data.get((stage, key))
+
+    def put(self, stage, key, value):
+        self.data[(stage, key)] = value
+
+
+class TestSplitterCheckpoint:
+    """测试断句分组检查点"""
+
+    def test_checkpoint_reused_without_llm(self, monkeypatch):
+        """已有检查点的分组不再调用 LLM"""
+        checkpoint = DictCheckpoint()
+        splitter = SubtitleSplitter(thread_num=1, model="gpt-4o-mini", checkpoint=checkpoint)
+        segments = [
+            ASRDataSeg(text="hello ", start_time=0, end_time=500),
+            ASRDataSeg(text="world ", start_time=500, end_time=1000),
+        ]
+        key = splitter._checkpoint_key(segments)
+        checkpoint.put(Checkpoint.STAGE_SPLIT, key, [["hello world ", 0, 1000]])
+
+        def fail_llm(*args, **kwargs):
+            raise AssertionError("不应调用 LLM")
+
+        monkeypatch.setattr(splitter, "_process_by_llm", fail_llm)
+        result = splitter._process_single_segment(ASRData(segments))
+        splitter.stop()
+
+        assert [(s.text, s.start_time, s.end_time) for s in result] == [
+            ("hello world ", 0, 1000)
+        ]
+
+    def test_llm_result_written_to_checkpoint(self, monkeypatch):
+        """LLM 断句成功后写入检查点"""
+        checkpoint = DictCheckpoint()
+        splitter = SubtitleSplitter(thread_num=1, model="gpt-4o-mini", checkpoint=checkpoint)
+        segments = [ASRDataSeg(text="hi ", start_time=0, end_time=300)]
+        monkeypatch.setattr(
+            splitter, "_process_by_llm", lambda segs: [ASRDataSeg("hi ", 0, 300)]
+        )
+
+        splitter._process_single_segment(ASRData(segments))
+        splitter.stop()
+
+        assert list(checkpoint.data.values()) == [[["hi ", 0, 300]]]
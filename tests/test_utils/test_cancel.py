@@ -0,0 +1,142 @@
+"""任务取消作用域测试"""
+
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.utils import cancel
+from app.core.utils.cancel import (
+    CancelToken,
+    TaskCancelledError,
+    cancel_scope,
+    cancellable_process,
+    current_cancel_token,
+    run_cancellable,
+    submit_with_context,
+    wait_abandoned_runners,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_abandoned_runners(monkeypatch):
+    monkeypatch.setattr(cancel, "_abandoned_runners", [])
+
+
+class TestCancelToken:
+    def test_cancel_runs_callbacks_once(self):
+        token = CancelToken()
+        calls = []
+        token.add_callback(lambda: calls.append("a"))
+
+        def removed():
+            calls.append("removed")
+
+        token.add_callback(removed)
+        token.remove_callback(removed)
+
+        token.cancel()
+        token.cancel()
+
+        assert token.cancelled
+        assert calls == ["a"]
+        with pytest.raises(TaskCancelledError):
+            token.raise_if_cancelled()
+
+    def test_callback_added_after_cancel_runs_immediately(self):
+        token = CancelToken()
+        token.cancel()
+        calls = []
+        token.add_callback(lambda: calls.append(1))
+        assert calls == [1]
+
+    def test_failing_callback_does_not_stop_others(self):
+        token = CancelToken()
+        calls = []
+        token.add_callback(lambda: 1 / 0)
+        token.add_callback(lambda: calls.append(1))
+        token.cancel()
+        assert calls == [1]
+
+    def test_cancel_terminates_registered_process(self):
+        token = CancelToken()
+        process = subprocess.Popen(
+            [sys.executable, "-c", "import time; time.sleep(30)"]
+        )
+        with cancel_scope(token), cancellable_process(process):
+            token.cancel()
+            assert process.wait(timeout=5) is not None
+
+
+class TestCancelScope:
+    def test_scope_sets_and_restores_current_token(self):
+        default = current_cancel_token()
+        token = CancelToken()
+        with cancel_scope(token):
+            assert current_cancel_token() is token
+        assert current_cancel_token() is default
+        assert not default.cancelled
+
+    def test_submit_with_context_inherits_scope(self):
+        token = CancelToken()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            with cancel_scope(token):
+                inherited = submit_with_context(pool, current_cancel_token)
+            plain = pool.submit(current_cancel_token)
+            assert inherited.result() is token
+            assert plain.result() is not token
+
+
+class TestRunCancellable:
+    def test_returns_value_in_scope(self):
+        token = CancelToken()
+        assert run_cancellable(token, lambda x: (x, current_cancel_token()), 1) == (
+            1,
+            token,
+        )
+
+    def test_propagates_error(self):
+        with pytest.raises(ValueError):
+            run_cancellable(CancelToken(), lambda: int("x"))
+
+    def test_already_cancelled_does_not_start(self):
+        token = CancelToken()
+        token.cancel()
+        started = []
+        with pytest.raises(TaskCancelledError):
+            run_cancellable(token, lambda: started.append(1))
+        assert started == []
+
+    def test_cancel_returns_without_waiting_for_runner(self):
+        token = CancelToken()
+        release = threading.Event()
+
+        def blocking():
+            release.wait(5)
+
+        threading.Timer(0.1, token.cancel).start()
+        with pytest.raises(TaskCancelledError):
+            run_cancellable(token, blocking)
+
+        # 后台线程仍在运行，等待有超时
+        assert not wait_abandoned_runners(0.1)
+        release.set()
+        assert wait_abandoned_runners(5)
+
+    def test_wait_filters_by_function_name(self):
+        token = CancelToken()
+        release = threading.Event()
+
+        def transcribe():
+            release.wait(5)
+
+        threading.Timer(0.1, token.cancel).start()
+        with pytest.raises(TaskCancelledError):
+            run_cancellable(token, transcribe)
+
+        assert wait_abandoned_runners(0.1, name="translate")
+        assert not wait_abandoned_runners(0.1, name="transcribe")
+        release.set()
+        assert wait_abandoned_runners(5, name="transcribe")